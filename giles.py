@@ -49,10 +49,26 @@ if not cp.has_option("server", "port"):
 else:
     port = cp.getint("server", "port")
 
+if not cp.has_option("server", "compression_level"):
+    compression_level = 6
+else:
+    compression_level = cp.getint("server", "compression_level")
+
+if not cp.has_option("server", "profile_file"):
+    profile_file = "profiles.db"
+else:
+    profile_file = cp.get("server", "profile_file")
+
+if not cp.has_option("server", "snapshot_file"):
+    snapshot_file = "tables.db"
+else:
+    snapshot_file = cp.get("server", "snapshot_file")
+
 # No need to keep the config parser around now that we're done with it.
 del cp
 
-server = giles.server.Server(name, source_url, admin_password, config_filename)
+server = giles.server.Server(name, source_url, admin_password, config_filename,
+                             profile_file, snapshot_file)
 
-server.instantiate(port)
+server.instantiate(port, compress_level=compression_level)
 server.loop()
@@ -0,0 +1,383 @@
+# Giles: benchmark.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Move-generation benchmarks for the board game engines.  Each game gets a
+# small driver that plays its rules headlessly (no Server, no players, no
+# telnet), and we time two things at a few board sizes:
+#
+# - Random playouts, seeded so every run plays exactly the same games.  We
+#   time move generation, applying moves, and the winner check separately,
+#   and report moves per second and winner-check cost per move.
+# - Perft: the number of positions reachable in exactly N plies, and how
+#   fast we get there.  The counts never change unless the rules do, so
+#   they double as a correctness check.
+#
+# Run it with:
+#
+#     python -m giles.benchmark [-o results.json] [game ...]
+#
+# and compare the JSON between runs.
+
+import json
+import platform
+import random
+import sys
+import time
+
+from optparse import OptionParser
+
+from giles.games.ataxx.ataxx_engine import AtaxxEngine
+from giles.games.breakthrough.breakthrough_engine import BreakthroughEngine
+from giles.games.capture_go.capture_go_engine import CaptureGoEngine
+from giles.games.crossway.crossway_engine import CrosswayEngine
+from giles.games.gonnect.gonnect_engine import GonnectEngine
+from giles.games.hex.hex_engine import HexEngine
+from giles.games.metamorphosis.metamorphosis_engine import MetamorphosisEngine
+from giles.games.redstone.redstone_engine import RedstoneEngine
+from giles.games.square_oust.square_oust_engine import SquareOustEngine
+from giles.games.talpa.talpa_engine import TalpaEngine
+from giles.games.tanbo.tanbo_engine import TanboEngine
+from giles.games.y.y_engine import YEngine
+
+if sys.platform == "win32":
+    timer = time.clock
+else:
+    timer = time.time
+
+DEFAULT_SEEDS = 20
+DEFAULT_OUTPUT = "benchmark.json"
+
+class Driver(object):
+    """The interface every benchmark driver offers.  A driver is built at a
+    board size, in the game's starting position, and knows whose turn it
+    is.  moves() lists the legal moves for the side to play, play() makes
+    one and passes the turn, and winner() returns the winning side, if
+    there is one yet.  save() and restore() snapshot and roll back the
+    whole position, for perft.
+    """
+
+    name = None
+    sizes = ()
+    perft_depth = 2
+
+    def __init__(self, size):
+        self.size = size
+
+    def moves(self):
+        raise NotImplementedError
+
+    def play(self, move):
+        raise NotImplementedError
+
+    def winner(self):
+        raise NotImplementedError
+
+    def save(self):
+        raise NotImplementedError
+
+    def restore(self, state):
+        raise NotImplementedError
+
+class EngineDriver(Driver):
+    """Drives any game built on giles.games.engine.Engine; subclasses just
+    say how to build the engine.
+    """
+
+    def __init__(self, size):
+
+        Driver.__init__(self, size)
+        self.engine = self.new_engine(size)
+
+    def new_engine(self, size):
+        raise NotImplementedError
+
+    def moves(self):
+        return self.engine.legal_moves()
+
+    def play(self, move):
+        self.engine.apply(move)
+
+    def winner(self):
+        return self.engine.winner()
+
+    def save(self):
+        return self.engine.copy()
+
+    def restore(self, state):
+        self.engine = state.copy()
+
+class AtaxxDriver(EngineDriver):
+
+    name = "ataxx"
+    sizes = (5, 7, 9)
+    perft_depth = 3
+
+    def new_engine(self, size):
+        return AtaxxEngine(size)
+
+class BreakthroughDriver(EngineDriver):
+
+    name = "breakthrough"
+    sizes = (6, 8, 10)
+    perft_depth = 3
+
+    def new_engine(self, size):
+        return BreakthroughEngine(size, size)
+
+class CaptureGoDriver(EngineDriver):
+
+    name = "capture_go"
+    sizes = (5, 9, 13)
+
+    def new_engine(self, size):
+        return CaptureGoEngine(size, size)
+
+class CrosswayDriver(EngineDriver):
+
+    name = "crossway"
+    sizes = (9, 13, 19)
+
+    def new_engine(self, size):
+        return CrosswayEngine(size)
+
+class GonnectDriver(EngineDriver):
+
+    name = "gonnect"
+    sizes = (7, 9, 13)
+
+    def new_engine(self, size):
+        return GonnectEngine(size, size)
+
+class HexDriver(EngineDriver):
+
+    name = "hex"
+    sizes = (7, 11, 14)
+
+    def new_engine(self, size):
+        return HexEngine(size)
+
+class MasterYDriver(EngineDriver):
+
+    name = "master_y"
+    sizes = (8, 12, 16)
+
+    def new_engine(self, size):
+        return YEngine(size, master=True)
+
+class MetamorphosisDriver(EngineDriver):
+
+    name = "metamorphosis"
+    sizes = (6, 8, 12)
+
+    def new_engine(self, size):
+        return MetamorphosisEngine(size)
+
+class RedstoneDriver(EngineDriver):
+
+    name = "redstone"
+    sizes = (9, 13, 19)
+
+    def new_engine(self, size):
+        return RedstoneEngine(size, size)
+
+class SquareOustDriver(EngineDriver):
+
+    name = "square_oust"
+    sizes = (6, 8, 11)
+
+    def new_engine(self, size):
+        return SquareOustEngine(size, size)
+
+class TalpaDriver(EngineDriver):
+
+    name = "talpa"
+    sizes = (6, 8, 10)
+
+    def new_engine(self, size):
+        return TalpaEngine(size)
+
+class TanboDriver(EngineDriver):
+
+    name = "tanbo"
+    sizes = (9, 13, 19)
+
+    def new_engine(self, size):
+        return TanboEngine(size)
+
+class YDriver(EngineDriver):
+
+    name = "y"
+    sizes = (8, 12, 16)
+
+    def new_engine(self, size):
+        return YEngine(size)
+
+DRIVERS = (
+    AtaxxDriver,
+    BreakthroughDriver,
+    CaptureGoDriver,
+    CrosswayDriver,
+    GonnectDriver,
+    HexDriver,
+    MasterYDriver,
+    MetamorphosisDriver,
+    RedstoneDriver,
+    SquareOustDriver,
+    TalpaDriver,
+    TanboDriver,
+    YDriver,
+)
+
+def run_playouts(driver_class, size, seeds):
+
+    # Plays one random game per seed and times each phase separately.
+    gen_time = 0.0
+    play_time = 0.0
+    winner_time = 0.0
+    move_count = 0
+    winners = {}
+    lengths = []
+
+    for seed in range(seeds):
+        rng = random.Random(seed)
+        driver = driver_class(size)
+        length = 0
+        while True:
+            start = timer()
+            winner = driver.winner()
+            winner_time += timer() - start
+            if winner is not None:
+                break
+
+            start = timer()
+            moves = driver.moves()
+            gen_time += timer() - start
+            if not moves:
+                winner = "none"
+                break
+
+            move = rng.choice(moves)
+            start = timer()
+            driver.play(move)
+            play_time += timer() - start
+            length += 1
+
+        move_count += length
+        lengths.append(length)
+        winners[winner] = winners.get(winner, 0) + 1
+
+    total_time = gen_time + play_time
+    return {
+        "games": seeds,
+        "moves": move_count,
+        "lengths": lengths,
+        "winners": winners,
+        "movegen_seconds": gen_time,
+        "apply_seconds": play_time,
+        "winner_seconds": winner_time,
+        "moves_per_second": total_time and move_count / total_time or None,
+        "winner_usec_per_move": move_count and 1000000 * winner_time / move_count or None,
+    }
+
+def perft(driver, depth):
+
+    # The number of move sequences of exactly 'depth' plies, stopping at
+    # won positions.
+    if depth == 0 or driver.winner() is not None:
+        return 1
+    moves = driver.moves()
+    if depth == 1:
+        return len(moves)
+
+    count = 0
+    state = driver.save()
+    for move in moves:
+        driver.play(move)
+        count += perft(driver, depth - 1)
+        driver.restore(state)
+    return count
+
+def run_perft(driver_class, size, depth):
+
+    counts = []
+    start = timer()
+    nodes = 0
+    for d in range(1, depth + 1):
+        count = perft(driver_class(size), d)
+        counts.append(count)
+        nodes += count
+    elapsed = timer() - start
+    return {
+        "depth": depth,
+        "counts": counts,
+        "seconds": elapsed,
+        "nodes_per_second": elapsed and nodes / elapsed or None,
+    }
+
+def run(names=None, seeds=DEFAULT_SEEDS, depth=None, out=sys.stdout):
+
+    results = {}
+    for driver_class in DRIVERS:
+        if names and driver_class.name not in names:
+            continue
+        game_results = {}
+        for size in driver_class.sizes:
+            playouts = run_playouts(driver_class, size, seeds)
+            perft_results = run_perft(driver_class, size,
+                                      depth or driver_class.perft_depth)
+            game_results[str(size)] = {
+                "playouts": playouts,
+                "perft": perft_results,
+            }
+            out.write("%-14s %3d  %10.0f moves/s  %7.2f us/winner check  perft %s\n" %
+                      (driver_class.name, size, playouts["moves_per_second"] or 0,
+                       playouts["winner_usec_per_move"] or 0,
+                       ", ".join([str(c) for c in perft_results["counts"]])))
+        results[driver_class.name] = game_results
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "seeds": seeds,
+        "results": results,
+    }
+
+def main(argv):
+
+    parser = OptionParser(usage="%prog [options] [game ...]")
+    parser.add_option("-o", "--output", default=DEFAULT_OUTPUT,
+                      help="file to write JSON results to (default %default)")
+    parser.add_option("-s", "--seeds", type="int", default=DEFAULT_SEEDS,
+                      help="random playouts per board size (default %default)")
+    parser.add_option("-d", "--depth", type="int", default=None,
+                      help="perft depth (default: per game)")
+    options, names = parser.parse_args(argv)
+
+    known = [d.name for d in DRIVERS]
+    for name in names:
+        if name not in known:
+            parser.error("unknown game '%s'; choose from %s" % (name, ", ".join(known)))
+
+    results = run(names, options.seeds, options.depth)
+    f = open(options.output, "w")
+    json.dump(results, f, indent=2, sort_keys=True)
+    f.write("\n")
+    f.close()
+    sys.stdout.write("Results written to %s.\n" % options.output)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -44,9 +44,6 @@ class Chat(object):
                         custom_join="^!%s^. has connected to the server.\n" % player)
             self.list_players_in_space(player.location, player)
             self.server.channel_manager.connect(player, "global")
-
-            # Turn timestamps on for them.
-            player.config["timestamps"] = True
             state.set_sub("prompt")
 
         elif substate == "prompt":
@@ -89,6 +86,12 @@ class Chat(object):
                     # Just whitespace.  Reprompt.
                     state.set_sub("prompt")
 
+                # Draw the prompt now, rather than next time around, so it
+                # goes out in the same write as the response to the command.
+                if state.get_sub() == "prompt":
+                    player.prompt()
+                    state.set_sub("input")
+
     def parse(self, command, player):
 
         did_quit = False
@@ -616,6 +619,7 @@ class Chat(object):
 
         try:
             self.server.configurator.handle(config_string, player)
+            self.server.save_profile(player)
         except Exception as e:
             player.tell("Something went horribly awry with configuration.\n")
             self.server.log.log("Configuration failed: %s" % e)
@@ -702,6 +706,7 @@ class Chat(object):
         # Either way, add the new alias.
         alias_dict[a_num] = a_name
         player.tell_cc("^C%d^~ is now a ^M%s^~ alias for ^G%s^~%s.\n" % (a_num, type_str, a_name, addendum_str))
+        self.server.save_profile(player)
         return True
 
     def become(self, new_name, player):
@@ -741,6 +746,7 @@ class Chat(object):
         player.tell("\nCONFIGURATION:\n")
         player.tell_cc("^!set timestamp^. on|off, ^!set ts^.      Enable/disable timestamps.\n")
         player.tell_cc("     ^!set color^. on|off, ^!set c^.      Enable/disable color.\n")
+        player.tell_cc("^!set boardmode^. full|delta, ^!set bm^.  Redraw whole boards, or only changes.\n")
         player.tell("\nMETA:\n")
         player.tell_cc("            ^!become^. <newname>      Set name to <newname>.\n")
         player.tell_cc("   ^!alias^. <type> <name> <num>      Alias table/channel <name> to <num>.\n")
@@ -58,6 +58,11 @@ class Configurator(object):
                         is_valid = False
                     else:
                         is_valid = self.set_color(config_bits[1], player)
+                elif primary in ('boardmode', 'bm'):
+                    if len(config_bits) != 2:
+                        is_valid = False
+                    else:
+                        is_valid = self.set_board_mode(config_bits[1], player)
 
         if not is_valid:
             player.tell("Invalid configuration.\n")
@@ -98,3 +103,18 @@ class Configurator(object):
             player.server.log.log("%s turned color off." % player)
 
         return True
+
+    def set_board_mode(self, msg, player):
+
+        # Returns whether or not it was successful, not the value set.
+
+        if msg in ('delta', 'd'):
+            player.config["board_mode"] = "delta"
+            player.server.log.log("%s turned delta boards on." % player)
+        elif msg in ('full', 'f'):
+            player.config["board_mode"] = "full"
+            player.server.log.log("%s turned delta boards off." % player)
+        else:
+            return False
+
+        return True
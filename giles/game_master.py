@@ -33,6 +33,13 @@ class GameMaster(object):
         self.server = server
         self.games = {}
         self.tables = []
+
+        # Table name -> (change count, snapshot) as of the last snapshot,
+        # so tables that haven't changed since aren't pickled again, and
+        # table name -> the change count a snapshot last failed at, so we
+        # only try (and complain) again once the table has changed.
+        self.snapshots = {}
+        self.snapshot_failures = {}
         self.load_games_from_conf()
 
     def log(self, message):
@@ -91,8 +98,16 @@ class GameMaster(object):
 
         if self.is_game(game_key):
             try:
-                name = self.games[game_key].name
-                self.games[game_key].reload_game()
+                game_handle = self.games[game_key]
+                name = game_handle.name
+                old_class = game_handle.game_class
+                game_handle.reload_game()
+
+                # Tables already running are instances of the old class,
+                # which can no longer be pickled by name; move them over.
+                for table in self.tables:
+                    if table.__class__ is old_class:
+                        table.__class__ = game_handle.game_class
                 self.log("Successfully reloaded game %s (%s)." % (game_key, name))
                 return True
             except Exception as e:
@@ -135,6 +150,7 @@ class GameMaster(object):
             table = self.get_table(table_name)
             if table:
                 try:
+                    table.mark_changed()
                     table.handle(player, command_str)
                 except Exception as e:
                     table.channel.broadcast_cc("This table just crashed on a command! ^RAlert the admin^~.\n")
@@ -279,12 +295,88 @@ class GameMaster(object):
         for table in self.tables:
             table.remove_player(player)
 
+    def reattach(self, player):
+
+        # Put a player who's just logged in back in any seats they had
+        # before the server restarted.
+        for table in self.tables:
+            try:
+                table.reattach(player)
+            except Exception as e:
+                self.log("%sfailed to reattach %s.\n%s" % (table.log_prefix, player, traceback.format_exc()))
+
+    def snapshot_tables(self):
+
+        # Snapshots every table still in play, and stores them.  If a table
+        # can't be pickled, we keep its last good snapshot rather than
+        # losing the game, and try again once it has changed.
+        store = self.server.table_store
+        snapshots = {}
+        for table in self.tables:
+            if table.state.get() == "finished":
+                continue
+            name = table.table_name
+            last = self.snapshots.get(name)
+            if last and last[0] == table.change_count:
+                snapshots[name] = (table, last[1])
+                continue
+            if self.snapshot_failures.get(name) == table.change_count:
+                if last:
+                    snapshots[name] = (table, last[1])
+                continue
+            try:
+                data = store.snapshot(table)
+                snapshots[name] = (table, data)
+                self.snapshots[name] = (table.change_count, data)
+                if name in self.snapshot_failures:
+                    del self.snapshot_failures[name]
+            except Exception as e:
+                self.snapshot_failures[name] = table.change_count
+                if last:
+                    snapshots[name] = (table, last[1])
+                self.log("%scannot be snapshotted.\n%s" % (table.log_prefix, traceback.format_exc()))
+        return store.write(snapshots)
+
+    def restore_tables(self):
+
+        # Brings back the tables snapshotted before the last shutdown, as
+        # long as their games are still loaded and haven't changed too much
+        # since.  Snapshots we can't use are dropped at the next write.
+        # Snapshots record the class's real module path, which isn't
+        # always the one in the conf file ("games.hex.hex.Hex" loads as
+        # giles.games.hex.hex), so that's what we match on.
+        handles = {}
+        for game_handle in self.games.values():
+            game_class = game_handle.game_class
+            handles["%s.%s" % (game_class.__module__, game_class.__name__)] = game_handle
+
+        for table_name, path, version, data in self.server.table_store.read():
+            if path not in handles:
+                self.log("Discarding snapshot of table %s; %s is not loaded." % (table_name, path))
+            elif version != handles[path].game_class.snapshot_version:
+                self.log("Discarding snapshot of table %s; it is from another version of %s." % (table_name, path))
+            elif self.get_table(table_name):
+                self.log("Discarding snapshot of table %s; the name is taken." % table_name)
+            else:
+                try:
+                    table = self.server.table_store.load(data)
+                    table.restore(self.server)
+                    self.tables.append(table)
+                    self.snapshots[table.table_name] = (table.change_count, data)
+                    self.log("Restored table %s (%s)." % (table.table_display_name, table.game_display_name))
+                except Exception as e:
+                    self.log("Failed to restore table %s (%s).\n%s" % (table_name, path, traceback.format_exc()))
+
     def tick(self):
 
         # Send ticks to all tables under our control.
+        # A tick that moves a table to another state has changed it.
         for table in self.tables:
             try:
+                state = (table.state.get(), table.state.get_sub())
                 table.tick()
+                if (table.state.get(), table.state.get_sub()) != state:
+                    table.mark_changed()
             except Exception as e:
                 table.channel.broadcast_cc("This table just crashed on tick()! ^RAlert the admin^~.\n")
                 self.log("%scrashed on tick().\n%s" % (table.log_prefix, traceback.format_exc()))
@@ -301,6 +393,10 @@ class GameMaster(object):
                 if player.state.get() == "chat":
                     player.prompt()
         self.tables.remove(table)
+        if table.table_name in self.snapshots:
+            del self.snapshots[table.table_name]
+        if table.table_name in self.snapshot_failures:
+            del self.snapshot_failures[table.table_name]
         del table
 
 
@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from giles.state import State
+from giles.games.ataxx.ataxx_engine import AtaxxEngine, RED, BLUE, YELLOW, GREEN, PIT
 from giles.games.seated_game import SeatedGame
 from giles.games.seat import Seat
 from giles.utils import demangle_move
@@ -22,12 +23,6 @@ from giles.utils import demangle_move
 MIN_SIZE = 5
 MAX_SIZE = 26
 
-RED = "red"
-BLUE = "blue"
-YELLOW = "yellow"
-GREEN = "green"
-PIT = "pit"
-
 COLS = "abcdefghijklmnopqrstuvwxyz"
 
 class Ataxx(SeatedGame):
@@ -52,8 +47,7 @@ class Ataxx(SeatedGame):
         self.log_prefix = "%s/%s: " % (self.table_display_name, self.game_display_name)
 
         # Ataxx-specific stuff.
-        self.board = None
-        self.printable_board = None
+        self.engine = None
         self.sides = {}
         self.size = 7
         self.player_mode = 2
@@ -66,23 +60,11 @@ class Ataxx(SeatedGame):
 
     def init_board(self):
 
-        self.board = []
-        for r in range(self.size):
-            self.board.append([None] * self.size)
-
-        # Place starting pieces, depending on the number of players.
-        bottom_left = BLUE
-        bottom_right = RED
-        if self.player_mode == 4:
-            bottom_left = YELLOW
-            bottom_right = GREEN
-
-        self.board[0][0] = RED
-        self.board[0][self.size - 1] = BLUE
-        self.board[self.size - 1][0] = bottom_left
-        self.board[self.size - 1][self.size - 1] = bottom_right
+        # The engine places the starting pieces and holds the rules; we just
+        # talk to people.
+        self.engine = AtaxxEngine(self.size, self.player_mode)
 
-        self.update_printable_board()
+        self.mark_board_dirty()
 
     def init_seats(self):
 
@@ -95,11 +77,7 @@ class Ataxx(SeatedGame):
         self.sides = {}
         # Set the sides and data for players one and two.
         self.seats[0].data.side = RED
-        self.seats[0].data.count = 2
-        self.seats[0].data.resigned = False
         self.seats[1].data.side = BLUE
-        self.seats[1].data.count = 2
-        self.seats[1].data.resigned = False
         self.sides[RED] = self.seats[0]
         self.sides[BLUE] = self.seats[1]
 
@@ -113,17 +91,10 @@ class Ataxx(SeatedGame):
 
             # Either way, set the sides and data.
             self.seats[2].data.side = GREEN
-            self.seats[2].data.resigned = False
             self.sides[GREEN] = self.seats[2]
             self.seats[3].data.side = YELLOW
-            self.seats[3].data.resigned = False
             self.sides[YELLOW] = self.seats[3]
 
-            self.seats[0].data.count = 1
-            self.seats[1].data.count = 1
-            self.seats[2].data.count = 1
-            self.seats[3].data.count = 1
-
     def change_player_mode(self, count):
 
         # Don't bother if it's the mode we're already in.
@@ -145,18 +116,18 @@ class Ataxx(SeatedGame):
         # ...and reinitialize the board.
         self.init_board()
 
-    def update_printable_board(self):
+    def render_board(self):
 
-        self.printable_board = []
+        lines = []
         col_str = "    " + "".join([" " + COLS[i] for i in range(self.size)])
-        self.printable_board.append(col_str + "\n")
-        self.printable_board.append("   ^m.=" + "".join(["=="] * self.size) + ".^~\n")
+        lines.append(col_str + "\n")
+        lines.append("   ^m.=" + "".join(["=="] * self.size) + ".^~\n")
         for r in range(self.size):
             this_str = "%2d ^m|^~ " % (r + 1)
             for c in range(self.size):
                 if r == self.last_r and c == self.last_c:
                     this_str += "^I"
-                loc = self.board[r][c]
+                loc = self.engine.board.get(r, c)
                 if loc == RED:
                     this_str += "^RR^~ "
                 elif loc == BLUE:
@@ -170,9 +141,10 @@ class Ataxx(SeatedGame):
                 else:
                     this_str += "^M.^~ "
             this_str += "^m|^~ %d" % (r + 1)
-            self.printable_board.append(this_str + "\n")
-        self.printable_board.append("   ^m`=" + "".join(["=="] * self.size) + "'^~\n")
-        self.printable_board.append(col_str + "\n")
+            lines.append(this_str + "\n")
+        lines.append("   ^m`=" + "".join(["=="] * self.size) + "'^~\n")
+        lines.append(col_str + "\n")
+        return "".join(lines)
 
     def get_info_str(self):
 
@@ -193,18 +165,15 @@ class Ataxx(SeatedGame):
             turn_str = "^YYellow^~"
 
         info_str = "It is %s's turn (%s).\n" % (name, turn_str)
-        info_str += "^RRed^~: %d  ^BBlue^~: %d" % (self.seats[0].data.count, self.seats[1].data.count)
+        info_str += "^RRed^~: %d  ^BBlue^~: %d" % (self.engine.board.count(RED), self.engine.board.count(BLUE))
         if self.player_mode == 4:
-            info_str += "  ^GGreen^~: %d  ^YYellow^~: %d" % (self.seats[2].data.count, self.seats[3].data.count)
+            info_str += "  ^GGreen^~: %d  ^YYellow^~: %d" % (self.engine.board.count(GREEN), self.engine.board.count(YELLOW))
         info_str += "\n"
         return(info_str)
 
     def show(self, player):
 
-        if not self.printable_board:
-            self.update_printable_board()
-        for line in self.printable_board:
-            player.tell_cc(line)
+        self.tell_board(player)
         player.tell_cc(self.get_info_str())
 
     def send_board(self):
@@ -225,44 +194,19 @@ class Ataxx(SeatedGame):
         # Returns whether or not a given piece has a potential move.
 
         # Bail on dud data.
-        if not self.is_valid(row, col) or not self.board[row][col]:
+        if not self.is_valid(row, col) or not self.engine.board.get(row, col):
             return False
 
-        # Okay.  A piece can potentially move anywhere in a 5x5 area centered
-        # on its location.
-        found_move = False
-        for r_d in range(-2, 3): # <--- why I hate range syntax.
-            for c_d in range(-2, 3):
-                if not found_move and (self.is_valid(row + r_d, col + c_d) and
-                   not self.board[row + r_d][col + c_d]):
-                    found_move = True
-
-        # Return whether we found a move or not.
-        return found_move
+        # A piece can potentially move anywhere in a 5x5 area centered on its
+        # location; the board has those areas precomputed.
+        return self.engine.board.piece_has_move(row, col)
 
     def color_has_move(self, color):
 
         # Returns whether or not a given side has a potential move.
 
-        # Bail immediately if green or yellow and we're in 2p mode.
-        if self.player_mode == 2 and (color == YELLOW or color == GREEN):
-            return False
-
-        # Bail if this player has resigned.
-        if ((color == RED and self.seats[0].data.resigned) or
-           (color == BLUE and self.seats[1].data.resigned) or
-           (color == GREEN and self.seats[2].data.resigned) or
-           (color == YELLOW and self.seats[3].data.resigned)):
-            return False
-
-        # Okay.  Scan the board for pieces...
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.board[r][c] == color and self.piece_has_move(r, c):
-                    return True
-
-        # Found no moves.  This color has no valid moves.
-        return False
+        # The engine knows who's playing and who has resigned.
+        return self.engine.can_move(color)
 
     def loc_to_str(self, row, col):
         return "%s%s" % (COLS[col], row + 1)
@@ -293,7 +237,7 @@ class Ataxx(SeatedGame):
 
         # Do they have a piece at the source?
         color = seat.data.side
-        if self.board[src_r][src_c] != color:
+        if self.engine.board.get(src_r, src_c) != color:
             player.tell_cc(self.prefix + "You don't have a piece at ^C%s^~.\n" % src_str)
             return False
 
@@ -303,7 +247,7 @@ class Ataxx(SeatedGame):
             return False
 
         # Is the destination empty?
-        if self.board[dst_r][dst_c]:
+        if self.engine.board.get(dst_r, dst_c):
             player.tell_cc(self.prefix + "^C%s^~ is already occupied.\n" % dst_str)
             return False
 
@@ -313,34 +257,15 @@ class Ataxx(SeatedGame):
 
         # Now, is it a split or a leap?
         if abs(src_r - dst_r) < 2 and abs(src_c - dst_c) < 2:
-
-            # Split.  Add a new piece, increase the count.
             action_str = "^Mgrew^~ into"
-            self.board[dst_r][dst_c] = color
-            seat.data.count += 1
         else:
-
-            # Leap.  Move the piece, don't increase the count.
             action_str = "^Cjumped^~ to"
-            self.board[src_r][src_c] = None
-            self.board[dst_r][dst_c] = color
 
-        # Whichever action occurred, check all cells surrounding the
-        # destination.  If they are opponents, transform them.
-        change_count = 0
+        # Either way, the board handles the move and transforms any opponents
+        # surrounding the destination.
+        converted = self.engine.play(color, (src_r, src_c, dst_r, dst_c))
+        change_count = sum(converted.values())
         change_str = ""
-        for r_d in range(-1, 2):
-            for c_d in range(-1, 2):
-                if self.is_valid(dst_r + r_d, dst_c + c_d):
-                    occupier = self.board[dst_r + r_d][dst_c + c_d]
-                    if occupier and occupier != color and occupier != PIT:
-
-                        # Another player.  Uh oh!  Flip it and decrement that
-                        # player's count.
-                        self.board[dst_r + r_d][dst_c + c_d] = color
-                        seat.data.count += 1
-                        self.sides[occupier].data.count -= 1
-                        change_count += 1
 
         if change_count:
             change_str = ", ^!converting %d piece" % change_count
@@ -350,7 +275,7 @@ class Ataxx(SeatedGame):
         # Tell everyone what just happened.
         self.channel.broadcast_cc(self.prefix + "From ^c%s^~, %s %s ^C%s^~%s^~.\n" % (src_str, player, action_str, dst_str, change_str))
 
-        self.update_printable_board()
+        self.mark_board_dirty()
         return True
 
     def toggle_pits(self, player, loc_list):
@@ -369,7 +294,7 @@ class Ataxx(SeatedGame):
                 return
 
             # Bail if a starting piece is there.
-            thing_there = self.board[row][col]
+            thing_there = self.engine.board.get(row, col)
             if thing_there and not (thing_there == PIT):
                 player.tell_cc(self.prefix + "Cannot put a pit on a starting piece.\n")
                 return
@@ -383,14 +308,14 @@ class Ataxx(SeatedGame):
                 action_str = "^Cadded^~"
 
             # Tentative place the thing.
-            self.board[row][col] = new_thing
+            self.engine.board.set(row, col, new_thing)
 
             # Does it keep red or blue (which, in a 4p game, is equivalent to
             # all four players) from being able to make a move?  If so, it's
             # invalid.  Put the board back the way it was.
             if not self.color_has_move(RED) or not self.color_has_move(BLUE):
                 player.tell_cc(self.prefix + "Players must have a valid move.\n")
-                self.board[row][col] = thing_there
+                self.engine.board.set(row, col, thing_there)
                 return
 
             loc_list = [(row, col)]
@@ -401,17 +326,17 @@ class Ataxx(SeatedGame):
             # but not if that's the same location as the one we just placed
             # (on the center line on odd-sized boards).
             if (edge - row) != row:
-                self.board[edge - row][col] = new_thing
+                self.engine.board.set(edge - row, col, new_thing)
                 loc_list.append((edge - row, col))
 
                 # Handle the 4p down-reflection if necessary.
                 if self.player_mode == 4 and (edge - col) != col:
-                    self.board[edge - row][edge - col] = new_thing
+                    self.engine.board.set(edge - row, edge - col, new_thing)
                     loc_list.append((edge - row, edge - col))
 
             # Handle the 4p right-reflection if necessary.
             if self.player_mode == 4 and (edge - col) != col:
-                self.board[row][edge - col] = new_thing
+                self.engine.board.set(row, edge - col, new_thing)
                 loc_list.append((row, edge - col))
 
             # Generate the list of locations.
@@ -419,7 +344,7 @@ class Ataxx(SeatedGame):
 
             # Finally, send the string detailing what just happened.
             self.channel.broadcast_cc(self.prefix + "^Y%s^~ has %s a pit at: %s\n" % (player, action_str, loc_str))
-            self.update_printable_board()
+            self.mark_board_dirty()
 
     def set_size(self, player, size_bits):
 
@@ -437,7 +362,7 @@ class Ataxx(SeatedGame):
         self.size = size
         self.channel.broadcast_cc(self.prefix + "^R%s^~ has set the board size to ^C%d^~.\n" % (player, size))
         self.init_board()
-        self.update_printable_board()
+        self.mark_board_dirty()
 
     def set_player_mode(self, player, mode_bits):
 
@@ -470,12 +395,12 @@ class Ataxx(SeatedGame):
             player.tell_cc(self.prefix + "You must wait for your turn to resign.\n")
             return False
 
-        if seat.data.resigned:
+        if seat.data.side in self.engine.resigned:
             player.tell_cc(self.prefix + "You've already resigned.\n")
             return False
 
         # They've passed the tests and can resign.
-        seat.data.resigned = True
+        self.engine.resign(seat.data.side)
         self.channel.broadcast_cc(self.prefix + "^R%s^~ is resigning from the game.\n" % player)
 
     def tick(self):
@@ -490,7 +415,7 @@ class Ataxx(SeatedGame):
             if self.player_mode == 4:
                 send_str += "; ^GGreen^~: %s; ^YYellow^~: %s" % (self.seats[2].player_name, self.seats[3].player_name)
             self.channel.broadcast_cc(self.prefix + send_str + "\n")
-            self.turn = RED
+            self.turn = self.engine.turn
             self.send_board()
 
     def handle(self, player, command_str):
@@ -572,34 +497,7 @@ class Ataxx(SeatedGame):
                     else:
                         # Okay, well, let's see whose turn it is.  If it comes
                         # back around to us, the game is over anyway.
-                        curr_turn = self.turn
-                        done = False
-                        while not done:
-                            if self.turn == RED:
-                                self.turn = BLUE
-                            elif self.turn == BLUE:
-
-                                # The only tough one; switch depending on mode.
-                                if self.player_mode == 2:
-                                    self.turn = RED
-                                else:
-                                    self.turn = GREEN
-                            elif self.turn == GREEN:
-                                self.turn = YELLOW
-                            elif self.turn == YELLOW:
-                                self.turn = RED
-
-                            # Now see if this player even has a move.
-                            if self.color_has_move(self.turn):
-                                done = True
-                            elif self.turn == curr_turn:
-
-                                # If we've wrapped back around to the current
-                                # turn, no one had a move.  Bail as well.
-                                done = True
-
-                        # Check to see if we're back at the mover.
-                        if curr_turn == self.turn:
+                        if not self.engine.next_turn():
 
                             # No one had a valid move.  Game's over.
                             self.no_move_resolve()
@@ -608,6 +506,7 @@ class Ataxx(SeatedGame):
                         else:
 
                             # Otherwise it's some other player's turn; game on.
+                            self.turn = self.engine.turn
                             self.send_board()
 
         if not handled:
@@ -615,13 +514,11 @@ class Ataxx(SeatedGame):
 
     def find_winner(self):
 
-        # Get the list of players that haven't resigned and have at least one
-        # piece left on the board.  If that list is only one long, we have a
-        # winner.  Otherwise, the game continues.
-        live_players = [x for x in self.seats if ((not x.data.resigned) and
-           x.data.count)]
-        if len(live_players) == 1:
-            return live_players[0].player_name
+        # If only one player hasn't resigned and has pieces left on the
+        # board, we have a winner.  Otherwise, the game continues.
+        survivor = self.engine.survivor()
+        if survivor:
+            return self.sides[survivor].player_name
         else:
             return None
 
@@ -637,10 +534,11 @@ class Ataxx(SeatedGame):
         high_count = -1
         high_list = None
         for seat in self.seats:
-            if seat.data.count > high_count:
-                high_count = seat.data.count
+            count = self.engine.board.count(seat.data.side)
+            if count > high_count:
+                high_count = count
                 high_list = ["^C%s^~" % seat.player_name]
-            elif seat.data.count == high_count:
+            elif count == high_count:
 
                 # Potential tie.
                 high_list.append("^C%s^~" % seat.player_name)
@@ -0,0 +1,161 @@
+# Giles: ataxx_board.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Cell (row, col) is bit (row * size + col) of each bitboard.
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+class AtaxxBoard(object):
+    """A bitboard for Ataxx.  Each side gets a Python int with one bit per
+    cell, and the pits get one more.  Neighbour (distance 1) and jump
+    (distance 2) masks are precomputed per cell, so moves and conversions
+    are a handful of bitwise operations, and checking whether a side can
+    move at all is done by dilating its bitboard rather than by scanning
+    every piece.
+
+    The board doesn't know what the sides are called; you hand it the list
+    of side values (and the value you use for pits) when you build it, and
+    get() hands those same values back.
+    """
+
+    def __init__(self, size, sides, pit):
+
+        self.size = size
+        self.sides = list(sides)
+        self.pit = pit
+        self.pieces = {}
+        for side in self.sides:
+            self.pieces[side] = 0
+        self.pits = 0
+
+        cell_count = size * size
+        self.full = (1 << cell_count) - 1
+
+        # Masks of every cell except the first column or the last one; used
+        # to keep shifts from wrapping around the edges.
+        first_col = 0
+        for r in range(size):
+            first_col |= 1 << (r * size)
+        last_col = first_col << (size - 1)
+        self.not_first_col = self.full & ~first_col
+        self.not_last_col = self.full & ~last_col
+
+        self.neighbour_masks = []
+        self.jump_masks = []
+        for r in range(size):
+            for c in range(size):
+                neighbours = 0
+                jumps = 0
+                for r_d in range(-2, 3):
+                    for c_d in range(-2, 3):
+                        new_r = r + r_d
+                        new_c = c + c_d
+                        if (new_r < 0 or new_r >= size or new_c < 0 or
+                           new_c >= size or (r_d == 0 and c_d == 0)):
+                            continue
+                        bit = 1 << (new_r * size + new_c)
+                        if abs(r_d) < 2 and abs(c_d) < 2:
+                            neighbours |= bit
+                        else:
+                            jumps |= bit
+                self.neighbour_masks.append(neighbours)
+                self.jump_masks.append(jumps)
+
+    def index(self, row, col):
+        return row * self.size + col
+
+    def get(self, row, col):
+
+        bit = 1 << (row * self.size + col)
+        if self.pits & bit:
+            return self.pit
+        for side in self.sides:
+            if self.pieces[side] & bit:
+                return side
+        return None
+
+    def set(self, row, col, thing):
+
+        bit = 1 << (row * self.size + col)
+        self.pits &= ~bit
+        for side in self.sides:
+            self.pieces[side] &= ~bit
+        if thing == self.pit:
+            self.pits |= bit
+        elif thing:
+            self.pieces[thing] |= bit
+
+    def occupied(self):
+
+        occupied = self.pits
+        for side in self.sides:
+            occupied |= self.pieces[side]
+        return occupied
+
+    def empty(self):
+        return self.full & ~self.occupied()
+
+    def count(self, side):
+        return popcount(self.pieces[side])
+
+    def dilate(self, bits):
+
+        # Grows a bitboard by one cell in all eight directions.
+        size = self.size
+        bits |= ((bits << 1) & self.not_first_col) | ((bits >> 1) & self.not_last_col)
+        bits |= (bits << size) | (bits >> size)
+        return bits & self.full
+
+    def piece_has_move(self, row, col):
+
+        i = row * self.size + col
+        return bool((self.neighbour_masks[i] | self.jump_masks[i]) & self.empty())
+
+    def has_move(self, side):
+
+        # Every cell within two steps of one of this side's pieces is a
+        # potential destination, so dilate twice and look for empties.
+        reach = self.dilate(self.dilate(self.pieces[side]))
+        return bool(reach & self.empty())
+
+    def move(self, side, src_row, src_col, dst_row, dst_col):
+
+        # Applies a split or leap for side, which is assumed to be legal.
+        # Returns a dictionary of other side -> number of its pieces that
+        # were converted.
+        src = src_row * self.size + src_col
+        dst = dst_row * self.size + dst_col
+        dst_bit = 1 << dst
+
+        if not self.neighbour_masks[src] & dst_bit:
+
+            # A leap; the source empties.
+            self.pieces[side] &= ~(1 << src)
+        self.pieces[side] |= dst_bit
+
+        neighbours = self.neighbour_masks[dst]
+        converted = {}
+        for other in self.sides:
+            if other == side:
+                continue
+            captured = self.pieces[other] & neighbours
+            if captured:
+                self.pieces[other] &= ~captured
+                self.pieces[side] |= captured
+                converted[other] = popcount(captured)
+
+        return converted
@@ -0,0 +1,170 @@
+# Giles: ataxx_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.ataxx.ataxx_board import AtaxxBoard
+from giles.games.engine import Engine, DRAW
+from giles.games.geometry import get_coords
+
+RED = "red"
+BLUE = "blue"
+YELLOW = "yellow"
+GREEN = "green"
+PIT = "pit"
+
+class AtaxxEngine(Engine):
+    """The rules of Ataxx, for two or four players.  Moves are
+    (src_row, src_col, dst_row, dst_col) tuples.
+
+    Turns go round in side order, skipping anyone who has resigned or
+    can't move.  If the turn comes all the way back around to the side
+    that just moved, the game is stalled and the biggest army wins.
+    """
+
+    def __init__(self, size, player_mode=2):
+
+        super(AtaxxEngine, self).__init__()
+
+        # Place starting pieces, depending on the number of players.
+        self.sides = [RED, BLUE]
+        bottom_left = BLUE
+        bottom_right = RED
+        if player_mode == 4:
+            self.sides = [RED, BLUE, GREEN, YELLOW]
+            bottom_left = YELLOW
+            bottom_right = GREEN
+
+        self.size = size
+        self.board = AtaxxBoard(size, self.sides, PIT)
+        self.board.set(0, 0, RED)
+        self.board.set(0, size - 1, BLUE)
+        self.board.set(size - 1, 0, bottom_left)
+        self.board.set(size - 1, size - 1, bottom_right)
+        self.coords = get_coords(size, size)
+
+        self.turn = RED
+        self.resigned = set()
+        self.stalled = False
+
+    def can_move(self, side):
+
+        if side not in self.sides or side in self.resigned:
+            return False
+        return self.board.has_move(side)
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+
+        board = self.board
+        coords = self.coords
+        empty = board.empty()
+        moves = []
+        own = board.pieces[self.turn]
+        src = 0
+        while own:
+            if own & 1:
+                src_row, src_col = coords[src]
+                reach = (board.neighbour_masks[src] | board.jump_masks[src]) & empty
+                dst = 0
+                while reach:
+                    if reach & 1:
+                        dst_row, dst_col = coords[dst]
+                        moves.append((src_row, src_col, dst_row, dst_col))
+                    reach >>= 1
+                    dst += 1
+            own >>= 1
+            src += 1
+        return moves
+
+    def is_legal(self, move):
+
+        src_row, src_col, dst_row, dst_col = move
+        size = self.size
+        if not (0 <= src_row < size and 0 <= src_col < size and
+           0 <= dst_row < size and 0 <= dst_col < size):
+            return False
+        if abs(src_row - dst_row) > 2 or abs(src_col - dst_col) > 2:
+            return False
+        return (self.board.get(src_row, src_col) == self.turn and
+                not self.board.get(dst_row, dst_col))
+
+    def play(self, side, move):
+
+        # Makes a move for side without passing the turn.  Returns a
+        # dictionary of other side -> number of its pieces converted.
+        src_row, src_col, dst_row, dst_col = move
+        return self.board.move(side, src_row, src_col, dst_row, dst_col)
+
+    def next_turn(self):
+
+        # Passes the turn to the next side that can move.  Returns False,
+        # and marks the game stalled, if it came back around to the side
+        # that just moved.
+        current = self.turn
+        index = self.sides.index(current)
+        while True:
+            index = (index + 1) % len(self.sides)
+            if self.can_move(self.sides[index]) or self.sides[index] == current:
+                break
+        self.turn = self.sides[index]
+        if self.turn == current:
+            self.stalled = True
+            return False
+        return True
+
+    def apply(self, move):
+
+        self.play(self.turn, move)
+        if not self.survivor():
+            self.next_turn()
+
+    def resign(self, side):
+        self.resigned.add(side)
+
+    def survivor(self):
+
+        # The one side that hasn't resigned and still has pieces, if it's
+        # down to one.
+        live_sides = [x for x in self.sides if x not in self.resigned and
+                      self.board.count(x)]
+        if len(live_sides) == 1:
+            return live_sides[0]
+        return None
+
+    def winner(self):
+
+        survivor = self.survivor()
+        if survivor or not self.stalled:
+            return survivor
+
+        # Nobody can move; the highest piece count wins.
+        counts = [(self.board.count(x), x) for x in self.sides]
+        counts.sort(reverse=True)
+        if counts[0][0] == counts[1][0]:
+            return DRAW
+        return counts[0][1]
+
+    def copy(self):
+
+        new_engine = AtaxxEngine.__new__(AtaxxEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_board = AtaxxBoard.__new__(AtaxxBoard)
+        new_board.__dict__.update(self.board.__dict__)
+        new_board.pieces = dict(self.board.pieces)
+        new_engine.board = new_board
+        new_engine.resigned = set(self.resigned)
+        return new_engine
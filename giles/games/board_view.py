@@ -0,0 +1,162 @@
+# Giles: board_view.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Delta board updates.  A player who has 'set boardmode delta' still gets
+# the whole board the first time, but after that we only send the cells
+# that changed, drawn over the old board in place with ANSI cursor
+# movement.  That only works while the old board is still on their
+# screen, and while we know exactly how far below it the cursor is, so
+# the telnet client counts every line it sends; if anything's in doubt,
+# they just get the whole board again.
+
+from miniboa.xterm import CARET_CODES, colorize
+
+CSI = "\x1b["
+
+# Every so many deltas, send the whole board anyway, in case the player's
+# screen has drifted from what we think is on it.
+REFRESH_EVERY = 20
+
+# Caret codes that do something other than change how text looks.
+_SCREEN_CODES = ("^s", "^l")
+
+def split_cells(line):
+    """Breaks a line of caret-coded text into (codes, char) cells, one
+    for every column on the screen, where codes are the caret codes in
+    effect for that column since the last reset.
+    """
+
+    cells = []
+    codes = ""
+    i = 0
+    length = len(line)
+    while i < length:
+        code = line[i:i + 2]
+        if code == "^^":
+            cells.append((codes, code))
+            i += 2
+        elif code in CARET_CODES:
+            if code == "^~":
+                codes = ""
+            elif code not in _SCREEN_CODES:
+                codes += code
+            i += 2
+        else:
+            cells.append((codes, line[i]))
+            i += 1
+    return cells
+
+def cells_to_str(cells):
+
+    # Caret codes for just these cells, starting and ending from a reset.
+    pieces = []
+    codes = None
+    for cell_codes, char in cells:
+        if cell_codes != codes:
+            pieces.append("^~" + cell_codes)
+            codes = cell_codes
+        pieces.append(char)
+    pieces.append("^~")
+    return "".join(pieces)
+
+def diff_boards(old_str, new_str):
+    """Returns the patches that turn old_str into new_str on screen, as a
+    list of (row, column, text, erase) tuples: text is colorized, and
+    erase is whether to clear the rest of the line after it.  Returns
+    None if the boards aren't the same number of lines.
+    """
+
+    old_lines = old_str.split("\n")
+    new_lines = new_str.split("\n")
+    if len(old_lines) != len(new_lines):
+        return None
+
+    patches = []
+    for row in range(len(new_lines)):
+        old_line = old_lines[row]
+        new_line = new_lines[row]
+        if old_line == new_line:
+            continue
+
+        old_cells = split_cells(old_line)
+        new_cells = split_cells(new_line)
+
+        # Skip the cells that are the same at the start and, if nothing
+        # has moved along, at the end too.
+        first = 0
+        limit = min(len(old_cells), len(new_cells))
+        while first < limit and old_cells[first] == new_cells[first]:
+            first += 1
+        last = len(new_cells)
+        if len(old_cells) == len(new_cells):
+            while last > first and old_cells[last - 1] == new_cells[last - 1]:
+                last -= 1
+        erase = len(new_cells) < len(old_cells)
+
+        if first < last or erase:
+            patches.append((row, first,
+                            colorize(cells_to_str(new_cells[first:last])), erase))
+    return patches
+
+def fits_screen(board_str, columns, offset=0):
+
+    # Deltas need every row of the board on a line of its own.  The first
+    # row starts offset columns in, past any timestamp.
+    if not board_str.endswith("\n"):
+        return False
+    for line in board_str.split("\n"):
+        if len(split_cells(line)) + offset > columns:
+            return False
+        offset = 0
+    return True
+
+class BoardView(object):
+    """What one player last saw of a board, and where it is on their
+    screen: top is the client's line count when the board started, and
+    offset how far into the first line it started, past any timestamp.
+    """
+
+    def __init__(self, board_str, top, offset):
+
+        self.board_str = board_str
+        self.top = top
+        self.offset = offset
+        self.deltas = 0
+
+    def redraw(self, patches, height):
+        """Returns the ANSI codes to apply patches to the board, from a
+        cursor at the start of the line height lines below its top,
+        leaving the cursor back where it was.
+        """
+
+        pieces = []
+        line = height
+        for row, col, text, erase in patches:
+            if line > row:
+                pieces.append(CSI + "%dA" % (line - row))
+            elif line < row:
+                pieces.append(CSI + "%dB" % (row - line))
+            line = row
+            if not row:
+                col += self.offset
+            pieces.append(CSI + "%dG" % (col + 1))
+            pieces.append(text)
+            if erase:
+                pieces.append(CSI + "K")
+        if line < height:
+            pieces.append(CSI + "%dB" % (height - line))
+        pieces.append("\r")
+        return "".join(pieces)
@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from giles.games.breakthrough.breakthrough_engine import BreakthroughEngine, BLACK, WHITE
 from giles.games.seated_game import SeatedGame
 from giles.games.piece import Piece
 from giles.games.seat import Seat
@@ -53,9 +54,11 @@ class Breakthrough(SeatedGame):
         self.height = 8
         self.turn = None
         self.black = self.seats[0]
+        self.black.data.side = BLACK
         self.white = self.seats[1]
-        self.resigner = None
+        self.white.data.side = WHITE
         self.layout = None
+        self.engine = None
 
         # We cheat and create a black and white piece here.  Breakthrough
         # doesn't differentiate between pieces, so this allows us to do
@@ -84,14 +87,18 @@ class Breakthrough(SeatedGame):
             self.layout.place(self.wp, next_last_row, i, update=False)
             self.layout.place(self.wp, last_row, i, update=False)
 
-        # Set the piece counts.
-        self.white.data.piece_count = self.width * 2
-        self.black.data.piece_count = self.width * 2
         self.layout.update()
 
+        # The layout is just for show; the engine plays out the rules on
+        # its bitboards.
+        self.engine = BreakthroughEngine(self.width, self.height)
+
+    def get_board_str(self):
+        return str(self.layout)
+
     def show(self, player):
 
-        player.tell_cc(self.layout)
+        self.tell_board(player)
         player.tell_cc(self.get_turn_str() + "\n")
 
     def send_board(self):
@@ -136,8 +143,9 @@ class Breakthrough(SeatedGame):
             return False
 
         # Does the player even have a piece there?
-        src_loc = self.layout.grid[src_r][src_c]
-        if not src_loc or src_loc.data.owner != self.turn:
+        side = seat.data.side
+        board = self.engine.board
+        if board.get(src_r, src_c) != side:
             self.tell_pre(player, "You don't have a piece at ^C%s^~.\n" % src_str)
             return False
 
@@ -156,13 +164,13 @@ class Breakthrough(SeatedGame):
 
         # Okay, this is actually (gasp) a potentially legitimate move.  If
         # it's a move forward, it only works if the forward space is empty.
-        if src_c == dst_c and self.layout.grid[dst_r][dst_c]:
+        dst_loc = board.get(dst_r, dst_c)
+        if src_c == dst_c and dst_loc:
             self.tell_pre(player, "A straight-forward move can only be into an empty space.\n")
             return False
 
         # Otherwise, it must not have one of the player's own pieces in it.
-        dst_loc = self.layout.grid[dst_r][dst_c]
-        if src_loc == dst_loc:
+        if dst_loc == side:
             self.tell_pre(player, "A diagonal-forward move cannot be onto your own piece.\n")
             return False
 
@@ -170,13 +178,14 @@ class Breakthrough(SeatedGame):
         opponent = self.seats[0]
         if seat == self.seats[0]:
             opponent = self.seats[1]
-        if dst_loc:
+        move = self.engine.make_move(src_r, src_c, dst_r, dst_c)
+        if move[3]:
             # It's a capture.
             additional_str = ", capturing one of ^R%s^~'s pieces" % (opponent.player)
-            opponent.data.piece_count -= 1
         self.bc_pre("^Y%s^~ moves a piece from ^C%s^~ to ^G%s^~%s.\n" % (seat.player, src_str, dst_str, additional_str))
 
-        # Make the move on the layout.
+        # Make the move in the engine and on the layout.
+        self.engine.apply(move)
         self.layout.move(src_r, src_c, dst_r, dst_c, True)
 
         return ((src_r, src_c), (dst_r, dst_c))
@@ -243,7 +252,7 @@ class Breakthrough(SeatedGame):
             self.tell_pre(player, "You must wait for your turn to resign.\n")
             return False
 
-        self.resigner = seat
+        self.engine.resign(seat.data.side)
         self.bc_pre("^R%s^~ is resigning from the game.\n" % player)
         return True
 
@@ -323,21 +332,14 @@ class Breakthrough(SeatedGame):
 
     def find_winner(self):
 
-        # If someone resigned, this is the easiest thing ever.  Same if
-        # they lost all their pieces.
-        if self.resigner == self.white or self.seats[1].data.piece_count == 0:
-            return self.seats[0].player_name
-        elif self.resigner == self.black or self.seats[1].data.piece_count == 0:
-            return self.seats[1].player_name
-
-        # Aw, we have to do work.  If black has a piece on the last row,
-        # they win; if white has a piece on the first row, they win.
-        if self.bp in self.layout.grid[-1]:
+        # The engine handles both resignations and the board.
+        winner = self.engine.winner()
+        if winner == BLACK:
             return self.seats[0].player_name
-        if self.wp in self.layout.grid[0]:
+        elif winner == WHITE:
             return self.seats[1].player_name
 
-        # ...that wasn't really much work, but there's no winner yet.
+        # No winner yet.
         return None
 
     def resolve(self, winner):
@@ -0,0 +1,162 @@
+# Giles: breakthrough_board.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Cell (row, col) is bit (row * width + col) of each bitboard.  Black starts
+# on rows 0 and 1 and moves towards higher rows; White starts on the last
+# two rows and moves towards row 0.
+
+BLACK = "black"
+WHITE = "white"
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+def bits_of(bits):
+
+    # Yields the index of each set bit, lowest first.
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+class BreakthroughBoard(object):
+    """A bitboard engine for Breakthrough.  Each side is a single Python
+    int; moves for a whole side are generated with three shifts (straight
+    ahead into empty cells, and the two diagonals onto anything that isn't
+    our own), and a side has won as soon as its bitboard touches its goal
+    row, so win detection is a couple of ANDs.
+
+    Moves are (side, src, dst, captured) tuples of flat cell indices, as
+    returned by legal_moves() and make_move(); apply() plays one and undo()
+    takes it back, so searches can walk the game tree in place.
+    """
+
+    def __init__(self, width, height):
+
+        self.width = width
+        self.height = height
+
+        cell_count = width * height
+        self.full = (1 << cell_count) - 1
+
+        row_mask = (1 << width) - 1
+        first_col = 0
+        for r in range(height):
+            first_col |= 1 << (r * width)
+        last_col = first_col << (width - 1)
+        self.not_first_col = self.full & ~first_col
+        self.not_last_col = self.full & ~last_col
+
+        # Each side's home rows, and the row it's trying to reach.
+        self.goal = {
+            BLACK: row_mask << ((height - 1) * width),
+            WHITE: row_mask,
+        }
+        self.pieces = {
+            BLACK: row_mask | (row_mask << width),
+            WHITE: (row_mask << ((height - 2) * width)) | self.goal[BLACK],
+        }
+
+    def other(self, side):
+
+        if side == BLACK:
+            return WHITE
+        return BLACK
+
+    def get(self, row, col):
+
+        bit = 1 << (row * self.width + col)
+        for side in (BLACK, WHITE):
+            if self.pieces[side] & bit:
+                return side
+        return None
+
+    def count(self, side):
+        return popcount(self.pieces[side])
+
+    def targets(self, side):
+
+        # Returns (straight, left, right) bitboards of destination cells for
+        # the three kinds of step, along with the index delta of each.  Left
+        # and right are by column: left lowers the column by one.
+        width = self.width
+        own = self.pieces[side]
+        empty = self.full & ~(own | self.pieces[self.other(side)])
+        if side == BLACK:
+            straight = (own << width) & empty
+            left = ((own & self.not_first_col) << (width - 1)) & self.full & ~own
+            right = ((own & self.not_last_col) << (width + 1)) & self.full & ~own
+            return ((straight, width), (left, width - 1), (right, width + 1))
+        else:
+            straight = (own >> width) & empty
+            left = ((own & self.not_first_col) >> (width + 1)) & ~own
+            right = ((own & self.not_last_col) >> (width - 1)) & ~own
+            return ((straight, -width), (left, -width - 1), (right, -width + 1))
+
+    def legal_moves(self, side):
+
+        opponent = self.pieces[self.other(side)]
+        moves = []
+        for dsts, delta in self.targets(side):
+            for dst in bits_of(dsts):
+                moves.append((side, dst - delta, dst, bool(opponent & (1 << dst))))
+        return moves
+
+    def make_move(self, side, src_row, src_col, dst_row, dst_col):
+
+        # Returns the move from one cell to another for this side, or None
+        # if it isn't legal.
+        src = src_row * self.width + src_col
+        dst = dst_row * self.width + dst_col
+        dst_bit = 1 << dst
+        for dsts, delta in self.targets(side):
+            if dsts & dst_bit and dst - delta == src:
+                opponent = self.pieces[self.other(side)]
+                return (side, src, dst, bool(opponent & dst_bit))
+        return None
+
+    def apply(self, move):
+
+        side, src, dst, captured = move
+        self.pieces[side] ^= (1 << src) | (1 << dst)
+        if captured:
+            self.pieces[self.other(side)] ^= 1 << dst
+
+    def undo(self, move):
+
+        # Every change apply() makes is an XOR, so undoing is the same
+        # operation again.
+        self.apply(move)
+
+    def copy(self):
+
+        # The masks never change, so only the pieces need copying.
+        new_board = BreakthroughBoard.__new__(BreakthroughBoard)
+        new_board.__dict__.update(self.__dict__)
+        new_board.pieces = dict(self.pieces)
+        return new_board
+
+    def winner(self):
+
+        # A side wins by reaching its goal row or by taking every one of
+        # the other side's pieces.
+        for side in (BLACK, WHITE):
+            if self.pieces[side] & self.goal[side]:
+                return side
+        for side in (BLACK, WHITE):
+            if not self.pieces[self.other(side)]:
+                return side
+        return None
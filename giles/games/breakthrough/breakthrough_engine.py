@@ -0,0 +1,79 @@
+# Giles: breakthrough_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.breakthrough.breakthrough_board import BreakthroughBoard, BLACK, WHITE
+from giles.games.engine import Engine
+
+class BreakthroughEngine(Engine):
+    """The rules of Breakthrough, played out on a BreakthroughBoard.
+    Moves are the board's (side, src, dst, captured) tuples; Black moves
+    first.
+    """
+
+    def __init__(self, width, height):
+
+        super(BreakthroughEngine, self).__init__()
+
+        self.board = BreakthroughBoard(width, height)
+        self.turn = BLACK
+        self.resigner = None
+
+    def other(self, color):
+        return self.board.other(color)
+
+    def make_move(self, src_row, src_col, dst_row, dst_col):
+
+        # The move from one cell to another for the side to play, or None
+        # if it isn't legal.
+        return self.board.make_move(self.turn, src_row, src_col, dst_row, dst_col)
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+        return self.board.legal_moves(self.turn)
+
+    def is_legal(self, move):
+
+        side, src, dst, captured = move
+        if side != self.turn:
+            return False
+        width = self.board.width
+        return self.make_move(src / width, src % width, dst / width, dst % width) == move
+
+    def apply(self, move):
+
+        self.board.apply(move)
+        self.turn = self.other(self.turn)
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # Otherwise the board knows: a side wins by reaching the far row or
+        # by capturing every opposing piece.
+        return self.board.winner()
+
+    def copy(self):
+
+        new_engine = BreakthroughEngine.__new__(BreakthroughEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.board = self.board.copy()
+        return new_engine
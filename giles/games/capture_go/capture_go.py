@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from giles.games.capture_go.capture_go_engine import CaptureGoEngine, SWAP
 from giles.games.seated_game import SeatedGame
 from giles.games.seat import Seat
 from giles.state import State
@@ -55,19 +56,17 @@ class CaptureGo(SeatedGame):
         self.turn = None
         self.seats[0].data.side = BLACK
         self.seats[1].data.side = WHITE
-        self.seats[0].data.capture_list = []
-        self.seats[1].data.capture_list = []
         self.capture_goal = 1
-        self.resigner = None
-        self.turn_number = 0
-        self.goban = giles.games.goban.Goban()
+
+        # The engine holds the goban and the rules; we just talk to people.
+        self.engine = CaptureGoEngine(19, 19)
+
+    def get_board_str(self):
+        return self.engine.goban.get_printable_board()
 
     def show(self, player):
 
-        if not self.goban.printable_board:
-            self.goban.update_printable_board()
-        for line in self.goban.printable_board:
-            player.tell_cc(line)
+        self.tell_board(player)
         player.tell_cc(self.get_supplemental_str())
 
     def send_board(self):
@@ -94,7 +93,7 @@ class CaptureGo(SeatedGame):
             color_msg = "^WWhite^~"
 
         to_return = "It is ^Y%s^~'s turn (%s).\n" % (player, color_msg)
-        to_return += "^KBlack^~ has captured %s. ^WWhite^~ has captured %s.\n" % (self.get_stone_str(len(self.seats[0].data.capture_list)), self.get_stone_str(len(self.seats[1].data.capture_list)))
+        to_return += "^KBlack^~ has captured %s. ^WWhite^~ has captured %s.\n" % (self.get_stone_str(self.engine.captures[BLACK]), self.get_stone_str(self.engine.captures[WHITE]))
         to_return += ("The goal is to capture %s.\n" % self.get_stone_str(self.capture_goal))
         return(to_return)
 
@@ -107,7 +106,6 @@ class CaptureGo(SeatedGame):
             self.channel.broadcast_cc(self.prefix + "^KBlack^~: ^R%s^~; ^WWhite^~: ^Y%s^~\n" %
                (self.seats[0].player, self.seats[1].player))
             self.turn = BLACK
-            self.turn_number = 1
             self.send_board()
 
     def set_size(self, player, size_bits):
@@ -141,7 +139,7 @@ class CaptureGo(SeatedGame):
             return
 
         # Valid!
-        self.goban.resize(w, h)
+        self.engine = CaptureGoEngine(w, h, self.capture_goal)
         self.channel.broadcast_cc(self.prefix + "^R%s^~ has set the board size to ^C%d^Gx^C%d^~.\n" % (player, w, h))
 
     def set_capture_goal(self, player, count_bits):
@@ -160,6 +158,7 @@ class CaptureGo(SeatedGame):
         # allow passing, I guess you could keep filling the board up over and over to
         # reach a capture goal.
         self.capture_goal = count
+        self.engine.capture_goal = count
         self.channel.broadcast_cc(self.prefix + "^R%s^~ has set the capture goal to ^C%s^~.\n" % (player, self.get_stone_str(count)))
 
     def resign(self, player):
@@ -173,7 +172,7 @@ class CaptureGo(SeatedGame):
             player.tell_cc(self.prefix + "You must wait for your turn to resign.\n")
             return False
 
-        self.resigner = seat.data.side
+        self.engine.resign(seat.data.side)
         self.channel.broadcast_cc(self.prefix + "^R%s^~ is resigning from the game.\n" % player)
         return True
 
@@ -190,61 +189,44 @@ class CaptureGo(SeatedGame):
 
         # Check bounds.
         col, row = move
-        if row < 0 or row >= self.goban.height or col < 0 or col >= self.goban.width:
+        goban = self.engine.goban
+        if not goban.is_valid(row, col):
             player.tell_cc(self.prefix + "Your move is out of bounds.\n")
             return False
 
         # Check that the space is empty.
-        if self.goban.board[row][col]:
+        if not self.engine.is_empty(row, col):
             player.tell_cc(self.prefix + "That space is already occupied.\n")
             return False
 
         # Does this move cause a repeat of a previous board?
-        if self.goban.move_causes_repeat(seat.data.side, row, col):
+        if goban.move_causes_repeat(seat.data.side, row, col):
             player.tell_cc(self.prefix + "That move causes a repeat of a previous board.\n")
             return False
 
-        # Okay, this looks like a legitimate move.
-        move_return = self.goban.go_play(seat.data.side, row, col)
-
-        if not move_return:
-            player.tell_cc(self.prefix + "That move was unsuccessful.  Weird.\n")
-            return False
-
-        else:
-            coords, capture_color, capture_list = move_return
-            move_str = "%s%s" % (LETTERS[col], row + 1)
-            capture_str = ""
-            capturer = None
-            if capture_color == seat.data.side:
-
-                # Suicide.  The opponent is the "capturer" in this case.
-                capture_str += ", ^Rsuiciding %s^~" % (self.get_stone_str(len(capture_list)))
-                if seat == self.seats[0]:
-                    capturer = self.seats[1]
-                else:
-                    capturer = self.seats[0]
-
-            elif capture_color:
+        # Okay, this is a legitimate move; the engine keeps the capture
+        # counts, crediting a suicide to the opponent.
+        capture_color, capture_list = self.engine.apply((row, col))
+        move_str = "%s%s" % (LETTERS[col], row + 1)
+        capture_str = ""
+        if capture_color == seat.data.side:
 
-                # Captured opponent pieces!
-                capture_str += ", ^!capturing %s^." % (self.get_stone_str(len(capture_list)))
-                capturer = seat
+            # Suicide.
+            capture_str += ", ^Rsuiciding %s^~" % (self.get_stone_str(len(capture_list)))
 
-            # If there was a capturer, update their capture list.
-            if capturer:
-                capturer.data.capture_list.extend(capture_list)
+        elif capture_color:
 
-            # And no matter what, print information about the move.
-            self.channel.broadcast_cc(self.prefix + "^Y%s^~ places a stone at ^C%s^~%s.\n" % (player, move_str, capture_str))
+            # Captured opponent pieces!
+            capture_str += ", ^!capturing %s^." % (self.get_stone_str(len(capture_list)))
 
-            self.turn_number += 1
+        # And no matter what, print information about the move.
+        self.channel.broadcast_cc(self.prefix + "^Y%s^~ places a stone at ^C%s^~%s.\n" % (player, move_str, capture_str))
 
-            return True
+        return True
 
     def swap(self, player):
 
-        self.goban.invert()
+        self.engine.apply(SWAP)
         self.channel.broadcast_cc(self.prefix + "^Y%s^~ has swapped ^KBlack^~'s first move.\n" % (player))
 
     def handle(self, player, command_str):
@@ -301,7 +283,7 @@ class CaptureGo(SeatedGame):
                     handled = True
 
                 elif primary in ("swap",):
-                    if self.turn_number == 2 and self.seats[1].player == player:
+                    if self.engine.can_swap() and self.seats[1].player == player:
                         self.swap(player)
                         made_move = True
                     else:
@@ -325,10 +307,7 @@ class CaptureGo(SeatedGame):
                     else:
 
                         # Nope.  Switch turns...
-                        if self.turn == BLACK:
-                            self.turn = WHITE
-                        else:
-                            self.turn = BLACK
+                        self.turn = self.engine.turn
 
                         # ...show everyone the board, and keep on.
                         self.send_board()
@@ -338,16 +317,11 @@ class CaptureGo(SeatedGame):
 
     def find_winner(self):
 
-        # If someone resigned, this is the easiest thing ever.
-        if self.resigner == WHITE:
-            return self.seats[0].player_name
-        elif self.resigner == BLACK:
-            return self.seats[1].player_name
-
-        # If someone's capture count has reached the goal, they win.
-        if len(self.seats[0].data.capture_list) >= self.capture_goal:
+        # The engine handles both resignations and capture counts.
+        winner = self.engine.winner()
+        if winner == BLACK:
             return self.seats[0].player_name
-        if len(self.seats[1].data.capture_list) >= self.capture_goal:
+        elif winner == WHITE:
             return self.seats[1].player_name
 
         # No winner yet.
@@ -0,0 +1,120 @@
+# Giles: capture_go_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.engine import Engine
+from giles.games.goban import Goban, BLACK, WHITE
+
+# The move that swaps Black's first stone.
+SWAP = "swap"
+
+class CaptureGoEngine(Engine):
+    """The rules of Capture Go.  Moves are (row, col) tuples, plus SWAP,
+    which White may play as their first move.  Suicide is allowed, and
+    counts as a capture for the other side; repeating an earlier position
+    is not.  The first side to capture capture_goal stones wins.
+    """
+
+    def __init__(self, width, height, capture_goal=1):
+
+        super(CaptureGoEngine, self).__init__()
+
+        self.goban = Goban()
+        self.goban.resize(width, height)
+        self.capture_goal = capture_goal
+        self.captures = {BLACK: 0, WHITE: 0}
+
+        self.turn = BLACK
+        self.move_count = 0
+        self.resigner = None
+
+    def other(self, color):
+
+        if color == BLACK:
+            return WHITE
+        return BLACK
+
+    def can_swap(self):
+
+        # White can swap only as the reply to Black's first stone.
+        return self.move_count == 1
+
+    def is_empty(self, row, col):
+        return not self.goban.board.get(row, col)
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+
+        goban = self.goban
+        moves = []
+        for row in range(goban.height):
+            for col in range(goban.width):
+                if (not goban.board.get(row, col) and
+                   not goban.move_causes_repeat(self.turn, row, col)):
+                    moves.append((row, col))
+        if self.can_swap():
+            moves.append(SWAP)
+        return moves
+
+    def is_legal(self, move):
+
+        if move == SWAP:
+            return self.can_swap()
+        row, col = move
+        goban = self.goban
+        return (goban.is_valid(row, col) and not goban.board.get(row, col) and
+                not goban.move_causes_repeat(self.turn, row, col))
+
+    def apply(self, move):
+
+        # Returns the colour of any stones captured (the mover's own, for a
+        # suicide) and where they were.
+        capture_color = None
+        capture_list = []
+        if move == SWAP:
+            self.goban.invert()
+        else:
+            row, col = move
+            coords, capture_color, capture_list = self.goban.go_play(self.turn, row, col)
+            if capture_color:
+                self.captures[self.other(capture_color)] += len(capture_list)
+        self.move_count += 1
+        self.turn = self.other(self.turn)
+        return (capture_color, capture_list)
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # If someone's capture count has reached the goal, they win.
+        if self.captures[BLACK] >= self.capture_goal:
+            return BLACK
+        if self.captures[WHITE] >= self.capture_goal:
+            return WHITE
+        return None
+
+    def copy(self):
+
+        new_engine = CaptureGoEngine.__new__(CaptureGoEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.goban = self.goban.copy()
+        new_engine.captures = dict(self.captures)
+        return new_engine
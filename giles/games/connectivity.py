@@ -0,0 +1,218 @@
+# Giles: connectivity.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Board connectivity for connection games.  Cells use the flat indices and
+# cached neighbour tables from the geometry module; on top of those we
+# precompute, once per board size, a table of edge masks, so the inner loops
+# never have to do bounds checks.
+
+from giles.games.geometry import cell_exists, get_neighbours
+from giles.games.geometry import TRIANGULAR
+
+# Edge bits.  A group's edge mask is the OR of the edge masks of its cells,
+# so "does this group connect top to bottom?" is a single comparison.
+EDGE_TOP = 1
+EDGE_BOTTOM = 2
+EDGE_LEFT = 4
+EDGE_RIGHT = 8
+EDGE_DIAGONAL = 16
+
+# Cache of the edge tables, keyed by (topology, width, height).
+_edge_cache = {}
+
+def get_edge_masks(topology, width, height):
+
+    # Returns a tuple, indexed by flat cell index, of the edges each cell
+    # touches.  Triangular boards have a top, a right, and a diagonal edge.
+    key = (topology, width, height)
+    if key in _edge_cache:
+        return _edge_cache[key]
+
+    table = []
+    for r in range(height):
+        for c in range(width):
+            mask = 0
+            if cell_exists(topology, width, height, r, c):
+                if r == 0:
+                    mask |= EDGE_TOP
+                if c == width - 1:
+                    mask |= EDGE_RIGHT
+                if topology == TRIANGULAR:
+                    if r == c:
+                        mask |= EDGE_DIAGONAL
+                else:
+                    if r == height - 1:
+                        mask |= EDGE_BOTTOM
+                    if c == 0:
+                        mask |= EDGE_LEFT
+            table.append(mask)
+
+    table = tuple(table)
+    _edge_cache[key] = table
+    return table
+
+def flatten(board):
+
+    # Turns a list-of-lists board into a flat list matching the indices
+    # used by the tables above.
+    to_return = []
+    for row in board:
+        to_return.extend(row)
+    return to_return
+
+def group_connects(cells, value, topology, width, height, goal_mask):
+
+    # The full-rescan test, for games where cells can change hands (say,
+    # via capture) and incremental tracking won't do.  'cells' is a flat
+    # board.  We walk every group of 'value' that touches at least one goal
+    # edge, iteratively, and return True as soon as one of them touches
+    # every edge in goal_mask.
+    neighbours = get_neighbours(topology, width, height)
+    edge_masks = get_edge_masks(topology, width, height)
+    visited = [False] * len(cells)
+
+    for start in range(len(cells)):
+        if (visited[start] or cells[start] != value or
+           not edge_masks[start] & goal_mask):
+            continue
+
+        visited[start] = True
+        mask = 0
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            mask |= edge_masks[index]
+            if mask & goal_mask == goal_mask:
+                return True
+            for neighbour in neighbours[index]:
+                if not visited[neighbour] and cells[neighbour] == value:
+                    visited[neighbour] = True
+                    stack.append(neighbour)
+
+    return False
+
+class ConnectionTracker(object):
+    """Incremental connectivity for a set of cells that only ever grows,
+    such as the stones of one colour in Hex.  It's a union-find over flat
+    cell indices; each group remembers the OR of the edge masks of its
+    cells, so checking for a winning connection is O(1) after each add.
+
+    Cells that change hands can't be removed from a tracker; games that
+    need that (swaps, captures) should clear() and re-add, or use
+    group_connects() instead.  Because groups only ever grow, the tracker
+    also remembers every edge mask any group has reached, so connects()
+    never has to look at individual groups.
+    """
+
+    def __init__(self, topology, width, height):
+
+        self.topology = topology
+        self.width = width
+        self.height = height
+        self.neighbours = get_neighbours(topology, width, height)
+        self.edge_masks = get_edge_masks(topology, width, height)
+        self.clear()
+
+    def clear(self):
+
+        cell_count = self.width * self.height
+
+        # A parent of -1 means the cell isn't in the tracker.
+        self.parent = [-1] * cell_count
+        self.size = [0] * cell_count
+        self.edges = [0] * cell_count
+        self.reached = set()
+
+    def copy(self):
+
+        # The neighbour and edge tables are shared, cached and never
+        # change, so only the union-find itself needs copying.
+        new_tracker = ConnectionTracker.__new__(ConnectionTracker)
+        new_tracker.__dict__.update(self.__dict__)
+        new_tracker.parent = self.parent[:]
+        new_tracker.size = self.size[:]
+        new_tracker.edges = self.edges[:]
+        new_tracker.reached = set(self.reached)
+        return new_tracker
+
+    def __contains__(self, index):
+        return self.parent[index] != -1
+
+    def find(self, index):
+
+        # Path halving; keeps the trees flat without recursion.
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(self, a, b):
+
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return a
+
+        # Smaller tree goes under the larger one.
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.edges[a] |= self.edges[b]
+        self.reached.add(self.edges[a])
+        return a
+
+    def add(self, index):
+
+        # Adds a cell, merges it with any tracked neighbours, and returns the
+        # edge mask of the resulting group.
+        if self.parent[index] == -1:
+            self.parent[index] = index
+            self.size[index] = 1
+            self.edges[index] = self.edge_masks[index]
+            self.reached.add(self.edges[index])
+            parent = self.parent
+            for neighbour in self.neighbours[index]:
+                if parent[neighbour] != -1:
+                    self.union(index, neighbour)
+
+        return self.edges[self.find(index)]
+
+    def add_cell(self, row, col):
+        return self.add(row * self.width + col)
+
+    def edges_of(self, index):
+
+        if self.parent[index] == -1:
+            return 0
+        return self.edges[self.find(index)]
+
+    def connected(self, a, b):
+
+        if self.parent[a] == -1 or self.parent[b] == -1:
+            return False
+        return self.find(a) == self.find(b)
+
+    def connects(self, goal_mask):
+
+        # Does any group touch every edge in goal_mask?  There are only a
+        # handful of distinct masks, and a group that once touched some
+        # edges always will, so we check the masks we've seen.
+        for mask in self.reached:
+            if mask & goal_mask == goal_mask:
+                return True
+        return False
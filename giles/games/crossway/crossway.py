@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from giles.games.crossway.crossway_engine import CrosswayEngine, SWAP, BLACK, WHITE
 from giles.games.seated_game import SeatedGame
 from giles.games.seat import Seat
 from giles.state import State
@@ -23,26 +24,8 @@ from giles.utils import demangle_move
 MIN_SIZE = 3
 MAX_SIZE = 26
 
-BLACK = "black"
-WHITE = "white"
-
 COLS = "abcdefghijklmnopqrstuvwxyz"
 
-# 0 1 2
-# . . . 0
-# . x . 1
-# . . . 2
-#
-# This game allows both orthogonal and diagonal connections.
-CONNECTION_DELTAS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
-
-# A checkerboard play results when one of the diagonal deltas
-# is the same color as the play, and the other two corners of
-# the defined square are the other player's.  Note that you
-# only need to know the diagonals; the other two are the
-# diagonal delta with one and then the other set to zero.
-CHECKERBOARD_DELTAS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
-
 class Crossway(SeatedGame):
     """A Crossway game table implementation.  Invented in 2007 by Mark Steere.
     """
@@ -64,41 +47,32 @@ class Crossway(SeatedGame):
         self.log_prefix = "%s/%s: " % (self.table_display_name, self.game_display_name)
 
         # Crossway-specific stuff.
-        self.board = None
-        self.printable_board = None
+        self.engine = None
         self.size = 19
         self.turn = None
-        self.turn_number = 0
         self.seats[0].data.side = BLACK
         self.seats[1].data.side = WHITE
-        self.last_r = None
-        self.last_c = None
-        self.resigner = None
-        self.adjacency_map = None
-        self.found_winner = False
 
         self.init_board()
 
     def init_board(self):
 
-        self.board = []
-
-        # Generate a new empty board.
-        for r in range(self.size):
-            self.board.append([None] * self.size)
+        # The engine holds the board and the rules; we just talk to people.
+        self.engine = CrosswayEngine(self.size)
 
-    def update_printable_board(self):
+    def render_board(self):
 
-        self.printable_board = []
+        engine = self.engine
+        lines = []
         col_str = "    " + "".join([" " + COLS[i] for i in range(self.size)])
-        self.printable_board.append(col_str + "\n")
-        self.printable_board.append("   ^m.=" + "".join(["=="] * self.size) + ".^~\n")
+        lines.append(col_str + "\n")
+        lines.append("   ^m.=" + "".join(["=="] * self.size) + ".^~\n")
         for r in range(self.size):
             this_str = "%2d ^m|^~ " % (r + 1)
             for c in range(self.size):
-                if r == self.last_r and c == self.last_c:
+                if r == engine.last_r and c == engine.last_c:
                     this_str += "^5"
-                loc = self.board[r][c]
+                loc = engine.board.get(r, c)
                 if loc == WHITE:
                     this_str += "^Wo^~ "
                 elif loc == BLACK:
@@ -106,16 +80,14 @@ class Crossway(SeatedGame):
                 else:
                     this_str += "^M.^~ "
             this_str += "^m|^~ %d" % (r + 1)
-            self.printable_board.append(this_str + "\n")
-        self.printable_board.append("   ^m`=" + "".join(["=="] * self.size) + "'^~\n")
-        self.printable_board.append(col_str + "\n")
+            lines.append(this_str + "\n")
+        lines.append("   ^m`=" + "".join(["=="] * self.size) + "'^~\n")
+        lines.append(col_str + "\n")
+        return "".join(lines)
 
     def show(self, player):
 
-        if not self.printable_board:
-            self.update_printable_board()
-        for line in self.printable_board:
-            player.tell_cc(line)
+        self.tell_board(player)
         player.tell_cc(self.get_turn_str() + "\n")
 
     def send_board(self):
@@ -137,41 +109,6 @@ class Crossway(SeatedGame):
 
         return ("It is ^Y%s^~'s turn (%s)." % (player, color_msg))
 
-    def is_valid(self, row, col):
-
-        if row < 0 or row >= self.size or col < 0 or col >= self.size:
-            return False
-        return True
-
-    def is_checkerboard(self, color, row, col):
-
-        # Bail immediately if we're given bad input.
-        if not self.is_valid(row, col):
-            return False
-
-        if self.board[row][col]:
-            return False
-
-        # Okay.  Let's check all four checkerboard deltas.
-        found = False
-        for r_delta, c_delta in CHECKERBOARD_DELTAS:
-
-            # Only bother if this is on the board or we already found it.
-            if not found and self.is_valid(row + r_delta, col + c_delta):
-
-                # If the delta space is this color, and the two adjacent spaces
-                # in that direction are the other color, it's a checkerboard.
-                if self.board[row + r_delta][col + c_delta] == color:
-                    corner_one = self.board[row + r_delta][col]
-                    corner_two = self.board[row][col + c_delta]
-                    if (corner_one and corner_one == corner_two and
-                       corner_one != color):
-
-                        # Not empty, is another color.  Checkerboard.
-                        found = True
-
-        return found
-
     def move(self, player, play):
 
         seat = self.get_seat_of_player(player)
@@ -186,27 +123,24 @@ class Crossway(SeatedGame):
         col, row = play
 
         # Make sure they're all in range.
-        if not self.is_valid(row, col):
+        if not self.engine.is_valid(row, col):
             player.tell_cc(self.prefix + "Your move is out of bounds.\n")
             return False
 
         # Is the space empty?
-        if self.board[row][col]:
+        if not self.engine.is_empty(row, col):
             player.tell_cc(self.prefix + "That space is already occupied.\n")
             return False
 
         # Does the move violate the no-checkerboard rule?
-        if self.is_checkerboard(self.turn, row, col):
+        if self.engine.is_checkerboard(self.turn, row, col):
             player.tell_cc(self.prefix + "That move creates a checkerboard.\n")
             return False
 
         # This is a valid move.  Apply, announce.
-        self.board[row][col] = self.turn
+        self.engine.apply((row, col))
         play_str = "%s%s" % (COLS[col], row + 1)
         self.channel.broadcast_cc(self.prefix + "^Y%s^~ places a piece at ^C%s^~.\n" % (seat.player, play_str))
-        self.last_r = row
-        self.last_c = col
-        self.turn_number += 1
 
         return True
 
@@ -219,7 +153,6 @@ class Crossway(SeatedGame):
             self.channel.broadcast_cc(self.prefix + "^KBlack/Vertical^~: ^R%s^~; ^WWhite/Horizontal^~: ^Y%s^~\n" %
                (self.seats[0].player, self.seats[1].player))
             self.turn = BLACK
-            self.turn_number = 1
             self.send_board()
 
     def set_size(self, player, size_bits):
@@ -238,7 +171,7 @@ class Crossway(SeatedGame):
         self.size = size
         self.channel.broadcast_cc(self.prefix + "^R%s^~ has set the board size to ^C%d^~.\n" % (player, size))
         self.init_board()
-        self.update_printable_board()
+        self.mark_board_dirty()
 
     def resign(self, player):
 
@@ -251,21 +184,15 @@ class Crossway(SeatedGame):
             player.tell_cc(self.prefix + "You must wait for your turn to resign.\n")
             return False
 
-        self.resigner = seat.data.side
+        self.engine.resign(seat.data.side)
         self.channel.broadcast_cc(self.prefix + "^R%s^~ is resigning from the game.\n" % player)
         return True
 
     def swap(self, player):
 
-        # Like Hex, a swap in Crossway requires a translation to make it the
-        # equivalent move for the other player.
-
-        self.board[self.last_r][self.last_c] = None
-        self.board[self.last_c][self.last_r] = WHITE
-        self.last_c, self.last_r = self.last_r, self.last_c
-
+        # The engine mirrors Black's first piece to make it White's.
+        self.engine.apply(SWAP)
         self.channel.broadcast_cc("^Y%s^~ has swapped ^KBlack^~'s first move.\n" % (player))
-        self.turn_number += 1
 
     def handle(self, player, command_str):
 
@@ -321,7 +248,7 @@ class Crossway(SeatedGame):
 
                 elif primary in ("swap",):
 
-                    if self.seats[1].player == player and self.turn_number == 2:
+                    if self.seats[1].player == player and self.engine.can_swap():
                         self.swap(player)
                         made_move = True
                     else:
@@ -338,7 +265,7 @@ class Crossway(SeatedGame):
                 if made_move:
 
                     # Okay, something happened on the board.  Update.
-                    self.update_printable_board()
+                    self.mark_board_dirty()
 
                     # Did someone win?
                     winner = self.find_winner()
@@ -348,10 +275,7 @@ class Crossway(SeatedGame):
                     else:
 
                         # Nope.  Switch turns...
-                        if self.turn == BLACK:
-                            self.turn = WHITE
-                        else:
-                            self.turn = BLACK
+                        self.turn = self.engine.turn
 
                         # ...show everyone the board, and keep on.
                         self.send_board()
@@ -361,66 +285,16 @@ class Crossway(SeatedGame):
 
     def find_winner(self):
 
-        # If someone resigned, this is the easiest thing ever.
-        if self.resigner == WHITE:
-            return self.seats[0].player_name
-        elif self.resigner == BLACK:
-            return self.seats[1].player_name
-
-        # This is like most connection games; we check recursively from the
-        # top and left edges to see whether a player has won.
-        self.found_winner = False
-        self.adjacency_map = []
-        for i in range(self.size):
-            self.adjacency_map.append([None] * self.size)
-
-        for i in range(self.size):
-            if self.board[i][0] == WHITE:
-                self.recurse_adjacency(WHITE, i, 0)
-            if self.board[0][i] == BLACK:
-                self.recurse_adjacency(BLACK, 0, i)
-
-        if self.found_winner == BLACK:
+        # The engine handles both resignations and connections.
+        winner = self.engine.winner()
+        if winner == BLACK:
             return self.seats[0].player_name
-        elif self.found_winner == WHITE:
+        elif winner == WHITE:
             return self.seats[1].player_name
 
         # No winner yet.
         return None
 
-    def recurse_adjacency(self, color, row, col):
-
-        # Bail if we found a winner already.
-        if self.found_winner:
-            return
-
-        # Bail if we're off the board.
-        if not self.is_valid(row, col):
-            return
-
-        # Bail if we've been here.
-        if self.adjacency_map[row][col]:
-            return
-
-        # Bail if this is the wrong color.
-        if self.board[row][col] != color:
-            return
-
-        # Okay.  Occupied and it's this player's.  Mark.
-        self.adjacency_map[row][col] = True
-
-        # Have we hit the winning side for this player?
-        if ((color == WHITE and col == self.size - 1) or
-           (color == BLACK and row == self.size - 1)):
-
-            # Success!
-            self.found_winner = color
-            return
-
-        # Not a win yet.  Recurse over adjacencies.
-        for r_delta, c_delta in CONNECTION_DELTAS:
-            self.recurse_adjacency(color, row + r_delta, col + c_delta)
-
     def resolve(self, winner):
         self.send_board()
         self.channel.broadcast_cc(self.prefix + "^C%s^~ wins!\n" % winner)
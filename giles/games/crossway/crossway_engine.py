@@ -0,0 +1,185 @@
+# Giles: crossway_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.connectivity import ConnectionTracker
+from giles.games.connectivity import EDGE_TOP, EDGE_BOTTOM, EDGE_LEFT, EDGE_RIGHT
+from giles.games.engine import Engine
+from giles.games.flat_board import FlatBoard
+from giles.games.geometry import get_windows, EIGHT_WAY
+
+BLACK = "black"
+WHITE = "white"
+
+# The move that swaps Black's first piece.
+SWAP = "swap"
+
+# 0 1 2
+# . . . 0
+# . x . 1
+# . . . 2
+#
+# This game allows both orthogonal and diagonal connections, so we use the
+# eight-way topology.  Black connects top to bottom, White left to right.
+GOALS = {
+    BLACK: EDGE_TOP | EDGE_BOTTOM,
+    WHITE: EDGE_LEFT | EDGE_RIGHT,
+}
+
+class CrosswayEngine(Engine):
+    """The rules of Crossway.  Moves are (row, col) tuples, plus SWAP,
+    which White may play as their first move.
+    """
+
+    def __init__(self, size):
+
+        super(CrosswayEngine, self).__init__()
+
+        self.size = size
+        self.board = FlatBoard(size, size, (None, BLACK, WHITE))
+        self.windows = get_windows(size, size)
+
+        self.connections = {
+            BLACK: ConnectionTracker(EIGHT_WAY, size, size),
+            WHITE: ConnectionTracker(EIGHT_WAY, size, size),
+        }
+
+        self.turn = BLACK
+        self.move_count = 0
+        self.last_r = None
+        self.last_c = None
+        self.resigner = None
+
+    def rebuild_connections(self):
+
+        # The only time a piece changes colour is on a swap, with exactly
+        # one piece on the board, so it's cheap to just start over.
+        for color in self.connections:
+            self.connections[color].clear()
+        for index in range(self.size * self.size):
+            color = self.board.get_index(index)
+            if color:
+                self.connections[color].add(index)
+
+    def is_valid(self, row, col):
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    def is_empty(self, row, col):
+        return not self.board.get(row, col)
+
+    def can_swap(self):
+
+        # White can swap only as the reply to Black's first piece.
+        return self.move_count == 1
+
+    def is_checkerboard(self, color, row, col):
+
+        # Bail immediately if we're given bad input.
+        if not self.is_valid(row, col):
+            return False
+
+        if self.board.get(row, col):
+            return False
+
+        # A checkerboard results when the far corner of one of the 2x2
+        # windows this cell is in is the same color as the play, and the
+        # other two corners are the other player's.  The windows are
+        # precomputed, so this is at most four lookups of three cells.
+        cells = self.board.cells
+        code = self.board.code(color)
+        for diagonal, side_one, side_two in self.windows[row * self.size + col]:
+            if cells[diagonal] == code:
+                corner = cells[side_one]
+                if corner and corner == cells[side_two] and corner != code:
+                    return True
+
+        return False
+
+    def swap(self):
+
+        # Like Hex, a swap requires a translation to make it the equivalent
+        # move for the other player.
+        self.board.set(self.last_r, self.last_c, None)
+        self.board.set(self.last_c, self.last_r, WHITE)
+        self.last_c, self.last_r = self.last_r, self.last_c
+        self.rebuild_connections()
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+        moves = []
+        for row in range(self.size):
+            for col in range(self.size):
+                if self.is_empty(row, col) and not self.is_checkerboard(self.turn, row, col):
+                    moves.append((row, col))
+        if self.can_swap():
+            moves.append(SWAP)
+        return moves
+
+    def is_legal(self, move):
+
+        if move == SWAP:
+            return self.can_swap()
+        row, col = move
+        return (self.is_valid(row, col) and self.is_empty(row, col) and
+                not self.is_checkerboard(self.turn, row, col))
+
+    def apply(self, move):
+
+        if move == SWAP:
+            self.swap()
+        else:
+            row, col = move
+            self.board.set(row, col, self.turn)
+            self.connections[self.turn].add_cell(row, col)
+            self.last_r = row
+            self.last_c = col
+        self.move_count += 1
+        self.turn = self.other(self.turn)
+
+    def other(self, color):
+
+        if color == BLACK:
+            return WHITE
+        return BLACK
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # Pieces are added to their colour's connection tracker as they're
+        # placed, so this is just a question of whether either colour has a
+        # group touching both of its edges.
+        if self.connections[BLACK].connects(GOALS[BLACK]):
+            return BLACK
+        elif self.connections[WHITE].connects(GOALS[WHITE]):
+            return WHITE
+        return None
+
+    def copy(self):
+
+        new_engine = CrosswayEngine.__new__(CrosswayEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.board = self.board.copy()
+        new_engine.connections = {
+            BLACK: self.connections[BLACK].copy(),
+            WHITE: self.connections[WHITE].copy(),
+        }
+        return new_engine
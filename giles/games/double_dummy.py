@@ -0,0 +1,217 @@
+# Giles: double_dummy.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# A double-dummy solver for simple trick-taking games: with every hand
+# face up, how many of the remaining tricks can a side take against any
+# defence?  The rules are the ones handle_trick() plays by: follow the led
+# suit if you can, and the highest trump wins, or failing that the highest
+# card of the led suit.
+
+from giles.games.hand import bits_of
+
+# How many positions a solver will look at before giving up.  Endings are
+# usually quick, but a full deal can take a long time, and we'd rather play
+# on than stall the server.  Checks we make on our own, after every trick,
+# get a much smaller budget than claims players ask for.
+DEFAULT_BUDGET = 20000
+QUICK_BUDGET = 2000
+
+class _GaveUp(Exception):
+    pass
+
+class DoubleDummy(object):
+    """Solves an ending of a trick-taking game.  hands are CardHands, in
+    seat order, all with the same number of cards; leader is the index of
+    the seat on lead to the next trick, and side the indices of the seats
+    whose tricks we're counting.  Everyone else plays against them; in a
+    three-player game, that means the other two gang up, so a result is a
+    guarantee no matter how anyone plays.
+
+    The cards need ids, and within a suit a higher id has to be a higher
+    card, which is how PlayingCard numbers them.
+
+    Positions are searched with alpha-beta, and the bounds found at the
+    start of each trick are kept in a transposition table, as the same
+    cards can be played out in any number of orders.  Cards that are next
+    to each other in a suit, once everything already played is taken out,
+    are interchangeable, so only one of each run is tried.
+    """
+
+    def __init__(self, hands, leader, trump_suit, side, budget=DEFAULT_BUDGET):
+
+        self.masks = tuple([hand.mask for hand in hands])
+        self.leader = leader
+        self.trump_suit = trump_suit
+        self.ours = [seat in side for seat in range(len(hands))]
+        self.budget = budget
+        self.nodes = 0
+        self.table = {}
+
+        # The union of everyone's suits, and the suit of every card id.
+        self.suit_masks = {}
+        self.suit_of = {}
+        for hand in hands:
+            for suit, mask in hand.suit_masks.items():
+                self.suit_masks[suit] = self.suit_masks.get(suit, 0) | mask
+                for card_id in bits_of(mask):
+                    self.suit_of[card_id] = suit
+
+    def tricks_left(self):
+        return bin(self.masks[self.leader]).count("1")
+
+    def can_take(self, target):
+        """Returns whether the side can take at least target of the
+        remaining tricks, or None if it was too much work to find out.
+        """
+
+        try:
+            return self.search(self.masks, self.leader, target - 1, target) >= target
+        except _GaveUp:
+            return None
+
+    def solve(self):
+        """Returns the number of the remaining tricks the side takes with
+        best play all round, or None if it was too much work to find out.
+        """
+
+        try:
+            return self.search(self.masks, self.leader, -1, self.tricks_left() + 1)
+        except _GaveUp:
+            return None
+
+    def search(self, masks, leader, alpha, beta):
+
+        # The value of a position at the start of a trick.
+        left = bin(masks[leader]).count("1")
+        if not left:
+            return 0
+
+        self.nodes += 1
+        if self.nodes > self.budget:
+            raise _GaveUp()
+
+        key = (leader, masks)
+        lower, upper = self.table.get(key, (0, left))
+        if lower >= beta:
+            return lower
+        if upper <= alpha:
+            return upper
+        if lower == upper:
+            return lower
+        alpha = max(alpha, lower)
+        beta = min(beta, upper)
+
+        value = self.play(list(masks), leader, leader, None, None, None, False,
+                          0, alpha, beta)
+
+        # The search only pins the value down inside the window; outside
+        # it, we've just learned a bound.
+        if value <= alpha:
+            upper = value
+        elif value >= beta:
+            lower = value
+        else:
+            lower = upper = value
+        self.table[key] = (lower, upper)
+        return value
+
+    def choices(self, hand, led_suit, live):
+
+        # The cards worth trying: the legal ones, highest first, less any
+        # that are interchangeable with the card just below them.
+        if led_suit is not None:
+            legal = hand & self.suit_masks[led_suit]
+            if not legal:
+                legal = hand
+        else:
+            legal = hand
+
+        suit_of = self.suit_of
+        to_try = []
+        prev = None
+        for card_id in bits_of(legal):
+            if (prev is not None and suit_of[prev] == suit_of[card_id] and
+               not live & ((1 << card_id) - (2 << prev))):
+                to_try[-1] = card_id
+            else:
+                to_try.append(card_id)
+            prev = card_id
+        to_try.reverse()
+        return to_try
+
+    def play(self, masks, leader, seat, led_suit, win_seat, win_id, win_trump,
+             played, alpha, beta):
+
+        # Tries each card seat could play to the trick in progress.
+        count = len(masks)
+        last_seat = (leader + count - 1) % count
+        live = played
+        for mask in masks:
+            live |= mask
+        hand = masks[seat]
+        ours = self.ours[seat]
+        trump_suit = self.trump_suit
+
+        best = None
+        for card_id in self.choices(hand, led_suit, live):
+            suit = self.suit_of[card_id]
+            is_trump = suit == trump_suit
+
+            # Does this card take the trick over?
+            this_led = led_suit
+            this_seat, this_id, this_trump = win_seat, win_id, win_trump
+            if led_suit is None:
+                this_led = suit
+                this_seat, this_id, this_trump = seat, card_id, is_trump
+            elif is_trump and not win_trump:
+                this_seat, this_id, this_trump = seat, card_id, True
+            elif card_id > win_id and suit == (win_trump and trump_suit or led_suit):
+                this_seat, this_id = seat, card_id
+
+            bit = 1 << card_id
+            masks[seat] = hand & ~bit
+            if seat == last_seat:
+                won = self.ours[this_seat] and 1 or 0
+                value = won + self.search(tuple(masks), this_seat,
+                                          alpha - won, beta - won)
+            else:
+                value = self.play(masks, leader, (seat + 1) % count, this_led,
+                                  this_seat, this_id, this_trump,
+                                  played | bit, alpha, beta)
+            masks[seat] = hand
+
+            if ours:
+                if best is None or value > best:
+                    best = value
+                    if best > alpha:
+                        alpha = best
+            else:
+                if best is None or value < best:
+                    best = value
+                    if best < beta:
+                        beta = best
+            if alpha >= beta:
+                break
+
+        return best
+
+def claim_holds(hands, leader, trump_suit, side, budget=DEFAULT_BUDGET):
+    """Returns whether side can take every remaining trick against any
+    defence; None if it couldn't be worked out within the budget.
+    """
+
+    solver = DoubleDummy(hands, leader, trump_suit, side, budget)
+    return solver.can_take(solver.tricks_left())
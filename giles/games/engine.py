@@ -0,0 +1,66 @@
+# Giles: engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# What winner() returns when a game ends with nobody ahead.
+DRAW = "draw"
+
+class Engine(object):
+    """The base Engine class.  An engine is the rules of a game and nothing
+    else: the position, whose turn it is, what the legal moves are, what
+    a move does, and who (if anyone) has won.  It never talks to players,
+    channels, or the server, so it can be run in a tight loop (for
+    simulations, benchmarks, or computer players) just as easily as from a
+    table.
+
+    The game's SeatedGame() is then a thin layer on top that handles seats
+    and commands, checks a player's move against the engine so it can say
+    what's wrong with it, hands legal moves to apply(), and renders the
+    result.
+
+    Moves are whatever is convenient for the game, as long as they're
+    hashable and legal_moves() and apply() agree on them.
+    """
+
+    def __init__(self):
+
+        self.turn = None
+
+    def legal_moves(self):
+
+        # Returns a list of the moves the side to play can make.  Should be
+        # empty once the game is over.
+        raise NotImplementedError
+
+    def is_legal(self, move):
+
+        # Override this if there's a cheaper test than generating every
+        # move.
+        return move in self.legal_moves()
+
+    def apply(self, move):
+
+        # Plays a legal move for the side to play and passes the turn.
+        raise NotImplementedError
+
+    def winner(self):
+
+        # Returns the winning side, DRAW, or None if the game isn't over.
+        raise NotImplementedError
+
+    def copy(self):
+
+        # Returns an independent copy of the position, to try moves on.
+        raise NotImplementedError
@@ -15,15 +15,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from giles.games.seated_game import SeatedGame
-from giles.games.hand import Hand
 from giles.games.seat import Seat
 from giles.state import State
-from giles.utils import Struct, get_plural_str
+from giles.utils import get_plural_str
 
-from giles.games.expeditions.expeditions_card import ExpeditionsCard
-from giles.games.expeditions.expeditions_card import card_to_str, get_color_code, hand_to_str, value_to_str, sorted_hand, str_to_card, str_to_suit
-from giles.games.expeditions.expeditions_card import DEFAULT_SUITS, YELLOW, BLUE, WHITE, GREEN, RED, CYAN, MAGENTA
-from giles.games.expeditions.expeditions_card import AGREEMENT, SHORT, LONG
+from giles.games.expeditions.expeditions_card import card_to_str, get_color_code, hand_to_str, value_to_str, str_to_card, str_to_suit
+from giles.games.expeditions.expeditions_card import LONG
+from giles.games.expeditions.expeditions_engine import ExpeditionsEngine, LEFT, RIGHT, PLAY
+from giles.games.expeditions.expeditions_engine import TOO_LOW, SAME_VALUE, NOT_IN_PLAY, NO_DISCARDS, JUST_DISCARDED
 
 # Some useful default values.
 MIN_SUITS = 2
@@ -38,11 +37,6 @@ MAX_AGREEMENTS = 6
 MIN_PENALTY = 0
 MAX_PENALTY = 50
 
-LEFT = "left"
-RIGHT = "right"
-
-NUMERICAL_RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10']
-
 class Expeditions(SeatedGame):
     """A Expeditions game table implementation.  Based on a game invented in
     1999 by Reiner Knizia.
@@ -75,90 +69,44 @@ class Expeditions(SeatedGame):
         self.goal = 1
 
         self.turn = None
-        self.draw_pile = None
-        self.discards = []
         self.left = self.seats[0]
         self.right = self.seats[1]
         self.left.data.side = LEFT
-        self.left.data.curr_score = 0
-        self.left.data.overall_score = 0
-        self.left.data.hand = None
-        self.left.data.expeditions = []
         self.right.data.side = RIGHT
-        self.right.data.curr_score = 0
-        self.right.data.overall_score = 0
-        self.right.data.hand = None
-        self.right.data.expeditions = []
-        self.resigner = None
-        self.first_player = None
-        self.just_discarded_to = None
 
+        # The engine builds and shuffles the piles and holds the rules; we
+        # keep the printable form of every expedition, so drawing one
+        # doesn't mean walking its cards.
+        self.engine = ExpeditionsEngine(self.suit_count, self.agreement_count,
+                                        self.penalty, self.bonus,
+                                        self.bonus_length, self.bonus_points,
+                                        self.hand_size, self.goal)
         self.printable_layout = None
-        self.init_hand()
+        self.init_printables()
+
+    def init_printables(self):
+
+        self.printables = {
+            LEFT: [""] * self.suit_count,
+            RIGHT: [""] * self.suit_count,
+        }
 
     def init_hand(self):
 
-        # Depending on the number of suits requested for play, we build
-        # structures.
-        suit_list = DEFAULT_SUITS[:]
-        if self.suit_count >= 6:
-            suit_list.append(CYAN)
-        if self.suit_count == 7:
-            suit_list.append(MAGENTA)
-
-        # If, on the other hand, the number of suits is /less/ than five,
-        # we use a subset of the default suits.
-        if self.suit_count < 5:
-            suit_list = DEFAULT_SUITS[:self.suit_count]
-
-        # All right, we have a list of suits involved in this game.  Let's
-        # build the various piles that are based on those suits.
-        self.left.data.expeditions = []
-        self.right.data.expeditions = []
-        self.discards = []
-        for suit in suit_list:
-            discard_pile = Struct()
-            left_expedition = Struct()
-            right_expedition = Struct()
-            for pile in (discard_pile, left_expedition, right_expedition):
-                pile.suit = suit
-                pile.hand = Hand()
-                pile.value = 0
-            self.left.data.expeditions.append(left_expedition)
-            self.right.data.expeditions.append(right_expedition)
-            self.discards.append(discard_pile)
-
-        # We'll do a separate loop for generating the deck to minimize
-        # confusion.
-        self.draw_pile = Hand()
-        for suit in suit_list:
-            for rank in NUMERICAL_RANKS:
-                self.draw_pile.add(ExpeditionsCard(rank, suit))
-
-            # Add as many agreements as requested.
-            for agreement in range(self.agreement_count):
-                self.draw_pile.add(ExpeditionsCard(AGREEMENT, suit))
-
-        # Lastly, shuffle the draw deck and initialize hands.
-        self.draw_pile.shuffle()
-        self.left.data.hand = Hand()
-        self.right.data.hand = Hand()
+        # Collects the cards and builds a fresh shuffled deck.
+        self.engine.new_hand()
+        self.init_printables()
+
+    def get_hand(self, seat):
+        return self.engine.hands[seat.data.side]
 
     def get_discard_str(self, pos):
 
-        discard_pile = self.discards[pos]
+        discard_pile = self.engine.discards[pos]
         if len(discard_pile.hand):
             return(value_to_str(discard_pile.hand[-1].value()))
         return "."
 
-    def get_expedition_str(self, expedition):
-
-        to_return = ""
-        for card in expedition:
-            to_return += value_to_str(card.value())
-
-        return to_return
-
     def get_sp_str(self, seat):
 
         if seat == self.left:
@@ -166,6 +114,24 @@ class Expeditions(SeatedGame):
         else:
             return "^M%s^~" % self.right.player_name
 
+    def get_layout_row(self, row):
+
+        left = self.engine.expeditions[LEFT][row]
+        right = self.engine.expeditions[RIGHT][row]
+        suit_char = left.suit[0].upper()
+        left_suit_char = suit_char
+        right_suit_char = suit_char
+        expedition_str = get_color_code(left.suit)
+        expedition_str += self.printables[LEFT][row].rjust(18)
+        if self.bonus and len(left.hand) >= self.bonus_length:
+            left_suit_char = "*"
+        if self.bonus and len(right.hand) >= self.bonus_length:
+            right_suit_char = "*"
+        expedition_str += " %s %s %s " % (left_suit_char, self.get_discard_str(row), right_suit_char)
+        expedition_str += self.printables[RIGHT][row]
+        expedition_str += "^~\n"
+        return expedition_str
+
     def update_printable_layout(self):
 
         self.printable_layout = []
@@ -173,29 +139,30 @@ class Expeditions(SeatedGame):
 
         # Loop through all table rows.
         for row in range(self.suit_count):
-            left = self.left.data.expeditions[row]
-            right = self.right.data.expeditions[row]
-            suit_char = left.suit[0].upper()
-            left_suit_char = suit_char
-            right_suit_char = suit_char
-            expedition_str = get_color_code(left.suit)
-            expedition_str += self.get_expedition_str(left.hand.reversed()).rjust(18)
-            if self.bonus and len(left.hand) >= self.bonus_length:
-                left_suit_char = "*"
-            if self.bonus and len(right.hand) >= self.bonus_length:
-                right_suit_char = "*"
-            expedition_str += " %s %s %s " % (left_suit_char, self.get_discard_str(row), right_suit_char)
-            expedition_str += self.get_expedition_str(right.hand)
-            expedition_str += "^~\n"
-            self.printable_layout.append(expedition_str)
+            self.printable_layout.append(self.get_layout_row(row))
             self.printable_layout.append("                   |   |\n")
 
         # Replace the last unnecessary separator row with the end of the board.
         self.printable_layout[-1] = "                   `---'\n"
+        self.mark_board_dirty()
+
+    def update_layout_row(self, row):
+
+        # Only one row changes with any move, so only redraw that one.  If
+        # there's no layout yet, show() will build the whole thing.
+        if self.printable_layout:
+            self.printable_layout[1 + row * 2] = self.get_layout_row(row)
+            self.mark_board_dirty()
+
+    def render_board(self):
+
+        if not self.printable_layout:
+            self.update_printable_layout()
+        return "".join(self.printable_layout)
 
     def get_metadata_str(self):
 
-        to_return = "^Y%s^~ remain in the draw pile.\n" % get_plural_str(len(self.draw_pile), "card")
+        to_return = "^Y%s^~ remain in the draw pile.\n" % get_plural_str(len(self.engine.draw_pile), "card")
         if not self.turn:
             to_return += "The game has not started yet.\n"
         else:
@@ -206,17 +173,15 @@ class Expeditions(SeatedGame):
             else:
                 to_return += "^cdraw a card^~.\n"
         to_return += "The goal score for this game is ^Y%s^~.\n" % get_plural_str(self.goal, "point")
-        to_return += "Overall:      %s: %s     %s: %s\n" % (self.get_sp_str(self.left), self.left.data.overall_score, self.get_sp_str(self.right), self.right.data.overall_score)
+        overall_scores = self.engine.overall_scores
+        to_return += "Overall:      %s: %s     %s: %s\n" % (self.get_sp_str(self.left), overall_scores[LEFT], self.get_sp_str(self.right), overall_scores[RIGHT])
 
         return to_return
 
     def show(self, player, show_metadata=True):
 
-        if not self.printable_layout:
-            self.update_printable_layout()
         player.tell_cc("%s         %s\n" % (self.get_sp_str(self.left).rjust(21), self.get_sp_str(self.right)))
-        for line in self.printable_layout:
-            player.tell_cc(line)
+        self.tell_board(player)
         if show_metadata:
             player.tell_cc("\n" + self.get_metadata_str())
 
@@ -229,7 +194,7 @@ class Expeditions(SeatedGame):
             return
 
         print_str = "Your current hand:\n   "
-        print_str += hand_to_str(seat.data.hand)
+        print_str += hand_to_str(self.get_hand(seat))
         print_str += "\n"
         self.tell_pre(player, print_str)
 
@@ -241,21 +206,14 @@ class Expeditions(SeatedGame):
             if seat.player:
                 self.show_hand(seat.player)
 
-    def deal(self):
-
-        # Deal cards until each player has hand_size cards.
-        self.bc_pre("A fresh hand is dealt to both players.\n")
-        for i in range(self.hand_size):
-            self.left.data.hand.add(self.draw_pile.discard())
-            self.right.data.hand.add(self.draw_pile.discard())
+    def update_turn(self):
 
-        # Sort hands.
-        self.left.data.hand = sorted_hand(self.left.data.hand)
-        self.right.data.hand = sorted_hand(self.right.data.hand)
-
-        # Clear scores.
-        self.left.data.curr_score = 0
-        self.right.data.curr_score = 0
+        # Follows the engine's turn and which half of it we're in.
+        if self.engine.turn == LEFT:
+            self.turn = self.left
+        else:
+            self.turn = self.right
+        self.state.set_sub(self.engine.phase)
 
     def tick(self):
 
@@ -263,12 +221,13 @@ class Expeditions(SeatedGame):
         if (self.state.get() == "need_players" and self.seats[0].player
            and self.seats[1].player and self.active):
             self.state.set("playing")
-            self.state.set_sub("play")
             self.bc_pre("^CLeft^~: ^Y%s^~; ^MRight^~: ^Y%s^~\n" %
                (self.left.player_name, self.right.player_name))
-            self.turn = self.left
-            self.first_player = self.left
-            self.deal()
+
+            # The engine deals; Left goes first.
+            self.bc_pre("A fresh hand is dealt to both players.\n")
+            self.engine.start(LEFT)
+            self.update_turn()
             self.send_layout()
 
     def calculate_deck_size(self, suits, agrees):
@@ -295,6 +254,7 @@ class Expeditions(SeatedGame):
 
         # Valid.
         self.suit_count = new_suit_count
+        self.engine.suit_count = new_suit_count
         self.bc_pre("^M%s^~ has changed the suit count to ^G%s^~.\n" % (player, new_suit_count))
         self.init_hand()
         self.update_printable_layout()
@@ -317,6 +277,7 @@ class Expeditions(SeatedGame):
 
         # Valid.
         self.agreement_count = new_agree_count
+        self.engine.agreement_count = new_agree_count
         self.bc_pre("^M%s^~ has changed the agreement count to ^G%s^~.\n" % (player, new_agree_count))
         self.init_hand()
         self.update_printable_layout()
@@ -334,12 +295,13 @@ class Expeditions(SeatedGame):
 
         # If the drawn hands are greater than or equal to the actual card
         # count, that doesn't work either.
-        if (new_hand_size * 2) >= len(self.draw_pile):
+        if (new_hand_size * 2) >= len(self.engine.draw_pile):
             self.tell_pre(player, "The hand size is too large for the number of cards in play.\n")
             return False
 
         # Valid.
         self.hand_size = new_hand_size
+        self.engine.hand_size = new_hand_size
         self.bc_pre("^M%s^~ has changed the hand size to ^G%s^~.\n" % (player, new_hand_size))
 
     def set_penalty(self, player, penalty_str):
@@ -355,6 +317,7 @@ class Expeditions(SeatedGame):
 
         # Valid.
         self.penalty = new_penalty
+        self.engine.penalty = new_penalty
         self.bc_pre("^M%s^~ has changed the penalty to ^G%s^~.\n" % (player, new_penalty))
 
     def set_bonus(self, player, bonus_bits):
@@ -365,6 +328,7 @@ class Expeditions(SeatedGame):
             # Gotta be 'none' or 0.
             if bonus in ("none", "n", "0",):
                 self.bonus = False
+                self.engine.bonus = False
                 self.bc_pre("^M%s^~ has disabled the expedition bonuses.\n" % player)
                 return True
             else:
@@ -384,12 +348,16 @@ class Expeditions(SeatedGame):
 
             if not points or not length:
                 self.bonus = False
+                self.engine.bonus = False
                 self.bc_pre("^M%s^~ has disabled the expedition bonuses.\n" % player)
                 return True
             else:
                 self.bonus = True
                 self.bonus_points = points
                 self.bonus_length = length
+                self.engine.bonus = True
+                self.engine.bonus_points = points
+                self.engine.bonus_length = length
                 self.bc_pre("^M%s^~ has set the expedition bonuses to ^C%s^~ at length ^R%s^~.\n" % (player, get_plural_str(points, "point"), length))
                 return True
 
@@ -410,25 +378,16 @@ class Expeditions(SeatedGame):
 
         # Got a valid goal.
         self.goal = new_goal
+        self.engine.goal = new_goal
         self.bc_pre("^M%s^~ has changed the goal to ^G%s^~.\n" % (player, get_plural_str(new_goal, "point")))
 
-    def suit_to_loc(self, suit):
-
-        if suit in DEFAULT_SUITS:
-            return DEFAULT_SUITS.index(suit)
-        elif suit == CYAN:
-            return 5
-        elif suit == MAGENTA:
-            return 6
-
-        return None
-
     def evaluate(self, player):
 
         for seat in self.seats:
+            side = seat.data.side
             score_str = "%s: " % seat.player_name
-            score_str += " + ".join(["%s%s^~" % (get_color_code(x.suit), x.value) for x in seat.data.expeditions])
-            score_str += " = %s\n" % (get_plural_str(seat.data.curr_score, "point"))
+            score_str += " + ".join(["%s%s^~" % (get_color_code(x.suit), x.value) for x in self.engine.expeditions[side]])
+            score_str += " = %s\n" % (get_plural_str(self.engine.curr_scores[side], "point"))
             self.tell_pre(player, score_str)
 
     def play(self, player, play_str):
@@ -455,27 +414,29 @@ class Expeditions(SeatedGame):
             return False
 
         # Do they even have this card?
-        if potential_card not in seat.data.hand:
+        if potential_card not in self.get_hand(seat):
             self.tell_pre(player, "You don't have that card!\n")
             return False
 
-        # All right.  Grab the hand for that expedition.
-        exp_hand = seat.data.expeditions[self.suit_to_loc(potential_card.suit)].hand
-
-        # If this card is a lower value than the top card of the hand, nope.
-        if len(exp_hand) and potential_card < exp_hand[-1]:
+        # Can it still go on that expedition?
+        problem = self.engine.play_problem(potential_card)
+        if problem == TOO_LOW:
             self.tell_pre(player, "You can no longer play this card on this expedition.\n")
             return False
 
-        # If it's the same value and not an agreement, nope.
-        elif (len(exp_hand) and potential_card == exp_hand[-1] and
-           potential_card.rank != AGREEMENT):
+        elif problem == SAME_VALUE:
             self.tell_pre(player, "You cannot play same-valued point cards on an expedition.\n")
             return False
 
-        # Passed the tests.  Play it and clear the discard tracker.
-        exp_hand.add(seat.data.hand.discard_specific(potential_card))
-        self.just_discarded_to = None
+        # Passed the tests.  Play it; the left player's expeditions grow
+        # towards the left.
+        loc = self.engine.play(potential_card)
+        value_str = value_to_str(potential_card.value())
+        if seat == self.left:
+            self.printables[LEFT][loc] = value_str + self.printables[LEFT][loc]
+        else:
+            self.printables[RIGHT][loc] += value_str
+        self.update_layout_row(loc)
 
         self.bc_pre("%s played %s.\n" % (self.get_sp_str(seat),
                        card_to_str(potential_card, mode=LONG)))
@@ -505,18 +466,14 @@ class Expeditions(SeatedGame):
             return False
 
         # Do they even have this card?
-        if potential_card not in seat.data.hand:
+        if potential_card not in self.get_hand(seat):
             self.tell_pre(player, "You don't have that card!\n")
             return False
 
-        # All right, they can discard it.  Get the appropriate discard pile...
-        discard_pile = self.discards[self.suit_to_loc(potential_card.suit)].hand
-
-        discard_pile.add(seat.data.hand.discard_specific(potential_card))
-
-        # Note the pile we just discarded to, so the player can't just pick it
-        # back up as their next play.
-        self.just_discarded_to = potential_card.suit
+        # All right, they can discard it.  The engine notes the pile, so
+        # the player can't just pick it back up as their next play.
+        loc = self.engine.discard(potential_card)
+        self.update_layout_row(loc)
 
         self.bc_pre("%s discarded %s.\n" % (self.get_sp_str(seat),
                           card_to_str(potential_card, mode=LONG)))
@@ -539,11 +496,7 @@ class Expeditions(SeatedGame):
             return False
 
         # Draw a card.  This one's easy!
-        draw_card = self.draw_pile.discard()
-        seat.data.hand.add(draw_card)
-
-        # Resort the hand.
-        seat.data.hand = sorted_hand(seat.data.hand)
+        draw_card = self.engine.draw()
 
         self.bc_pre("%s drew a card.\n" % (self.get_sp_str(seat)))
         self.tell_pre(player, "You drew %s.\n" % card_to_str(draw_card, mode=LONG))
@@ -571,27 +524,22 @@ class Expeditions(SeatedGame):
             self.tell_pre(player, "That's not a valid suit!\n")
             return False
 
-        # Is that a valid location in this game?
-        loc = self.suit_to_loc(suit)
-        if loc >= self.suit_count:
+        problem = self.engine.retrieve_problem(suit)
+        if problem == NOT_IN_PLAY:
             self.tell_pre(player, "That suit isn't in play this game.\n")
             return False
 
-        # Is there actually a card there /to/ draw?
-        discard_pile = self.discards[loc].hand
-        if not len(discard_pile):
+        elif problem == NO_DISCARDS:
             self.tell_pre(player, "There are no discards of that suit.\n")
             return False
 
-        # Is it the card they just discarded?
-        if suit == self.just_discarded_to:
+        elif problem == JUST_DISCARDED:
             self.tell_pre(player, "You just discarded that card!\n")
             return False
 
         # Phew.  All tests passed.  Give them the card.
-        dis_card = discard_pile.discard()
-        seat.data.hand.add(dis_card)
-        seat.data.hand = sorted_hand(seat.data.hand)
+        dis_card, loc = self.engine.retrieve(suit)
+        self.update_layout_row(loc)
 
         self.bc_pre("%s retrieved %s from the discards.\n" % (self.get_sp_str(seat),
                                                   card_to_str(dis_card, mode=LONG)))
@@ -608,7 +556,7 @@ class Expeditions(SeatedGame):
             self.tell_pre(player, "You must wait for your turn to resign.\n")
             return False
 
-        self.resigner = seat
+        self.engine.resign(seat.data.side)
         self.bc_pre("%s is resigning from the game.\n" % self.get_sp_str(seat))
         return True
 
@@ -733,15 +681,8 @@ class Expeditions(SeatedGame):
 
                 if made_move:
 
-                    substate = self.state.get_sub()
-
-                    # Okay, something happened on the layout.  Update scores
-                    # and the layout.
-                    self.update_scores()
-                    self.update_printable_layout()
-
                     # Is the game over?
-                    if not len(self.draw_pile) or self.resigner:
+                    if self.engine.hand_over():
 
                         # Yup.  Resolve the game.
                         self.resolve_hand()
@@ -755,87 +696,36 @@ class Expeditions(SeatedGame):
 
                         else:
 
-                            # Hand over, but not the game itself.  New deal.
+                            # Hand over, but not the game itself.  New deal,
+                            # and switch dealers.
                             self.bc_pre("The cards are collected for another hand.\n")
-                            self.init_hand()
-
-                            # Switch dealers.
-                            self.first_player = self.next_seat(self.first_player)
-                            self.turn = self.first_player
+                            self.bc_pre("A fresh hand is dealt to both players.\n")
+                            self.engine.next_hand()
+                            self.init_printables()
                             self.state.set("playing")
-                            self.state.set_sub("play")
-                            self.deal()
+                            self.update_turn()
                             self.update_printable_layout()
                             self.send_layout()
 
                     else:
 
-                        # If we're in the play substate, switch to the draw.
-                        if substate == "play":
-                            self.state.set_sub("draw")
-
-                        else:
-
-                            # After draw, switch turns and resend the board.
-                            self.state.set_sub("play")
-                            self.turn = self.next_seat(self.turn)
+                        # After a play we move on to the draw; after a
+                        # draw, the engine switches turns and we resend
+                        # the board.
+                        self.update_turn()
+                        if self.engine.phase == PLAY:
                             self.send_layout(show_metadata=False)
 
         if not handled:
             self.tell_pre(player, "Invalid command.\n")
 
-    def update_scores(self):
-
-        for seat in self.left, self.right:
-
-            # Start at 0.
-            total = 0
-
-            # For each expedition, if they're even on it...
-            for exp in seat.data.expeditions:
-
-                curr = 0
-                multiplier = 1
-
-                if len(exp.hand):
-
-                    # Immediately assign the penalty.
-                    curr -= self.penalty
-
-                    # Now loop through the cards.
-                    for card in exp.hand:
-
-                        value = card.value()
-                        if value == 1:
-
-                            # Agreement; adjust multiplier.
-                            multiplier += 1
-
-                        else:
-
-                            # Scoring card; increase current score.
-                            curr += value
-
-                    # Adjust the current score by the multiplier.
-                    curr *= multiplier
-
-                    # If bonuses are active, and this meets it, add it.
-                    if self.bonus and len(exp.hand) >= self.bonus_length:
-                        curr += self.bonus_points
-
-                # No matter what, add curr to total and set it on the
-                # pile.
-                total += curr
-                exp.value = curr
-
-            # Set the current score for the seat.
-            seat.data.curr_score = total
-
     def resolve_hand(self):
 
+        # The engine adds each side's score for the hand to their total.
+        self.engine.finish_hand()
         for seat in self.left, self.right:
 
-            addend = seat.data.curr_score
+            addend = self.engine.curr_scores[seat.data.side]
             if addend > 0:
                 adj_str = "^Ygains ^C%s^~" % get_plural_str(addend, "point")
             elif addend < 0:
@@ -843,34 +733,23 @@ class Expeditions(SeatedGame):
             else:
                 adj_str = "^Wsomehow manages to score precisely zero points^~"
 
-            # Actually adjust the scores by the proper amounts, and inform
-            # everyone of the result.
-            seat.data.overall_score += addend
-
             # If someone resigned, scores don't matter, so don't show them.
-            if not self.resigner:
-                self.bc_pre("%s %s, giving them ^G%s^~.\n" % (self.get_sp_str(seat), adj_str, seat.data.overall_score))
+            if not self.engine.resigner:
+                self.bc_pre("%s %s, giving them ^G%s^~.\n" % (self.get_sp_str(seat), adj_str, self.engine.overall_scores[seat.data.side]))
 
     def find_winner(self):
 
-        # If someone resigned, this is the easiest thing ever.
-        if self.resigner == self.left:
-            return self.right
-        elif self.resigner == self.right:
-            return self.left
-
-        # If one player has a higher score than the other and that score
-        # is higher than the goal, they win.
-        if (self.left.data.overall_score > self.right.data.overall_score and
-           self.left.data.overall_score >= self.goal):
+        # The engine handles both resignations and the goal.
+        winner = self.engine.winner()
+        if winner == LEFT:
             return self.left
-        elif (self.right.data.overall_score > self.left.data.overall_score and
-           self.right.data.overall_score >= self.goal):
+        elif winner == RIGHT:
             return self.right
 
         # Either we haven't reached the goal or there's a tie.  We'll print a
         # special message if there's a tie, because that's kinda crazy.
-        if self.left.data.overall_score == self.right.data.overall_score:
+        overall_scores = self.engine.overall_scores
+        if overall_scores[LEFT] == overall_scores[RIGHT]:
             self.bc_pre("The players are tied!\n")
 
         # No matter what, there's no winner.
@@ -43,6 +43,7 @@ SHORT = "short"
 LONG = "long"
 
 DEFAULT_SUITS = [YELLOW, BLUE, WHITE, GREEN, RED]
+ALL_SUITS = DEFAULT_SUITS + [CYAN, MAGENTA]
 
 class ExpeditionsCard(PlayingCard):
     """Implements a Expeditions card.  By default there are five suits; each
@@ -52,9 +53,11 @@ class ExpeditionsCard(PlayingCard):
     creation.
     """
 
-    def __init__(self, r=None, s=None):
+    __slots__ = ()
 
-        super(ExpeditionsCard, self).__init__(r, s)
+    SUIT_ORDER = ALL_SUITS
+    SUIT_SIZE = len(RANKS)
+    JOKER_SUITS = []
 
     def __repr__(self):
         if self.rank == AGREEMENT:
@@ -62,15 +65,22 @@ class ExpeditionsCard(PlayingCard):
         else:
             return ("a %s %s" % (self.suit, self.rank))
 
-    def value(self):
-        r = self.rank
+    @staticmethod
+    def rank_value(r, ace_high):
         if r == AGREEMENT:
             return 1
-        if type(r) == int:
-            return r
-        if r.isdigit():
+        if r is not None and r.isdigit():
             return int(r)
 
+    @classmethod
+    def card_id(cls, r, s, ordinal, ace_high):
+
+        # Agreements are the lowest card in each suit.  All three
+        # Agreements of a suit are the same card, so they share an id.
+        if ordinal is None or s not in cls.SUIT_ORDER:
+            return None
+        return cls.SUIT_ORDER.index(s) * cls.SUIT_SIZE + ordinal - 1
+
 SUIT_SHORTHANDS = ['y', 'b', 'w', 'g', 'r', 'c', 'm', 'p']
 AGREEMENT_SHORTHANDS = ['a', 'h', 'i', '1']
 
@@ -0,0 +1,402 @@
+# Giles: expeditions_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.engine import Engine
+from giles.games.hand import Hand
+from giles.utils import Struct
+
+from giles.games.expeditions.expeditions_card import ExpeditionsCard
+from giles.games.expeditions.expeditions_card import sorted_hand
+from giles.games.expeditions.expeditions_card import DEFAULT_SUITS, CYAN, MAGENTA
+from giles.games.expeditions.expeditions_card import AGREEMENT
+
+LEFT = "left"
+RIGHT = "right"
+
+NUMERICAL_RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10']
+
+# Each turn is a play or a discard, then a draw or a retrieval.
+PLAY = "play"
+DISCARD = "discard"
+DRAW = "draw"
+RETRIEVE = "retrieve"
+
+# Reasons a card can't go on an expedition...
+TOO_LOW = "too_low"
+SAME_VALUE = "same_value"
+
+# ...and reasons a discard can't be retrieved.
+NOT_IN_PLAY = "not_in_play"
+NO_DISCARDS = "no_discards"
+JUST_DISCARDED = "just_discarded"
+
+def suit_to_loc(suit):
+
+    if suit in DEFAULT_SUITS:
+        return DEFAULT_SUITS.index(suit)
+    elif suit == CYAN:
+        return 5
+    elif suit == MAGENTA:
+        return 6
+
+    return None
+
+def copy_hand(hand):
+
+    new_hand = Hand()
+    for card in hand:
+        new_hand.add(card)
+    return new_hand
+
+def copy_pile(pile):
+
+    new_pile = Struct()
+    new_pile.__dict__.update(pile.__dict__)
+    new_pile.hand = copy_hand(pile.hand)
+    return new_pile
+
+class ExpeditionsEngine(Engine):
+    """The rules of Expeditions.  The sides are LEFT and RIGHT.  Moves are
+    (PLAY, card), (DISCARD, card), (DRAW, None), or (RETRIEVE, suit); the
+    phase says which half of the turn the side to play is in.  A hand ends
+    when the draw pile runs out, and the game when, at the end of a hand,
+    one side is ahead and has reached the goal.
+
+    apply() plays a whole game through, dealing each new hand as the last
+    one ends; tables call the individual steps so they can talk about
+    each one as it happens.
+    """
+
+    def __init__(self, suit_count=5, agreement_count=3, penalty=20,
+                 bonus=True, bonus_length=8, bonus_points=20, hand_size=8,
+                 goal=1):
+
+        super(ExpeditionsEngine, self).__init__()
+
+        self.suit_count = suit_count
+        self.agreement_count = agreement_count
+        self.penalty = penalty
+        self.bonus = bonus
+        self.bonus_length = bonus_length
+        self.bonus_points = bonus_points
+        self.hand_size = hand_size
+        self.goal = goal
+
+        self.curr_scores = {LEFT: 0, RIGHT: 0}
+        self.overall_scores = {LEFT: 0, RIGHT: 0}
+        self.turn = None
+        self.phase = PLAY
+        self.first_player = None
+        self.resigner = None
+        self.just_discarded_to = None
+
+        self.new_hand()
+
+    def other(self, side):
+
+        if side == LEFT:
+            return RIGHT
+        return LEFT
+
+    def new_hand(self):
+
+        # Depending on the number of suits requested for play, we build
+        # structures.
+        suit_list = DEFAULT_SUITS[:]
+        if self.suit_count >= 6:
+            suit_list.append(CYAN)
+        if self.suit_count == 7:
+            suit_list.append(MAGENTA)
+
+        # If, on the other hand, the number of suits is /less/ than five,
+        # we use a subset of the default suits.
+        if self.suit_count < 5:
+            suit_list = DEFAULT_SUITS[:self.suit_count]
+
+        # All right, we have a list of suits involved in this game.  Let's
+        # build the various piles that are based on those suits.
+        self.expeditions = {LEFT: [], RIGHT: []}
+        self.discards = []
+        for suit in suit_list:
+            discard_pile = Struct()
+            left_expedition = Struct()
+            right_expedition = Struct()
+            for pile in (discard_pile, left_expedition, right_expedition):
+                pile.suit = suit
+                pile.hand = Hand()
+                pile.value = 0
+
+            # Expeditions keep a running tally of their point cards and
+            # agreements, so scoring one doesn't mean walking its cards.
+            for pile in (left_expedition, right_expedition):
+                pile.points = 0
+                pile.agreements = 0
+            self.expeditions[LEFT].append(left_expedition)
+            self.expeditions[RIGHT].append(right_expedition)
+            self.discards.append(discard_pile)
+
+        # We'll do a separate loop for generating the deck to minimize
+        # confusion.
+        self.draw_pile = Hand()
+        for suit in suit_list:
+            for rank in NUMERICAL_RANKS:
+                self.draw_pile.add(ExpeditionsCard(rank, suit))
+
+            # Add as many agreements as requested.
+            for agreement in range(self.agreement_count):
+                self.draw_pile.add(ExpeditionsCard(AGREEMENT, suit))
+
+        # Lastly, shuffle the draw deck and initialize hands.
+        self.draw_pile.shuffle()
+        self.hands = {LEFT: Hand(), RIGHT: Hand()}
+
+    def deal(self):
+
+        # Deal cards until each player has hand_size cards, sort them, and
+        # clear the scores for the hand.
+        for i in range(self.hand_size):
+            self.hands[LEFT].add(self.draw_pile.discard())
+            self.hands[RIGHT].add(self.draw_pile.discard())
+
+        self.hands[LEFT] = sorted_hand(self.hands[LEFT])
+        self.hands[RIGHT] = sorted_hand(self.hands[RIGHT])
+
+        self.curr_scores = {LEFT: 0, RIGHT: 0}
+
+    def start(self, first_player=LEFT):
+
+        self.first_player = first_player
+        self.turn = first_player
+        self.phase = PLAY
+        self.deal()
+
+    def next_hand(self):
+
+        # Collects the cards for another hand, and the other side starts.
+        self.new_hand()
+        self.start(self.other(self.first_player))
+
+    def score_expedition(self, exp):
+
+        # Expeditions you aren't even on are worth nothing.
+        if not len(exp.hand):
+            return 0
+
+        # Immediately assign the penalty, then add the point cards, and
+        # adjust by the multiplier; every agreement adds one to it.
+        curr = (exp.points - self.penalty) * (exp.agreements + 1)
+
+        # If bonuses are active, and this meets it, add it.
+        if self.bonus and len(exp.hand) >= self.bonus_length:
+            curr += self.bonus_points
+
+        return curr
+
+    def add_to_expedition(self, side, loc, card):
+
+        # Puts a card on one of the side's expeditions, and updates the
+        # running tallies and the side's score.
+        exp = self.expeditions[side][loc]
+        exp.hand.add(card)
+
+        value = card.value()
+        if value == 1:
+
+            # Agreement; adjust multiplier.
+            exp.agreements += 1
+
+        else:
+
+            # Scoring card; increase current score.
+            exp.points += value
+
+        new_value = self.score_expedition(exp)
+        self.curr_scores[side] += new_value - exp.value
+        exp.value = new_value
+
+    def play_problem(self, card):
+
+        # Returns why the side to play can't put this card (which must be
+        # in their hand) on its expedition, or None if they can.
+        exp_hand = self.expeditions[self.turn][suit_to_loc(card.suit)].hand
+
+        # If this card is a lower value than the top card of the hand, nope.
+        if len(exp_hand) and card < exp_hand[-1]:
+            return TOO_LOW
+
+        # If it's the same value and not an agreement, nope.
+        elif (len(exp_hand) and card == exp_hand[-1] and
+           card.rank != AGREEMENT):
+            return SAME_VALUE
+
+        return None
+
+    def retrieve_problem(self, suit):
+
+        # Returns why the side to play can't take the top discard of this
+        # suit, or None if they can.
+        loc = suit_to_loc(suit)
+        if loc is None or loc >= self.suit_count:
+            return NOT_IN_PLAY
+
+        # Is there actually a card there /to/ draw?
+        if not len(self.discards[loc].hand):
+            return NO_DISCARDS
+
+        # Is it the card they just discarded?
+        if suit == self.just_discarded_to:
+            return JUST_DISCARDED
+
+        return None
+
+    def play(self, card):
+
+        # Plays a card on its expedition and clears the discard tracker.
+        # Returns the card's location.
+        side = self.turn
+        loc = suit_to_loc(card.suit)
+        self.add_to_expedition(side, loc, self.hands[side].discard_specific(card))
+        self.just_discarded_to = None
+        self.phase = DRAW
+        return loc
+
+    def discard(self, card):
+
+        # Discards a card, noting the pile so the player can't just pick it
+        # back up as their next play.  Returns the card's location.
+        loc = suit_to_loc(card.suit)
+        self.discards[loc].hand.add(self.hands[self.turn].discard_specific(card))
+        self.just_discarded_to = card.suit
+        self.phase = DRAW
+        return loc
+
+    def end_turn(self):
+
+        self.hands[self.turn] = sorted_hand(self.hands[self.turn])
+        self.phase = PLAY
+        self.turn = self.other(self.turn)
+
+    def draw(self):
+
+        # Draws a card from the draw pile and ends the turn.  Returns it.
+        card = self.draw_pile.discard()
+        self.hands[self.turn].add(card)
+        self.end_turn()
+        return card
+
+    def retrieve(self, suit):
+
+        # Takes the top discard of a suit and ends the turn.  Returns the
+        # card and its location.
+        loc = suit_to_loc(suit)
+        card = self.discards[loc].hand.discard()
+        self.hands[self.turn].add(card)
+        self.end_turn()
+        return (card, loc)
+
+    def hand_over(self):
+        return not len(self.draw_pile) or self.resigner
+
+    def finish_hand(self):
+
+        # Adds each side's score for the hand to their overall score.
+        for side in (LEFT, RIGHT):
+            self.overall_scores[side] += self.curr_scores[side]
+
+    def legal_moves(self):
+
+        if self.winner() or self.turn is None:
+            return []
+
+        if self.phase == DRAW:
+            moves = [(DRAW, None)]
+            for discard_pile in self.discards:
+                if not self.retrieve_problem(discard_pile.suit):
+                    moves.append((RETRIEVE, discard_pile.suit))
+            return moves
+
+        moves = []
+        for card in self.hands[self.turn]:
+            if not self.play_problem(card):
+                moves.append((PLAY, card))
+            moves.append((DISCARD, card))
+        return moves
+
+    def is_legal(self, move):
+
+        kind, what = move
+        if self.turn is None:
+            return False
+        if self.phase == DRAW:
+            if kind == DRAW:
+                return True
+            return kind == RETRIEVE and not self.retrieve_problem(what)
+
+        if what not in self.hands[self.turn]:
+            return False
+        if kind == PLAY:
+            return not self.play_problem(what)
+        return kind == DISCARD
+
+    def apply(self, move):
+
+        kind, what = move
+        if kind == PLAY:
+            self.play(what)
+        elif kind == DISCARD:
+            self.discard(what)
+        elif kind == DRAW:
+            self.draw()
+        else:
+            self.retrieve(what)
+
+        if self.hand_over():
+            self.finish_hand()
+            if not self.winner():
+                self.next_hand()
+
+    def resign(self, side):
+        self.resigner = side
+
+    def winner(self):
+
+        # If someone resigned, this is the easiest thing ever.
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # If one player has a higher score than the other and that score
+        # is higher than the goal, they win.
+        left = self.overall_scores[LEFT]
+        right = self.overall_scores[RIGHT]
+        if left > right and left >= self.goal:
+            return LEFT
+        elif right > left and right >= self.goal:
+            return RIGHT
+
+        return None
+
+    def copy(self):
+
+        new_engine = ExpeditionsEngine.__new__(ExpeditionsEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.curr_scores = dict(self.curr_scores)
+        new_engine.overall_scores = dict(self.overall_scores)
+        new_engine.hands = dict([(x, copy_hand(y)) for x, y in self.hands.items()])
+        new_engine.draw_pile = copy_hand(self.draw_pile)
+        new_engine.discards = [copy_pile(x) for x in self.discards]
+        new_engine.expeditions = dict([(x, [copy_pile(z) for z in y])
+                                       for x, y in self.expeditions.items()])
+        return new_engine
@@ -0,0 +1,125 @@
+# Giles: flat_board.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+class FlatBoard(object):
+    """A compact grid board.  Cells live in a single bytearray, indexed the
+    same way as the geometry module's tables (row * width + col), with one
+    byte per cell.
+
+    The board doesn't store your values directly; you hand it a sequence
+    of the values a cell can hold when you build it, and each cell stores
+    the position of its value in that sequence.  The first value is what
+    empty cells hold, and is usually None.  get() and set() translate, so
+    games can keep using whatever they already use (strings, say) for
+    their pieces.
+
+    Copies are a single bytearray copy, and boards hash and compare by
+    contents, so they're cheap to snapshot, to keep in a set of previously
+    seen positions, and to use for "try a move, then put it back."
+    """
+
+    def __init__(self, width, height, values=(None,)):
+
+        self.width = width
+        self.height = height
+        self.values = tuple(values)
+        self.codes = dict([(v, i) for i, v in enumerate(self.values)])
+        self.cells = bytearray(width * height)
+
+    def index(self, row, col):
+        return row * self.width + col
+
+    def get(self, row, col):
+        return self.values[self.cells[row * self.width + col]]
+
+    def set(self, row, col, value):
+        self.cells[row * self.width + col] = self.codes[value]
+
+    def get_index(self, index):
+        return self.values[self.cells[index]]
+
+    def set_index(self, index, value):
+        self.cells[index] = self.codes[value]
+
+    def code(self, value):
+
+        # The byte stored for this value; handy for working on .cells
+        # directly.
+        return self.codes[value]
+
+    def count(self, value):
+        return self.cells.count(chr(self.codes[value]))
+
+    def clear(self):
+        self.cells = bytearray(self.width * self.height)
+
+    def copy(self):
+
+        new_board = FlatBoard.__new__(FlatBoard)
+        new_board.width = self.width
+        new_board.height = self.height
+        new_board.values = self.values
+        new_board.codes = self.codes
+        new_board.cells = bytearray(self.cells)
+        return new_board
+
+    def restore(self, other):
+
+        # Makes this board's contents match another of the same size, in
+        # place; the other half of copy() for undoing a trial move.
+        self.cells[:] = other.cells
+
+    def key(self):
+
+        # An immutable snapshot of the board, suitable for a dict key or a
+        # set member.
+        return (self.width, self.height, str(self.cells))
+
+    def __eq__(self, other):
+
+        if not isinstance(other, FlatBoard):
+            return NotImplemented
+        return self.key() == other.key()
+
+    def __ne__(self, other):
+
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def rows(self):
+
+        # The board as a list of lists of values, row by row.
+        values = self.values
+        to_return = []
+        for r in range(self.height):
+            start = r * self.width
+            to_return.append([values[code] for code in self.cells[start:start + self.width]])
+        return to_return
+
+    def __str__(self):
+
+        # A plain printable form: one line per row, with a '.' for empty
+        # cells and the value's position in the value list otherwise.
+        lines = []
+        for r in range(self.height):
+            start = r * self.width
+            lines.append("".join([code and str(code) or "." for code in self.cells[start:start + self.width]]))
+        return "\n".join(lines) + "\n"
@@ -14,7 +14,10 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from giles.games.board_view import BoardView, diff_boards, fits_screen
+from giles.games.board_view import REFRESH_EVERY
 from giles.state import State
+from miniboa.xterm import colorize
 
 class Game(object):
     """The base Game class.  Does a lot of the boring footwork that all
@@ -22,21 +25,27 @@ class Game(object):
     the game, handling kibitzing and player replacement, and so on.  In
     general, though, you want one of the subclasses of this class, either
     SeatedGame() or SeatlessGame().
+
+    Games can be pickled, as snapshots that let a table survive a server
+    restart.  The snapshot leaves out the server, the channel, and the
+    players; restore() and reattach() hook a restored game back up.  A
+    game is only snapshotted again once it has changed: every command
+    counts, as does marking the board dirty or changing the state, but
+    anything else a game changes on its own in tick() has to call
+    mark_changed().
     """
 
+    # Bump this in a game whenever a change to it means snapshots taken
+    # with the old code can't be restored.
+    snapshot_version = 1
+
     def __init__(self, server, table_name):
 
-        self.server = server
-        self.channel = server.channel_manager.has_channel(table_name)
-        if not self.channel:
-            self.channel = self.server.channel_manager.add_channel(table_name,
-                                                gameable=True, persistent=True)
-        else:
-            self.channel.persistent = True
         self.game_display_name = "Generic Game"
         self.game_name = "game"
         self.table_display_name = table_name
         self.table_name = table_name.lower()
+        self.attach(server)
 
         self.active = False
         self.private = False
@@ -49,9 +58,75 @@ class Game(object):
         # done debugging them.
         self.debug = False
 
+        # The board as players see it.  It's only rendered when someone
+        # looks at it after it's changed, and then only colorized once for
+        # each color setting, no matter how many people are watching.
+        self.board_dirty = True
+        self.board_str = ""
+        self.colorized_source = None
+        self.colorized_boards = {}
+
+        # For players who only want the changes: what each of them last
+        # saw, and the patches from each old board to the current one.
+        self.board_views = {}
+        self.board_patches = {}
+
+        # Bumped whenever anything that goes into a snapshot might have
+        # changed.
+        self.change_count = 0
+
     def __repr__(self):
         return ("%s (%s)" % (self.table_display_name, self.game_display_name))
 
+    def __getstate__(self):
+
+        # Everything but our ties to the running server, and what we've
+        # cached for display, which is all rebuilt when we're restored.
+        state = self.__dict__.copy()
+        for key in ("server", "channel", "board_str", "colorized_source",
+                    "colorized_boards", "board_views", "board_patches"):
+            del state[key]
+        state["board_dirty"] = True
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        self.change_count = state.get("change_count", 0)
+        self.server = None
+        self.channel = None
+        self.board_str = ""
+        self.colorized_source = None
+        self.colorized_boards = {}
+        self.board_views = {}
+        self.board_patches = {}
+
+    def attach(self, server):
+
+        # Hooks the game up to the server and its table's channel.
+        self.server = server
+        self.channel = server.channel_manager.has_channel(self.table_display_name)
+        if not self.channel:
+            self.channel = self.server.channel_manager.add_channel(self.table_display_name,
+                                                gameable=True, persistent=True)
+        else:
+            self.channel.persistent = True
+
+    def restore(self, server):
+
+        # Called on a game fresh from a snapshot, before anyone can use
+        # it.  Override this (calling it too) if your game has anything
+        # else to rebuild.
+        self.attach(server)
+
+    def reattach(self, player):
+
+        # Called for every restored game when a player logs in, in case
+        # they were playing in it before the restart.  Returns whether
+        # they were.  Games with seats handle this; override it if your
+        # game keeps track of its players some other way.
+        return False
+
     def log_pre(self, log_str):
 
         # This utility function logs with the proper prefix.
@@ -93,6 +168,107 @@ class Game(object):
         # This function should /absolutely/ be overridden by any games.
         self.tell_pre(player, "This is the default game class; nothing to show.\n")
 
+    def render_board(self):
+
+        # Override this to return the board, color codes and all, as one
+        # string.  It's only called when the board has been marked dirty.
+        return ""
+
+    def mark_changed(self):
+        self.change_count += 1
+
+    def mark_board_dirty(self):
+
+        # Call this whenever the board changes, rather than re-rendering
+        # it right away; if nobody looks, it never gets rendered at all.
+        self.board_dirty = True
+        self.mark_changed()
+
+    def get_board_str(self):
+
+        # Games whose board already keeps an up-to-date rendering of
+        # itself, like the Layouts, can override this to just return it.
+        if self.board_dirty:
+            self.board_str = self.render_board()
+            self.board_dirty = False
+        return self.board_str
+
+    def tell_board(self, player):
+
+        board_str = self.get_board_str()
+
+        # A new board means new colorized versions of it.  Strings never
+        # change, so if it's the same one we colorized last time, the
+        # cached versions are still good.
+        if board_str is not self.colorized_source:
+            self.colorized_source = board_str
+            self.colorized_boards = {}
+            self.board_patches = {}
+
+        delta_mode = player.config["board_mode"] == "delta"
+        if delta_mode and self.tell_board_delta(player, board_str):
+            return
+
+        color = player.config["color"]
+        colorized = self.colorized_boards.get(color)
+        if colorized is None:
+            colorized = colorize(board_str, color)
+            self.colorized_boards[color] = colorized
+        player.tell_colorized(colorized)
+
+        # Remember where this board landed, so the next one can be drawn
+        # over it.
+        offset = 0
+        if player.config["timestamps"]:
+            offset = len("(%s) " % self.server.timestamp)
+        if delta_mode and fits_screen(board_str, player.client.columns, offset):
+            top = player.client.lines_sent - board_str.count("\n")
+            self.board_views[player] = BoardView(board_str, top, offset)
+        else:
+            self.forget_board(player)
+
+    def tell_board_delta(self, player, board_str):
+
+        # Draws just the changes since the board this player last saw, if
+        # we can; returns whether we did.
+        view = self.board_views.get(player)
+        client = player.client
+        if (not view or not client.use_ansi or not client.telnet_echo or
+           view.deltas >= REFRESH_EVERY):
+            return False
+
+        # The old board has to still be on their screen.
+        height = client.lines_sent - view.top
+        if height >= client.rows:
+            return False
+
+        patches = self.board_patches.get(view.board_str)
+        if patches is None:
+            patches = diff_boards(view.board_str, board_str)
+            if patches is None:
+                return False
+            self.board_patches[view.board_str] = patches
+
+        # If most of the board changed, it's cheaper to send it all.
+        if patches:
+            delta = view.redraw(patches, height)
+            if len(delta) * 2 > len(board_str):
+                return False
+
+            # No timestamp; this doesn't go on a new line.  The delta ends
+            # with the cursor back where it started, so it moves it down
+            # no lines at all, however long it is.
+            client.send(delta, 0)
+            view.deltas += 1
+        view.board_str = board_str
+        return True
+
+    def forget_board(self, player):
+
+        # The next board this player sees will be the whole thing.
+        if player in self.board_views:
+            del self.board_views[player]
+
     def finish(self):
 
         # If you have fancy cleanup that should be done when a game is
@@ -161,12 +337,16 @@ class Game(object):
         elif primary in ('kibitz', 'watch'):
             if not self.channel.is_connected(player):
                 self.channel.connect(player)
+                self.forget_board(player)
                 self.show(player)
             else:
                 self.tell_pre(player, "You're already watching this game!\n")
             handled = True
 
         elif primary in ('show', 'look', 'l'):
+
+            # Someone asking to look wants to see the whole thing.
+            self.forget_board(player)
             self.show(player)
             handled = True
 
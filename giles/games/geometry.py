@@ -0,0 +1,123 @@
+# Giles: geometry.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Board geometry shared by the grid games.  Every cell on a board is given a
+# flat index (row * width + col); games that store their boards as
+# board[x][y] should simply treat x as the row.  For each supported topology
+# we precompute, once per board size, a table of the flat indices of each
+# cell's neighbours, so inner loops (flood fills, capture tests and the
+# like) can walk neighbours without bounds checks or building coordinate
+# tuples.
+
+# Supported topologies.  TRIANGULAR is the hex grid cut in half along the
+# diagonal, as used by Y: only cells with row <= col exist.
+SQUARE = "square"
+HEX = "hex"
+TRIANGULAR = "triangular"
+EIGHT_WAY = "eight_way"
+
+#      . . . . 0
+#     . . . . 1
+#    . . . . 2
+#   . . . . 3
+#  0 1 2 3
+#
+# Hex and triangular boards share deltas; the triangular board just has
+# fewer valid cells.
+TOPOLOGY_DELTAS = {
+    SQUARE: ((-1, 0), (1, 0), (0, -1), (0, 1)),
+    HEX: ((0, -1), (0, 1), (-1, 0), (1, 0), (1, 1), (-1, -1)),
+    TRIANGULAR: ((0, -1), (0, 1), (-1, 0), (1, 0), (1, 1), (-1, -1)),
+    EIGHT_WAY: ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)),
+}
+
+# Caches of the tables, keyed by (topology, width, height) for neighbours
+# and by (width, height) for coordinates.
+_neighbour_cache = {}
+_coords_cache = {}
+_window_cache = {}
+
+def cell_exists(topology, width, height, row, col):
+
+    if row < 0 or row >= height or col < 0 or col >= width:
+        return False
+    if topology == TRIANGULAR and row > col:
+        return False
+    return True
+
+def get_neighbours(topology, width, height):
+
+    # Returns a tuple, indexed by flat cell index, of tuples of the flat
+    # indices of that cell's neighbours.  Cells that don't exist (the
+    # missing half of a triangular board) have no neighbours.
+    key = (topology, width, height)
+    if key in _neighbour_cache:
+        return _neighbour_cache[key]
+
+    deltas = TOPOLOGY_DELTAS[topology]
+    table = []
+    for r in range(height):
+        for c in range(width):
+            if not cell_exists(topology, width, height, r, c):
+                table.append(())
+                continue
+            this_cell = []
+            for r_delta, c_delta in deltas:
+                new_r = r + r_delta
+                new_c = c + c_delta
+                if cell_exists(topology, width, height, new_r, new_c):
+                    this_cell.append(new_r * width + new_c)
+            table.append(tuple(this_cell))
+
+    table = tuple(table)
+    _neighbour_cache[key] = table
+    return table
+
+def get_coords(width, height):
+
+    # Returns a tuple, indexed by flat cell index, of (row, col) pairs; the
+    # inverse of row * width + col, without the divmod.
+    key = (width, height)
+    if key not in _coords_cache:
+        _coords_cache[key] = tuple([divmod(index, width) for index in range(width * height)])
+    return _coords_cache[key]
+
+def get_windows(width, height):
+
+    # Returns a tuple, indexed by flat cell index, of the 2x2 windows that
+    # cell is a corner of.  Each window is a (diagonal, side, side) triple
+    # of flat indices: the opposite corner, then the two corners that
+    # share a row or a column with the cell.
+    key = (width, height)
+    if key in _window_cache:
+        return _window_cache[key]
+
+    table = []
+    for r in range(height):
+        for c in range(width):
+            this_cell = []
+            for r_delta, c_delta in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+                new_r = r + r_delta
+                new_c = c + c_delta
+                if 0 <= new_r < height and 0 <= new_c < width:
+                    this_cell.append((new_r * width + new_c,
+                                      new_r * width + c,
+                                      r * width + new_c))
+            table.append(tuple(this_cell))
+
+    table = tuple(table)
+    _window_cache[key] = table
+    return table
@@ -14,23 +14,14 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from bitstring.bitstring import Bits
-import copy
-
 WHITE = "white"
 BLACK = "black"
 
 MIN_SIZE = 3
 MAX_SIZE = 26
 
-# Deltas for a square grid.  Pretty easy.
-SQUARE_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
-
-# Bitstring values for None, Black, and White.
-NONE_BITS = "00"
-BLACK_BITS = "01"
-WHITE_BITS = "10"
-
+from giles.games.flat_board import FlatBoard
+from giles.games.geometry import get_coords, get_neighbours, SQUARE
 from giles.utils import LETTERS
 
 class Goban(object):
@@ -43,37 +34,55 @@ class Goban(object):
         self.width = 19
         self.height = 19
         self.board = None
+
+        # The printable board is only rendered when someone asks for it;
+        # anything that changes the board just throws the old one away.
         self.printable_board = None
 
         self.last_row = None
         self.last_col = None
 
-        self.prev_board_list = []
+        # Every position seen so far, as FlatBoard keys, for the ko check.
+        self.prev_boards = set()
 
         self.init_board()
 
+    def __getstate__(self):
+
+        # The printable board is rebuilt the first time anyone asks for
+        # it, so there's no need to snapshot it.
+        state = self.__dict__.copy()
+        state["printable_board"] = None
+        return state
+
     def init_board(self):
 
         # Build a new, empty board at the current size.
-        self.board = []
-        for r in range(self.height):
-            self.board.append([None] * self.width)
+        self.board = FlatBoard(self.width, self.height, (None, BLACK, WHITE))
+        self.neighbours = get_neighbours(SQUARE, self.width, self.height)
+        self.coords = get_coords(self.width, self.height)
 
-        # Update the printable version.
-        self.update_printable_board()
+        # Throw away the printable version.
+        self.printable_board = None
+
+    def get_printable_board(self):
+
+        if self.printable_board is None:
+            self.update_printable_board()
+        return self.printable_board
 
     def update_printable_board(self):
 
-        self.printable_board = []
+        lines = []
         col_str = "    " + "".join([" " + LETTERS[i] for i in range(self.width)])
-        self.printable_board.append(col_str + "\n")
-        self.printable_board.append("   ^m.=" + "".join(["=="] * self.width) + ".^~\n")
+        lines.append(col_str + "\n")
+        lines.append("   ^m.=" + "".join(["=="] * self.width) + ".^~\n")
         for r in range(self.height):
             this_str = "%2d ^m|^~ " % (r + 1)
             for c in range(self.width):
                 if r == self.last_row and c == self.last_col:
                     this_str += "^5"
-                loc = self.board[r][c]
+                loc = self.board.get(r, c)
                 if loc == WHITE:
                     this_str += "^Wo^~ "
                 elif loc == BLACK:
@@ -81,9 +90,10 @@ class Goban(object):
                 else:
                     this_str += "^M.^~ "
             this_str += "^m|^~ %d" % (r + 1)
-            self.printable_board.append(this_str + "\n")
-        self.printable_board.append("   ^m`=" + "".join(["=="] * self.width) + "'^~\n")
-        self.printable_board.append(col_str + "\n")
+            lines.append(this_str + "\n")
+        lines.append("   ^m`=" + "".join(["=="] * self.width) + "'^~\n")
+        lines.append(col_str + "\n")
+        self.printable_board = "".join(lines)
 
     def resize(self, width, height):
 
@@ -101,9 +111,7 @@ class Goban(object):
 
         # Inverts the colour of all pieces on the board.  Useful for games
         # with a pie rule.  First, build a blank new board.
-        new_board = []
-        for r in range(self.height):
-            new_board.append([None] * self.width)
+        new_board = FlatBoard(self.width, self.height, (None, BLACK, WHITE))
 
         # Now, loop through the current board and get actual pieces.  If
         # invert is on, we need to flip both location and colour; else we
@@ -120,17 +128,28 @@ class Goban(object):
                     dest_r = r
                     dest_c = c
 
-                if self.board[r][c] == BLACK:
-                    new_board[dest_r][dest_c] = WHITE
+                loc = self.board.get(r, c)
+                if loc == BLACK:
+                    new_board.set(dest_r, dest_c, WHITE)
                     self.last_row = dest_r
                     self.last_col = dest_c
-                elif self.board[r][c] == WHITE:
-                    new_board[dest_r][dest_c] = BLACK
+                elif loc == WHITE:
+                    new_board.set(dest_r, dest_c, BLACK)
                     self.last_row = dest_r
                     self.last_col = dest_c
 
         self.board = new_board
-        self.update_printable_board()
+        self.printable_board = None
+
+    def copy(self):
+
+        # An independent copy to try moves on.  The neighbour and coordinate
+        # tables are shared, cached and never change.
+        new_goban = Goban.__new__(Goban)
+        new_goban.__dict__.update(self.__dict__)
+        new_goban.board = self.board.copy()
+        new_goban.prev_boards = set(self.prev_boards)
+        return new_goban
 
     def is_valid(self, row, col):
 
@@ -138,22 +157,6 @@ class Goban(object):
             return True
         return False
 
-    def board_to_bits(self, board):
-
-        # This function takes a board and generates a bitstring out of it.
-
-        bit_str = "0b"
-        for r in range(self.height):
-            for c in range(self.width):
-                if board[r][c] == BLACK:
-                    bit_str += BLACK_BITS
-                elif board[r][c] == WHITE:
-                    bit_str += WHITE_BITS
-                else:
-                    bit_str += NONE_BITS
-
-        return Bits(bin=bit_str)
-
     def move_causes_repeat(self, color, row, col):
 
         # This function fakes a play, gets its results, and compares it to
@@ -163,32 +166,31 @@ class Goban(object):
         if not self.is_valid(row, col):
             return False
 
-        if self.board[row][col]:
+        if self.board.get(row, col):
             return False
 
-        # Make a backup of the board.
-        board_backup = copy.deepcopy(self.board)
+        # Make a backup of the board.  It's a single bytearray, so this is
+        # cheap.
+        board_backup = self.board.copy()
 
         # Place the piece.
-        self.board[row][col] = color
+        self.board.set(row, col, color)
 
         # Get capture information, and apply it.
         color_captured, capture_list = self.go_find_captures(row, col)
 
         if color_captured:
             for capture_row, capture_col in capture_list:
-                self.board[capture_row][capture_col] = None
-
-        # Now, is this list in the list of previous boards?
-        board_bits = self.board_to_bits(self.board)
+                self.board.set(capture_row, capture_col, None)
 
-        if board_bits in self.prev_board_list:
+        # Now, is this board in the set of previous boards?
+        if self.board.key() in self.prev_boards:
             to_return = True
         else:
             to_return = False
 
-        # Either way, replace the board with the backup...
-        self.board = board_backup
+        # Either way, put the board back the way it was...
+        self.board.restore(board_backup)
 
         # ...and return the result.
         return to_return
@@ -207,7 +209,7 @@ class Goban(object):
             return None
 
         # Is the space already occupied?
-        if self.board[row][col]:
+        if self.board.get(row, col):
             return None
 
         # Does this move result in a repeat of a previous board?
@@ -218,7 +220,7 @@ class Goban(object):
             return None
 
         # Okay, it's an unoccupied space.  Let's place the piece...
-        self.board[row][col] = color
+        self.board.set(row, col, color)
         self.last_row = row
         self.last_col = col
 
@@ -228,14 +230,14 @@ class Goban(object):
         # If stones can be captured, capture them!
         if color_captured:
             for capture_row, capture_col in capture_list:
-                self.board[capture_row][capture_col] = None
+                self.board.set(capture_row, capture_col, None)
 
 
-        # Update the printable board representation...
-        self.update_printable_board()
+        # Throw away the old printable board...
+        self.printable_board = None
 
-        # ...add it to the list of previous board layouts...
-        self.prev_board_list.append(self.board_to_bits(self.board))
+        # ...add it to the set of previous board layouts...
+        self.prev_boards.add(self.board.key())
 
         # ...and return the information about the successful play.
         return ((row, col), color_captured, capture_list)
@@ -243,7 +245,7 @@ class Goban(object):
     def go_find_captures(self, row, col):
 
         # If we somehow get called with an empty space, bail quick.
-        color = self.board[row][col]
+        color = self.board.get(row, col)
         if not color:
             return (None, [])
 
@@ -252,19 +254,16 @@ class Goban(object):
         # have to check the pieces that are the same color.
         opponent_piece_list = []
         empty_space_adjacent = False
-        for delta in SQUARE_DELTAS:
-            new_row = row + delta[0]
-            new_col = col + delta[1]
-            if self.is_valid(new_row, new_col):
-                piece_at_loc = self.board[new_row][new_col]
-                if piece_at_loc and piece_at_loc != color:
-                    opponent_color = self.board[new_row][new_col]
-                    opponent_piece_list.append((new_row, new_col))
-                elif not piece_at_loc:
-                    # Empty space adjacent.  This can't be a suicide, and any
-                    # adjacent pieces of this color also don't need to be
-                    # checked, as we just found a liberty.
-                    empty_space_adjacent = True
+        for neighbour in self.neighbours[row * self.width + col]:
+            piece_at_loc = self.board.get_index(neighbour)
+            if piece_at_loc and piece_at_loc != color:
+                opponent_color = piece_at_loc
+                opponent_piece_list.append(neighbour)
+            elif not piece_at_loc:
+                # Empty space adjacent.  This can't be a suicide, and any
+                # adjacent pieces of this color also don't need to be
+                # checked, as we just found a liberty.
+                empty_space_adjacent = True
 
         # Any adjacent pieces of our color are obviously connected in a group
         # with this new piece, so with a recursive determiner we only need to
@@ -282,12 +281,10 @@ class Goban(object):
                 # now we suck up the overhead of the visitation table rebuild,
                 # since it happens at most four times per play.  TODO: Implement
                 # such a method.
-                visit_table = []
-                for i in range(self.height):
-                    visit_table.append([None] * self.width)
+                visit_table = [None] * (self.width * self.height)
 
                 capture_list.extend(self.recurse_captures(opponent_color,
-                   opponent_piece[0], opponent_piece[1], visit_table))
+                   opponent_piece, visit_table))
 
             if capture_list:
 
@@ -297,11 +294,9 @@ class Goban(object):
             else:
 
                 # Ugh, we have to check ourselves to see if this was a suicide.
-                visit_table = []
-                for i in range(self.height):
-                    visit_table.append([None] * self.width)
-                capture_list.extend(self.recurse_captures(color, row, col,
-                   visit_table))
+                visit_table = [None] * (self.width * self.height)
+                capture_list.extend(self.recurse_captures(color,
+                   row * self.width + col, visit_table))
                 if capture_list:
 
                     # Suicide.
@@ -320,37 +315,33 @@ class Goban(object):
         # Either way, return what we've found.
         return to_return
 
-    def recurse_captures(self, color, row, col, visit_table):
-
-        # Bail if this is a bad coordinate.
-        if not self.is_valid(row, col):
-            return None
+    def recurse_captures(self, color, index, visit_table):
 
         # Bail if we've been here before.
-        if visit_table[row][col]:
+        if visit_table[index]:
             return None
 
         # Okay, so, is this an empty cell?  If so, we found a liberty, and
         # whatever group we're checking is safe.
-        if not self.board[row][col]:
+        loc = self.board.get_index(index)
+        if not loc:
             return []
 
         # If it's the wrong color, no dice either.
-        if self.board[row][col] != color:
+        if loc != color:
             return None
 
         # Okay, so, it's a piece of the right color we haven't visited before.
         # Mark it as visited...
-        visit_table[row][col] = True
+        visit_table[index] = True
 
         # ...and start up a list of further calls.  If any of them return an
         # empty list, we know this group has a liberty and can return [];
         # otherwise we have to return a concatenation of the lists of all
         # pieces found further on.
-        return_list = [(row, col)]
-        for delta in SQUARE_DELTAS:
-            recurse_return = self.recurse_captures(color, row + delta[0],
-               col + delta[1], visit_table)
+        return_list = [self.coords[index]]
+        for neighbour in self.neighbours[index]:
+            recurse_return = self.recurse_captures(color, neighbour, visit_table)
             if recurse_return == []:
 
                 # A liberty found!  Bail immediately.
@@ -368,17 +359,17 @@ class Goban(object):
     def move_is_suicidal(self, color, row, col):
 
         # First, make sure the space is empty.
-        if self.board[row][col]:
+        if self.board.get(row, col):
             return False
 
         # Okay, so, this is actually pretty easy.  Put a fake piece here...
-        self.board[row][col] = color
+        self.board.set(row, col, color)
 
         # ...and see if go_find_captures returns captures of our color.
         capture_return = self.go_find_captures(row, col)
 
         # Make sure to remove that temporary piece.
-        self.board[row][col] = None
+        self.board.set(row, col, None)
 
         if capture_return[0] == color:
             # The captures are of the same color.  This is suicidal.
@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from giles.games.gonnect.gonnect_engine import GonnectEngine, SWAP
 from giles.games.seated_game import SeatedGame
 from giles.games.seat import Seat
 from giles.state import State
@@ -31,11 +32,6 @@ WHITE = giles.games.goban.WHITE
 
 LETTERS = giles.games.goban.LETTERS
 
-TEST_RIGHT = "->"
-TEST_DOWN = "v"
-
-SQUARE_DELTAS = giles.games.goban.SQUARE_DELTAS
-
 class Gonnect(SeatedGame):
     """A Gonnect table implementation.  Gonnect was invented by Joao Pedro
     Neto in 2000.
@@ -64,21 +60,17 @@ class Gonnect(SeatedGame):
         self.seats[1].data.side = WHITE
         self.seats[1].data.dir_str = "/Horizontal"
         self.directional = False
-        self.resigner = None
-        self.turn_number = 0
-        self.goban = giles.games.goban.Goban()
-        self.adjacency_map = None
-        self.found_winner = False
 
+        # The engine holds the goban and the rules; we just talk to people.
         # A traditional Gonnect board is 13x13.
-        self.goban.resize(13, 13)
+        self.engine = GonnectEngine(13, 13)
+
+    def get_board_str(self):
+        return self.engine.goban.get_printable_board()
 
     def show(self, player):
 
-        if not self.goban.printable_board:
-            self.goban.update_printable_board()
-        for line in self.goban.printable_board:
-            player.tell_cc(line)
+        self.tell_board(player)
         player.tell_cc(self.get_supplemental_str())
 
     def send_board(self):
@@ -127,7 +119,6 @@ class Gonnect(SeatedGame):
             self.channel.broadcast_cc(self.prefix + "^KBlack%s^~: ^R%s^~; ^WWhite%s^~: ^Y%s^~\n" %
                (black_dir_str, self.seats[0].player, white_dir_str, self.seats[1].player))
             self.turn = BLACK
-            self.turn_number = 1
             self.send_board()
 
     def set_size(self, player, size_bits):
@@ -166,7 +157,7 @@ class Gonnect(SeatedGame):
             return
 
         # Valid!
-        self.goban.resize(w, h)
+        self.engine = GonnectEngine(w, h, self.directional)
         self.channel.broadcast_cc(self.prefix + "^R%s^~ has set the board size to ^C%d^Gx^C%d^~.\n" % (player, w, h))
 
     def set_directional(self, player, dir_bits):
@@ -174,7 +165,7 @@ class Gonnect(SeatedGame):
         dir_bool = booleanize(dir_bits)
         if dir_bool:
             if dir_bool > 0:
-                if self.goban.height != self.goban.width:
+                if self.engine.goban.height != self.engine.goban.width:
                     player.tell_cc(self.prefix + "Cannot change to directional with uneven sides.  Resize first.\n")
                     return
                 self.directional = True
@@ -182,6 +173,7 @@ class Gonnect(SeatedGame):
             elif dir_bool < 0:
                 self.directional = False
                 display_str = "^coff^~"
+            self.engine.directional = self.directional
             self.channel.broadcast_cc(self.prefix + "^R%s^~ has turned directional goals %s.\n" % (player, display_str))
         else:
             player.tell_cc(self.prefix + "Not a valid boolean!\n")
@@ -197,7 +189,7 @@ class Gonnect(SeatedGame):
             player.tell_cc(self.prefix + "You must wait for your turn to resign.\n")
             return False
 
-        self.resigner = seat.data.side
+        self.engine.resign(seat.data.side)
         self.channel.broadcast_cc(self.prefix + "^R%s^~ is resigning from the game.\n" % player)
         return True
 
@@ -214,54 +206,44 @@ class Gonnect(SeatedGame):
 
         # Check bounds.
         col, row = move
-        if row < 0 or row >= self.goban.height or col < 0 or col >= self.goban.width:
+        goban = self.engine.goban
+        if not goban.is_valid(row, col):
             player.tell_cc(self.prefix + "Your move is out of bounds.\n")
             return False
 
         # Check that the space is empty.
-        if self.goban.board[row][col]:
+        if not self.engine.is_empty(row, col):
             player.tell_cc(self.prefix + "That space is already occupied.\n")
             return False
 
         # Is this move suicidal?  If so, it can't be played.
-        if self.goban.move_is_suicidal(seat.data.side, row, col):
+        if goban.move_is_suicidal(seat.data.side, row, col):
             player.tell_cc(self.prefix + "That move is suicidal.\n")
             return False
 
         # Does this move cause a repeat of a previous board?
-        if self.goban.move_causes_repeat(seat.data.side, row, col):
+        if goban.move_causes_repeat(seat.data.side, row, col):
             player.tell_cc(self.prefix + "That move causes a repeat of a previous board.\n")
             return False
 
-        # Okay, this looks like a legitimate move.
-        move_return = self.goban.go_play(seat.data.side, row, col,
-                                         suicide_is_valid=False)
-
-        if not move_return:
-            player.tell_cc(self.prefix + "That move was unsuccessful.  Weird.\n")
-            return False
-
-        else:
-            coords, capture_color, capture_list = move_return
-            move_str = "%s%s" % (LETTERS[col], row + 1)
-            capture_str = ""
-            if capture_color:
-
-                # Captured opponent pieces!
-                capture_str += ", ^!capturing %s^." % (self.get_stone_str(len(capture_list)))
+        # Okay, this is a legitimate move.
+        capture_color, capture_list = self.engine.apply((row, col))
+        move_str = "%s%s" % (LETTERS[col], row + 1)
+        capture_str = ""
+        if capture_color:
 
-            # And no matter what, print information about the move.
-            self.channel.broadcast_cc(self.prefix + "^Y%s^~ places a stone at ^C%s^~%s.\n" % (player, move_str, capture_str))
+            # Captured opponent pieces!
+            capture_str += ", ^!capturing %s^." % (self.get_stone_str(len(capture_list)))
 
-            self.turn_number += 1
+        # And no matter what, print information about the move.
+        self.channel.broadcast_cc(self.prefix + "^Y%s^~ places a stone at ^C%s^~%s.\n" % (player, move_str, capture_str))
 
-            return True
+        return True
 
     def swap(self, player):
 
-        self.goban.invert(self.directional)
+        self.engine.apply(SWAP)
         self.channel.broadcast_cc(self.prefix + "^Y%s^~ has swapped ^KBlack^~'s first move.\n" % (player))
-        self.turn_number += 1
 
     def handle(self, player, command_str):
 
@@ -317,7 +299,7 @@ class Gonnect(SeatedGame):
                     handled = True
 
                 elif primary in ("swap",):
-                    if self.turn_number == 2 and self.seats[1].player == player:
+                    if self.engine.can_swap() and self.seats[1].player == player:
                         self.swap(player)
                         made_move = True
                     else:
@@ -333,10 +315,7 @@ class Gonnect(SeatedGame):
 
                 if made_move:
 
-                    if self.turn == BLACK:
-                        self.turn = WHITE
-                    else:
-                        self.turn = BLACK
+                    self.turn = self.engine.turn
 
                     # Did someone win?
                     winner = self.find_winner()
@@ -350,105 +329,18 @@ class Gonnect(SeatedGame):
         if not handled:
             player.tell_cc(self.prefix + "Invalid command.\n")
 
-    def reset_adjacency(self):
-
-        self.adjacency_map = []
-        for r in range(self.goban.height):
-            self.adjacency_map.append([None] * self.goban.width)
-
     def find_winner(self):
 
-        # If someone resigned, this is the easiest thing ever.
-        if self.resigner == WHITE:
-            return self.seats[0].player_name
-        elif self.resigner == BLACK:
-            return self.seats[1].player_name
-
-        # Okay, we have to check the board.  First, determine which
-        # checks we need to make.  In a directional game, we only
-        # need to test the left and top edges for White and Black
-        # respectively; otherwise we need to test both edges for
-        # both players.
-
-        self.found_winner = False
-        self.reset_adjacency()
-
-        for r in range(self.goban.height):
-            self.recurse_adjacencies(WHITE, r, 0, TEST_RIGHT)
-        if not self.found_winner:
-            for c in range(self.goban.width):
-                self.recurse_adjacencies(BLACK, 0, c, TEST_DOWN)
-
-        if not self.found_winner and not self.directional:
-
-            # Gotta test both edges with the other colors.  Reset the
-            # adjacency graph, as the previous entries will now conflict.
-            self.reset_adjacency()
-
-            for r in range(self.goban.height):
-                self.recurse_adjacencies(BLACK, r, 0, TEST_RIGHT)
-            if not self.found_winner:
-                for c in range(self.goban.width):
-                    self.recurse_adjacencies(WHITE, 0, c, TEST_DOWN)
-
-        if self.found_winner == BLACK:
-            return self.seats[0].player_name
-        elif self.found_winner == WHITE:
-            return self.seats[1].player_name
-
-        # Blarg, still no winner.  See if the next player (we've already
-        # switched turns) has no valid moves.  If so, the current player
-        # wins.
-        for r in range(self.goban.height):
-            for c in range(self.goban.width):
-                if (not self.goban.board[r][c] and
-                   not self.goban.move_is_suicidal(self.turn, r, c) and
-                   not self.goban.move_causes_repeat(self.turn, r, c)):
-
-                    # Player has a non-suicidal move.  No winner.
-                    return None
-
-        # Checked all valid moves for the next player, and they're all
-        # suicidal.  This player wins.
-        if self.turn == WHITE:
+        # The engine handles resignations, connections, and running out of
+        # moves.
+        winner = self.engine.winner()
+        if winner == BLACK:
             return self.seats[0].player_name
-        else:
+        elif winner == WHITE:
             return self.seats[1].player_name
 
-    def recurse_adjacencies(self, color, row, col, test_dir):
-
-        # Bail if a winner's been found.
-        if self.found_winner:
-            return
-
-        # Bail if we're off the board.
-        if (row < 0 or row >= self.goban.height or
-           col < 0 or col >= self.goban.width):
-            return
-
-        # Bail if we've visited this location.
-        if self.adjacency_map[row][col]:
-            return
-
-        # Bail if it's the wrong color.
-        if self.goban.board[row][col] != color:
-            return
-
-        # Okay, it's the right color.  Mark it visited...
-        self.adjacency_map[row][col] = True
-
-        # Have we reached the proper side?
-        if ((test_dir == TEST_RIGHT and col == self.goban.width - 1) or
-           (test_dir == TEST_DOWN and row == self.goban.height - 1)):
-
-            # Winner!
-            self.found_winner = color
-            return
-
-        # Not a win yet... so we need to test the four adjacencies.
-        for r_delta, c_delta in SQUARE_DELTAS:
-            self.recurse_adjacencies(color, row + r_delta, col + c_delta,
-               test_dir)
+        # No winner yet.
+        return None
 
     def resolve(self, winner):
         self.send_board()
@@ -0,0 +1,168 @@
+# Giles: gonnect_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.connectivity import group_connects
+from giles.games.connectivity import EDGE_TOP, EDGE_BOTTOM, EDGE_LEFT, EDGE_RIGHT
+from giles.games.engine import Engine
+from giles.games.geometry import SQUARE
+from giles.games.goban import Goban, BLACK, WHITE
+
+# The move that swaps Black's first stone.
+SWAP = "swap"
+
+TEST_RIGHT = EDGE_LEFT | EDGE_RIGHT
+TEST_DOWN = EDGE_TOP | EDGE_BOTTOM
+
+class GonnectEngine(Engine):
+    """The rules of Gonnect.  Moves are (row, col) tuples, plus SWAP,
+    which White may play as their first move.  Stones are captured as in
+    Go, but suicide and repeating an earlier position are not allowed.
+    A side wins by connecting opposite edges (in a directional game, only
+    their own pair of them), or when the other side has no move left.
+    """
+
+    def __init__(self, width, height, directional=False):
+
+        super(GonnectEngine, self).__init__()
+
+        self.goban = Goban()
+        self.goban.resize(width, height)
+        self.directional = directional
+
+        self.turn = BLACK
+        self.move_count = 0
+        self.resigner = None
+
+    def other(self, color):
+
+        if color == BLACK:
+            return WHITE
+        return BLACK
+
+    def can_swap(self):
+
+        # White can swap only as the reply to Black's first stone.
+        return self.move_count == 1
+
+    def is_empty(self, row, col):
+        return not self.goban.board.get(row, col)
+
+    def can_place(self, color, row, col):
+
+        goban = self.goban
+        return (not goban.board.get(row, col) and
+                not goban.move_is_suicidal(color, row, col) and
+                not goban.move_causes_repeat(color, row, col))
+
+    def has_move(self, color):
+
+        for row in range(self.goban.height):
+            for col in range(self.goban.width):
+                if self.can_place(color, row, col):
+                    return True
+        return False
+
+    def connected(self):
+
+        # Captures mean stones can vanish, so we can't track connections
+        # incrementally; instead we do a full (but non-recursive) scan.
+        # The goban's cells are already flat; we just compare against the
+        # bytes it stores for each colour.  In a directional game, we only
+        # need to test the left and top edges for White and Black
+        # respectively; otherwise we need to test both edges for both
+        # players.
+        board = self.goban.board
+        cells = board.cells
+        white = board.code(WHITE)
+        black = board.code(BLACK)
+        width = self.goban.width
+        height = self.goban.height
+
+        if group_connects(cells, white, SQUARE, width, height, TEST_RIGHT):
+            return WHITE
+        if group_connects(cells, black, SQUARE, width, height, TEST_DOWN):
+            return BLACK
+
+        if not self.directional:
+
+            # Gotta test both edges with the other colors.
+            if group_connects(cells, black, SQUARE, width, height, TEST_RIGHT):
+                return BLACK
+            if group_connects(cells, white, SQUARE, width, height, TEST_DOWN):
+                return WHITE
+
+        return None
+
+    def legal_moves(self):
+
+        if self.resigner or self.connected():
+            return []
+
+        moves = []
+        for row in range(self.goban.height):
+            for col in range(self.goban.width):
+                if self.can_place(self.turn, row, col):
+                    moves.append((row, col))
+        if self.can_swap():
+            moves.append(SWAP)
+        return moves
+
+    def is_legal(self, move):
+
+        if move == SWAP:
+            return self.can_swap()
+        row, col = move
+        return self.goban.is_valid(row, col) and self.can_place(self.turn, row, col)
+
+    def apply(self, move):
+
+        # Returns the colour of any stones captured and where they were.
+        capture_color = None
+        capture_list = []
+        if move == SWAP:
+            self.goban.invert(self.directional)
+        else:
+            row, col = move
+            coords, capture_color, capture_list = self.goban.go_play(self.turn, row, col,
+                                                                     suicide_is_valid=False)
+        self.move_count += 1
+        self.turn = self.other(self.turn)
+        return (capture_color, capture_list)
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        if self.resigner:
+            return self.other(self.resigner)
+
+        found_winner = self.connected()
+        if found_winner:
+            return found_winner
+
+        # Still no winner.  If the side to play has no valid moves, the
+        # side that just moved wins.
+        if not self.has_move(self.turn):
+            return self.other(self.turn)
+        return None
+
+    def copy(self):
+
+        new_engine = GonnectEngine.__new__(GonnectEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.goban = self.goban.copy()
+        return new_engine
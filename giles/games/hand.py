@@ -68,7 +68,7 @@ class Hand(object):
     def muck(self):
         """Discard all of the items in a hand.  Returns a Hand containing all
         of the mucked items, or an empty Hand if empty."""
-        mucked_cards = Hand()
+        mucked_cards = self.__class__()
         while self.show():
             mucked_cards.add(self.discard())
         return mucked_cards
@@ -114,9 +114,149 @@ class Hand(object):
         self.cards.sort()
 
     def reversed(self):
-        reversed_hand = Hand()
+        reversed_hand = self.__class__()
 
         for card in reversed(self.cards):
             reversed_hand.add(card)
 
         return reversed_hand
+
+def bits_of(mask):
+
+    # Yields the index of each set bit, lowest first.
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+class CardHand(Hand):
+    """A Hand of cards that also keeps track of them as a bitmask, for
+    cards with a small-integer .id, like PlayingCard.  Membership tests,
+    "do they have any of this suit?", and suit counts are then a couple of
+    bit operations rather than walks of the list, and iterating in id
+    order (which, for PlayingCards, is by suit and then by value) needs no
+    sort.  The list of cards is still kept, in order, so a CardHand can go
+    anywhere a Hand can.
+
+    Cards with an .id of None live in the list only, and membership tests
+    for them fall back to searching it.  Identical cards are fine; we count
+    how many of each id we hold, and the bit stays set until the last of
+    them leaves the hand.  Taking a card out of the middle still has to
+    find it in the list, so discard_specific() is linear in the size of
+    the hand, as it is for a Hand.
+    """
+
+    def __init__(self):
+
+        super(CardHand, self).__init__()
+        self.mask = 0
+        self.suit_masks = {}
+        self.by_id = {}
+        self.id_counts = {}
+
+    def track(self, card):
+
+        card_id = card.id
+        if card_id is not None:
+            bit = 1 << card_id
+            self.mask |= bit
+            self.suit_masks[card.suit] = self.suit_masks.get(card.suit, 0) | bit
+            self.by_id[card_id] = card
+            self.id_counts[card_id] = self.id_counts.get(card_id, 0) + 1
+
+    def untrack(self, card):
+
+        # Only clear the bit if no identical card is left behind.
+        card_id = card.id
+        if card_id is None:
+            return
+        count = self.id_counts[card_id] - 1
+        if count:
+            self.id_counts[card_id] = count
+            return
+        del self.id_counts[card_id]
+        bit = 1 << card_id
+        self.mask &= ~bit
+        self.suit_masks[card.suit] &= ~bit
+        del self.by_id[card_id]
+
+    def rebuild(self):
+
+        self.mask = 0
+        self.suit_masks = {}
+        self.by_id = {}
+        self.id_counts = {}
+        for card in self.cards:
+            self.track(card)
+
+    def __setitem__(self, key, value):
+
+        self.cards.__setitem__(key, value)
+        self.rebuild()
+
+    def __delitem__(self, key):
+
+        self.cards.__delitem__(key)
+        self.rebuild()
+
+    def __contains__(self, needle):
+
+        card_id = needle.id
+        if card_id is None:
+            return needle in self.cards
+        return bool((self.mask >> card_id) & 1)
+
+    def discard(self, n=-1):
+
+        card = super(CardHand, self).discard(n)
+        if card is not None:
+            self.untrack(card)
+        return card
+
+    def muck(self):
+
+        # All at once, rather than a discard() at a time; the mucked cards
+        # come out top first, as they would one by one.
+        mucked_cards = self.__class__()
+        for card in reversed(self.cards):
+            mucked_cards.add(card)
+        self.cards = []
+        self.rebuild()
+        return mucked_cards
+
+    def discard_specific(self, needle):
+
+        if needle not in self:
+            return None
+        self.cards.remove(needle)
+        self.untrack(needle)
+        return needle
+
+    def add(self, c):
+
+        if super(CardHand, self).add(c):
+            self.track(c)
+            return True
+        return False
+
+    def has_suit(self, suit):
+        return bool(self.suit_masks.get(suit))
+
+    def suit_count(self, suit):
+        return bin(self.suit_masks.get(suit, 0)).count("1")
+
+    def sorted_cards(self):
+
+        # The cards in id order, one of each.
+        by_id = self.by_id
+        return [by_id[card_id] for card_id in bits_of(self.mask)]
+
+    def copy(self):
+
+        new_hand = CardHand()
+        new_hand.cards = self.cards[:]
+        new_hand.mask = self.mask
+        new_hand.suit_masks = dict(self.suit_masks)
+        new_hand.by_id = dict(self.by_id)
+        new_hand.id_counts = dict(self.id_counts)
+        return new_hand
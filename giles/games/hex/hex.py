@@ -17,6 +17,7 @@
 from giles.utils import booleanize
 from giles.utils import demangle_move
 from giles.state import State
+from giles.games.hex.hex_engine import HexEngine, SWAP, WHITE, BLACK
 from giles.games.seated_game import SeatedGame
 from giles.games.seat import Seat
 
@@ -31,10 +32,6 @@ HEX_MAX_SIZE = 26
 #  0 1 2 3
 #
 # (1, 2) is adjacent to (1, 1), (2, 2), (0, 2), (1, 3), (2, 3), and (0, 1).
-HEX_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0), (1, 1), (-1, -1))
-
-WHITE = "white"
-BLACK = "black"
 
 
 COL_CHARACTERS = "abcdefghijklmnopqrstuvwxyz"
@@ -66,18 +63,14 @@ class Hex(SeatedGame):
         self.seats[0].data.color_code = "^W"
         self.seats[1].data.color = BLACK
         self.seats[1].data.color_code = "^K"
-        self.board = None
-        self.printable_board = None
+        self.engine = None
         self.size = 14
         self.turn = None
         self.turn_number = 0
         self.move_list = []
-        self.resigner = None
         self.last_x = None
         self.last_y = None
         self.is_quickstart = False
-        self.adjacency = None
-        self.found_winner = False
 
         # Hex requires both seats, so may as well mark them active.
         self.seats[0].active = True
@@ -87,9 +80,8 @@ class Hex(SeatedGame):
 
     def init_board(self):
 
-        self.board = []
-        for x in range(self.size):
-            self.board.append([None] * self.size)
+        # The engine holds the board and the rules; we just talk to people.
+        self.engine = HexEngine(self.size)
 
     def set_size(self, player, size_str):
 
@@ -105,7 +97,7 @@ class Hex(SeatedGame):
         # Got a valid size.
         self.size = new_size
         self.init_board()
-        self.update_printable_board()
+        self.mark_board_dirty()
         self.channel.broadcast_cc(self.prefix + "^M%s^~ has changed the size of the board to ^C%s^~.\n" % (player, str(new_size)))
         return True
 
@@ -115,16 +107,16 @@ class Hex(SeatedGame):
         move_str = "%s%s" % (COL_CHARACTERS[x], y + 1)
 
         # Check bounds.
-        if (x < 0 or x >= self.size or y < 0 or y >= self.size):
+        if not self.engine.is_valid(x, y):
             seat.player.tell_cc(self.prefix + "That move is out of bounds.\n")
             return None
 
-        if self.board[x][y]:
+        if not self.engine.is_empty(x, y):
             seat.player.tell_cc(self.prefix + "That space is already occupied.\n")
             return None
 
         # Okay, it's an unoccupied space!  Let's make the move.
-        self.board[x][y] = seat.data.color
+        self.engine.apply((x, y))
         self.channel.broadcast_cc(self.prefix + seat.data.color_code + "%s^~ has moved to ^C%s^~.\n" % (seat.player_name, move_str))
         self.last_x = x
         self.last_y = y
@@ -132,19 +124,17 @@ class Hex(SeatedGame):
 
     def swap(self):
 
-        # In Hex, to get the equivalent piece for the other player, it
-        # must be swapped along the x = y axis.  That is, x <-> y for
-        # the piece.  Easy enough!
-
-        self.board[self.move_list[0][0]][self.move_list[0][1]] = None
-        self.board[self.move_list[0][1]][self.move_list[0][0]] = BLACK
+        # The engine mirrors White's first piece along the x = y axis, so
+        # the last-move marker mirrors with it.
+        self.engine.apply(SWAP)
         self.last_x, self.last_y = self.last_y, self.last_x
         self.channel.broadcast_cc(self.prefix + "^Y%s^~ has swapped ^WWhite^~'s first move.\n" % self.seats[1].player_name)
         self.turn_number += 1
 
-    def update_printable_board(self):
+    def render_board(self):
 
-        self.printable_board = []
+        board = self.engine.board
+        lines = []
         slash_line = " "
         char_line = ""
         for x in range(self.size):
@@ -157,7 +147,7 @@ class Hex(SeatedGame):
             for spc in range(self.size - x):
                 msg += " "
             for y in range(self.size):
-                piece = self.board[y][x]
+                piece = board[y][x]
                 if y == self.last_x and x == self.last_y:
                     msg += "^5"
                 if piece == BLACK:
@@ -169,16 +159,14 @@ class Hex(SeatedGame):
                 else:
                     msg += "^M.^~ "
             msg += "- " + str(x + 1) + "\n"
-            self.printable_board.append(msg)
-        self.printable_board.append(slash_line + "\n")
-        self.printable_board.append(char_line + "\n")
+            lines.append(msg)
+        lines.append(slash_line + "\n")
+        lines.append(char_line + "\n")
+        return "".join(lines)
 
     def print_board(self, player):
 
-        if not self.printable_board:
-            self.update_printable_board()
-        for line in self.printable_board:
-            player.tell_cc(line)
+        self.tell_board(player)
 
     def get_turn_str(self):
         if self.state.get() == "playing":
@@ -201,7 +189,7 @@ class Hex(SeatedGame):
 
         # Okay, this person can resign; it's their turn, after all.
         self.channel.broadcast_cc(self.prefix + "^R%s^~ is resigning from the game.\n" % seat.player_name)
-        self.resigner = seat.data.color
+        self.engine.resign(seat.data.color)
         return True
 
     def show(self, player):
@@ -243,22 +231,13 @@ class Hex(SeatedGame):
             self.state.set("playing")
             self.channel.broadcast_cc(self.prefix + "^WWhite/Horizontal^~: ^R%s^~; ^KBlack/Vertical^~: ^Y%s^~\n" %
                (self.seats[0].player_name, self.seats[1].player_name))
-            self.turn = WHITE
+            self.turn = self.engine.turn
             self.turn_number = 1
 
-            # If quickstart mode is on, make the quickstart moves.  On
-            # even-sized boards, we want to "stairstep" the placement;
-            # on odd-sized boards, there's an exact middle row to place
-            # them on anyhow, so no need to tweak any pieces.
+            # If quickstart mode is on, make the quickstart moves.
             if self.is_quickstart:
-                delta = 0
-                if self.size % 2 == 0:
-                    delta = 1
-                middle = self.size / 2
-                self.board[0][middle] = BLACK
-                self.board[self.size - 1][middle - delta] = BLACK
-                self.board[middle][0] = WHITE
-                self.board[middle - delta][self.size - 1] = WHITE
+                self.engine.quickstart()
+                self.mark_board_dirty()
             self.send_board()
             self.channel.broadcast_cc(self.prefix + self.get_turn_str())
 
@@ -334,7 +313,7 @@ class Hex(SeatedGame):
 
             elif primary in ('swap',):
 
-                if self.turn_number == 2 and seat.player == player:
+                if self.engine.can_swap() and seat.player == player:
                     self.swap()
                     move = "swap"
                     made_move = True
@@ -354,7 +333,7 @@ class Hex(SeatedGame):
 
             if made_move:
 
-                self.update_printable_board()
+                self.mark_board_dirty()
                 self.send_board()
                 self.move_list.append(move)
                 self.turn_number += 1
@@ -364,10 +343,7 @@ class Hex(SeatedGame):
                     self.resolve(winner)
                     self.finish()
                 else:
-                    if self.turn == WHITE:
-                        self.turn = BLACK
-                    else:
-                        self.turn = WHITE
+                    self.turn = self.engine.turn
                     self.channel.broadcast_cc(self.prefix + self.get_turn_str())
 
         if not handled:
@@ -375,80 +351,15 @@ class Hex(SeatedGame):
 
     def find_winner(self):
 
-        # First, check resignations; that's a fast bail.
-        if self.resigner:
-            if self.resigner == WHITE:
-                return self.seats[1].player_name
-            elif self.resigner == BLACK:
-                return self.seats[0].player_name
-            else:
-                self.server.log.log(self.log_prefix + "Weirdness; a resign that's not a player.")
-                return None
-
-        # Well, darn, we have to do actual work.  Time for recursion!
-        # To calculate a winner:
-        # - Start on one edge.
-        # - Recursively mark pieces of the same colour adjacent to that one.
-        # - If you're about to mark a piece on the opposite edge, there's a
-        #   winner!
-        #
-        # You only have to run this algorithm on two edges, one for each
-        # player.  Which is precisely what we're going to do.
-
-        self.found_winner = None
-        self.adjacency = []
-
-        # Set up our adjacency checker.
-        for i in range(self.size):
-            self.adjacency.append([None] * self.size)
-
-        # Check both edges.
-        for i in range(self.size):
-            if self.board[0][i]:
-                self.update_adjacency(0, i, WHITE)
-            if self.board[i][0]:
-                self.update_adjacency(i, 0, BLACK)
-
-        if self.found_winner == WHITE:
+        # The engine handles both resignations and connections.
+        winner = self.engine.winner()
+        if winner == WHITE:
             return self.seats[0].player_name
-        elif self.found_winner == BLACK:
+        elif winner == BLACK:
             return self.seats[1].player_name
 
         # No winner yet.
         return None
 
-    def update_adjacency(self, x, y, color):
-
-        # Skip work if a winner's already found.
-        if self.found_winner:
-            return
-
-        # Skip work if we're off the board.
-        if (x < 0 or x >= self.size or y < 0 or y >= self.size):
-            return
-
-        # Skip work if we've been here already.
-        if self.adjacency[x][y]:
-            return
-
-        # Skip work if it's empty or for the other player.
-        this_cell = self.board[x][y]
-        if this_cell != color:
-            return
-
-        # All right, it's this player's cell.  Mark it visited.
-        self.adjacency[x][y] = color
-
-        # If we're on the winning edge for this player, success!
-        # They have won.
-        if ((color == WHITE and x == self.size - 1) or
-           (color == BLACK and y == self.size - 1)):
-            self.found_winner = color
-            return
-
-        # Okay, no winner yet.  Recurse on the six adjacent cells.
-        for x_delta, y_delta in HEX_DELTAS:
-            self.update_adjacency(x + x_delta, y + y_delta, color)
-
     def resolve(self, winner):
         self.channel.broadcast_cc(self.prefix + "^C%s^~ wins!\n" % (winner))
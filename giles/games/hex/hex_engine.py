@@ -0,0 +1,175 @@
+# Giles: hex_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.connectivity import ConnectionTracker
+from giles.games.connectivity import EDGE_TOP, EDGE_BOTTOM, EDGE_LEFT, EDGE_RIGHT
+from giles.games.engine import Engine
+from giles.games.geometry import HEX
+
+WHITE = "white"
+BLACK = "black"
+
+# The move that swaps White's first stone.
+SWAP = "swap"
+
+# White connects the x = 0 and x = size - 1 edges; Black the y ones.  The
+# connectivity code treats x as the row.
+GOALS = {
+    WHITE: EDGE_TOP | EDGE_BOTTOM,
+    BLACK: EDGE_LEFT | EDGE_RIGHT,
+}
+
+class HexEngine(Engine):
+    """The rules of Hex.  The board is board[x][y]; moves are (x, y)
+    tuples, plus SWAP, which Black may play as their first move.
+    """
+
+    def __init__(self, size):
+
+        super(HexEngine, self).__init__()
+
+        self.size = size
+        self.board = []
+        for x in range(size):
+            self.board.append([None] * size)
+
+        self.connections = {
+            WHITE: ConnectionTracker(HEX, size, size),
+            BLACK: ConnectionTracker(HEX, size, size),
+        }
+
+        self.turn = WHITE
+        self.move_count = 0
+        self.first_move = None
+        self.resigner = None
+
+    def rebuild_connections(self):
+
+        # Pieces only change colour on a swap or a quickstart, both of which
+        # happen while the board is nearly empty, so just start over.
+        for color in self.connections:
+            self.connections[color].clear()
+        for x in range(self.size):
+            for y in range(self.size):
+                color = self.board[x][y]
+                if color:
+                    self.connections[color].add_cell(x, y)
+
+    def is_valid(self, x, y):
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def is_empty(self, x, y):
+        return not self.board[x][y]
+
+    def can_swap(self):
+
+        # Black can swap only as the reply to White's first stone.
+        return self.move_count == 1
+
+    def quickstart(self):
+
+        # On even-sized boards, we want to "stairstep" the placement; on
+        # odd-sized boards, there's an exact middle row to place them on
+        # anyhow, so no need to tweak any pieces.
+        delta = 0
+        if self.size % 2 == 0:
+            delta = 1
+        middle = self.size / 2
+        self.board[0][middle] = BLACK
+        self.board[self.size - 1][middle - delta] = BLACK
+        self.board[middle][0] = WHITE
+        self.board[middle - delta][self.size - 1] = WHITE
+        self.rebuild_connections()
+
+    def place(self, color, x, y):
+
+        self.board[x][y] = color
+        self.connections[color].add_cell(x, y)
+
+    def swap(self):
+
+        # To get the equivalent piece for the other player, it must be
+        # swapped along the x = y axis.  That is, x <-> y for the piece.
+        x, y = self.first_move
+        self.board[x][y] = None
+        self.board[y][x] = BLACK
+        self.rebuild_connections()
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+        moves = []
+        for x in range(self.size):
+            for y in range(self.size):
+                if not self.board[x][y]:
+                    moves.append((x, y))
+        if self.can_swap():
+            moves.append(SWAP)
+        return moves
+
+    def is_legal(self, move):
+
+        if move == SWAP:
+            return self.can_swap()
+        x, y = move
+        return self.is_valid(x, y) and self.is_empty(x, y)
+
+    def apply(self, move):
+
+        if move == SWAP:
+            self.swap()
+        else:
+            x, y = move
+            self.place(self.turn, x, y)
+            if not self.first_move:
+                self.first_move = move
+        self.move_count += 1
+        self.turn = self.other(self.turn)
+
+    def other(self, color):
+
+        if color == WHITE:
+            return BLACK
+        return WHITE
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # Every piece is tracked in its colour's connection tracker as it's
+        # placed, so all we need to do is ask whether either colour has a
+        # group touching both of its edges.
+        if self.connections[WHITE].connects(GOALS[WHITE]):
+            return WHITE
+        elif self.connections[BLACK].connects(GOALS[BLACK]):
+            return BLACK
+        return None
+
+    def copy(self):
+
+        new_engine = HexEngine.__new__(HexEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.board = [column[:] for column in self.board]
+        new_engine.connections = {
+            WHITE: self.connections[WHITE].copy(),
+            BLACK: self.connections[BLACK].copy(),
+        }
+        return new_engine
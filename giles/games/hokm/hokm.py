@@ -14,15 +14,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from giles.games.double_dummy import QUICK_BUDGET
 from giles.games.four_player_card_game_layout import FourPlayerCardGameLayout, NORTH, SOUTH, EAST, WEST
 from giles.games.three_player_card_game_layout import ThreePlayerCardGameLayout
+from giles.games.hokm.hokm_engine import HokmEngine, NORTH_SOUTH, EAST_WEST
 from giles.games.seated_game import SeatedGame
-from giles.games.hand import Hand
-from giles.games.playing_card import PlayingCard, new_deck, str_to_card, card_to_str, hand_to_str, SHORT, LONG, CLUBS, DIAMONDS, HEARTS, SPADES, JACK, QUEEN, KING, ACE
+from giles.games.playing_card import str_to_card, card_to_str, hand_to_str, SHORT, LONG, CLUBS, DIAMONDS, HEARTS, SPADES
 from giles.games.seat import Seat
-from giles.games.trick import handle_trick, hand_has_suit, sorted_hand
+from giles.games.trick import hand_has_suit
 from giles.state import State
-from giles.utils import Struct, booleanize, get_plural_str
+from giles.utils import booleanize, get_plural_str
 
 import random
 
@@ -47,13 +48,10 @@ class Hokm(SeatedGame):
 
         # Hokm-specific stuff.
         self.goal = 7
-        self.trick = None
-        self.trump_suit = None
-        self.led_suit = None
+        self.engine = None
         self.turn = None
         self.dealer = None
         self.hakem = None
-        self.winner = None
 
         # Default to four-player mode.
         self.mode = 4
@@ -63,8 +61,8 @@ class Hokm(SeatedGame):
     def setup_mode(self):
 
         # Sets up all of the structures that depend on the mode of Hokm
-        # we're playing: seats, layouts, and (in 4p mode) partnerships.
-        # Remember that seats in Hokm go the opposite direction of the
+        # we're playing: seats, layouts, and the engine, which knows about
+        # the partnerships (in 4p mode) and the deck.  Remember that seats in Hokm go the opposite direction of the
         # American/European standard.
 
         if self.mode == 4:
@@ -85,12 +83,6 @@ class Hokm(SeatedGame):
             self.max_players = 4
             self.layout = FourPlayerCardGameLayout()
 
-            # Set up the partnership structures.
-            self.ns = Struct()
-            self.ew = Struct()
-            self.ns.score = 0
-            self.ew.score = 0
-
         elif self.mode == 3:
 
             self.seats = [
@@ -106,9 +98,6 @@ class Hokm(SeatedGame):
             self.west = self.seats[0]
             self.south = self.seats[1]
             self.east = self.seats[2]
-            self.west.data.score = 0
-            self.south.data.score = 0
-            self.east.data.score = 0
 
             self.min_players = 3
             self.max_players = 3
@@ -116,6 +105,9 @@ class Hokm(SeatedGame):
 
         else:
             self.log_pre("MAJOR ERROR: Hokm initialization with invalid mode %s!" % self.mode)
+            return
+
+        self.engine = HokmEngine(self.mode, self.short, self.goal)
 
     def show_help(self, player):
 
@@ -130,10 +122,14 @@ class Hokm(SeatedGame):
         player.tell_cc("            ^!choose^. <suit>, ^!ch^.     Declare <suit> as trumps.  Hakem only.\n")
         player.tell_cc("              ^!play^. <card>, ^!pl^.     Play <card> from your hand.\n")
         player.tell_cc("                 ^!hand^., ^!inv^., ^!i^.     Look at the cards in your hand.\n")
+        player.tell_cc("                          ^!claim^.     Claim the rest of the tricks.\n")
+
+    def get_board_str(self):
+        return str(self.layout)
 
     def display(self, player):
 
-        player.tell_cc("%s" % self.layout)
+        self.tell_board(player)
 
     def get_color_code(self, seat):
         if self.mode == 4:
@@ -153,11 +149,15 @@ class Hokm(SeatedGame):
 
         return "^G%s^~ (%s%s^~)" % (seat.player_name, self.get_color_code(seat), seat)
 
-    def get_score_str(self):
+    def get_count_str(self, counts):
         if self.mode == 4:
-            return "          ^RNorth/South^~: %d    ^MEast/West^~: %d\n" % (self.ns.score, self.ew.score)
+            return "^RNorth/South^~: %d    ^MEast/West^~: %d\n" % (counts[NORTH_SOUTH], counts[EAST_WEST])
         else:
-            return "          ^M%s^~: %d    ^R%s^~: %d    ^B%s^~: %d\n" % (self.west.player_name, self.west.data.score, self.south.player_name, self.south.data.score, self.east.player_name, self.east.data.score)
+            west, south, east = [counts[x] for x in self.engine.sides]
+            return "^M%s^~: %d    ^R%s^~: %d    ^B%s^~: %d\n" % (self.west.player_name, west, self.south.player_name, south, self.east.player_name, east)
+
+    def get_score_str(self):
+        return "          " + self.get_count_str(self.engine.scores)
 
     def get_metadata(self):
 
@@ -165,16 +165,13 @@ class Hokm(SeatedGame):
         if self.turn:
             seat_color = self.get_color_code(self.turn)
             to_return += "%s is the hakem.\n" % (self.get_sp_str(self.hakem))
-            if self.trump_suit:
-                trump_str = "^C%s^~" % self.trump_suit
+            if self.engine.trump_suit:
+                trump_str = "^C%s^~" % self.engine.trump_suit
             else:
                 trump_str = "^cwaiting to be chosen^~"
 
             to_return += "It is ^Y%s^~'s turn (%s%s^~).  Trumps are ^C%s^~.\n" % (self.turn.player_name, seat_color, self.turn, trump_str)
-            if self.mode == 4:
-                to_return += "Tricks:   ^RNorth/South^~: %d    ^MEast/West^~: %d\n" % (self.ns.tricks, self.ew.tricks)
-            else:
-                to_return += "Tricks:   ^M%s^~: %d    ^R%s^~: %d    ^B%s^~: %d\n" % (self.west.player_name, self.west.data.tricks, self.south.player_name, self.south.data.tricks, self.east.player_name, self.east.data.tricks)
+            to_return += "Tricks:   " + self.get_count_str(self.engine.tricks)
         to_return += "The goal score for this game is ^C%s^~.\n" % get_plural_str(self.goal, "point")
         to_return += self.get_score_str()
 
@@ -197,6 +194,7 @@ class Hokm(SeatedGame):
 
         # Got a valid goal.
         self.goal = new_goal
+        self.engine.goal = new_goal
         self.bc_pre("^M%s^~ has changed the goal to ^G%s^~.\n" % (player, get_plural_str(new_goal, "point")))
 
     def set_short(self, player, short_bits):
@@ -213,6 +211,7 @@ class Hokm(SeatedGame):
             elif short_bool < 0:
                 self.short = False
                 display_str = "^coff^~"
+            self.engine.short = self.short
             self.bc_pre("^R%s^~ has turned short suits %s.\n" % (player, display_str))
         else:
             self.tell_pre(player, "Not a valid boolean!\n")
@@ -238,74 +237,29 @@ class Hokm(SeatedGame):
         self.bc_pre("^M%s^~ has changed the number of players to ^G%s^~.\n" % (player, new_mode))
         self.setup_mode()
 
-    def clear_trick(self):
-
-        # Set the current trick to an empty hand...
-        self.trick = Hand()
-        self.led_suit = None
-
-        # ...and set everyone's played card to None.
-        for seat in self.seats:
-            seat.data.card = None
-
-        # Clear the layout as well.
-        self.layout.clear()
-
-    def new_deck(self):
+    def get_hand(self, seat):
+        return self.engine.hands[self.seats.index(seat)]
 
-        # In 4-player mode, it's a standard 52-card pack.
-        if self.mode == 4:
-            self.deck = new_deck()
-        else:
+    def update_turn(self):
 
-            # If it's a short deck, 7-A are full; if a long deck, 3-A are.
-            full_ranks = [ACE, KING, QUEEN, JACK, '10', '9', '8', '7', '6']
-            if self.short:
-                short_rank = '5'
-            else:
-                full_ranks.extend(['5', '4', '3'])
-                short_rank = '2'
+        self.turn = self.seats[self.engine.turn]
+        self.layout.change_turn(self.turn.data.who)
 
-            # Build the deck, full ranks first.
-            self.deck = Hand()
-            for suit in (CLUBS, DIAMONDS, HEARTS, SPADES):
-                for rank in full_ranks:
-                    self.deck.add(PlayingCard(rank, suit))
+    def update_hakem(self):
 
-            # We only want three of the short rank.  No hearts, because.
-            for suit in (CLUBS, DIAMONDS, SPADES):
-                self.deck.add(PlayingCard(short_rank, suit))
+        self.hakem = self.seats[self.engine.hakem]
+        self.dealer = self.seats[self.engine.dealer()]
 
     def start_deal(self):
 
-        # Set the trick counts to zero, appropriately for the mode.
-        if self.mode == 4:
-            self.ns.tricks = 0
-            self.ew.tricks = 0
-        else:
-            self.west.data.tricks = 0
-            self.south.data.tricks = 0
-            self.east.data.tricks = 0
-
         dealer_name = self.dealer.player_name
 
         self.bc_pre("^R%s^~ (%s%s^~) gives the cards a good shuffle...\n" % (dealer_name, self.get_color_code(self.dealer), self.dealer))
-        self.new_deck()
-        self.deck.shuffle()
 
-        # Deal out five cards each.
+        # The engine shuffles, deals out five cards each, and sorts the
+        # hakem's hand.
         self.bc_pre("^R%s^~ deals five cards out to each of the players.\n" % dealer_name)
-        for seat in self.seats:
-            seat.data.hand = Hand()
-        for i in range(5):
-            for seat in self.seats:
-                seat.data.hand.add(self.deck.discard())
-
-        # Clear the internal metadata about trumps.
-        self.trump_suit = None
-
-        # Sort the hakem's hand.
-        self.hakem.data.hand = sorted_hand(self.hakem.data.hand)
+        self.engine.start_deal()
 
         # Show the hakem their hand.
         if self.hakem.player:
@@ -313,22 +267,17 @@ class Hokm(SeatedGame):
             self.show_hand(self.hakem.player)
 
         # The hakem both chooses and, eventually, leads.
-        self.turn = self.hakem
-        self.layout.change_turn(self.hakem.data.who)
+        self.update_turn()
 
         # Shift into "choosing" mode.
         self.state.set("choosing")
 
-    def finish_deal(self):
+    def finish_deal(self, suit):
 
+        # The engine deals out the rest and sorts everyone's hands now that
+        # we have a trump suit.
         self.bc_pre("^R%s^~ finishes dealing the cards out.\n" % self.dealer.player_name)
-        while len(self.deck):
-            for seat in self.seats:
-                seat.data.hand.add(self.deck.discard())
-
-        # Sort everyone's hands now that we have a trump suit.
-        for seat in self.seats:
-            seat.data.hand = sorted_hand(seat.data.hand, self.trump_suit)
+        self.engine.choose(suit)
 
         # Show everyone their completed hands.
         self.show_hands()
@@ -345,7 +294,7 @@ class Hokm(SeatedGame):
             return
 
         print_str = "Your current hand:\n   "
-        print_str += hand_to_str(seat.data.hand, self.trump_suit)
+        print_str += hand_to_str(self.get_hand(seat), self.engine.trump_suit)
         print_str += "\n"
         self.tell_pre(player, print_str)
 
@@ -374,18 +323,20 @@ class Hokm(SeatedGame):
             return False
 
         # Do they even have this card?
-        if potential_card not in seat.data.hand:
+        hand = self.get_hand(seat)
+        if potential_card not in hand:
             self.tell_pre(player, "You don't have that card!\n")
             return False
 
         # Okay, it's a card in their hand.  First, let's do the "follow the
         # led suit" business.
         action_str = "^Wplays^~"
-        if self.led_suit:
+        led_suit = self.engine.led_suit
+        if led_suit:
 
             this_suit = potential_card.suit
-            if (this_suit != self.led_suit and
-               hand_has_suit(seat.data.hand, self.led_suit)):
+            if (this_suit != led_suit and
+               hand_has_suit(hand, led_suit)):
 
                 # You can't play off-suit if you can match the led suit.
                 self.tell_pre(player, "You can't throw off; you have the led suit.\n")
@@ -395,19 +346,77 @@ class Hokm(SeatedGame):
 
             # No led suit; they're the leader.
             action_str = "^Yleads^~ with"
-            self.led_suit = potential_card.suit
 
         # They either matched the led suit, didn't have any of it, or they
         # are themselves the leader.  Nevertheless, their play is valid.
-        seat.data.card = potential_card
-        self.trick.add(seat.data.hand.discard_specific(potential_card))
+        self.engine.play(potential_card)
         trump_str = ""
-        if potential_card.suit == self.trump_suit:
+        if potential_card.suit == self.engine.trump_suit:
             trump_str = ", a ^Rtrump^~"
         self.bc_pre("%s %s ^C%s^~%s.\n" % (self.get_sp_str(seat), action_str, card_to_str(potential_card, LONG), trump_str))
         self.layout.place(seat.data.who, potential_card)
         return potential_card
 
+    def get_side(self, seat):
+
+        # In 4p mode, the partnership the seat plays for; in 3p mode, it's
+        # every player for themselves.
+        return self.engine.side_of(self.seats.index(seat))
+
+    def get_side_seat(self, side):
+
+        # Only meaningful in 3p mode, where every side is a single seat.
+        return self.seats[self.engine.sides.index(side)]
+
+    def get_side_str(self, side):
+
+        if self.mode == 4:
+            if side == NORTH_SOUTH:
+                return "^RNorth/South^~"
+            return "^MEast/West^~"
+        return self.get_sp_str(self.get_side_seat(side))
+
+    def give_rest(self, side):
+
+        # The side takes every trick left in the hand.
+        remaining = self.engine.give_rest(side)
+        self.bc_pre("%s takes the remaining ^C%s^~.\n" % (self.get_side_str(side), get_plural_str(remaining, "trick")))
+
+    def claim(self, player):
+
+        seat = self.get_seat_of_player(player)
+        if not seat:
+            self.tell_pre(player, "You're not playing!\n")
+            return
+
+        if len(self.engine.trick):
+            self.tell_pre(player, "You can only claim between tricks.\n")
+            return
+
+        side = self.get_side(seat)
+        holds = self.engine.holds_rest(side)
+        if holds is None:
+            self.tell_pre(player, "That claim is too complicated to check; play on.\n")
+            return
+        elif not holds:
+            self.tell_pre(player, "You could still lose a trick; play on.\n")
+            return
+
+        self.bc_pre("%s claims the rest of the tricks.\n" % self.get_sp_str(seat))
+        self.give_rest(side)
+        self.finish_play(self.engine.hand_winner())
+
+    def auto_claim(self):
+
+        # If any side is sure to take every trick that's left, there's no
+        # point making everyone play them out.  Returns True if so.
+        for side in self.engine.sides:
+            if self.engine.holds_rest(side, QUICK_BUDGET):
+                self.bc_pre("The rest of the hand is decided.\n")
+                self.give_rest(side)
+                return True
+        return False
+
     def tick(self):
 
         # If all seats are full and active, autostart.
@@ -418,14 +427,14 @@ class Hokm(SeatedGame):
             self.bc_pre("The game has begun.\n")
 
             # Initialize everything by clearing the (non-existent) trick.
-            self.clear_trick()
+            self.layout.clear()
 
             # Pick a hakem at random.
-            self.hakem = random.choice(self.seats)
+            self.engine.hakem = self.seats.index(random.choice(self.seats))
+            self.update_hakem()
             self.bc_pre("Fate has spoken, and the starting hakem is %s!\n" % self.get_sp_str(self.hakem))
 
             # The dealer is always the player before the hakem.
-            self.dealer = self.prev_seat(self.hakem)
             self.start_deal()
 
     def choose(self, player, choose_str):
@@ -433,20 +442,20 @@ class Hokm(SeatedGame):
         choose_str = choose_str.lower()
 
         if choose_str in ("clubs", "c",):
-            self.trump_suit = CLUBS
+            suit = CLUBS
         elif choose_str in ("diamonds", "d",):
-            self.trump_suit = DIAMONDS
+            suit = DIAMONDS
         elif choose_str in ("hearts", "h",):
-            self.trump_suit = HEARTS
+            suit = HEARTS
         elif choose_str in ("spades", "s",):
-            self.trump_suit = SPADES
+            suit = SPADES
         else:
             self.tell_pre(player, "That's not a valid suit!\n")
             return
 
         # Success.  Declare it and finish the deal.
-        self.bc_pre("^Y%s^~ has picked ^R%s^~ as trumps.\n" % (player, self.trump_suit))
-        self.finish_deal()
+        self.bc_pre("^Y%s^~ has picked ^R%s^~ as trumps.\n" % (player, suit))
+        self.finish_deal(suit)
 
     def handle(self, player, command_str):
 
@@ -528,225 +537,105 @@ class Hokm(SeatedGame):
                         self.tell_pre(player, "Invalid play command.\n")
                     handled = True
 
+                elif primary in ("claim",):
+                    self.claim(player)
+                    handled = True
+
                 if card_played:
 
                     # A card hit the table.  We need to do stuff.
-                    if len(self.trick) == self.mode:
+                    if self.engine.trick_complete():
 
                         # Finish the trick up.
                         self.finish_trick()
 
-                        # Did that end the hand?
-                        winner = self.find_hand_winner()
+                        # Did that end the hand?  If not, are the rest
+                        # of the tricks a foregone conclusion?
+                        winner = self.engine.hand_winner()
+                        if not winner and self.auto_claim():
+                            winner = self.engine.hand_winner()
 
                         if winner:
-
-                            # Yup.  Resolve the hand...
-                            self.resolve_hand(winner)
-
-                            # And look for a winner.
-                            winner = self.find_winner()
-                            if winner:
-
-                                # Found a winner.  Finish.
-                                self.resolve(winner)
-                                self.finish()
-
-                            else:
-
-                                # No winner.  Redeal.
-                                self.start_deal()
+                            self.finish_play(winner)
 
                     else:
 
                         # Trick not over.  Rotate.
-                        self.turn = self.next_seat(self.turn)
-                        self.layout.change_turn(self.turn.data.who)
+                        self.update_turn()
                         if self.turn.player:
                             self.show_hand(self.turn.player)
 
         if not handled:
             self.tell_pre(player, "Invalid command.\n")
 
-    def finish_trick(self):
+    def finish_play(self, winner):
 
-        # Okay, we have a trick with four cards.  Which card won?
-        winner = handle_trick(self.trick, self.trump_suit)
+        # The hand is over.  Resolve it...
+        self.resolve_hand(winner)
 
-        # This /should/ just return one seat...
-        winning_seat_list = [x for x in self.seats if x.data.card == winner]
+        # And look for a winner.
+        winner = self.find_winner()
+        if winner:
 
-        if len(winning_seat_list) != 1:
-            self.server.log.log(self.log_prefix + "Something went horribly awry; trick ended without a finish.")
-            self.bc_pre("Something went horribly wrong; no one won the trick!  Tell the admin.\n")
-            return
+            # Found a winner.  Finish.
+            self.resolve(winner)
+            self.finish()
 
-        winning_seat = winning_seat_list[0]
-
-        # Print information about the winning card.
-        self.bc_pre("%s wins the trick with ^C%s^~.\n" % (self.get_sp_str(winning_seat), card_to_str(winner, LONG)))
-
-        # If there are four players, give the trick to the correct partnership.
-        if self.mode == 4:
-            if winning_seat == self.seats[0] or winning_seat == self.seats[2]:
-                self.ns.tricks += 1
-            else:
-                self.ew.tricks += 1
         else:
-            winning_seat.data.tricks += 1
 
-        # Clear the trick.
-        self.clear_trick()
+            # No winner.  Redeal.
+            self.start_deal()
 
-        # Set the next leader to the player who won.
-        self.turn = winning_seat
-        self.layout.change_turn(self.turn.data.who)
-        if self.turn.player:
-            self.show_hand(self.turn.player)
+    def finish_trick(self):
 
-    def find_hand_winner(self):
+        # Okay, we have a full trick.  The engine works out which card won,
+        # gives the trick to that side, and sets the winner to lead next.
+        position, winner = self.engine.finish_trick()
+        winning_seat = self.seats[position]
 
-        # In four-player mode, this is actually really simple; winning only
-        # occurs when one side has more than 6 tricks.
-        if self.mode == 4:
-            if self.ns.tricks > 6:
-                return self.ns
-            elif self.ew.tricks > 6:
-                return self.ew
-        else:
+        # Print information about the winning card.
+        self.bc_pre("%s wins the trick with ^C%s^~.\n" % (self.get_sp_str(winning_seat), card_to_str(winner, LONG)))
 
-            # In three-player mode, this is considerably less simple.  If
-            # one player has more tricks than either other player can possibly
-            # get, they win...
-            tricks_remaining = len(self.west.data.hand)
-            for seat in self.seats:
-                our_tricks = seat.data.tricks
-                prev_tricks = self.prev_seat(seat).data.tricks
-                next_tricks = self.next_seat(seat).data.tricks
-                if ((our_tricks > prev_tricks + tricks_remaining) and
-                   (our_tricks > next_tricks + tricks_remaining)):
-                    return seat
-
-                # ...orrr if there are no tricks left and the other two players
-                # tied for the number of tricks, we win as well.  3p Hokm, you
-                # so crazy.
-                if (not tricks_remaining) and prev_tricks == next_tricks:
-                    return seat
-
-                # There's also the case where one player gets the first seven;
-                # this is handled already for the short deck by the first check
-                # above, but has to have a specific check for the long-deck
-                # game.
-                if our_tricks == 7 and not prev_tricks and not next_tricks:
-                    return seat
-
-        # No winner yet.
-        return None
+        # Clear the trick, and show the next leader their hand.
+        self.layout.clear()
+        self.update_turn()
+        if self.turn.player:
+            self.show_hand(self.turn.player)
 
     def resolve_hand(self, winner):
 
-        # Assume the hakem won and there was no sweep; we'll adjust later.
-        hakem_won = True
-        swept = False
-
-        # 4p mode shenanigans first.
-        if self.mode == 4:
-
-            if winner == self.ns:
-                winning_str = "^RNorth/South^~"
-                if self.hakem != self.seats[0] and self.hakem != self.seats[2]:
-                    hakem_won = False
-                loser = self.ew
-            else:
-                winning_str = "^MEast/West^~"
-                if self.hakem != self.seats[1] and self.hakem != self.seats[3]:
-                    hakem_won = False
-                loser = self.ns
-
-            # Did the loser get no tricks?  If so, the winner swept!
-            if loser.tricks == 0:
-                swept = True
-
-        else:
-
-            # 3P mode.  Check whether the hakem really won...
-            if winner != self.hakem:
-                hakem_won = False
-
-            # ...and whether the winner swept.
-            prev_tricks = self.prev_seat(winner).data.tricks
-            next_tricks = self.next_seat(winner).data.tricks
-            if not prev_tricks and not next_tricks:
-                swept = True
-
-            winning_str = self.get_sp_str(winner)
+        # The engine scores the hand and, if the hakem lost it, unseats
+        # them: in 4p mode it just rotates, and in 3p mode the winner
+        # becomes hakem.
+        swept, addend, hakem_won = self.engine.finish_hand(winner)
 
         if swept:
             action_str = "^Yswept^~"
-
-            # 2 points if the hakem won, 3 if others did.
-            if hakem_won:
-                addend = 2
-            else:
-                addend = 3
         else:
-
-            # Standard win.  One point.
             action_str = "^Wwon^~"
-            addend = 1
 
         # Let everyone know.
-        self.bc_pre("%s %s the hand and gains ^C%s^~.\n" % (winning_str, action_str, get_plural_str(addend, "point")))
-
-        # Apply the score.
-        if self.mode == 4:
-            winner.score += addend
-        else:
-            winner.data.score += addend
+        self.bc_pre("%s %s the hand and gains ^C%s^~.\n" % (self.get_side_str(winner), action_str, get_plural_str(addend, "point")))
 
         # Show everyone's scores.
         self.bc_pre(self.get_score_str())
 
-        # Did the hakem not win?  If so, we need to have a new hakem and dealer.
+        # Did the hakem not win?  If so, we have a new hakem and dealer.
+        self.update_hakem()
         if not hakem_won:
-
-            # In 4p mode, it just rotates...
-            if self.mode == 4:
-                self.dealer = self.hakem
-                self.hakem = self.next_seat(self.hakem)
-            else:
-
-                # In 3p mode, the winner becomes hakem.
-                self.hakem = winner
-                self.dealer = self.prev_seat(self.hakem)
-
             self.bc_pre("The ^Yhakem^~ has been unseated!  The new hakem is %s.\n" % self.get_sp_str(self.hakem))
         else:
             self.bc_pre("%s remains the hakem.\n" % self.get_sp_str(self.hakem))
 
     def find_winner(self):
 
-        if self.mode == 4:
-
-            # Easy: has one of the sides reached a winning score?
-            if self.ns.score >= self.goal:
-                return self.ns
-            elif self.ew.score >= self.goal:
-                return self.ew
-
-        else:
-
-            # Have any of the players reached a winning score?
-            for seat in self.seats:
-                if seat.data.score >= self.goal:
-                    return seat
-
-        return None
+        # Has any side reached a winning score?
+        return self.engine.winner()
 
     def resolve(self, winner):
 
         if self.mode == 4:
-            if self.ns == winner:
+            if winner == NORTH_SOUTH:
                 name_one = self.seats[0].player_name
                 name_two = self.seats[2].player_name
             else:
@@ -754,4 +643,4 @@ class Hokm(SeatedGame):
                 name_two = self.seats[3].player_name
             self.bc_pre("^G%s^~ and ^G%s^~ win!\n" % (name_one, name_two))
         else:
-            self.bc_pre("^G%s^~ wins!\n" % winner.player_name)
+            self.bc_pre("^G%s^~ wins!\n" % self.get_side_seat(winner).player_name)
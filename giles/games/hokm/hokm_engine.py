@@ -0,0 +1,321 @@
+# Giles: hokm_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.double_dummy import claim_holds, DEFAULT_BUDGET
+from giles.games.engine import Engine
+from giles.games.hand import Hand, CardHand
+from giles.games.playing_card import PlayingCard, new_deck, CLUBS, DIAMONDS, HEARTS, SPADES, JACK, QUEEN, KING, ACE
+from giles.games.trick import handle_trick, hand_has_suit, sorted_hand
+
+# In 4p mode, positions 0 to 3 are North, West, South, and East, playing
+# in two partnerships.  In 3p mode, positions 0 to 2 are West, South, and
+# East, and every player is their own side.
+NORTH_SOUTH = "north_south"
+EAST_WEST = "east_west"
+THREE_PLAYER_SIDES = ("west", "south", "east")
+
+SUITS = (CLUBS, DIAMONDS, HEARTS, SPADES)
+
+def copy_hand(hand):
+
+    new_hand = Hand()
+    for card in hand:
+        new_hand.add(card)
+    return new_hand
+
+class HokmEngine(Engine):
+    """The rules of Hokm.  The side to play is a position.  At the start
+    of each hand, the hakem sees five cards and chooses trumps, so until
+    then moves are suits; after that they're cards from that position's
+    hand.  A hand ends as soon as one side is sure to have won it, and
+    the first side to the goal wins the game.
+
+    apply() plays a whole game through, dealing each new hand as the last
+    one ends; tables call the individual steps so they can talk about
+    each one as it happens.
+    """
+
+    def __init__(self, mode=4, short=True, goal=7):
+
+        super(HokmEngine, self).__init__()
+
+        self.mode = mode
+        self.short = short
+        self.goal = goal
+
+        if mode == 4:
+            self.sides = (NORTH_SOUTH, EAST_WEST)
+        else:
+            self.sides = THREE_PLAYER_SIDES
+
+        self.hakem = None
+        self.deck = Hand()
+        self.hands = [CardHand() for i in range(mode)]
+        self.trick = Hand()
+        self.played = [None] * mode
+        self.led_suit = None
+        self.trump_suit = None
+        self.tricks = dict([(x, 0) for x in self.sides])
+        self.scores = dict([(x, 0) for x in self.sides])
+        self.turn = None
+
+    def next_position(self, position):
+        return (position + 1) % self.mode
+
+    def prev_position(self, position):
+        return (position - 1) % self.mode
+
+    def dealer(self):
+
+        # The dealer is always the player before the hakem.
+        return self.prev_position(self.hakem)
+
+    def side_of(self, position):
+
+        # In 4p mode, the partnership the position plays for; in 3p mode,
+        # it's every player for themselves.
+        if self.mode == 4:
+            if position % 2:
+                return EAST_WEST
+            return NORTH_SOUTH
+        return self.sides[position]
+
+    def new_deck(self):
+
+        # In 4-player mode, it's a standard 52-card pack.
+        if self.mode == 4:
+            self.deck = new_deck()
+        else:
+
+            # If it's a short deck, 7-A are full; if a long deck, 3-A are.
+            full_ranks = [ACE, KING, QUEEN, JACK, '10', '9', '8', '7', '6']
+            if self.short:
+                short_rank = '5'
+            else:
+                full_ranks.extend(['5', '4', '3'])
+                short_rank = '2'
+
+            # Build the deck, full ranks first.
+            self.deck = Hand()
+            for suit in SUITS:
+                for rank in full_ranks:
+                    self.deck.add(PlayingCard(rank, suit))
+
+            # We only want three of the short rank.  No hearts, because.
+            for suit in (CLUBS, DIAMONDS, SPADES):
+                self.deck.add(PlayingCard(short_rank, suit))
+
+    def start_deal(self):
+
+        # Shuffles and deals five cards to each player.  The hakem both
+        # chooses trumps and, eventually, leads.
+        self.tricks = dict([(x, 0) for x in self.sides])
+        self.new_deck()
+        self.deck.shuffle()
+        self.hands = [CardHand() for i in range(self.mode)]
+        for i in range(5):
+            for hand in self.hands:
+                hand.add(self.deck.discard())
+
+        self.trump_suit = None
+        self.hands[self.hakem] = sorted_hand(self.hands[self.hakem])
+        self.clear_trick()
+        self.turn = self.hakem
+
+    def choose(self, suit):
+
+        # The hakem has picked trumps; deal out the rest of the cards and
+        # sort everyone's hands now that we have a trump suit.
+        self.trump_suit = suit
+        while len(self.deck):
+            for hand in self.hands:
+                hand.add(self.deck.discard())
+        self.hands = [sorted_hand(hand, suit) for hand in self.hands]
+
+    def clear_trick(self):
+
+        self.trick = Hand()
+        self.played = [None] * self.mode
+        self.led_suit = None
+
+    def can_play(self, card):
+
+        # You can't play off-suit if you can match the led suit.
+        hand = self.hands[self.turn]
+        if card not in hand:
+            return False
+        return (not self.led_suit or card.suit == self.led_suit or
+                not hand_has_suit(hand, self.led_suit))
+
+    def play(self, card):
+
+        # Plays a card for the side to play, and passes the turn if the
+        # trick isn't over.
+        if not self.led_suit:
+            self.led_suit = card.suit
+        self.played[self.turn] = card
+        self.trick.add(self.hands[self.turn].discard_specific(card))
+        if not self.trick_complete():
+            self.turn = self.next_position(self.turn)
+
+    def trick_complete(self):
+        return len(self.trick) == self.mode
+
+    def finish_trick(self):
+
+        # Gives the trick to the side of whoever played the winning card,
+        # who leads next.  Returns the winner's position and card.
+        winning_card = handle_trick(self.trick, self.trump_suit)
+        winner = self.played.index(winning_card)
+        self.tricks[self.side_of(winner)] += 1
+        self.clear_trick()
+        self.turn = winner
+        return (winner, winning_card)
+
+    def hand_winner(self):
+
+        # In four-player mode, this is actually really simple; winning only
+        # occurs when one side has more than 6 tricks.
+        tricks = self.tricks
+        if self.mode == 4:
+            for side in self.sides:
+                if tricks[side] > 6:
+                    return side
+            return None
+
+        # In three-player mode, this is considerably less simple.  If one
+        # player has more tricks than either other player can possibly get,
+        # they win...
+        tricks_remaining = len(self.hands[0])
+        for position in range(self.mode):
+            our_tricks = tricks[self.side_of(position)]
+            prev_tricks = tricks[self.side_of(self.prev_position(position))]
+            next_tricks = tricks[self.side_of(self.next_position(position))]
+            if ((our_tricks > prev_tricks + tricks_remaining) and
+               (our_tricks > next_tricks + tricks_remaining)):
+                return self.side_of(position)
+
+            # ...orrr if there are no tricks left and the other two players
+            # tied for the number of tricks, we win as well.  3p Hokm, you
+            # so crazy.
+            if (not tricks_remaining) and prev_tricks == next_tricks:
+                return self.side_of(position)
+
+            # There's also the case where one player gets the first seven;
+            # this is handled already for the short deck by the first check
+            # above, but has to have a specific check for the long-deck
+            # game.
+            if our_tricks == 7 and not prev_tricks and not next_tricks:
+                return self.side_of(position)
+
+        return None
+
+    def holds_rest(self, side, budget=DEFAULT_BUDGET):
+
+        # Can this side take every remaining trick, whatever everyone else
+        # does?  None if the solver gave up.
+        positions = [i for i in range(self.mode) if self.side_of(i) == side]
+        return claim_holds(self.hands, self.turn, self.trump_suit, positions,
+                           budget)
+
+    def give_rest(self, side):
+
+        # The side takes every trick left in the hand.  Returns how many
+        # that was.
+        remaining = len(self.hands[self.turn])
+        self.tricks[side] += remaining
+        for hand in self.hands:
+            hand.muck()
+        return remaining
+
+    def finish_hand(self, winner):
+
+        # Scores the hand for the side that won it: a point, or if everyone
+        # else took nothing, a sweep, which is worth 2 to the hakem's side
+        # and 3 to anyone else.  If the hakem didn't win, they're unseated;
+        # in 4p mode it rotates, and in 3p mode the winner takes over.
+        # Returns whether it was a sweep, the points, and whether the hakem
+        # won.
+        hakem_won = (self.side_of(self.hakem) == winner)
+        swept = not [x for x in self.sides if x != winner and self.tricks[x]]
+
+        if swept:
+            if hakem_won:
+                addend = 2
+            else:
+                addend = 3
+        else:
+            addend = 1
+        self.scores[winner] += addend
+
+        if not hakem_won:
+            if self.mode == 4:
+                self.hakem = self.next_position(self.hakem)
+            else:
+                self.hakem = self.sides.index(winner)
+
+        return (swept, addend, hakem_won)
+
+    def legal_moves(self):
+
+        if self.winner() or self.turn is None:
+            return []
+        if not self.trump_suit:
+            return list(SUITS)
+        return [card for card in self.hands[self.turn] if self.can_play(card)]
+
+    def is_legal(self, move):
+
+        if self.turn is None:
+            return False
+        if not self.trump_suit:
+            return move in SUITS
+        return self.can_play(move)
+
+    def apply(self, move):
+
+        if not self.trump_suit:
+            self.choose(move)
+            return
+
+        self.play(move)
+        if self.trick_complete():
+            self.finish_trick()
+            hand_winner = self.hand_winner()
+            if hand_winner:
+                self.finish_hand(hand_winner)
+                if not self.winner():
+                    self.start_deal()
+
+    def winner(self):
+
+        # Has any side reached a winning score?
+        for side in self.sides:
+            if self.scores[side] >= self.goal:
+                return side
+        return None
+
+    def copy(self):
+
+        new_engine = HokmEngine.__new__(HokmEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.deck = copy_hand(self.deck)
+        new_engine.hands = [hand.copy() for hand in self.hands]
+        new_engine.trick = copy_hand(self.trick)
+        new_engine.played = self.played[:]
+        new_engine.tricks = dict(self.tricks)
+        new_engine.scores = dict(self.scores)
+        return new_engine
@@ -0,0 +1,215 @@
+# Giles: metamorphosis_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.connectivity import flatten, group_connects
+from giles.games.connectivity import EDGE_TOP, EDGE_BOTTOM, EDGE_LEFT, EDGE_RIGHT
+from giles.games.engine import Engine
+from giles.games.geometry import SQUARE
+from giles.games.metamorphosis.metamorphosis_groups import GroupCounter
+
+BLACK = "black"
+WHITE = "white"
+
+# The move that swaps Black's first flip.
+SWAP = "swap"
+
+# Why a flip isn't allowed.
+INCREASES_GROUPS = "increases_groups"
+KO_NOT_ALLOWED = "ko_not_allowed"
+KO_TWICE = "ko_twice"
+KO_REPEAT = "ko_repeat"
+
+class MetamorphosisEngine(Engine):
+    """The rules of Metamorphosis.  The board is board[row][col]; moves
+    are (row, col) tuples, flipping the piece there, plus SWAP, which
+    White may play as their first move.
+
+    A flip must not increase the number of groups on the board.  One that
+    leaves it the same is a ko move, which is only allowed in ko fight
+    mode, never twice in a row by the same side, and never on the cell
+    the opponent just flipped.
+    """
+
+    def __init__(self, size, ko_fight=True):
+
+        super(MetamorphosisEngine, self).__init__()
+
+        self.size = size
+        self.ko_fight = ko_fight
+
+        # Generate the starting checkered layout, two rows at a time.
+        white_first_row = []
+        black_first_row = []
+        for c in range(size):
+            if c % 2:
+                white_first_row.append(BLACK)
+                black_first_row.append(WHITE)
+            else:
+                white_first_row.append(WHITE)
+                black_first_row.append(BLACK)
+        self.board = []
+        for r in range(size / 2):
+            self.board.append(white_first_row[:])
+            self.board.append(black_first_row[:])
+
+        # Count the number of groups on the board.  Should be size^2.
+        self.groups = GroupCounter(self.board, size)
+        self.group_count = self.groups.count
+
+        self.turn = BLACK
+        self.last_mover = None
+        self.move_count = 0
+        self.last_was_ko = {BLACK: False, WHITE: False}
+        self.last_r = None
+        self.last_c = None
+        self.resigner = None
+
+    def is_valid(self, row, col):
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    def other(self, color):
+
+        if color == BLACK:
+            return WHITE
+        return BLACK
+
+    def can_swap(self):
+
+        # White can swap only as the reply to Black's first flip.
+        return self.move_count == 1
+
+    def check_flip(self, row, col):
+
+        # Works out whether the side to play may flip (row, col), without
+        # changing anything.  Returns the reason it may not (or None), whether
+        # it's a ko move, and a plan to hand to flip() if it's made.
+        new_group_count, plan = self.groups.plan_flip(row, col)
+        if new_group_count > self.group_count:
+            return (INCREASES_GROUPS, False, plan)
+
+        if new_group_count == self.group_count:
+            if not self.ko_fight:
+                return (KO_NOT_ALLOWED, True, plan)
+            elif self.last_was_ko[self.turn]:
+                return (KO_TWICE, True, plan)
+            elif row == self.last_r and col == self.last_c:
+                return (KO_REPEAT, True, plan)
+            return (None, True, plan)
+
+        return (None, False, plan)
+
+    def flip_piece(self, row, col, plan=None):
+
+        # Flips the piece and brings the group count up to date.  A plan
+        # from check_flip() for this same cell saves redoing its work.
+        if not plan:
+            plan = self.groups.plan_flip(row, col)[1]
+
+        if self.board[row][col] == BLACK:
+            self.board[row][col] = WHITE
+        else:
+            self.board[row][col] = BLACK
+
+        self.group_count = self.groups.apply_flip(plan)
+
+    def flip(self, row, col, is_ko, plan):
+
+        # Makes a flip that check_flip() allowed, and passes the turn.
+        self.flip_piece(row, col, plan)
+        self.last_r = row
+        self.last_c = col
+        self.last_was_ko[self.turn] = is_ko
+        self.end_turn()
+
+    def swap(self):
+
+        # Like Hex, a swap requires a translation to make it the equivalent
+        # move for the other player.
+        self.flip_piece(self.last_r, self.last_c)
+        self.flip_piece(self.last_c, self.last_r)
+        self.last_c, self.last_r = self.last_r, self.last_c
+        self.end_turn()
+
+    def end_turn(self):
+
+        self.move_count += 1
+        self.last_mover = self.turn
+        self.turn = self.other(self.turn)
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+
+        moves = []
+        for row in range(self.size):
+            for col in range(self.size):
+                if not self.check_flip(row, col)[0]:
+                    moves.append((row, col))
+        if self.can_swap():
+            moves.append(SWAP)
+        return moves
+
+    def is_legal(self, move):
+
+        if move == SWAP:
+            return self.can_swap()
+        row, col = move
+        return self.is_valid(row, col) and not self.check_flip(row, col)[0]
+
+    def apply(self, move):
+
+        if move == SWAP:
+            self.swap()
+        else:
+            row, col = move
+            problem, is_ko, plan = self.check_flip(row, col)
+            self.flip(row, col, is_ko, plan)
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        # If someone resigned, this is the easiest thing ever.
+        if self.resigner:
+            return self.other(self.resigner)
+
+        if not self.last_mover:
+            return None
+
+        # This is like most connection games; we look for a group that
+        # touches both of a player's edges.
+        cells = flatten(self.board)
+        found_winner = None
+        if group_connects(cells, WHITE, SQUARE, self.size, self.size, EDGE_LEFT | EDGE_RIGHT):
+            found_winner = WHITE
+        elif group_connects(cells, BLACK, SQUARE, self.size, self.size, EDGE_TOP | EDGE_BOTTOM):
+            found_winner = BLACK
+
+        # ...except that it has to be at the end of the OTHER player's turn!
+        if found_winner and found_winner != self.last_mover:
+            return found_winner
+        return None
+
+    def copy(self):
+
+        new_engine = MetamorphosisEngine.__new__(MetamorphosisEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.board = [row[:] for row in self.board]
+        new_engine.groups = self.groups.copy(new_engine.board)
+        new_engine.last_was_ko = dict(self.last_was_ko)
+        return new_engine
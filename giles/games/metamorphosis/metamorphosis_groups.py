@@ -0,0 +1,230 @@
+# Giles: metamorphosis_groups.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.geometry import get_coords, get_neighbours, SQUARE
+
+# The eight cells around a cell, in order around the ring; consecutive
+# entries are orthogonally adjacent to each other, and the even entries are
+# the cell's own orthogonal neighbours.
+RING_DELTAS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+class GroupCounter(object):
+    """Keeps a running count of the orthogonally-connected single-colour
+    groups on a Metamorphosis board, where every move flips one cell.
+
+    Groups live in a union-find with path compression.  Cells don't map to
+    union-find nodes one-to-one: a flipped cell gets a fresh node (its old
+    one stays behind in its old group's tree, no longer counted), and when
+    a flip splits a group, every piece but the largest is moved onto a
+    fresh node of its own.  That way merges are ordinary unions and splits
+    never have to take a tree apart.
+
+    Most flips are handled by looking at the eight cells around the flipped
+    one; only when that can't rule out a split do we walk the old group.
+    """
+
+    def __init__(self, board, size):
+
+        self.board = board
+        self.size = size
+        self.neighbours = get_neighbours(SQUARE, size, size)
+        self.coords = get_coords(size, size)
+        self.rebuild()
+
+    def rebuild(self):
+
+        cell_count = self.size * self.size
+        self.node = range(cell_count)
+        self.parent = range(cell_count)
+        self.live = [1] * cell_count
+        self.count = cell_count
+
+        for index in range(cell_count):
+            colour = self.colour(index)
+            for neighbour in self.neighbours[index]:
+                if neighbour > index and self.colour(neighbour) == colour:
+                    self.union(self.node[index], self.node[neighbour])
+
+    def copy(self, board):
+
+        # A copy that follows board, which must match the one we follow.
+        # The neighbour and coordinate tables are shared, cached and never
+        # change.
+        new_counter = GroupCounter.__new__(GroupCounter)
+        new_counter.__dict__.update(self.__dict__)
+        new_counter.board = board
+        new_counter.node = self.node[:]
+        new_counter.parent = self.parent[:]
+        new_counter.live = self.live[:]
+        return new_counter
+
+    def colour(self, index):
+
+        r, c = self.coords[index]
+        return self.board[r][c]
+
+    def find(self, node):
+
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def group_of(self, index):
+        return self.find(self.node[index])
+
+    def union(self, a, b):
+
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return a
+
+        if self.live[a] < self.live[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.live[a] += self.live[b]
+        self.count -= 1
+        return a
+
+    def new_node(self, live):
+
+        node = len(self.parent)
+        self.parent.append(node)
+        self.live.append(live)
+        self.count += 1
+        return node
+
+    def locally_connected(self, index, colour):
+
+        # Are all of this cell's same-coloured orthogonal neighbours joined
+        # by same-coloured cells in the ring around it?  If so, flipping
+        # this cell can't split its group.
+        row, col = self.coords[index]
+        ring = []
+        for r_delta, c_delta in RING_DELTAS:
+            r = row + r_delta
+            c = col + c_delta
+            ring.append(0 <= r < self.size and 0 <= c < self.size and
+                        self.board[r][c] == colour)
+
+        if False not in ring:
+            return True
+
+        # Walk the ring starting just after a gap, numbering each run of
+        # same-coloured cells, and see how many runs hold a neighbour.
+        start = ring.index(False)
+        run = 0
+        runs_seen = set()
+        for step in range(1, 9):
+            position = (start + step) % 8
+            if not ring[position]:
+                continue
+            if not ring[(position - 1) % 8]:
+                run += 1
+            if not position % 2:
+                runs_seen.add(run)
+
+        return len(runs_seen) <= 1
+
+    def split_pieces(self, index, staying):
+
+        # Walks the old group, minus this cell, from each of the neighbours
+        # that stay in it.  Returns the list of pieces (lists of cells) it
+        # falls into.
+        colour = self.colour(index)
+        seen = set([index])
+        pieces = []
+        for start in staying:
+            if start in seen:
+                continue
+            seen.add(start)
+            piece = [start]
+            stack = [start]
+            while stack:
+                cell = stack.pop()
+                for neighbour in self.neighbours[cell]:
+                    if neighbour not in seen and self.colour(neighbour) == colour:
+                        seen.add(neighbour)
+                        piece.append(neighbour)
+                        stack.append(neighbour)
+            pieces.append(piece)
+        return pieces
+
+    def plan_flip(self, row, col):
+
+        # Works out, without changing anything, what the group count would
+        # be if the cell at (row, col) flipped.  Returns that count and a
+        # plan to hand to apply_flip() once the board has been flipped.
+        index = row * self.size + col
+        colour = self.colour(index)
+
+        joining = set()
+        staying = []
+        for neighbour in self.neighbours[index]:
+            if self.colour(neighbour) == colour:
+                staying.append(neighbour)
+            else:
+                joining.add(self.group_of(neighbour))
+
+        # The flipped cell is a new group that then swallows every group of
+        # its new colour it touches; its old group loses it, and either
+        # vanishes, stays whole, or splits.
+        pieces = None
+        if len(staying) > 1 and not self.locally_connected(index, colour):
+            pieces = self.split_pieces(index, staying)
+            if len(pieces) == 1:
+                pieces = None
+
+        if not staying:
+            left_behind = 0
+        elif pieces:
+            left_behind = len(pieces)
+        else:
+            left_behind = 1
+
+        return self.count + left_behind - len(joining), (index, staying, pieces)
+
+    def apply_flip(self, plan):
+
+        index, staying, pieces = plan
+
+        # Take the cell out of its old group.
+        old_group = self.group_of(index)
+        self.live[old_group] -= 1
+        if not staying:
+            self.count -= 1
+
+        # If the old group split, leave the largest piece where it was and
+        # move the rest onto new nodes.
+        if pieces:
+            pieces = sorted(pieces, key=len)
+            for piece in pieces[:-1]:
+                node = self.new_node(len(piece))
+                self.live[old_group] -= len(piece)
+                for cell in piece:
+                    self.node[cell] = node
+
+        # Now the cell itself, in its new colour.
+        node = self.new_node(1)
+        self.node[index] = node
+        colour = self.colour(index)
+        for neighbour in self.neighbours[index]:
+            if self.colour(neighbour) == colour:
+                self.union(node, self.node[neighbour])
+
+        return self.count
@@ -39,6 +39,10 @@ SUITS = [CLUBS, DIAMONDS, HEARTS, SPADES]
 SHORT = "short"
 LONG = "long"
 
+# Every card ever made, keyed by (class, rank, suit, ace_high).  Cards are
+# immutable, so there's only ever one of each.
+_interned = {}
+
 class PlayingCard(object):
     """PlayingCard is an implementation of a traditional 52-card deck of playing
     cards.
@@ -52,14 +56,99 @@ class PlayingCard(object):
     is not a bug; it allows for simple constructions such as "if mycard in
     myhand" without having to go through absurd gymnastics.
 
+    Cards are immutable flyweights: PlayingCard(rank, suit) hands back the one
+    shared instance of that card, with its value worked out once, when it
+    was first made, and stored as .ordinal.  Each standard card and joker
+    also has a small-integer .id, unique among cards with the same ace_high
+    setting (0-51 for the deck, ordered by suit and then by value, and 52
+    and 53 for the black and red jokers), for games that want to keep
+    hands as bitmasks.  Cards that aren't part of a standard deck have an
+    .id of None.
+
     Methods of note are:  __repr__(), value(), and all ordinal comparisons, e.g.
     __lt__().
     """
 
+    __slots__ = ("rank", "suit", "ace_high", "ordinal", "id", "_hash")
+
+    SUIT_ORDER = SUITS
+    SUIT_SIZE = 13
+    JOKER_SUITS = [BLACK, RED]
+
+    def __new__(cls, r=None, s=None, ace_high=True):
+
+        # 10 and '10' are the same rank; store the string form.
+        if type(r) == int:
+            r = str(r)
+
+        key = (cls, r, s, ace_high)
+        card = _interned.get(key)
+        if card is None:
+            card = object.__new__(cls)
+            ordinal = cls.rank_value(r, ace_high)
+            object.__setattr__(card, "rank", r)
+            object.__setattr__(card, "suit", s)
+            object.__setattr__(card, "ace_high", ace_high)
+            object.__setattr__(card, "ordinal", ordinal)
+            object.__setattr__(card, "id", cls.card_id(r, s, ordinal, ace_high))
+            object.__setattr__(card, "_hash", hash((ordinal, s)))
+            _interned[key] = card
+        return card
+
     def __init__(self, r=None, s=None, ace_high=True):
-        self.rank = r
-        self.suit = s
-        self.ace_high = ace_high
+
+        # Everything was set up in __new__().
+        pass
+
+    @staticmethod
+    def rank_value(r, ace_high):
+        if r == JOKER or r is None:
+            return None
+        if r.isdigit():
+            return int(r)
+        else:
+            if r == ACE:
+                if ace_high:
+                    return 14
+                else:
+                    return 1
+            elif r == JACK:
+                return 11
+            elif r == QUEEN:
+                return 12
+            elif r == KING:
+                return 13
+            else:
+                return None
+
+    @classmethod
+    def card_id(cls, r, s, ordinal, ace_high):
+        if r == JOKER and s in cls.JOKER_SUITS:
+            return len(cls.SUIT_ORDER) * cls.SUIT_SIZE + cls.JOKER_SUITS.index(s)
+        if ordinal is None or s not in cls.SUIT_ORDER:
+            return None
+
+        # Lowest card in the suit is position zero.
+        if ace_high:
+            position = ordinal - 2
+        else:
+            position = ordinal - 1
+        return cls.SUIT_ORDER.index(s) * cls.SUIT_SIZE + position
+
+    def __setattr__(self, name, value):
+        raise AttributeError("cards are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("cards are immutable")
+
+    def __reduce__(self):
+
+        # Unpickling (and copying) goes back through __new__(), so it gets
+        # the interned card rather than a duplicate.
+        return (self.__class__, (self.rank, self.suit, self.ace_high))
+
+    def __hash__(self):
+        return self._hash
 
     def __repr__(self):
         if self.rank == JOKER:
@@ -68,66 +157,62 @@ class PlayingCard(object):
             return ("the %s of %s" % (self.rank, self.suit))
 
     def __lt__(self, other):
-        if not (self.value() or other.value()):
+        mine = self.ordinal
+        theirs = other.ordinal
+        if not (mine or theirs):
             return NotImplemented
         else:
-            return self.value() < other.value()
+            return mine < theirs
 
     def __le__(self, other):
-        if not (self.value() or other.value()):
+        mine = self.ordinal
+        theirs = other.ordinal
+        if not (mine or theirs):
             return NotImplemented
         else:
-            return self.value() <= other.value()
+            return mine <= theirs
 
     def __eq__(self, other):
-        if not (self.value() or other.value()):
+        if self is other:
+            return True
+        mine = self.ordinal
+        theirs = other.ordinal
+        if not (mine or theirs):
             return NotImplemented
         else:
             # okay, so here's an interesting edge case.  Cards of differing
             # ranks of course can be compared.  however, the Three of Clubs is
             # not the same card as the Three of Diamonds.
-            return self.value() == other.value() and self.suit == other.suit
+            return mine == theirs and self.suit == other.suit
 
     def __ge__(self, other):
-        if not (self.value() or other.value()):
+        mine = self.ordinal
+        theirs = other.ordinal
+        if not (mine or theirs):
             return NotImplemented
         else:
-            return self.value() >= other.value()
+            return mine >= theirs
 
     def __gt__(self, other):
-        if not (self.value() or other.value()):
+        mine = self.ordinal
+        theirs = other.ordinal
+        if not (mine or theirs):
             return NotImplemented
         else:
-            return self.value() > other.value()
+            return mine > theirs
 
     def __ne__(self, other):
-        if not (self.value() or other.value()):
+        if self is other:
+            return False
+        mine = self.ordinal
+        theirs = other.ordinal
+        if not (mine or theirs):
             return NotImplemented
         else:
-            return self.value() != other.value() or self.suit != other.suit
+            return mine != theirs or self.suit != other.suit
 
     def value(self):
-        r = self.rank
-        if r == JOKER:
-            return None
-        if type(r) == int:
-            return r
-        if r.isdigit():
-            return int(r)
-        else:
-            if r == ACE:
-                if self.ace_high:
-                    return 14
-                else:
-                    return 1
-            elif r == JACK:
-                return 11
-            elif r == QUEEN:
-                return 12
-            elif r == KING:
-                return 13
-            else:
-                return None
+        return self.ordinal
 
 def str_to_card(card_str):
 
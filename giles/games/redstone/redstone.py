@@ -16,6 +16,8 @@
 
 from giles.games.seated_game import SeatedGame
 from giles.games.piece import Piece
+from giles.games.redstone.redstone_engine import RedstoneEngine, BLACK, WHITE
+from giles.games.redstone.redstone_engine import STONE, REDSTONE
 from giles.games.seat import Seat
 from giles.games.square_grid_layout import SquareGridLayout, COLS
 from giles.state import State
@@ -25,9 +27,6 @@ from giles.utils import demangle_move, get_plural_str
 MIN_SIZE = 4
 MAX_SIZE = 26
 
-# Deltas are useful.
-CONNECTION_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
-
 class Redstone(SeatedGame):
     """A Redstone game table implementation.  Invented in 2012 by Mark Steere.
     """
@@ -54,32 +53,29 @@ class Redstone(SeatedGame):
         self.turn = None
         self.black = self.seats[0]
         self.black.data.seat_str = "^KBlack^~"
-        self.black.data.made_move = False
+        self.black.data.color = BLACK
         self.white = self.seats[1]
         self.white.data.seat_str = "^WWhite^~"
-        self.white.data.made_move = False
-        self.resigner = None
+        self.white.data.color = WHITE
+        self.engine = None
         self.layout = None
 
         # Like most abstracts, Redstone doesn't need to differentiate between
         # the pieces on the board.
-        self.bp = Piece("^K", "x", "X")
-        self.bp.data.owner = self.black
-        self.black.data.piece = self.bp
-        self.wp = Piece("^W", "o", "O")
-        self.wp.data.owner = self.white
-        self.white.data.piece = self.wp
+        self.black.data.piece = Piece("^K", "x", "X")
+        self.white.data.piece = Piece("^W", "o", "O")
         self.rp = Piece("^R", "r", "R")
-        self.rp.data.owner = None
 
         # Initialize the starting layout.
         self.init_layout()
 
     def init_layout(self):
 
-        # Create the layout.  Empty, so easy.
+        # Create the layout.  Empty, so easy.  The engine holds the board
+        # and the rules; the layout just shows it.
         self.layout = SquareGridLayout(highlight_color="^I")
         self.layout.resize(self.width, self.height)
+        self.engine = RedstoneEngine(self.width, self.height)
 
     def get_sp_str(self, seat):
 
@@ -92,9 +88,12 @@ class Redstone(SeatedGame):
 
         return "It is ^C%s^~'s turn (%s).\n" % (self.turn.player_name, self.turn.data.seat_str)
 
+    def get_board_str(self):
+        return str(self.layout)
+
     def show(self, player):
 
-        player.tell_cc(self.layout)
+        self.tell_board(player)
         player.tell_cc(self.get_turn_str())
 
     def send_board(self):
@@ -138,89 +137,6 @@ class Redstone(SeatedGame):
         self.bc_pre("^R%s^~ has set the board size to ^C%d^Gx^C%d^~.\n" % (player, w, h))
         self.init_layout()
 
-    def recurse_capture(self, seat, row, col, visited):
-
-        # If it's a dud coordinate, bail.
-        if not self.layout.is_valid(row, col):
-            return None
-
-        # If we've been here, bail.
-        if visited[row][col]:
-            return None
-
-        # If it's an empty space, then it's a liberty.
-        pos = self.layout.grid[row][col]
-        if not pos:
-            return []
-
-        # If it's a piece of the other player, bail.
-        if pos.data.owner != seat:
-            return None
-
-        # Okay.  New piece, right color.  Mark it visited.
-        visited[row][col] = True
-
-        # Recurse on adjacencies.  If any return an empty list, this group has
-        # a liberty and we return an empty list as well; otherwise we return a
-        # concatenation of pieces found further on, for easy removal.
-        return_list = [(row, col)]
-        for r_delta, c_delta in CONNECTION_DELTAS:
-            result = self.recurse_capture(seat, row + r_delta, col + c_delta, visited)
-            if result == []:
-
-                # Liberty!  Bail.
-                return []
-            elif result:
-
-                # Found a subgroup with no liberties.  Extend.
-                return_list.extend(result)
-
-        # We never found a liberty.  Return the list of pieces.
-        return return_list
-
-    def move_is_capture(self, piece, row, col):
-
-        # Tentatively place the piece here.
-        self.layout.place(piece, row, col, update=False)
-
-        # Build the visitation list.
-        visited = []
-        for r in range(self.height):
-            visited.append([None] * self.width)
-
-        # If this piece is not a redstone, we check its own liberties.  We
-        # can quickly bail if this succeeds.
-        if piece != self.rp:
-            if self.recurse_capture(piece.data.owner, row, col, visited):
-                self.layout.remove(row, col, update=False)
-                return True
-
-        # Now we check the liberties of all four adjacent locations, assuming
-        # there's a piece there and it's not a redstone.
-        for r_delta, c_delta in CONNECTION_DELTAS:
-            new_r = row + r_delta
-            new_c = col + c_delta
-            if self.layout.is_valid(new_r, new_c):
-                pos = self.layout.grid[new_r][new_c]
-                if pos and pos != self.rp:
-
-                    # We have to rebuild the visited list for each piece we
-                    # check, because of the recursive "bail fast" method we use
-                    # for detecting liberties.  This should be improved.
-                    visited = []
-                    for r in range(self.height):
-                        visited.append([None] * self.width)
-
-                    if self.recurse_capture(pos.data.owner, new_r, new_c, visited):
-
-                        # Bail.
-                        self.layout.remove(row, col, update=False)
-                        return True
-
-        # We never found a capture.  Remove and return.
-        self.layout.remove(row, col, update=False)
-        return False
-
     def move(self, player, move_bits):
 
         seat = self.get_seat_of_player(player)
@@ -245,57 +161,20 @@ class Redstone(SeatedGame):
             return False
 
         # Is it a capturing move?
-        piece = seat.data.piece
-        if self.move_is_capture(piece, row, col):
+        index = row * self.width + col
+        if not self.engine.is_legal((STONE, index)):
             self.tell_pre(player, "That would cause a capture.\n")
             return False
 
         # Valid.  Put a piece there.
         move_str = "%s%s" % (COLS[col], row + 1)
-        self.layout.place(piece, row, col, True)
+        self.engine.apply((STONE, index))
+        self.layout.place(seat.data.piece, row, col, True)
 
         # Update the board.
         self.bc_pre("%s places a piece at ^C%s^~.\n" % (self.get_sp_str(seat), move_str))
-
-        seat.data.made_move = True
         return True
 
-    def capture(self, row, col):
-
-        # If for some reason this is called and there's not a redstone at this
-        # location, bail.
-        if self.layout.grid[row][col] != self.rp:
-            return -1
-
-        # All right.  Check all four adjacencies; if they no longer have a
-        # liberty, capture them.  Note that we come up with the list first,
-        # and /then/ execute the captures, as doing them as we find them may
-        # give groups liberties during the removal process.
-
-        visited = []
-        for r in range(self.height):
-            visited.append([None] * self.width)
-
-        capture_list = []
-        for r_delta, c_delta in CONNECTION_DELTAS:
-            new_r = row + r_delta
-            new_c = col + c_delta
-            if self.layout.is_valid(new_r, new_c):
-                loc = self.layout.grid[new_r][new_c]
-                if loc and loc != self.rp:
-                    captures = self.recurse_capture(loc.data.owner, new_r, new_c, visited)
-                    if captures:
-                        capture_list.extend([x for x in captures if x not in capture_list])
-
-        # Remove all pieces in the capture list.
-        for capture_r, capture_c in capture_list:
-            self.layout.remove(capture_r, capture_c, update=False)
-
-        self.layout.update()
-
-        # Return the number of pieces captured.
-        return len(capture_list)
-
     def red(self, player, move_bits):
 
         seat = self.get_seat_of_player(player)
@@ -320,21 +199,21 @@ class Redstone(SeatedGame):
             return False
 
         # Is it not a capturing move?
-        piece = self.rp
-        if not self.move_is_capture(piece, row, col):
+        index = row * self.width + col
+        if not self.engine.is_legal((REDSTONE, index)):
             self.tell_pre(player, "That would not cause a capture.\n")
             return False
 
-        # Valid.  Put the piece there.
+        # Valid.  Put the piece there.  Redstones by definition make
+        # captures, so take those stones off the board too.
         move_str = "%s%s" % (COLS[col], row + 1)
-        self.layout.place(piece, row, col, True)
-
-        # Redstones by definition make captures.
-        capture_count = self.capture(row, col)
-
-        self.bc_pre("%s places a ^Rredstone^~ at ^C%s^~, ^Ycapturing %s^~.\n" % (self.get_sp_str(seat), move_str, get_plural_str(capture_count, "stone")))
+        capture_list = self.engine.apply((REDSTONE, index))
+        self.layout.place(self.rp, row, col, True)
+        for capture_r, capture_c in capture_list:
+            self.layout.remove(capture_r, capture_c, update=False)
+        self.layout.update()
 
-        seat.data.made_move = True
+        self.bc_pre("%s places a ^Rredstone^~ at ^C%s^~, ^Ycapturing %s^~.\n" % (self.get_sp_str(seat), move_str, get_plural_str(len(capture_list), "stone")))
         return True
 
     def resign(self, player):
@@ -348,7 +227,7 @@ class Redstone(SeatedGame):
             self.tell_pre(player, "You must wait for your turn to resign.\n")
             return False
 
-        self.resigner = seat
+        self.engine.resign(seat.data.color)
         self.bc_pre("%s is resigning from the game.\n" % self.get_sp_str(seat))
         return True
 
@@ -442,35 +321,13 @@ class Redstone(SeatedGame):
 
     def find_winner(self):
 
-        # Did someone resign?
-        if self.resigner == self.white:
+        # The engine handles both resignations and wiped-out players.
+        winner = self.engine.winner()
+        if winner == BLACK:
             return self.black
-        elif self.resigner == self.black:
+        elif winner == WHITE:
             return self.white
 
-        # If one player has no pieces left, the other player won.  If neither
-        # player has a piece, mover wins.
-        found_white = False
-        found_black = False
-        for r in range(self.height):
-            for c in range(self.width):
-                loc = self.layout.grid[r][c]
-                if loc:
-                    if loc.data.owner == self.black:
-                        found_black = True
-                    elif loc.data.owner == self.white:
-                        found_white = True
-
-        if not found_black and self.black.data.made_move:
-            if not found_white and self.white.data.made_move:
-
-                # Mover wins.
-                return self.turn
-            else:
-                return self.white
-        elif not found_white and self.white.data.made_move:
-            return self.black
-
         # No winner yet.
         return None
 
@@ -0,0 +1,135 @@
+# Giles: redstone_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.engine import Engine
+from giles.games.redstone.redstone_groups import GroupTracker
+
+BLACK = "black"
+WHITE = "white"
+
+# The two kinds of move.
+STONE = "stone"
+REDSTONE = "redstone"
+
+class RedstoneEngine(Engine):
+    """The rules of Redstone.  Moves are (kind, index) pairs, where kind
+    is STONE or REDSTONE and index is a flat cell index.  A stone may only
+    go where it captures nothing; a redstone only where it captures
+    something.
+    """
+
+    def __init__(self, width, height):
+
+        super(RedstoneEngine, self).__init__()
+
+        self.width = width
+        self.height = height
+        self.groups = GroupTracker(width, height)
+
+        self.turn = BLACK
+        self.last_mover = None
+        self.made_move = {BLACK: False, WHITE: False}
+        self.resigner = None
+
+    def is_valid(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self.width
+
+    def is_empty(self, index):
+        return self.groups.is_empty(index)
+
+    def other(self, color):
+
+        if color == BLACK:
+            return WHITE
+        return BLACK
+
+    def captures(self, kind, index):
+
+        # Returns the groups the move would capture, if any, as a list
+        # that can be handed back to the tracker when the move is actually
+        # made.  Empty (and thus false) if there's no capture.
+        if kind == REDSTONE:
+            owner = None
+        else:
+            owner = self.turn
+        return self.groups.plan(owner, index)
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+
+        moves = []
+        for index in range(self.width * self.height):
+            if self.groups.is_empty(index):
+                if not self.captures(STONE, index):
+                    moves.append((STONE, index))
+                if self.captures(REDSTONE, index):
+                    moves.append((REDSTONE, index))
+        return moves
+
+    def is_legal(self, move):
+
+        kind, index = move
+        if not self.groups.is_empty(index):
+            return False
+        captured = self.captures(kind, index)
+        if kind == REDSTONE:
+            return bool(captured)
+        return not captured
+
+    def apply(self, move):
+
+        # Returns the (row, col) of every stone captured.
+        kind, index = move
+        if kind == REDSTONE:
+            capture_list = self.groups.place(None, index)
+        else:
+            capture_list = self.groups.place(self.turn, index, [])
+        self.made_move[self.turn] = True
+        self.last_mover = self.turn
+        self.turn = self.other(self.turn)
+        return capture_list
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        # Did someone resign?
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # If one player has no pieces left, the other player won.  If
+        # neither player has a piece, mover wins.
+        found_black = self.groups.stone_count(BLACK) > 0
+        found_white = self.groups.stone_count(WHITE) > 0
+
+        if not found_black and self.made_move[BLACK]:
+            if not found_white and self.made_move[WHITE]:
+                return self.last_mover
+            return WHITE
+        elif not found_white and self.made_move[WHITE]:
+            return BLACK
+        return None
+
+    def copy(self):
+
+        new_engine = RedstoneEngine.__new__(RedstoneEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.groups = self.groups.copy()
+        new_engine.made_move = dict(self.made_move)
+        return new_engine
@@ -0,0 +1,188 @@
+# Giles: redstone_groups.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.geometry import get_neighbours, SQUARE
+
+class GroupTracker(object):
+    """Go-style groups and liberties for Redstone.  Stones are tracked as a
+    union-find over flat cell indices (row * width + col); each root keeps
+    the list of its group's cells and the set of its liberties, so "does
+    this group have a liberty left?" is a lookup rather than a walk.
+
+    Redstones belong to no group and are never liberties; they're neutral
+    blockers.  Cells are handed in with an owner, which is None for a
+    redstone.
+
+    Placing something is done in two phases.  plan() works out, without
+    changing anything, which groups the placement would capture, and
+    place() applies it.  Capture removes whole groups at once, which is the
+    only way a stone ever leaves the board, so the union-find never has to
+    split.
+    """
+
+    def __init__(self, width, height):
+
+        self.width = width
+        self.height = height
+        self.neighbours = get_neighbours(SQUARE, width, height)
+
+        cell_count = width * height
+
+        # A parent of -1 means there's no stone at the cell.  Redstones are
+        # in 'blocked' instead.
+        self.parent = [-1] * cell_count
+        self.owner = [None] * cell_count
+        self.blocked = [False] * cell_count
+        self.members = {}
+        self.liberties = {}
+
+        # Number of stones on the board per owner.
+        self.counts = {}
+
+    def copy(self):
+
+        # The neighbour table is shared, cached and never changes.
+        new_tracker = GroupTracker.__new__(GroupTracker)
+        new_tracker.__dict__.update(self.__dict__)
+        new_tracker.parent = self.parent[:]
+        new_tracker.owner = self.owner[:]
+        new_tracker.blocked = self.blocked[:]
+        new_tracker.members = dict([(x, y[:]) for x, y in self.members.items()])
+        new_tracker.liberties = dict([(x, set(y)) for x, y in self.liberties.items()])
+        new_tracker.counts = dict(self.counts)
+        return new_tracker
+
+    def find(self, index):
+
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def is_empty(self, index):
+        return self.parent[index] == -1 and not self.blocked[index]
+
+    def stone_count(self, owner):
+        return self.counts.get(owner, 0)
+
+    def plan(self, owner, index):
+
+        # Returns the list of roots of groups that would be captured by
+        # putting a stone belonging to owner (or a redstone, if owner is
+        # None) on the empty cell at index.  An empty list means no capture.
+        parent = self.parent
+        captured = []
+
+        # Any adjacent group whose last liberty is this cell is captured,
+        # unless it's ours, in which case it merges with the new stone.
+        friendly = []
+        for neighbour in self.neighbours[index]:
+            if parent[neighbour] == -1:
+                continue
+            root = self.find(neighbour)
+            if root in captured or root in friendly:
+                continue
+            if owner is not None and self.owner[root] == owner:
+                friendly.append(root)
+            elif len(self.liberties[root]) == 1:
+                captured.append(root)
+
+        # Does the stone (and whatever it joins) have a liberty of its own?
+        # The redstone case doesn't care; it's not a group.
+        if owner is not None:
+            has_liberty = False
+            for neighbour in self.neighbours[index]:
+                if self.is_empty(neighbour):
+                    has_liberty = True
+                    break
+            if not has_liberty:
+                for root in friendly:
+                    if len(self.liberties[root]) > 1:
+                        has_liberty = True
+                        break
+            if not has_liberty:
+
+                # A self-capture; report it as a new group root, which is
+                # the index itself.
+                captured.append(index)
+
+        return captured
+
+    def place(self, owner, index, captured=None):
+
+        # Puts a stone (or redstone) at index and removes any captured
+        # groups.  'captured' should be the result of plan() for the same
+        # placement; if it's not provided, it's computed here.  Returns the
+        # list of (row, col) of captured stones.
+        if captured is None:
+            captured = self.plan(owner, index)
+
+        parent = self.parent
+        neighbours = self.neighbours[index]
+
+        # This cell is no longer anyone's liberty.
+        for neighbour in neighbours:
+            if parent[neighbour] != -1:
+                self.liberties[self.find(neighbour)].discard(index)
+
+        if owner is None:
+            self.blocked[index] = True
+        else:
+            parent[index] = index
+            self.owner[index] = owner
+            self.members[index] = [index]
+            self.liberties[index] = set([n for n in neighbours if self.is_empty(n)])
+            self.counts[owner] = self.counts.get(owner, 0) + 1
+            for neighbour in neighbours:
+                if parent[neighbour] != -1 and self.owner[neighbour] == owner:
+                    self.union(index, neighbour)
+
+        # Capture.  Gather everything first, then remove, then hand the
+        # freed cells out as liberties to whatever is left next to them.
+        removed = []
+        for root in captured:
+            root = self.find(root)
+            if root not in self.members:
+                continue
+            for cell in self.members.pop(root):
+                parent[cell] = -1
+                self.counts[self.owner[cell]] -= 1
+                self.owner[cell] = None
+                removed.append(cell)
+            del self.liberties[root]
+
+        for cell in removed:
+            for neighbour in self.neighbours[cell]:
+                if parent[neighbour] != -1:
+                    self.liberties[self.find(neighbour)].add(cell)
+
+        return [divmod(cell, self.width) for cell in removed]
+
+    def union(self, a, b):
+
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return a
+
+        # Smaller group merges into the larger one.
+        if len(self.members[a]) < len(self.members[b]):
+            a, b = b, a
+        self.parent[b] = a
+        self.members[a].extend(self.members.pop(b))
+        self.liberties[a].update(self.liberties.pop(b))
+        return a
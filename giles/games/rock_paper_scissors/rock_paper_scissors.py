@@ -15,6 +15,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from giles.state import State
+from giles.games.engine import DRAW
+from giles.games.rock_paper_scissors.rock_paper_scissors_engine import RockPaperScissorsEngine
+from giles.games.rock_paper_scissors.rock_paper_scissors_engine import LEFT, RIGHT, ROCK, PAPER, SCISSORS
 from giles.games.seated_game import SeatedGame
 from giles.games.seat import Seat
 
@@ -35,7 +38,7 @@ class RockPaperScissors(SeatedGame):
         self.min_players = 2
         self.max_players = 2
         self.state = State("need_players")
-        self.plays = [None, None]
+        self.engine = RockPaperScissorsEngine()
         self.prefix = "(^RRPS^~): "
         self.log_prefix = "%s/%s: " % (self.table_display_name, self.game_display_name)
 
@@ -66,7 +69,7 @@ class RockPaperScissors(SeatedGame):
                 self.move(player, primary)
                 handled = True
 
-            if self.plays[0] and self.plays[1] and self.active:
+            if self.engine.winner() and self.active:
 
                 # Got the moves!
                 self.resolve()
@@ -92,10 +95,10 @@ class RockPaperScissors(SeatedGame):
         if state == "need_players":
             player.tell_cc(self.prefix + "Everyone is hovering around the table, waiting for players.\n")
         elif state == "need_moves":
-            for loc, color in ((0, "^Y"), (1, "^M")):
+            for loc, side, color in ((0, LEFT, "^Y"), (1, RIGHT, "^M")):
                 if self.seats[loc].player:
                     name = repr(self.seats[loc].player)
-                    if self.plays[loc]:
+                    if self.engine.plays[side]:
                         player.tell_cc(self.prefix + color + name + "^~'s hand is trembling with anticipation.\n")
                     else:
                         player.tell_cc(self.prefix + color + name + "^~ seems to be deep in thought.\n")
@@ -120,11 +123,11 @@ class RockPaperScissors(SeatedGame):
             return
 
         if play in ('r', 'rock'):
-            this_move = "rock"
+            this_move = ROCK
         elif play in ('p', 'paper'):
-            this_move = "paper"
+            this_move = PAPER
         elif play in ('s', 'scissors'):
-            this_move = "scissors"
+            this_move = SCISSORS
         else:
             player.tell_cc(self.prefix + "Invalid play.\n")
             return
@@ -132,23 +135,22 @@ class RockPaperScissors(SeatedGame):
         self.channel.broadcast_cc(self.prefix + "%s's hand twitches.\n" % player)
 
         if seat == self.seats[0]:
-            self.plays[0] = this_move
+            self.engine.throw(LEFT, this_move)
         else:
-            self.plays[1] = this_move
+            self.engine.throw(RIGHT, this_move)
 
     def resolve(self):
 
-        one = self.plays[0]
-        two = self.plays[1]
+        one = self.engine.plays[LEFT]
+        two = self.engine.plays[RIGHT]
         one_name = "^Y" + repr(self.seats[0].player) + "^~"
         two_name = "^M" + repr(self.seats[1].player) + "^~"
         self.channel.broadcast_cc(self.prefix + "Jan... ken... pon... Throwdown time!\n")
         self.channel.broadcast_cc(self.prefix + "%s throws ^!%s^.; %s throws ^!%s^.!\n" % (one_name, one, two_name, two))
-        if one == two:
+        winner = self.engine.winner()
+        if winner == DRAW:
             msg = "It's a tie!\n"
-        elif ((one == "rock" and two == "paper") or
-           (one == "paper" and two == "scissors") or
-           (one == "scissors" and two == "rock")):
+        elif winner == RIGHT:
             msg = two_name + " wins!\n"
         else:
             msg = one_name + " wins!\n"
@@ -160,7 +162,7 @@ class RockPaperScissors(SeatedGame):
         # really is a player, we want to invalidate their throw.  That way
         # you're not stuck with another player's throw mid-game.
         if self.seats[0].player == player:
-            self.plays[0] = None
+            self.engine.withdraw(LEFT)
         elif self.seats[1].player == player:
-            self.plays[1] = None
+            self.engine.withdraw(RIGHT)
         super(RockPaperScissors, self).remove_player(player)
@@ -0,0 +1,97 @@
+# Giles: rock_paper_scissors_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.engine import Engine, DRAW
+
+LEFT = "left"
+RIGHT = "right"
+
+ROCK = "rock"
+PAPER = "paper"
+SCISSORS = "scissors"
+
+THROWS = (ROCK, PAPER, SCISSORS)
+
+# What each throw beats.
+BEATS = {
+    ROCK: SCISSORS,
+    PAPER: ROCK,
+    SCISSORS: PAPER,
+}
+
+class RockPaperScissorsEngine(Engine):
+    """The rules of Rock-Paper-Scissors.  Both sides throw at once, so
+    there's no real turn order; the side to play is just whichever hasn't
+    thrown yet, Left first.  Moves are throws.  Tables let either side
+    throw (or change their mind) at any time with throw().
+    """
+
+    def __init__(self):
+
+        super(RockPaperScissorsEngine, self).__init__()
+
+        self.plays = {LEFT: None, RIGHT: None}
+        self.turn = LEFT
+
+    def update_turn(self):
+
+        if not self.plays[LEFT]:
+            self.turn = LEFT
+        elif not self.plays[RIGHT]:
+            self.turn = RIGHT
+        else:
+            self.turn = None
+
+    def throw(self, side, play):
+
+        self.plays[side] = play
+        self.update_turn()
+
+    def withdraw(self, side):
+
+        # Forgets a side's throw, for when the player leaves.
+        self.throw(side, None)
+
+    def legal_moves(self):
+
+        if self.turn is None:
+            return []
+        return list(THROWS)
+
+    def is_legal(self, move):
+        return self.turn is not None and move in THROWS
+
+    def apply(self, move):
+        self.throw(self.turn, move)
+
+    def winner(self):
+
+        left = self.plays[LEFT]
+        right = self.plays[RIGHT]
+        if not left or not right:
+            return None
+        if left == right:
+            return DRAW
+        if BEATS[left] == right:
+            return LEFT
+        return RIGHT
+
+    def copy(self):
+
+        new_engine = RockPaperScissorsEngine.__new__(RockPaperScissorsEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.plays = dict(self.plays)
+        return new_engine
@@ -30,9 +30,23 @@ class Seat(object):
         self.player_name = "Empty!"
         self.data = Struct()
 
+        # The name of the player who sat here before a restart.
+        self.absent_name = None
+
     def __repr__(self):
         return self.display_name
 
+    def __getstate__(self):
+
+        # Players don't survive a restart, but remember who was sitting
+        # here, so they can have the seat back when they log in again.
+        state = self.__dict__.copy()
+        if self.player:
+            state["player"] = None
+            state["player_name"] = repr(self.player) + " (absentee)"
+            state["absent_name"] = self.player.name
+        return state
+
     def sit(self, player, activate=True):
 
         # By default, sitting a player down in a seat activates that
@@ -41,6 +55,7 @@ class Seat(object):
         if not self.player:
             self.player = player
             self.player_name = repr(player)
+            self.absent_name = None
             if activate:
                 self.active = True
             return True
@@ -69,6 +69,39 @@ class SeatedGame(Game):
             if seat.active and not seat.player:
                 self.active = False
 
+    def __getstate__(self):
+
+        # Anyone sitting here is gone once we're restored, until they log
+        # back in.
+        state = super(SeatedGame, self).__getstate__()
+        for seat in self.seats:
+            if seat.player:
+                state["num_players"] -= 1
+        return state
+
+    def restore(self, server):
+
+        super(SeatedGame, self).restore(server)
+        self.update_active()
+
+    def reattach(self, player):
+
+        # Give a player back any seat they had before a restore.
+        reattached = False
+        for seat in self.seats:
+            if seat.absent_name == player.name and not seat.player:
+                seat.sit(player, False)
+                self.num_players += 1
+                if not self.channel.is_connected(player):
+                    self.channel.connect(player)
+                self.bc_pre("^Y%s^~ is back in seat ^C%s^~.\n" % (player, seat))
+                self.mark_changed()
+                reattached = True
+
+        if reattached:
+            self.update_active()
+        return reattached
+
     def get_seat_of_player(self, player):
 
         # If a player is seated, snag the seat they're at.
@@ -197,6 +230,7 @@ class SeatedGame(Game):
                 self.bc_pre("^R%s^~ has left the table.\n" % player)
                 self.num_players -= 1
                 seat.stand()
+                self.mark_changed()
 
         self.update_active()
 
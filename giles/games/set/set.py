@@ -14,7 +14,6 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import random
 import time
 
 from giles.state import State
@@ -22,70 +21,13 @@ from giles.utils import booleanize
 from giles.utils import demangle_move
 from giles.games.seated_game import SeatedGame
 from giles.games.seat import Seat
-from giles.utils import Struct, get_plural_str
+from giles.games.set.set_engine import SetEngine, ONE, TWO, THREE
+from giles.utils import get_plural_str
 
 # Some useful default values.
 DEFAULT_MAX_CARDS = 24
 DEFAULT_DEAL_DELAY = 60
 
-# Numbers!
-ONE = Struct()
-ONE.display = "one"
-
-TWO = Struct()
-TWO.display = "two"
-
-THREE = Struct()
-THREE.display = "three"
-
-# Fills!
-
-SMOOTH = Struct()
-SMOOTH.display = "smooth"
-SMOOTH.edge_art = [".----.", "|%s|", "|%s|", "`----'"]
-
-WAVY = Struct()
-WAVY.display = "wavy"
-WAVY.edge_art = ["/~~~~\\", "{%s}", "{%s}", "\\~~~~/"]
-
-CHUNKY = Struct()
-CHUNKY.display = "chunky"
-CHUNKY.edge_art = ["|=||=|", "=%s=", "|%s|", "|=||=|"]
-
-# Colors!
-MAGENTA = Struct()
-MAGENTA.code = "^M"
-MAGENTA.display = "purple"
-
-RED = Struct()
-RED.code = "^R"
-RED.display = "red"
-
-GREEN = Struct()
-GREEN.code = "^G"
-GREEN.display = "green"
-
-# Shapes!
-BLOB = Struct()
-BLOB.art = "oOOo"
-BLOB.display = "blob"
-
-LOZENGE = Struct()
-LOZENGE.art = "<==>"
-LOZENGE.display = "lozenge"
-
-SQUIGGLE = Struct()
-SQUIGGLE.art = "/\\/\\"
-SQUIGGLE.display = "squiggle"
-
-# Bitfields!
-BITFIELDS = [
-   {1: ONE, 2: TWO, 4: THREE, ONE: 1, TWO: 2, THREE: 4},
-   {1: SMOOTH, 2: WAVY, 4: CHUNKY, SMOOTH: 1, WAVY: 2, CHUNKY: 4},
-   {1: MAGENTA, 2: RED, 4: GREEN, MAGENTA: 1, RED: 2, GREEN: 4},
-   {1: BLOB, 2: LOZENGE, 4: SQUIGGLE, BLOB: 1, LOZENGE: 2, SQUIGGLE: 4},
-]
-
 class Set(SeatedGame):
     """A Set game table implementation.  Invented in 1974 by Marsha Jean Falco.
     """
@@ -106,60 +48,11 @@ class Set(SeatedGame):
         # Set-specific stuff.
         self.max_cards_on_table = DEFAULT_MAX_CARDS
         self.deal_delay = DEFAULT_DEAL_DELAY
-        self.layout = None
-        self.printable_layout = None
-        self.deck = None
+        self.engine = None
         self.last_play_time = None
         self.max_card_count = 81
         self.has_borders = True
 
-
-    def build_deck(self):
-
-        # Generate the deck...
-        self.deck = []
-        for count in (ONE, TWO, THREE):
-            fill_list = (SMOOTH,)
-            if self.has_borders:
-                fill_list = (SMOOTH, WAVY, CHUNKY)
-            for fill in fill_list:
-                for color in (MAGENTA, RED, GREEN):
-                    for shape in (BLOB, LOZENGE, SQUIGGLE):
-                        self.deck.append((count, fill, color, shape))
-
-        # ...and shuffle it.
-        random.shuffle(self.deck)
-
-        # Trim it to at most the max count.
-        self.deck = self.deck[:self.max_card_count]
-
-    def build_layout(self):
-
-        # Put the first twelve cards on the table.
-        self.layout = self.deck[:12]
-        self.deck = self.deck[12:]
-
-    def update_layout(self):
-
-        # If the size of the layout is 12 or smaller, this is easy;
-        # we just draw cards left (if any) to fill gaps in the board.
-        # If it's larger than 12, it's easy too; we rebuild the
-        # layout without any gaps (and then, juuust in case, add
-        # blank cards if it somehow got smaller than 12.)
-
-        layout_len = len(self.layout)
-        if len(self.layout) <= 12:
-            for i in range(layout_len):
-                if not self.layout[i] and self.deck:
-                    self.layout[i] = self.deck[0]
-                    self.deck = self.deck[1:]
-
-        else:
-            new_layout = [x for x in self.layout if x]
-            while len(new_layout) < 12:
-                new_layout.append(None)
-            self.layout = new_layout
-
     def get_card_art_bits(self, card, line_number):
         # .----. 1 /~~~~\ |=||=|
         # |2or3| 2 {    } =    =
@@ -200,22 +93,21 @@ class Set(SeatedGame):
         # Dunno how we got here...
         return "ERROR"
 
-    def update_printable_layout(self):
+    def render_board(self):
 
-        self.printable_layout = []
-        if not self.layout:
-            self.printable_layout.append("The layout is currently ^cempty^~.\n")
-            return
+        if not self.engine or not self.engine.layout:
+            return "The layout is currently ^cempty^~.\n"
+        layout = self.engine.layout
 
         # If the layout doesn't have a number of card spaces divisible
         # by 3, something is horribly wrong, and we should bail.
-        if len(self.layout) % 3 != 0:
-            self.printable_layout.append("Something is ^Rhorribly wrong^~ with the layout.  Alert an admin.\n")
-            return
+        if len(layout) % 3 != 0:
+            return "Something is ^Rhorribly wrong^~ with the layout.  Alert an admin.\n"
 
         # Okay, we have a usable layout.  Generate it!
-        cards_per_row = len(self.layout) / 3
-        self.printable_layout.append("=======" * cards_per_row + "=\n")
+        cards_per_row = len(layout) / 3
+        lines = []
+        lines.append("=======" * cards_per_row + "=\n")
         for row in range(3):
             if row == 0:
                 row_char = "A"
@@ -226,21 +118,19 @@ class Set(SeatedGame):
             for card_line in range(1, 6):
                 this_line = ""
                 for col in range(cards_per_row):
-                    this_line += (" %s" % self.get_card_art_bits(self.layout[col * 3 + row], card_line))
-                self.printable_layout.append(this_line + "\n")
+                    this_line += (" %s" % self.get_card_art_bits(layout[col * 3 + row], card_line))
+                lines.append(this_line + "\n")
 
             # Now we print the codes for each card under the cards.
             this_line = ""
             for col in range(1, cards_per_row + 1):
                 this_line += ("   %s%s  " % (row_char, col))
-            self.printable_layout.append(this_line + "\n\n")
+            lines.append(this_line + "\n\n")
+        return "".join(lines)
 
     def show(self, player):
 
-        if not self.printable_layout:
-            self.update_printable_layout()
-        for line in self.printable_layout:
-            player.tell_cc(line)
+        self.tell_board(player)
 
     def send_layout(self):
         for listener in self.channel.listeners:
@@ -379,9 +269,9 @@ class Set(SeatedGame):
                     else:
                         self.state.set("playing")
                         self.channel.broadcast_cc(self.prefix + "Game on!\n")
-                        self.build_deck()
-                        self.build_layout()
-                        self.update_printable_layout()
+                        self.engine = SetEngine(self.max_cards_on_table,
+                                                self.max_card_count, self.has_borders)
+                        self.mark_board_dirty()
                         self.send_layout()
                         self.last_play_time = time.time()
                     handled = True
@@ -410,26 +300,22 @@ class Set(SeatedGame):
             return
 
         # Also don't bother if the maximum number of cards are already
-        # on the table.
-        if len(self.layout) >= self.max_cards_on_table:
+        # on the table, or if the deck is empty.
+        if not self.engine.can_deal():
             return
 
-        # Also don't bother if the deck is empty.
-        if not self.deck:
-            return
-
-        # Okay, so, we're playing.  See if too much time has passed.
+        # Okay, so, we're playing.  If there isn't a set on the table, there's
+        # no point in making everyone stare at it; deal right away.  Otherwise
+        # see if too much time has passed.
         curr_time = time.time()
-        if curr_time - self.last_play_time < self.deal_delay:
+        if (self.engine.sets_on_table and
+           curr_time - self.last_play_time < self.deal_delay):
             return
 
         # Yup.  Deal out three new cards.
-        for i in range(3):
-            if self.deck:
-                self.layout.append(self.deck[0])
-                self.deck = self.deck[1:]
+        self.engine.deal()
 
-        self.update_printable_layout()
+        self.mark_board_dirty()
         self.send_layout()
         self.channel.broadcast_cc(self.prefix + "New cards have automatically been dealt.\n")
 
@@ -446,7 +332,8 @@ class Set(SeatedGame):
         # in our linear array.
         valid = True
         card_locations = []
-        cards_per_row = len(self.layout) / 3
+        layout = self.engine.layout
+        cards_per_row = len(layout) / 3
         for bit in declare_bits:
             # Letter first.
             if bit[0] < 0 or bit[0] > 2:
@@ -474,7 +361,7 @@ class Set(SeatedGame):
             return
 
         # Okay, so, we potentially have valid cards...
-        cards = [self.layout[x] for x in card_locations]
+        cards = [layout[x] for x in card_locations]
 
         # Bail if any of these are empty locations.
         if not cards[0] or not cards[1] or not cards[2]:
@@ -483,21 +370,19 @@ class Set(SeatedGame):
 
         # All right.  Three valid, actual cards.  Now let's see if they're
         # actually a set!
-        if self.is_a_set(cards):
+        if self.engine.is_a_set(cards):
             seat = self.get_seat_of_player(player)
             seat.data.score += 1
             # zomg.  Is an actual set!  Notify the press.  Update the layout
             # and send it out.
-            for i in card_locations:
-                self.layout[i] = None
-            self.update_layout()
-            self.update_printable_layout()
+            self.engine.claim(card_locations)
+            self.mark_board_dirty()
             self.send_layout()
             self.channel.broadcast_cc(self.prefix + "^Y%s^~ found a set! (%s)\n" %
                (player, self.make_set_str(cards)))
 
             # Determine if the game is over.  If so, we're done!
-            if self.no_more_sets():
+            if self.engine.no_more_sets():
                 self.resolve()
                 self.finish()
 
@@ -507,27 +392,6 @@ class Set(SeatedGame):
         else:
             player.tell_cc(self.prefix + self.make_set_str(cards) + " is not a set!\n")
 
-    def third_card(self, one, two):
-
-        # For any two cards, the third card to make it a set can be
-        # determined easily.  For each element, if the two cards are
-        # the same, the third must have the same one as well; if
-        # different, use BITFIELDS to find the missing one.  Since
-        # there are 3 possible values, subtract 7 from the summation
-        # of the two's bit values to get the third one.
-        three = []
-        for k in range(4):
-            if one[k] == two[k]:
-                three.append(one[k])
-            else:
-                three.append(BITFIELDS[k][7 - (BITFIELDS[k][one[k]] +
-                   BITFIELDS[k][two[k]])])
-        return tuple(three)
-
-    def is_a_set(self, cards):
-
-        return self.third_card(cards[0], cards[1]) == cards[2]
-
     def make_set_str(self, cards):
 
         card_str_list = []
@@ -539,34 +403,6 @@ class Set(SeatedGame):
 
         return ", ".join(card_str_list)
 
-    def no_more_sets(self):
-
-        # First, bail if the deck still has any cards whatsoever, as we can't
-        # possibly know that there aren't any sets left until the deck is
-        # depleted.
-        if self.deck:
-            return False
-
-        # Okay, now, get a list of cards on the layout.
-        cards_left = [x for x in self.layout if x]
-
-        count_left = len(cards_left)
-        # If there are more than 20 cards on the table, we know for a fact
-        # that there has to be a set left.
-        if count_left > 20:
-            return False
-
-        # Take every unique pair of cards on the layout and determine what
-        # the third card would be that makes them a set.  If that card is
-        # still on the table, we have a valid set left.
-        for i in range(count_left):
-            for j in range(i + 1, count_left):
-                if self.third_card(cards_left[i], cards_left[j]) in cards_left:
-                    return False
-
-        # No sets found.
-        return True
-
     def resolve(self):
 
         winner_dict = {}
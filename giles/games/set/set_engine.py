@@ -0,0 +1,365 @@
+# Giles: set_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+
+from giles.games.engine import Engine, DRAW
+from giles.utils import Struct
+
+# Numbers!
+ONE = Struct()
+ONE.display = "one"
+
+TWO = Struct()
+TWO.display = "two"
+
+THREE = Struct()
+THREE.display = "three"
+
+# Fills!
+
+SMOOTH = Struct()
+SMOOTH.display = "smooth"
+SMOOTH.edge_art = [".----.", "|%s|", "|%s|", "`----'"]
+
+WAVY = Struct()
+WAVY.display = "wavy"
+WAVY.edge_art = ["/~~~~\\", "{%s}", "{%s}", "\\~~~~/"]
+
+CHUNKY = Struct()
+CHUNKY.display = "chunky"
+CHUNKY.edge_art = ["|=||=|", "=%s=", "|%s|", "|=||=|"]
+
+# Colors!
+MAGENTA = Struct()
+MAGENTA.code = "^M"
+MAGENTA.display = "purple"
+
+RED = Struct()
+RED.code = "^R"
+RED.display = "red"
+
+GREEN = Struct()
+GREEN.code = "^G"
+GREEN.display = "green"
+
+# Shapes!
+BLOB = Struct()
+BLOB.art = "oOOo"
+BLOB.display = "blob"
+
+LOZENGE = Struct()
+LOZENGE.art = "<==>"
+LOZENGE.display = "lozenge"
+
+SQUIGGLE = Struct()
+SQUIGGLE.art = "/\\/\\"
+SQUIGGLE.display = "squiggle"
+
+# Bitfields!
+BITFIELDS = [
+   {1: ONE, 2: TWO, 4: THREE, ONE: 1, TWO: 2, THREE: 4},
+   {1: SMOOTH, 2: WAVY, 4: CHUNKY, SMOOTH: 1, WAVY: 2, CHUNKY: 4},
+   {1: MAGENTA, 2: RED, 4: GREEN, MAGENTA: 1, RED: 2, GREEN: 4},
+   {1: BLOB, 2: LOZENGE, 4: SQUIGGLE, BLOB: 1, LOZENGE: 2, SQUIGGLE: 4},
+]
+
+# Integers!  Each card also has a compact id from 0 to 80, with one base-3
+# digit per attribute.  Three cards are a set exactly when each of their
+# digits sums to 0 mod 3, so the third card for any pair can be looked up
+# in a precomputed table instead of being built a piece at a time.
+ATTRIBUTES = [
+   (ONE, TWO, THREE),
+   (SMOOTH, WAVY, CHUNKY),
+   (MAGENTA, RED, GREEN),
+   (BLOB, LOZENGE, SQUIGGLE),
+]
+
+def build_card_tables():
+
+    # Returns the list of card tuples by id and the dictionary of ids by
+    # card tuple.
+    cards = []
+    card_ids = {}
+    for card_id in range(81):
+        card = []
+        value = card_id
+        for attribute in ATTRIBUTES:
+            card.append(attribute[value % 3])
+            value /= 3
+        cards.append(tuple(card))
+        card_ids[tuple(card)] = card_id
+    return cards, card_ids
+
+def build_third_card_table():
+
+    # THIRD_CARDS[one * 81 + two] is the id of the card completing the set.
+    table = []
+    for one in range(81):
+        for two in range(81):
+            three = 0
+            place = 1
+            a = one
+            b = two
+            for k in range(4):
+                three += (-(a + b) % 3) * place
+                a /= 3
+                b /= 3
+                place *= 3
+            table.append(three)
+    return table
+
+CARDS, CARD_IDS = build_card_tables()
+THIRD_CARDS = build_third_card_table()
+
+class SetIndex(object):
+    """An index of the cards currently on the table, keyed by card tuple.
+    Since the third card of any pair is a table lookup and membership is a
+    hash lookup, finding or counting the sets on the table only costs one
+    pass over the pairs of cards.
+    """
+
+    def __init__(self):
+
+        self.ids = {}
+
+    def __contains__(self, card):
+        return card in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, card):
+
+        if card:
+            self.ids[card] = CARD_IDS[card]
+
+    def remove(self, card):
+
+        if card in self.ids:
+            del self.ids[card]
+
+    def clear(self):
+
+        self.ids = {}
+
+    def sets(self):
+
+        # Yields each set on the table once, as a tuple of card ids in
+        # increasing order.
+        present = set(self.ids.values())
+        id_list = sorted(present)
+        for i in range(len(id_list)):
+            one = id_list[i]
+            row = one * 81
+            for two in id_list[i + 1:]:
+                three = THIRD_CARDS[row + two]
+                if three > two and three in present:
+                    yield (one, two, three)
+
+    def find_set(self):
+
+        for one, two, three in self.sets():
+            return (CARDS[one], CARDS[two], CARDS[three])
+        return None
+
+    def count_sets(self):
+
+        count = 0
+        for found in self.sets():
+            count += 1
+        return count
+
+# The move that deals three more cards.
+DEAL = "deal"
+
+class SetEngine(Engine):
+    """The rules of Set: the deck, the cards on the table, and which of
+    them make sets.  Moves are sorted tuples of three table locations
+    that make a set, plus DEAL.
+
+    Set is a race to spot sets, not a game between sides taking turns, so
+    there's no side to play, and the engine doesn't keep score; anyone can
+    claim a set at any time, winner() is DRAW once no sets are left, and
+    the table works out who found the most.  The table also decides when
+    to deal.
+    """
+
+    def __init__(self, max_cards_on_table, max_card_count=81, has_borders=True):
+
+        super(SetEngine, self).__init__()
+
+        self.max_cards_on_table = max_cards_on_table
+        self.max_card_count = max_card_count
+        self.has_borders = has_borders
+        self.layout = None
+        self.deck = None
+        self.index = SetIndex()
+        self.sets_on_table = 0
+
+        self.build_deck()
+        self.build_layout()
+
+    def build_deck(self):
+
+        # Generate the deck...
+        self.deck = []
+        for count in (ONE, TWO, THREE):
+            fill_list = (SMOOTH,)
+            if self.has_borders:
+                fill_list = (SMOOTH, WAVY, CHUNKY)
+            for fill in fill_list:
+                for color in (MAGENTA, RED, GREEN):
+                    for shape in (BLOB, LOZENGE, SQUIGGLE):
+                        self.deck.append((count, fill, color, shape))
+
+        # ...and shuffle it.
+        random.shuffle(self.deck)
+
+        # Trim it to at most the max count.
+        self.deck = self.deck[:self.max_card_count]
+
+    def build_layout(self):
+
+        # Put the first twelve cards on the table.
+        self.layout = self.deck[:12]
+        self.deck = self.deck[12:]
+
+        self.index.clear()
+        for card in self.layout:
+            self.index.add(card)
+        self.update_set_count()
+
+    def update_set_count(self):
+
+        # Call this whenever the cards on the table change.
+        self.sets_on_table = self.index.count_sets()
+
+    def update_layout(self):
+
+        # If the size of the layout is 12 or smaller, this is easy;
+        # we just draw cards left (if any) to fill gaps in the board.
+        # If it's larger than 12, it's easy too; we rebuild the
+        # layout without any gaps (and then, juuust in case, add
+        # blank cards if it somehow got smaller than 12.)
+
+        layout_len = len(self.layout)
+        if len(self.layout) <= 12:
+            for i in range(layout_len):
+                if not self.layout[i] and self.deck:
+                    self.layout[i] = self.deck[0]
+                    self.index.add(self.deck[0])
+                    self.deck = self.deck[1:]
+
+        else:
+            new_layout = [x for x in self.layout if x]
+            while len(new_layout) < 12:
+                new_layout.append(None)
+            self.layout = new_layout
+
+    def can_deal(self):
+
+        # There's only room for so many cards, and only so many to deal.
+        return len(self.layout) < self.max_cards_on_table and bool(self.deck)
+
+    def deal(self):
+
+        # Deal out three new cards.
+        for i in range(3):
+            if self.deck:
+                self.layout.append(self.deck[0])
+                self.index.add(self.deck[0])
+                self.deck = self.deck[1:]
+        self.update_set_count()
+
+    def third_card(self, one, two):
+
+        # For any two cards, the third card to make it a set can be
+        # determined easily; it's precomputed by id in THIRD_CARDS.
+        return CARDS[THIRD_CARDS[CARD_IDS[one] * 81 + CARD_IDS[two]]]
+
+    def is_a_set(self, cards):
+
+        return self.third_card(cards[0], cards[1]) == cards[2]
+
+    def claim(self, locations):
+
+        # Takes the set at these locations off the table and fills the gaps.
+        for i in locations:
+            self.index.remove(self.layout[i])
+            self.layout[i] = None
+        self.update_layout()
+        self.update_set_count()
+
+    def no_more_sets(self):
+
+        # First, bail if the deck still has any cards whatsoever, as we can't
+        # possibly know that there aren't any sets left until the deck is
+        # depleted.
+        if self.deck:
+            return False
+
+        # Otherwise, the index has been keeping count for us.
+        return not self.sets_on_table
+
+    def legal_moves(self):
+
+        if self.no_more_sets():
+            return []
+
+        locations = {}
+        for i in range(len(self.layout)):
+            if self.layout[i]:
+                locations[CARD_IDS[self.layout[i]]] = i
+        moves = [tuple(sorted([locations[x] for x in found]))
+                 for found in self.index.sets()]
+        if self.can_deal():
+            moves.append(DEAL)
+        return moves
+
+    def is_legal(self, move):
+
+        if move == DEAL:
+            return self.can_deal()
+        if len(set(move)) != 3:
+            return False
+        for i in move:
+            if i < 0 or i >= len(self.layout) or not self.layout[i]:
+                return False
+        return self.is_a_set([self.layout[i] for i in move])
+
+    def apply(self, move):
+
+        if move == DEAL:
+            self.deal()
+        else:
+            self.claim(move)
+
+    def winner(self):
+
+        if self.no_more_sets():
+            return DRAW
+        return None
+
+    def copy(self):
+
+        new_engine = SetEngine.__new__(SetEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.layout = self.layout[:]
+        new_engine.deck = self.deck[:]
+        new_engine.index = SetIndex()
+        new_engine.index.ids = dict(self.index.ids)
+        return new_engine
@@ -24,19 +24,27 @@ class SquareGridLayout(Layout):
     externally (it's a list of (row, col) tuples); that said, all of place, move,
     and remove can optionally replace the list with the destination locations (and,
     in the case of move, both the source /and/ destination).
+
+    Rendered rows are cached; place(), move(), remove(), and assigning to
+    last_moves mark the rows they touch as dirty, and update() only
+    re-renders those.  If you change the grid some other way, call
+    invalidate() before update().
     """
 
     def __init__(self, board_color=None, cell_color=None, highlight_color=None):
 
         super(SquareGridLayout, self).__init__()
 
-        self.last_moves = []
         self.width = 0
         self.height = 0
         self.col_str = ""
         self.top_row = ""
         self.bottom_row = ""
         self.grid = []
+        self.rows = []
+        self.dirty_rows = set()
+        self.last_move_list = []
+        self.last_move_set = set()
 
         if not board_color:
             board_color = "^m"
@@ -49,6 +57,21 @@ class SquareGridLayout(Layout):
         self.cell_color = cell_color
         self.highlight_color = highlight_color
 
+    def get_last_moves(self):
+        return self.last_move_list
+
+    def set_last_moves(self, last_moves):
+
+        # Both the old and new highlighted rows need redrawing.
+        for r, c in self.last_move_list:
+            self.dirty_rows.add(r)
+        self.last_move_list = last_moves
+        self.last_move_set = set(last_moves)
+        for r, c in last_moves:
+            self.dirty_rows.add(r)
+
+    last_moves = property(get_last_moves, set_last_moves)
+
     def is_valid(self, row, col):
 
         if row >= 0 and row < self.height and col >= 0 and col < self.width:
@@ -56,32 +79,41 @@ class SquareGridLayout(Layout):
         else:
             return False
 
-    def update(self):
+    def invalidate(self):
 
-        self.representation = "\n" + self.col_str
-        self.representation += self.top_row
-        for r in range(self.height):
-            r_disp = r + 1
-            this_row = "%2d %s|^~ " % (r_disp, self.board_color)
-            for c in range(self.width):
-                last_move = False
-                if (r, c) in self.last_moves:
-                    last_move = True
-                    this_row += self.highlight_color
-                loc = self.grid[r][c]
-                if loc:
-                    this_row += loc.color
-                    if last_move:
-                        this_row += loc.last_char
-                    else:
-                        this_row += loc.char
-                    this_row += "^~ "
+        self.dirty_rows = set(range(self.height))
+
+    def render_row(self, r):
+
+        r_disp = r + 1
+        bits = ["%2d %s|^~ " % (r_disp, self.board_color)]
+        grid_row = self.grid[r]
+        for c in range(self.width):
+            last_move = (r, c) in self.last_move_set
+            if last_move:
+                bits.append(self.highlight_color)
+            loc = grid_row[c]
+            if loc:
+                bits.append(loc.color)
+                if last_move:
+                    bits.append(loc.last_char)
                 else:
-                    this_row += self.cell_color + ".^~ "
-            this_row += self.board_color + "|^~ %d\n" % r_disp
-            self.representation += this_row
-        self.representation += self.bottom_row
-        self.representation += self.col_str
+                    bits.append(loc.char)
+                bits.append("^~ ")
+            else:
+                bits.append(self.cell_color + ".^~ ")
+        bits.append(self.board_color + "|^~ %d\n" % r_disp)
+        return "".join(bits)
+
+    def update(self):
+
+        for r in self.dirty_rows:
+            if r < self.height:
+                self.rows[r] = self.render_row(r)
+        self.dirty_rows = set()
+
+        self.representation = "".join(["\n", self.col_str, self.top_row] +
+           self.rows + [self.bottom_row, self.col_str])
 
     def resize(self, width, height=None):
 
@@ -97,11 +129,13 @@ class SquareGridLayout(Layout):
 
         self.width = width
         self.height = height
+        self.rows = [""] * height
 
         self.col_str = "    " + "".join([" " + COLS[i] for i in range(self.width)]) + "\n"
         equals_str = "".join(["=="] * self.width)
         self.top_row = "   " + self.board_color + ".=" + equals_str + ".^~\n"
         self.bottom_row = "   " + self.board_color + "`=" + equals_str + "'^~\n"
+        self.invalidate()
         self.update()
         return True
 
@@ -109,6 +143,7 @@ class SquareGridLayout(Layout):
 
         if self.is_valid(row, col):
             self.grid[row][col] = piece
+            self.dirty_rows.add(row)
             if update_last_moves:
                 self.last_moves = [(row, col)]
             if update:
@@ -124,6 +159,8 @@ class SquareGridLayout(Layout):
 
             self.grid[dst_r][dst_c] = self.grid[src_r][src_c]
             self.grid[src_r][src_c] = None
+            self.dirty_rows.add(src_r)
+            self.dirty_rows.add(dst_r)
             if update_last_moves:
                 self.last_moves = [(src_r, src_c), (dst_r, dst_c)]
             if update:
@@ -136,6 +173,7 @@ class SquareGridLayout(Layout):
 
         if self.is_valid(row, col) and self.grid[row][col]:
             self.grid[row][col] = None
+            self.dirty_rows.add(row)
             if update_last_moves:
                 self.last_moves = [(row, col)]
             if update:
@@ -18,6 +18,7 @@ from giles.games.seated_game import SeatedGame
 from giles.games.piece import Piece
 from giles.games.seat import Seat
 from giles.games.square_grid_layout import SquareGridLayout, COLS
+from giles.games.square_oust.square_oust_engine import SquareOustEngine, BLACK, WHITE
 from giles.state import State
 from giles.utils import demangle_move, get_plural_str
 
@@ -25,9 +26,6 @@ from giles.utils import demangle_move, get_plural_str
 MIN_SIZE = 4
 MAX_SIZE = 26
 
-# Deltas are useful.
-CONNECTION_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
-
 class SquareOust(SeatedGame):
     """A Square Oust game table implementation.  Invented in 2007 by Mark Steere.
     """
@@ -54,13 +52,15 @@ class SquareOust(SeatedGame):
         self.turn = None
         self.black = self.seats[0]
         self.black.data.seat_str = "^KBlack^~"
-        self.black.data.groups = []
-        self.black.data.made_move = False
+        self.black.data.color = BLACK
         self.white = self.seats[1]
         self.white.data.seat_str = "^WWhite^~"
-        self.white.data.groups = []
-        self.white.data.made_move = False
-        self.resigner = None
+        self.white.data.color = WHITE
+        self.pieces = {
+            BLACK: Piece("^K", "x", "X"),
+            WHITE: Piece("^W", "o", "O"),
+        }
+        self.engine = None
         self.layout = None
         self.move_was_capture = False
 
@@ -69,7 +69,9 @@ class SquareOust(SeatedGame):
 
     def init_layout(self):
 
-        # Create the layout.  Empty, so easy.
+        # Create the layout.  Empty, so easy.  The engine holds the board
+        # and the rules; the layout just shows it.
+        self.engine = SquareOustEngine(self.width, self.height)
         self.layout = SquareGridLayout(highlight_color="^I")
         self.layout.resize(self.width, self.height)
 
@@ -84,9 +86,12 @@ class SquareOust(SeatedGame):
 
         return "It is ^C%s^~'s turn (%s).\n" % (self.turn.player_name, self.turn.data.seat_str)
 
+    def get_board_str(self):
+        return str(self.layout)
+
     def show(self, player):
 
-        player.tell_cc(self.layout)
+        self.tell_board(player)
         player.tell_cc(self.get_turn_str())
 
     def send_board(self):
@@ -130,122 +135,6 @@ class SquareOust(SeatedGame):
         self.bc_pre("^R%s^~ has set the board size to ^C%d^Gx^C%d^~.\n" % (player, w, h))
         self.init_layout()
 
-    def get_new_piece(self, seat):
-
-        if seat == self.black:
-            p = Piece("^K", "x", "X")
-        else:
-            p = Piece("^W", "o", "O")
-        p.data.owner = seat
-        p.data.adjacencies = []
-        p.data.size = 1
-        p.data.num = id(p)
-
-        return p
-
-    def replace(self, old, new):
-
-        # First step: Replace the actual pieces on the board.
-        for r in range(self.height):
-            for c in range(self.width):
-                if self.layout.grid[r][c] == old:
-                    self.layout.place(new, r, c, update=False)
-        self.layout.update()
-
-        # Second step: Get rid of it from the group list of its owner.
-        owner = new.data.owner
-        owner.data.groups.remove(old)
-
-        # Third step: Replace instances of it in the other player's group
-        # adjacencies.
-        for group in self.next_seat(owner).data.groups:
-            if old in group.data.adjacencies:
-                group.data.adjacencies.remove(old)
-                if new not in group.data.adjacencies:
-                    group.data.adjacencies.append(new)
-
-    def remove(self, dead_group):
-
-        # Like above, except removing this time.
-        for r in range(self.height):
-            for c in range(self.width):
-                if self.layout.grid[r][c] == dead_group:
-                    self.layout.remove(r, c, update=False)
-        self.layout.update()
-
-        owner = dead_group.data.owner
-        owner.data.groups.remove(dead_group)
-
-        for group in self.next_seat(owner).data.groups:
-            if dead_group in group.data.adjacencies:
-                group.data.adjacencies.remove(dead_group)
-
-    def update_board(self, row, col):
-
-        # We just put a fresh piece at this location; it will have to be
-        # incorporated into everything else that's on the board.
-        this_piece = self.layout.grid[row][col]
-
-        # Look at all of the adjacencies and collapse the same-color groups
-        # into one.  Collate the unique enemy groups as well, as we may be
-        # capturing them.
-        other_adjacencies = []
-        potential_capture = False
-        for r_delta, c_delta in CONNECTION_DELTAS:
-            new_r = row + r_delta
-            new_c = col + c_delta
-            if self.layout.is_valid(new_r, new_c):
-                loc = self.layout.grid[new_r][new_c]
-                if loc and loc.data.owner == this_piece.data.owner:
-                    potential_capture = True
-                    if loc != this_piece:
-
-                        # New same-color group to collapse.
-                        other_adjacencies.extend([x for x in loc.data.adjacencies
-                           if x not in other_adjacencies])
-                        new_size = this_piece.data.size + loc.data.size
-                        if this_piece.data.num < loc.data.num:
-                            self.replace(loc, this_piece)
-                        else:
-                            self.replace(this_piece, loc)
-                            this_piece = loc
-
-                        # Whichever "won," set the new size.
-                        this_piece.data.size = new_size
-                elif loc:
-
-                    # A group of the other player.  Add to other adjacencies if
-                    # it's not already there.
-                    if loc not in other_adjacencies:
-                        other_adjacencies.append(loc)
-
-        # After having collapsed all of the same-colored groups, we look to see
-        # if this is a potential capture.  If not, we can't affect the opponent's
-        # groups, other than to become adjacent to them.  If so, all groups in the
-        # list of other adjacencies must be removed from the board.
-        if potential_capture:
-            for group in other_adjacencies:
-                self.remove(group)
-
-            # By definition, a capturing group has no enemy adjacencies.
-            this_piece.data.adjacencies = []
-
-            # Return the number of groups we captured.
-            return len(other_adjacencies)
-
-        else:
-
-            # Set the adjacency list.
-            this_piece.data.adjacencies = other_adjacencies
-
-            # Add ourselves to those pieces' adjacency lists.
-            for group in other_adjacencies:
-                if this_piece not in group.data.adjacencies:
-                    group.data.adjacencies.append(this_piece)
-
-            # No captures.
-            return 0
-
     def move(self, player, move_bits):
 
         seat = self.get_seat_of_player(player)
@@ -265,26 +154,24 @@ class SquareOust(SeatedGame):
             return False
 
         # Is this move a valid play?
-        if not self.is_valid_play(seat, row, col):
+        index = row * self.width + col
+        if not self.engine.is_legal(index):
             self.tell_pre(player, "That move is not valid.\n")
             return False
 
-        # Valid.  Put a piece there.
+        # Valid.  Put a piece there, making any captures.
         move_str = "%s%s" % (COLS[col], row + 1)
-        piece = self.get_new_piece(seat)
-        seat.data.groups.append(piece)
-        self.layout.place(piece, row, col, True)
-
-        # Update the board, making any captures.
+        capture_count, removed = self.engine.apply(index)
+        self.move_was_capture = capture_count > 0
+        self.layout.place(self.pieces[seat.data.color], row, col, True)
         capture_str = ""
-        self.move_was_capture = False
-        capture_count = self.update_board(row, col)
         if capture_count:
+            for index in removed:
+                r, c = self.engine.coords[index]
+                self.layout.remove(r, c, update=False)
+            self.layout.update()
             capture_str = ", ^Ycapturing %s^~" % (get_plural_str(capture_count, "group"))
-            self.move_was_capture = True
         self.bc_pre("%s places a piece at ^C%s^~%s.\n" % (self.get_sp_str(seat), move_str, capture_str))
-
-        seat.data.made_move = True
         return True
 
     def resign(self, player):
@@ -298,7 +185,7 @@ class SquareOust(SeatedGame):
             self.tell_pre(player, "You must wait for your turn to resign.\n")
             return False
 
-        self.resigner = seat
+        self.engine.resign(seat.data.color)
         self.bc_pre("%s is resigning from the game.\n" % self.get_sp_str(seat))
         return True
 
@@ -374,22 +261,22 @@ class SquareOust(SeatedGame):
                         self.finish()
                     else:
 
-                        # No.  If the move was not a capturing move, see if the
-                        # next player has a move; if so, change turns.  If not,
-                        # print a message and stay here.
+                        # No.  The engine has worked out whose turn it is:
+                        # after a capture the mover goes again if they can,
+                        # and otherwise the turn passes unless the next
+                        # player has no move.  Say which.
                         other = self.next_seat(self.turn)
+                        next_seat = self.get_seat(self.engine.turn)
                         if not self.move_was_capture:
-                            if not self.has_move(other):
+                            if next_seat == self.turn:
                                 self.bc_pre("%s has no valid move; ^Rskipping their turn^~.\n" % self.get_sp_str(other))
-                            else:
-                                self.turn = other
 
-                        elif not self.has_move(self.turn):
+                        elif next_seat != self.turn:
                             self.bc_pre("%s has no further valid moves.\n" % self.get_sp_str(self.turn))
-                            self.turn = other
 
                         else:
                             self.bc_pre("%s continues their turn.\n" % self.get_sp_str(self.turn))
+                        self.turn = next_seat
 
                         # No matter what, send the board again.
                         self.send_board()
@@ -397,78 +284,18 @@ class SquareOust(SeatedGame):
         if not handled:
             self.tell_pre(player, "Invalid command.\n")
 
-    def is_valid_play(self, seat, row, col):
-
-        # Obviously we can't place a piece if there's already one here or we're
-        # out of bounds.
-        if not self.layout.is_valid(row, col) or self.layout.grid[row][col]:
-            return False
-
-        # Okay; can we place a piece here?  Check the adjacent spaces; if there
-        # are any pieces owned by this seat, the sum total of their sizes must
-        # be equal to the largest enemy group adjacent either to them or this
-        # new piece.  If there are no pieces owned by this seat, it's valid.
-        same_list = []
-        same_total = 0
-        largest_other = 0
-
-        for r_delta, c_delta in CONNECTION_DELTAS:
-            new_r = row + r_delta
-            new_c = col + c_delta
-            if self.layout.is_valid(new_r, new_c):
-                loc = self.layout.grid[new_r][new_c]
-                if loc and loc.data.owner == seat:
-                    if loc not in same_list:
-                        same_list.append(loc)
-                        same_total += loc.data.size
-                        for other in loc.data.adjacencies:
-                            if other.data.size > largest_other:
-                                largest_other = other.data.size
-                elif loc:
-                    if loc.data.size > largest_other:
-                        largest_other = loc.data.size
-
-        # If we didn't find an adjacent same-colored piece, it is immediately
-        # valid.
-        if not same_total:
-            return True
-
-        # If we found same-colored pieces but no other groups, this is not a
-        # valid play.
-        if not largest_other:
-            return False
-
-        # Otherwise, check the sum from the same_list and see if that equals
-        # or is greater than the largest other group.
-        if same_total >= largest_other:
-            return True
+    def get_seat(self, color):
 
-        # Not a valid play.
-        return False
-
-    def has_move(self, seat):
-
-        for r in range(self.height):
-            for c in range(self.width):
-                if self.is_valid_play(seat, r, c):
-                    return True
-
-        # We checked every location and found no legitimate location.  No move.
-        return False
+        if color == BLACK:
+            return self.black
+        return self.white
 
     def find_winner(self):
 
-        # Did someone resign?
-        if self.resigner == self.white:
-            return self.black
-        elif self.resigner == self.black:
-            return self.white
-
-        # If one player has no pieces left, the other player won.
-        if not len(self.white.data.groups) and self.white.data.made_move:
-            return self.black
-        elif not len(self.black.data.groups) and self.black.data.made_move:
-            return self.white
+        # The engine handles both resignations and wiped-out players.
+        winner = self.engine.winner()
+        if winner:
+            return self.get_seat(winner)
 
         # No winner.
         return None
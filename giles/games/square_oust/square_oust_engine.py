@@ -0,0 +1,297 @@
+# Giles: square_oust_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.engine import Engine
+from giles.games.geometry import get_coords, get_neighbours, SQUARE
+
+BLACK = "black"
+WHITE = "white"
+
+class SquareOustEngine(Engine):
+    """The rules of Square Oust.  Moves are flat cell indices.
+
+    Groups are numbered as they're created; each one knows its owner, its
+    cells, and the enemy groups it touches.  A move that joins up with
+    friendly groups captures every enemy group next to the result, and
+    earns another move if there is one.
+    """
+
+    def __init__(self, width, height):
+
+        super(SquareOustEngine, self).__init__()
+
+        self.width = width
+        self.height = height
+        self.neighbours = get_neighbours(SQUARE, width, height)
+        self.coords = get_coords(width, height)
+
+        cell_count = width * height
+        self.board = [None] * cell_count
+        self.next_group = 0
+        self.group_owner = {}
+        self.group_cells = {}
+        self.group_adjacencies = {}
+        self.groups = {BLACK: set(), WHITE: set()}
+
+        # Every cell starts out free for both sides: empty, with none of
+        # that side's pieces next to it, and so always a valid play.
+        self.neighbour_counts = {BLACK: [0] * cell_count, WHITE: [0] * cell_count}
+        self.free_cells = {BLACK: cell_count, WHITE: cell_count}
+
+        self.turn = BLACK
+        self.made_move = {BLACK: False, WHITE: False}
+        self.resigner = None
+
+    def is_valid(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self.width
+
+    def owner_at(self, index):
+
+        group = self.board[index]
+        if group is None:
+            return None
+        return self.group_owner[group]
+
+    def other(self, color):
+
+        if color == BLACK:
+            return WHITE
+        return BLACK
+
+    def note_placed(self, color, index):
+
+        # Keeps each side's count of free cells up to date.  The board must
+        # already have the new piece.
+        for side in (BLACK, WHITE):
+            if not self.neighbour_counts[side][index]:
+                self.free_cells[side] -= 1
+
+        counts = self.neighbour_counts[color]
+        board = self.board
+        for neighbour in self.neighbours[index]:
+            counts[neighbour] += 1
+            if counts[neighbour] == 1 and board[neighbour] is None:
+                self.free_cells[color] -= 1
+
+    def note_removed(self, color, index):
+
+        # The inverse of the above; the board must already be empty here.
+        counts = self.neighbour_counts[color]
+        board = self.board
+        for neighbour in self.neighbours[index]:
+            counts[neighbour] -= 1
+            if not counts[neighbour] and board[neighbour] is None:
+                self.free_cells[color] += 1
+
+        for side in (BLACK, WHITE):
+            if not self.neighbour_counts[side][index]:
+                self.free_cells[side] += 1
+
+    def replace(self, old, new):
+
+        # Folds group old into group new.
+        for index in self.group_cells[old]:
+            self.board[index] = new
+        self.group_cells[new].update(self.group_cells.pop(old))
+        self.groups[self.group_owner.pop(old)].remove(old)
+
+        # Replace it in the adjacencies of the other side's groups it
+        # touched.  Adjacency is symmetric, so its own set tells us which
+        # those are.
+        old_adjacencies = self.group_adjacencies.pop(old)
+        for group in old_adjacencies:
+            self.group_adjacencies[group].discard(old)
+            self.group_adjacencies[group].add(new)
+        self.group_adjacencies[new].update(old_adjacencies)
+
+    def remove(self, dead_group):
+
+        owner = self.group_owner.pop(dead_group)
+        cells = self.group_cells.pop(dead_group)
+        for index in cells:
+            self.board[index] = None
+            self.note_removed(owner, index)
+        self.groups[owner].remove(dead_group)
+
+        for group in self.group_adjacencies.pop(dead_group):
+            self.group_adjacencies[group].discard(dead_group)
+        return cells
+
+    def is_valid_play(self, color, index):
+
+        # Obviously we can't place a piece if there's already one here.
+        board = self.board
+        if board[index] is not None:
+            return False
+
+        # Check the adjacent spaces; if there are any pieces owned by this
+        # side, the sum total of their sizes must be at least the size of
+        # the largest enemy group adjacent either to them or this new
+        # piece.  If there are no pieces owned by this side, it's valid.
+        same_list = []
+        same_total = 0
+        largest_other = 0
+        group_cells = self.group_cells
+
+        for neighbour in self.neighbours[index]:
+            group = board[neighbour]
+            if group is None:
+                continue
+            if self.group_owner[group] == color:
+                if group not in same_list:
+                    same_list.append(group)
+                    same_total += len(group_cells[group])
+                    for other in self.group_adjacencies[group]:
+                        if len(group_cells[other]) > largest_other:
+                            largest_other = len(group_cells[other])
+            elif len(group_cells[group]) > largest_other:
+                largest_other = len(group_cells[group])
+
+        # If we didn't find an adjacent same-colored piece, it is
+        # immediately valid.
+        if not same_total:
+            return True
+
+        # If we found same-colored pieces but no other groups, this is not
+        # a valid play; otherwise we must be at least as big as the
+        # largest other group.
+        if not largest_other:
+            return False
+        return same_total >= largest_other
+
+    def has_move(self, color):
+
+        # Any free cell is a valid play, so we only have to look closer when
+        # every empty cell is next to one of this side's pieces.
+        if self.free_cells[color]:
+            return True
+
+        for index in range(len(self.board)):
+            if self.is_valid_play(color, index):
+                return True
+        return False
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+        return [index for index in range(len(self.board))
+                if self.is_valid_play(self.turn, index)]
+
+    def is_legal(self, move):
+        return self.is_valid_play(self.turn, move)
+
+    def play(self, color, move):
+
+        # Places a piece for color at move, merging and capturing, without
+        # changing whose turn it is.  Returns the number of groups captured
+        # and the cells they were on.
+        this_group = self.next_group
+        self.next_group += 1
+        self.group_owner[this_group] = color
+        self.group_cells[this_group] = set([move])
+        self.group_adjacencies[this_group] = set()
+        self.groups[color].add(this_group)
+        self.board[move] = this_group
+        self.note_placed(color, move)
+        self.made_move[color] = True
+
+        # Look at all of the adjacencies and collapse the same-color groups
+        # into one, the smaller merged into the larger.  Collate the unique
+        # enemy groups as well, as we may be capturing them.
+        other_adjacencies = set()
+        potential_capture = False
+        board = self.board
+        for neighbour in self.neighbours[move]:
+            group = board[neighbour]
+            if group is None:
+                continue
+            if self.group_owner[group] == color:
+                potential_capture = True
+                if group != this_group:
+                    other_adjacencies.update(self.group_adjacencies[group])
+                    if len(self.group_cells[this_group]) >= len(self.group_cells[group]):
+                        self.replace(group, this_group)
+                    else:
+                        self.replace(this_group, group)
+                        this_group = group
+            else:
+
+                # A group of the other player.
+                other_adjacencies.add(group)
+
+        # If this isn't a capture, we can't affect the opponent's groups,
+        # other than to become adjacent to them.  If it is, all groups in
+        # the list of other adjacencies are removed from the board, and by
+        # definition the capturing group has no enemy adjacencies left.
+        if potential_capture:
+            removed = []
+            for group in other_adjacencies:
+                removed.extend(self.remove(group))
+            self.group_adjacencies[this_group] = set()
+            return (len(other_adjacencies), removed)
+
+        self.group_adjacencies[this_group] = other_adjacencies
+        for group in other_adjacencies:
+            self.group_adjacencies[group].add(this_group)
+        return (0, [])
+
+    def apply(self, move):
+
+        # After a capture the side to play goes again, if they can;
+        # otherwise the turn passes, unless the other side has no move.
+        color = self.turn
+        result = self.play(color, move)
+        other = self.other(color)
+        if not result[0]:
+            if self.has_move(other):
+                self.turn = other
+        elif not self.has_move(color):
+            self.turn = other
+        return result
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        # Did someone resign?
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # If one player has no pieces left, the other player won.
+        if not self.groups[WHITE] and self.made_move[WHITE]:
+            return BLACK
+        elif not self.groups[BLACK] and self.made_move[BLACK]:
+            return WHITE
+        return None
+
+    def copy(self):
+
+        new_engine = SquareOustEngine.__new__(SquareOustEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.board = self.board[:]
+        new_engine.group_owner = dict(self.group_owner)
+        new_engine.group_cells = dict([(x, set(y)) for x, y in self.group_cells.items()])
+        new_engine.group_adjacencies = dict([(x, set(y)) for x, y in self.group_adjacencies.items()])
+        new_engine.groups = {BLACK: set(self.groups[BLACK]), WHITE: set(self.groups[WHITE])}
+        new_engine.neighbour_counts = {
+            BLACK: self.neighbour_counts[BLACK][:],
+            WHITE: self.neighbour_counts[WHITE][:],
+        }
+        new_engine.free_cells = dict(self.free_cells)
+        new_engine.made_move = dict(self.made_move)
+        return new_engine
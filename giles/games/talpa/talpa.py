@@ -18,6 +18,7 @@ from giles.games.seated_game import SeatedGame
 from giles.games.piece import Piece
 from giles.games.seat import Seat
 from giles.games.square_grid_layout import SquareGridLayout, COLS
+from giles.games.talpa.talpa_engine import TalpaEngine, RED, BLUE
 from giles.state import State
 from giles.utils import demangle_move
 
@@ -25,8 +26,6 @@ from giles.utils import demangle_move
 MIN_SIZE = 4
 MAX_SIZE = 26
 
-CONNECTION_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
-
 class Talpa(SeatedGame):
     """A Talpa game table implementation.  Invented in 2010 by Arty Sandler.
     """
@@ -52,34 +51,35 @@ class Talpa(SeatedGame):
         self.turn = None
         self.red = self.seats[0]
         self.red.data.seat_str = "^RRed/Vertical^~"
+        self.red.data.color = RED
         self.blue = self.seats[1]
         self.blue.data.seat_str = "^BBlue/Horizontal^~"
-        self.resigner = None
+        self.blue.data.color = BLUE
+        self.engine = None
         self.layout = None
 
         # Like in most connection games, there is no difference between pieces
         # of a given color, so we save time and create our singleton pieces
         # here.
-        self.rp = Piece("^R", "x", "X")
-        self.rp.data.owner = self.red
-        self.bp = Piece("^B", "o", "O")
-        self.bp.data.owner = self.blue
+        self.pieces = {
+            RED: Piece("^R", "x", "X"),
+            BLUE: Piece("^B", "o", "O"),
+        }
 
         # Initialize the starting layout.
         self.init_layout()
 
     def init_layout(self):
 
-        # Create the layout and fill it with pieces.
+        # The engine sets up the board and holds the rules; the layout just
+        # shows it.
+        self.engine = TalpaEngine(self.size)
         self.layout = SquareGridLayout(highlight_color="^I")
         self.layout.resize(self.size)
 
-        for i in range(self.size):
-            for j in range(self.size):
-                if (i + j) % 2:
-                    self.layout.place(self.rp, i, j, update=False)
-                else:
-                    self.layout.place(self.bp, i, j, update=False)
+        for index in range(len(self.engine.board)):
+            i, j = self.engine.coords[index]
+            self.layout.place(self.pieces[self.engine.board[index]], i, j, update=False)
 
         self.layout.update()
 
@@ -94,9 +94,12 @@ class Talpa(SeatedGame):
 
         return "It is ^C%s^~'s turn (%s).\n" % (self.turn.player_name, self.turn.data.seat_str)
 
+    def get_board_str(self):
+        return str(self.layout)
+
     def show(self, player):
 
-        player.tell_cc(self.layout)
+        self.tell_board(player)
         player.tell_cc(self.get_turn_str())
 
     def send_board(self):
@@ -154,14 +157,15 @@ class Talpa(SeatedGame):
             return False
 
         # Is there a piece for this player in the source location?
-        src_loc = self.layout.grid[src_r][src_c]
-        if not src_loc or src_loc.data.owner != seat:
+        color = seat.data.color
+        src = src_r * self.size + src_c
+        if self.engine.board[src] != color:
             self.tell_pre(player, "You must have a piece in the source location.\n")
             return False
 
         # Is there a piece for the other player in the destination location?
-        dst_loc = self.layout.grid[dst_r][dst_c]
-        if not dst_loc or dst_loc.data.owner == seat:
+        dst = dst_r * self.size + dst_c
+        if not self.engine.board[dst] or self.engine.board[dst] == color:
             self.tell_pre(player, "Your opponent must have a piece in the destination location.\n")
             return False
 
@@ -169,31 +173,11 @@ class Talpa(SeatedGame):
         src_str = "%s%s" % (COLS[src_c], src_r + 1)
         dst_str = "%s%s" % (COLS[dst_c], dst_r + 1)
         self.bc_pre("%s moves a piece from ^C%s^~ to ^G%s^~.\n" % (self.get_sp_str(seat), src_str, dst_str))
+        self.engine.apply((src, dst))
         self.layout.move(src_r, src_c, dst_r, dst_c, True)
 
         return True
 
-    def has_capture(self, seat):
-
-        # We loop through the board, checking each piece to see if it's for
-        # this player.  If so, we check its four adjacencies to see if one
-        # of them is for the other player.  If so, there's still a valid
-        # capture this player can make.
-        for r in range(self.size):
-            for c in range(self.size):
-                loc = self.layout.grid[r][c]
-                if loc and loc.data.owner == seat:
-                    for r_delta, c_delta in CONNECTION_DELTAS:
-                        new_r = r + r_delta
-                        new_c = c + c_delta
-                        if self.layout.is_valid(new_r, new_c):
-                            dst = self.layout.grid[new_r][new_c]
-                            if dst and dst.data.owner != seat:
-                                return True
-
-        # We never found a valid capture.
-        return False
-
     def remove(self, player, remove_bits):
 
         seat = self.get_seat_of_player(player)
@@ -213,19 +197,20 @@ class Talpa(SeatedGame):
             return False
 
         # Does this player have a piece there?
-        loc = self.layout.grid[r][c]
-        if not loc or loc.data.owner != seat:
+        index = r * self.size + c
+        if self.engine.board[index] != seat.data.color:
             self.tell_pre(player, "You must have a piece there to remove.\n")
             return False
 
         # Do they have a valid capture instead?
-        if self.has_capture(seat):
+        if self.engine.has_capture():
             self.tell_pre(player, "You have a capture left.\n")
             return False
 
         # All right, remove the piece.
         loc_str = "%s%s" % (COLS[c], r + 1)
         self.bc_pre("%s removes a piece from ^R%s^~.\n" % (self.get_sp_str(seat), loc_str))
+        self.engine.apply((index, None))
         self.layout.remove(r, c, True)
 
         return True
@@ -241,7 +226,7 @@ class Talpa(SeatedGame):
             self.tell_pre(player, "You must wait for your turn to resign.\n")
             return False
 
-        self.resigner = seat
+        self.engine.resign(seat.data.color)
         self.bc_pre("%s is resigning from the game.\n" % self.get_sp_str(seat))
         return True
 
@@ -338,82 +323,16 @@ class Talpa(SeatedGame):
 
     def find_winner(self):
 
-        # Did someone resign?
-        if self.resigner == self.red:
-            return self.blue
-        elif self.resigner == self.blue:
+        # The engine handles both resignations and connections.
+        winner = self.engine.winner()
+        if winner == RED:
             return self.red
-
-        # Like most connection games, we will do a recursive check.  Unlike
-        # most connection games, we're looking for a lack of pieces, not
-        # their existence.  In addition, if both players won at the same
-        # time, the mover loses.  We need two distinct adjacency maps since
-        # we're looking at blank spaces, not pieces of a given color, and
-        # those blank spaces can be used by either side.
-        self.blue.data.adjacency_map = []
-        self.red.data.adjacency_map = []
-        for i in range(self.size):
-            self.blue.data.adjacency_map.append([None] * self.size)
-            self.red.data.adjacency_map.append([None] * self.size)
-
-        self.red.data.won = False
-        self.blue.data.won = False
-
-        for i in range(self.size):
-            if not self.red.data.won and not self.layout.grid[0][i]:
-                self.recurse(self.red, 0, i)
-            if not self.blue.data.won and not self.layout.grid[i][0]:
-                self.recurse(self.blue, i, 0)
-
-        # Handle the double-win state (mover loses) first.
-        if self.red.data.won and self.blue.data.won:
-            if self.turn == self.red:
-                return self.blue
-            else:
-                return self.red
-
-        # Now, normal winning states.
-        elif self.red.data.won:
-            return self.red
-        elif self.blue.data.won:
+        elif winner == BLUE:
             return self.blue
 
         # No winner.
         return None
 
-    def recurse(self, seat, row, col):
-
-        # Bail if this seat's already won.
-        if seat.data.won:
-            return
-
-        # Bail if we're off the board.
-        if not self.layout.is_valid(row, col):
-            return
-
-        # Bail if we've been here.
-        if seat.data.adjacency_map[row][col]:
-            return
-
-        # Bail if there's a piece here.
-        if self.layout.grid[row][col]:
-            return
-
-        # All right.  Empty and we haven't been here.  Mark.
-        seat.data.adjacency_map[row][col] = True
-
-        # Did we hit the winning side for this player?
-        if seat == self.blue and col == self.size - 1:
-            seat.data.won = True
-            return
-        elif seat == self.red and row == self.size - 1:
-            seat.data.won = True
-            return
-
-        # Not a win yet.  Recurse over adjacencies.
-        for r_delta, c_delta in CONNECTION_DELTAS:
-            self.recurse(seat, row + r_delta, col + c_delta)
-
     def resolve(self, winner):
 
         self.send_board()
@@ -0,0 +1,184 @@
+# Giles: talpa_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.connectivity import ConnectionTracker
+from giles.games.connectivity import EDGE_TOP, EDGE_BOTTOM, EDGE_LEFT, EDGE_RIGHT
+from giles.games.engine import Engine
+from giles.games.geometry import get_coords, get_neighbours, SQUARE
+
+RED = "red"
+BLUE = "blue"
+
+# Red connects top to bottom, Blue left to right.
+GOALS = {
+    RED: EDGE_TOP | EDGE_BOTTOM,
+    BLUE: EDGE_LEFT | EDGE_RIGHT,
+}
+
+class TalpaEngine(Engine):
+    """The rules of Talpa.  The board is a flat list of RED, BLUE, or None
+    for an empty space.  Moves are (src, dst) pairs of flat indices: a
+    capture of the enemy piece at dst by the piece at src, or, if dst is
+    None, the removal of the piece at src, which is only allowed when
+    there are no captures left.
+    """
+
+    def __init__(self, size):
+
+        super(TalpaEngine, self).__init__()
+
+        self.size = size
+        self.neighbours = get_neighbours(SQUARE, size, size)
+        self.coords = get_coords(size, size)
+
+        # The starting checkerboard.
+        self.board = []
+        for i in range(size):
+            for j in range(size):
+                if (i + j) % 2:
+                    self.board.append(RED)
+                else:
+                    self.board.append(BLUE)
+
+        # Talpa only ever removes pieces, so the set of empty spaces only
+        # grows; we track their connectivity incrementally as they appear.
+        self.empty = ConnectionTracker(SQUARE, size, size)
+        self.last_emptied = None
+
+        # We also keep a count of orthogonal contacts between red and blue
+        # pieces.  Every such contact is a capture for /both/ players, so a
+        # single count tells us whether either of them has one.  On the
+        # starting checkerboard, every adjacency is a contact.
+        self.contact_count = 2 * size * (size - 1)
+
+        self.turn = RED
+        self.last_mover = None
+        self.resigner = None
+
+    def is_valid(self, row, col):
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    def other(self, color):
+
+        if color == RED:
+            return BLUE
+        return RED
+
+    def has_capture(self):
+
+        # Any red/blue contact is a capture for either player.
+        return self.contact_count > 0
+
+    def change_piece(self, index, new_color):
+
+        # Sets the space at index, keeping the contact count up to date.
+        board = self.board
+        old_color = board[index]
+        for neighbour in self.neighbours[index]:
+            other = board[neighbour]
+            if old_color and other and old_color != other:
+                self.contact_count -= 1
+            if new_color and other and new_color != other:
+                self.contact_count += 1
+        board[index] = new_color
+
+    def empty_space(self, index):
+
+        # Marks a space as newly empty.
+        self.change_piece(index, None)
+        self.empty.add(index)
+        self.last_emptied = index
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+
+        board = self.board
+        color = self.turn
+        moves = []
+        if self.has_capture():
+            for src in range(len(board)):
+                if board[src] == color:
+                    for dst in self.neighbours[src]:
+                        if board[dst] and board[dst] != color:
+                            moves.append((src, dst))
+        else:
+            for src in range(len(board)):
+                if board[src] == color:
+                    moves.append((src, None))
+        return moves
+
+    def is_legal(self, move):
+
+        src, dst = move
+        board = self.board
+        if board[src] != self.turn:
+            return False
+        if dst is None:
+            return not self.has_capture()
+        return (dst in self.neighbours[src] and board[dst] is not None and
+                board[dst] != self.turn)
+
+    def apply(self, move):
+
+        # We do a capture a space at a time so the contact count sees each
+        # change in turn.
+        src, dst = move
+        color = self.board[src]
+        self.empty_space(src)
+        if dst is not None:
+            self.change_piece(dst, color)
+        self.last_mover = self.turn
+        self.turn = self.other(self.turn)
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        # Did someone resign?
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # Unlike most connection games, we're looking for a lack of pieces,
+        # not their existence.  In addition, if both players won at the same
+        # time, the mover loses.  The empty spaces can be used by either
+        # side, so we check them against both players' goals.  There was no
+        # winner before the last move, and the only region that changed is
+        # the one containing the space just emptied, so that's all we check.
+        if self.last_emptied is None:
+            return None
+
+        edges = self.empty.edges_of(self.last_emptied)
+        red_won = (edges & GOALS[RED] == GOALS[RED])
+        blue_won = (edges & GOALS[BLUE] == GOALS[BLUE])
+
+        if red_won and blue_won:
+            return self.other(self.last_mover)
+        elif red_won:
+            return RED
+        elif blue_won:
+            return BLUE
+        return None
+
+    def copy(self):
+
+        new_engine = TalpaEngine.__new__(TalpaEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.board = self.board[:]
+        new_engine.empty = self.empty.copy()
+        return new_engine
@@ -18,12 +18,10 @@ from giles.games.seated_game import SeatedGame
 from giles.games.piece import Piece
 from giles.games.seat import Seat
 from giles.games.square_grid_layout import SquareGridLayout, COLS
+from giles.games.tanbo.tanbo_engine import TanboEngine, BLACK, WHITE
 from giles.state import State
 from giles.utils import demangle_move, get_plural_str
 
-# Deltas are useful.
-CONNECTION_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
-
 class Tanbo(SeatedGame):
     """A Tanbo game table implementation.  Invented in 1993 by Mark Steere.
     This only implements the 2p version, although it does have the 9x9, 13x13,
@@ -52,79 +50,32 @@ class Tanbo(SeatedGame):
         self.turn = None
         self.black = self.seats[0]
         self.black.data.seat_str = "^KBlack^~"
-        self.black.data.root_list = []
+        self.black.data.color = BLACK
         self.white = self.seats[1]
         self.white.data.seat_str = "^WWhite^~"
-        self.white.data.root_list = []
-        self.resigner = None
+        self.white.data.color = WHITE
+        self.pieces = {
+            BLACK: Piece("^K", "x", "X"),
+            WHITE: Piece("^W", "o", "O"),
+        }
+        self.engine = None
         self.layout = None
 
         # Initialize the starting layout.
         self.init_layout()
 
-    def get_root_piece(self, seat, num):
-        if seat == self.black:
-            p = Piece("^K", "x", "X")
-        else:
-            p = Piece("^W", "o", "O")
-
-        p.data.owner = seat
-        p.data.num = num
-        return p
-
     def init_layout(self):
 
-        # Create the layout and fill it with pieces.
+        # The engine lays out the roots and holds the rules; the layout just
+        # shows its board.
+        self.engine = TanboEngine(self.size)
         self.layout = SquareGridLayout(highlight_color="^I")
         self.layout.resize(self.size)
-
-        black_count = 0
-        white_count = 0
-        self.black.data.root_list = []
-        self.white.data.root_list = []
-
-        # There are three different layouts depending on the size.  All of them
-        # alternate between black and white pieces; the two larger ones have 16
-        # roots, whereas the smallest size has 4.  (There's a 5x5 grid for
-        # testing as well.)
-        if self.size == 5:
-            jump_delta = 4
-            extent = 2
-            offset = 0
-        elif self.size == 7:
-            jump_delta = 6
-            extent = 2
-            offset = 0
-        elif self.size == 9:
-            jump_delta = 6
-            extent = 2
-            offset = 1
-        elif self.size == 13:
-            jump_delta = 4
-            extent = 4
-            offset = 0
-        elif self.size == 19:
-            jump_delta = 6
-            extent = 4
-            offset = 0
-        else: # size == 21
-            jump_delta = 4
-            extent = 6
-            offset = 0
-        for i in range(extent):
-            for j in range(extent):
-                if (i + j) % 2:
-                    p = self.get_root_piece(self.black, black_count)
-                    self.black.data.root_list.append(p)
-                    black_count += 1
-                else:
-                    p = self.get_root_piece(self.white, white_count)
-                    self.white.data.root_list.append(p)
-                    white_count += 1
-                row = offset + i * jump_delta
-                col = offset + j * jump_delta
-                p.data.start = (row, col)
-                self.layout.place(p, row, col, update=False)
+        for index in range(len(self.engine.board)):
+            color = self.engine.owner_at(index)
+            if color:
+                row, col = self.engine.coords[index]
+                self.layout.place(self.pieces[color], row, col, update=False)
         self.layout.update()
 
     def get_sp_str(self, seat):
@@ -138,9 +89,12 @@ class Tanbo(SeatedGame):
 
         return "It is ^C%s^~'s turn (%s).\n" % (self.turn.player_name, self.turn.data.seat_str)
 
+    def get_board_str(self):
+        return str(self.layout)
+
     def show(self, player):
 
-        player.tell_cc(self.layout)
+        self.tell_board(player)
         player.tell_cc(self.get_turn_str())
 
     def send_board(self):
@@ -165,124 +119,6 @@ class Tanbo(SeatedGame):
         self.bc_pre("^R%s^~ has set the board size to ^C%d^~.\n" % (player, size))
         self.init_layout()
 
-    def can_place_at(self, seat, row, col):
-
-        # You can place a piece in Tanbo iff it is adjacent to exactly one of
-        # your own pieces.  If a location is valid, we'll return the piece that
-        # is adjacent; otherwise we return nothing.
-
-        if self.layout.grid[row][col]:
-
-            # Occupied; clearly can't place here.
-            return None
-
-        adj_count = 0
-        for r_delta, c_delta in CONNECTION_DELTAS:
-            new_r = row + r_delta
-            new_c = col + c_delta
-            if self.layout.is_valid(new_r, new_c):
-                loc = self.layout.grid[new_r][new_c]
-                if loc and loc.data.owner == seat:
-                    piece = loc
-                    adj_count += 1
-
-        if adj_count == 1:
-            return piece
-        else:
-            return None
-
-    def recurse_is_bound(self, piece, row, col, prev_row, prev_col):
-
-        # Thanks to the way Tanbo placement works, we don't have to worry about
-        # loops, so we can get away with not using an adjacenty map and instead
-        # just track the direction we came from.
-        #
-        # Bail if this isn't a valid location.
-        if not self.layout.is_valid(row, col):
-            return True
-
-        loc = self.layout.grid[row][col]
-
-        # If there's no piece here, see if we can place one.
-        if not loc:
-            if self.can_place_at(piece.data.owner, row, col):
-
-                # Yup.  This root isn't bound.
-                return False
-
-            else:
-
-                # No, this location is binding.
-                return True
-
-        elif loc != piece:
-
-            # Some other root.  Definitely binding.
-            return True
-
-        else:
-
-            # Okay, it's another part of this root.  Recurse, but don't double
-            # back.
-            for r_delta, c_delta in CONNECTION_DELTAS:
-                new_r = row + r_delta
-                new_c = col + c_delta
-                if new_r != prev_row or new_c != prev_col:
-                    if not self.recurse_is_bound(piece, new_r, new_c, row, col):
-
-                        # A recursive call found a liberty.  Awesome!
-                        return False
-
-            # All of the recursive calls returned that they were bound.  This
-            # (sub)root is bound.
-            return True
-
-    def root_is_bound(self, piece):
-
-        # We'll just start recursing at the root's starting location and find
-        # whether it's bound or not.
-        row, col = piece.data.start
-        return self.recurse_is_bound(piece, row, col, None, None)
-
-    def kill_root(self, piece):
-
-        # We could do this recursively, but we're lazy.
-        for r in range(self.size):
-            for c in range(self.size):
-                loc = self.layout.grid[r][c]
-                if loc == piece:
-                    self.layout.remove(r, c, update=False)
-        self.layout.update()
-
-        # Remove this root from the owner's root list.
-        piece.data.owner.data.root_list.remove(piece)
-
-    def update_roots(self, row, col):
-
-        # If the piece at row, col is part of a bounded root, that root is killed.
-        piece = self.layout.grid[row][col]
-        if self.root_is_bound(piece):
-            self.kill_root(piece)
-
-            # -1 indicates a suicide.
-            return -1
-
-        # Not a suicide; loop through all roots, finding bound ones.
-        bound_root_list = []
-        all_roots = self.black.data.root_list[:]
-        all_roots.extend(self.white.data.root_list)
-        for root in all_roots:
-            if self.root_is_bound(root):
-                bound_root_list.append(root)
-
-        bound_count = 0
-        for bound_root in bound_root_list:
-            self.kill_root(bound_root)
-            bound_count += 1
-
-        # Return the number of roots we killed.
-        return bound_count
-
     def move(self, player, move_bits):
 
         seat = self.get_seat_of_player(player)
@@ -302,18 +138,22 @@ class Tanbo(SeatedGame):
             return False
 
         # Is it a valid Tanbo play?
-        piece = self.can_place_at(seat, row, col)
-        if not piece:
+        index = row * self.size + col
+        if not self.engine.is_legal(index):
             self.tell_pre(player, "That location is not adjacent to exactly one of your pieces.\n")
             return False
 
-        # Valid.  Put the piece there.
+        # Valid.  Put the piece there, and take away any roots that died.
         move_str = "%s%s" % (COLS[col], row + 1)
-        self.layout.place(piece, row, col, True)
+        root_kill, removed = self.engine.apply(index)
+        self.layout.place(self.pieces[seat.data.color], row, col, True)
+        if removed:
+            for index in removed:
+                r, c = self.engine.coords[index]
+                self.layout.remove(r, c, update=False)
+            self.layout.update()
 
-        # Update the root statuses.
         root_kill_str = ""
-        root_kill = self.update_roots(row, col)
         if root_kill < 0:
             root_kill_str = ", ^ysuiciding the root^~"
         elif root_kill > 0:
@@ -333,7 +173,7 @@ class Tanbo(SeatedGame):
             self.tell_pre(player, "You must wait for your turn to resign.\n")
             return False
 
-        self.resigner = seat
+        self.engine.resign(seat.data.color)
         self.bc_pre("%s is resigning from the game.\n" % self.get_sp_str(seat))
         return True
 
@@ -421,16 +261,11 @@ class Tanbo(SeatedGame):
 
     def find_winner(self):
 
-        # Did someone resign?
-        if self.resigner == self.white:
-            return self.black
-        elif self.resigner == self.black:
-            return self.white
-
-        # If one player has no pieces left, the other player won.
-        if not len(self.white.data.root_list):
+        # The engine handles both resignations and dead roots.
+        winner = self.engine.winner()
+        if winner == BLACK:
             return self.black
-        elif not len(self.black.data.root_list):
+        elif winner == WHITE:
             return self.white
 
         # No winner.
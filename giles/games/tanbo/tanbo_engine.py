@@ -0,0 +1,251 @@
+# Giles: tanbo_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.engine import Engine
+from giles.games.geometry import get_coords, get_neighbours, SQUARE
+
+BLACK = "black"
+WHITE = "white"
+
+# Starting layouts, by board size: (jump_delta, extent, offset).  All of
+# them alternate between black and white roots; the two larger ones have
+# 16 roots, whereas the smallest size has 4.  (There's a 5x5 grid for
+# testing as well.)
+LAYOUTS = {
+    5: (4, 2, 0),
+    7: (6, 2, 0),
+    9: (6, 2, 1),
+    13: (4, 4, 0),
+    19: (6, 4, 0),
+    21: (4, 6, 0),
+}
+
+class TanboEngine(Engine):
+    """The rules of Tanbo.  Moves are flat cell indices.
+
+    Every piece belongs to a root, numbered from 0 as they're laid out.
+    A root's frontier is the set of empty cells next to it where its owner
+    could place a piece; a root with an empty frontier is bound, and dies
+    at the end of the move.  Each empty cell credits its frontier to the
+    one root (if any) its owner could grow there from, so the frontiers
+    are kept up to date by rechecking only the cells a move touches.
+    """
+
+    def __init__(self, size):
+
+        super(TanboEngine, self).__init__()
+
+        self.size = size
+        self.neighbours = get_neighbours(SQUARE, size, size)
+        self.coords = get_coords(size, size)
+
+        cell_count = size * size
+        self.board = [None] * cell_count
+        self.root_owner = []
+        self.root_cells = []
+        self.root_frontier = []
+        self.root_lists = {BLACK: [], WHITE: []}
+        self.bound_roots = set()
+        self.credits = {BLACK: [None] * cell_count, WHITE: [None] * cell_count}
+
+        jump_delta, extent, offset = LAYOUTS[size]
+        for i in range(extent):
+            for j in range(extent):
+                if (i + j) % 2:
+                    color = BLACK
+                else:
+                    color = WHITE
+                index = (offset + i * jump_delta) * size + offset + j * jump_delta
+                root = len(self.root_owner)
+                self.root_owner.append(color)
+                self.root_cells.append(set([index]))
+                self.root_frontier.append(0)
+                self.root_lists[color].append(root)
+                self.board[index] = root
+
+        # Work out every root's frontier from scratch.
+        self.refresh_frontier(range(cell_count))
+        for color in (BLACK, WHITE):
+            for root in self.root_lists[color]:
+                if not self.root_frontier[root]:
+                    self.bound_roots.add(root)
+
+        self.turn = BLACK
+        self.resigner = None
+
+    def is_valid(self, row, col):
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    def owner_at(self, index):
+
+        root = self.board[index]
+        if root is None:
+            return None
+        return self.root_owner[root]
+
+    def root_for(self, color, index):
+
+        # You can place a piece in Tanbo iff it is adjacent to exactly one
+        # of your own pieces.  If a location is valid, we return the root
+        # of that piece; otherwise we return None.
+        board = self.board
+        if board[index] is not None:
+
+            # Occupied; clearly can't place here.
+            return None
+
+        adj_count = 0
+        root_owner = self.root_owner
+        for neighbour in self.neighbours[index]:
+            root = board[neighbour]
+            if root is not None and root_owner[root] == color:
+                found = root
+                adj_count += 1
+
+        if adj_count == 1:
+            return found
+        return None
+
+    def refresh_frontier(self, indices):
+
+        # Placing or removing a piece can only change whether that cell and
+        # its neighbours are placeable, so we recheck just those and move
+        # each cell's credit to whichever root (if any) now owns it.  Since
+        # a seat's roots never touch, a placeable cell is next to exactly
+        # one root.
+        for index in indices:
+            for color in (BLACK, WHITE):
+                credits = self.credits[color]
+                old_root = credits[index]
+                new_root = self.root_for(color, index)
+                if new_root != old_root:
+                    credits[index] = new_root
+                    if old_root is not None:
+                        self.adjust_frontier(old_root, -1)
+                    if new_root is not None:
+                        self.adjust_frontier(new_root, 1)
+
+    def adjust_frontier(self, root, delta):
+
+        self.root_frontier[root] += delta
+        if self.root_frontier[root]:
+            self.bound_roots.discard(root)
+        else:
+            self.bound_roots.add(root)
+
+    def affected_by(self, indices):
+
+        # Returns the cells whose placeability may change when the given
+        # cells change.
+        affected = set(indices)
+        for index in indices:
+            affected.update(self.neighbours[index])
+        return affected
+
+    def kill_root(self, root):
+
+        # The root knows its own cells, so there's no need to go looking.
+        cells = self.root_cells[root]
+        for index in cells:
+            self.board[index] = None
+        self.refresh_frontier(self.affected_by(cells))
+        self.root_cells[root] = set()
+        self.bound_roots.discard(root)
+        self.root_lists[self.root_owner[root]].remove(root)
+        return cells
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+
+        # Every empty cell the side to play could grow into is credited to
+        # one of their roots.
+        credits = self.credits[self.turn]
+        return [index for index in range(len(credits)) if credits[index] is not None]
+
+    def is_legal(self, move):
+        return self.root_for(self.turn, move) is not None
+
+    def play(self, color, move):
+
+        # Grows one of color's roots into the cell move and kills whatever
+        # is bound afterwards, without passing the turn.  Returns the
+        # number of roots killed (-1 for a suicide) and the cells cleared.
+        root = self.root_for(color, move)
+        self.board[move] = root
+        self.root_cells[root].add(move)
+        self.refresh_frontier(self.affected_by([move]))
+
+        # If the piece just placed is part of a bound root, that root is
+        # killed.
+        if root in self.bound_roots:
+            return (-1, list(self.kill_root(root)))
+
+        # Not a suicide; kill every bound root.  We gather them all first,
+        # as killing one may free up space for another.
+        bound_root_list = [x for x in self.root_lists[BLACK] + self.root_lists[WHITE]
+                           if x in self.bound_roots]
+        removed = []
+        for bound_root in bound_root_list:
+            removed.extend(self.kill_root(bound_root))
+        return (len(bound_root_list), removed)
+
+    def other(self, color):
+
+        if color == BLACK:
+            return WHITE
+        return BLACK
+
+    def apply(self, move):
+
+        result = self.play(self.turn, move)
+        self.turn = self.other(self.turn)
+        return result
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        # Did someone resign?
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # If one player has no pieces left, the other player won.
+        if not self.root_lists[WHITE]:
+            return BLACK
+        elif not self.root_lists[BLACK]:
+            return WHITE
+        return None
+
+    def copy(self):
+
+        new_engine = TanboEngine.__new__(TanboEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.board = self.board[:]
+        new_engine.root_cells = [set(x) for x in self.root_cells]
+        new_engine.root_frontier = self.root_frontier[:]
+        new_engine.root_lists = {
+            BLACK: self.root_lists[BLACK][:],
+            WHITE: self.root_lists[WHITE][:],
+        }
+        new_engine.bound_roots = set(self.bound_roots)
+        new_engine.credits = {
+            BLACK: self.credits[BLACK][:],
+            WHITE: self.credits[WHITE][:],
+        }
+        return new_engine
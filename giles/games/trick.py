@@ -17,7 +17,7 @@
 # This file holds a number of functions useful for card games, specifically
 # trick-taking games such as Whist, Spades, Bridge, Bourre, Hokm, and Hearts.
 
-from giles.games.hand import Hand
+from giles.games.hand import Hand, CardHand
 
 def handle_trick(hand, trump_suit=None, last_wins=False):
     """handle_trick() is a utility function for the vast majority of
@@ -91,14 +91,18 @@ def handle_trick(hand, trump_suit=None, last_wins=False):
 def hand_has_suit(hand, suit):
 
     # Returns true if the hand has at least one card in a given suit.
-    cards_in_suit = [x for x in hand if x.suit == suit]
-    if len(cards_in_suit):
-        return True
+    # CardHands know this already.
+    if isinstance(hand, CardHand):
+        return hand.has_suit(suit)
+    for card in hand:
+        if card.suit == suit:
+            return True
     return False
 
 def sorted_hand(hand, trump_suit=None):
     """Sorts a hand of cards.  Puts trumps first, if any, then sorts the
-    remaining suits arbitrarily.  Returns this newly-sorted hand.
+    remaining suits arbitrarily.  Returns this newly-sorted hand, which is
+    a CardHand if the original was.
     """
 
     trump_cards = Hand()
@@ -114,7 +118,10 @@ def sorted_hand(hand, trump_suit=None):
         hand_to_add_to.add(card)
 
     # Now that they're sorted out, combine them back together.
-    s_hand = Hand()
+    if isinstance(hand, CardHand):
+        s_hand = CardHand()
+    else:
+        s_hand = Hand()
     trump_cards.sort()
     for card in trump_cards:
         s_hand.add(card)
@@ -14,14 +14,15 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from giles.games.double_dummy import QUICK_BUDGET
 from giles.games.four_player_card_game_layout import FourPlayerCardGameLayout, NORTH, SOUTH, EAST, WEST
 from giles.games.seated_game import SeatedGame
-from giles.games.hand import Hand
-from giles.games.playing_card import new_deck, str_to_card, card_to_str, hand_to_str, SHORT, LONG
+from giles.games.playing_card import str_to_card, card_to_str, hand_to_str, SHORT, LONG
 from giles.games.seat import Seat
-from giles.games.trick import handle_trick, hand_has_suit, sorted_hand
+from giles.games.trick import hand_has_suit
+from giles.games.whist.whist_engine import WhistEngine, NORTH_SOUTH, EAST_WEST
 from giles.state import State
-from giles.utils import Struct, get_plural_str
+from giles.utils import get_plural_str
 
 class Whist(SeatedGame):
     """A Whist game table implementation.  Whist came about sometime in the
@@ -49,22 +50,16 @@ class Whist(SeatedGame):
         self.log_prefix = "%s/%s: " % (self.table_display_name, self.game_display_name)
 
         # Whist-specific guff.
-        self.ns = Struct()
-        self.ns.score = 0
-        self.ew = Struct()
-        self.ew.score = 0
         self.seats[0].data.who = NORTH
         self.seats[1].data.who = EAST
         self.seats[2].data.who = SOUTH
         self.seats[3].data.who = WEST
 
+        # The engine holds the cards and the rules; we just talk to people.
         self.goal = 5
-        self.trick = None
-        self.trump_suit = None
-        self.led_suit = None
+        self.engine = WhistEngine(self.goal)
         self.turn = None
         self.dealer = None
-        self.winner = None
 
         self.layout = FourPlayerCardGameLayout()
 
@@ -78,13 +73,18 @@ class Whist(SeatedGame):
         player.tell_cc("\nWHIST PLAY:\n\n")
         player.tell_cc("              ^!play^. <card>, ^!pl^.     Play <card> from your hand.\n")
         player.tell_cc("                 ^!hand^., ^!inv^., ^!i^.     Look at the cards in your hand.\n")
+        player.tell_cc("                          ^!claim^.     Claim the rest of the tricks for your side.\n")
+
+    def get_board_str(self):
+        return str(self.layout)
 
     def display(self, player):
 
-        player.tell_cc("%s" % self.layout)
+        self.tell_board(player)
 
     def get_score_str(self):
-        return "          ^RNorth/South^~: %d    ^MEast/West^~: %d\n" % (self.ns.score, self.ew.score)
+        scores = self.engine.scores
+        return "          ^RNorth/South^~: %d    ^MEast/West^~: %d\n" % (scores[NORTH_SOUTH], scores[EAST_WEST])
 
     def get_color_code(self, seat):
 
@@ -101,8 +101,9 @@ class Whist(SeatedGame):
 
         to_return = "\n\n"
         if self.turn:
-            to_return += "It is ^Y%s^~'s turn (%s%s^~).  Trumps are ^C%s^~.\n" % (self.turn.player_name, self.get_color_code(self.turn), self.turn, self.trump_suit)
-            to_return += "Tricks:   ^RNorth/South^~: %d    ^MEast/West^~: %d\n" % (self.ns.tricks, self.ew.tricks)
+            tricks = self.engine.tricks
+            to_return += "It is ^Y%s^~'s turn (%s%s^~).  Trumps are ^C%s^~.\n" % (self.turn.player_name, self.get_color_code(self.turn), self.turn, self.engine.trump_suit)
+            to_return += "Tricks:   ^RNorth/South^~: %d    ^MEast/West^~: %d\n" % (tricks[NORTH_SOUTH], tricks[EAST_WEST])
         to_return += "The goal score for this game is ^C%s^~.\n" % get_plural_str(self.goal, "point")
         to_return += self.get_score_str()
 
@@ -125,55 +126,33 @@ class Whist(SeatedGame):
 
         # Got a valid goal.
         self.goal = new_goal
+        self.engine.goal = new_goal
         self.bc_pre("^M%s^~ has changed the goal to ^G%s^~.\n" % (player, get_plural_str(new_goal, "point")))
 
-    def clear_trick(self):
-
-        # Set the current trick to an empty hand...
-        self.trick = Hand()
-        self.led_suit = None
+    def get_hand(self, seat):
+        return self.engine.hands[self.seats.index(seat)]
 
-        # ...and set everyone's played card to None.
-        for seat in self.seats:
-            seat.data.card = None
+    def update_turn(self):
 
-        # Clear the layout as well.
-        self.layout.clear()
+        self.turn = self.seats[self.engine.turn]
+        self.layout.change_turn(self.turn.data.who)
 
     def new_deal(self):
 
         dealer_name = self.dealer.player_name
 
         self.bc_pre("^R%s^~ (%s%s^~) gives the cards a good shuffle...\n" % (dealer_name, self.get_color_code(self.dealer), self.dealer))
-        deck = new_deck()
-        deck.shuffle()
 
-        # Deal out all of the cards.  We'll flip the last one; that determines
-        # the trump suit for the hand.
+        # The engine deals out all of the cards and flips the dealer's last
+        # one; that determines the trump suit for the hand.
         self.bc_pre("^R%s^~ deals the cards out to all the players.\n" % dealer_name)
-        for seat in self.seats:
-            seat.data.hand = Hand()
-        for i in range(13):
-            for seat in self.seats:
-                seat.data.hand.add(deck.discard())
-
-        # Flip the dealer's last card; it determines the trump suit.
-        last_card = self.dealer.data.hand[-1]
+        last_card = self.engine.new_deal()
         self.bc_pre("^R%s^~ flips their last card; it is ^C%s^~.\n" % (dealer_name,
            card_to_str(last_card, LONG)))
-        self.trump_suit = last_card.suit
-
-        # Sort everyone's hands.
-        for seat in self.seats:
-            seat.data.hand = sorted_hand(seat.data.hand, self.trump_suit)
 
         # Show everyone their hands.
         self.show_hands()
 
-        # Set the trick counts to zero.
-        self.ns.tricks = 0
-        self.ew.tricks = 0
-
     def show_hand(self, player):
 
         seat = self.get_seat_of_player(player)
@@ -183,7 +162,7 @@ class Whist(SeatedGame):
             return
 
         print_str = "Your current hand:\n   "
-        print_str += hand_to_str(seat.data.hand, self.trump_suit)
+        print_str += hand_to_str(self.get_hand(seat), self.engine.trump_suit)
         print_str += "\n"
         self.tell_pre(player, print_str)
 
@@ -212,18 +191,20 @@ class Whist(SeatedGame):
             return False
 
         # Do they even have this card?
-        if potential_card not in seat.data.hand:
+        hand = self.get_hand(seat)
+        if potential_card not in hand:
             self.tell_pre(player, "You don't have that card!\n")
             return False
 
         # Okay, it's a card in their hand.  First, let's do the "follow the
         # led suit" business.
         action_str = "^Wplays^~"
-        if self.led_suit:
+        led_suit = self.engine.led_suit
+        if led_suit:
 
             this_suit = potential_card.suit
-            if (this_suit != self.led_suit and
-               hand_has_suit(seat.data.hand, self.led_suit)):
+            if (this_suit != led_suit and
+               hand_has_suit(hand, led_suit)):
 
                 # You can't play off-suit if you can match the led suit.
                 self.tell_pre(player, "You can't throw off; you have the led suit.\n")
@@ -233,19 +214,67 @@ class Whist(SeatedGame):
 
             # No led suit; they're the leader.
             action_str = "^Yleads^~ with"
-            self.led_suit = potential_card.suit
 
         # They either matched the led suit, didn't have any of it, or they
         # are themselves the leader.  Nevertheless, their play is valid.
-        seat.data.card = potential_card
-        self.trick.add(seat.data.hand.discard_specific(potential_card))
+        self.engine.play(potential_card)
         trump_str = ""
-        if potential_card.suit == self.trump_suit:
+        if potential_card.suit == self.engine.trump_suit:
             trump_str = ", a ^Rtrump^~"
         self.bc_pre("%s %s ^C%s^~%s.\n" % (self.get_sp_str(seat), action_str, card_to_str(potential_card, LONG), trump_str))
         self.layout.place(seat.data.who, potential_card)
         return potential_card
 
+    def get_partnership(self, seat):
+        return self.engine.partnership_of(self.seats.index(seat))
+
+    def get_partnership_str(self, partnership):
+
+        if partnership == NORTH_SOUTH:
+            return "^RNorth/South^~"
+        return "^MEast/West^~"
+
+    def give_rest(self, partnership):
+
+        # The partnership takes every trick left in the hand.
+        remaining = self.engine.give_rest(partnership)
+        self.bc_pre("%s takes the remaining ^C%s^~.\n" % (self.get_partnership_str(partnership), get_plural_str(remaining, "trick")))
+
+    def claim(self, player):
+
+        seat = self.get_seat_of_player(player)
+        if not seat:
+            self.tell_pre(player, "You're not playing!\n")
+            return
+
+        if len(self.engine.trick):
+            self.tell_pre(player, "You can only claim between tricks.\n")
+            return
+
+        partnership = self.get_partnership(seat)
+        holds = self.engine.holds_rest(partnership)
+        if holds is None:
+            self.tell_pre(player, "That claim is too complicated to check; play on.\n")
+            return
+        elif not holds:
+            self.tell_pre(player, "The other side can still take a trick; play on.\n")
+            return
+
+        self.bc_pre("%s claims the rest of the tricks.\n" % self.get_sp_str(seat))
+        self.give_rest(partnership)
+        self.finish_play()
+
+    def auto_claim(self):
+
+        # If either side is sure to take every trick that's left, there's
+        # no point making everyone play them out.  Returns True if so.
+        for partnership in (NORTH_SOUTH, EAST_WEST):
+            if self.engine.holds_rest(partnership, QUICK_BUDGET):
+                self.bc_pre("The rest of the hand is decided.\n")
+                self.give_rest(partnership)
+                return True
+        return False
+
     def tick(self):
 
         # If all seats are full and active, autostart.
@@ -256,15 +285,13 @@ class Whist(SeatedGame):
             self.bc_pre("The game has begun.\n")
 
             # Initialize everything by clearing the (non-existent) trick.
-            self.clear_trick()
+            self.layout.clear()
 
-            # Make a new deal.
+            # Make a new deal; eldest leads to the first trick.
             self.dealer = self.seats[0]
+            self.engine.dealer = 0
             self.new_deal()
-
-            # Eldest leads to the first trick.
-            self.turn = self.next_seat(self.dealer)
-            self.layout.change_turn(self.turn.data.who)
+            self.update_turn()
 
     def handle(self, player, command_str):
 
@@ -313,111 +340,90 @@ class Whist(SeatedGame):
                         self.tell_pre(player, "Invalid play command.\n")
                     handled = True
 
+                elif primary in ("claim",):
+                    self.claim(player)
+                    handled = True
+
                 if card_played:
 
                     # A card hit the table.  We need to do stuff.
-                    if len(self.trick) == 4:
+                    if self.engine.trick_complete():
 
                         # Finish the trick up.
                         self.finish_trick()
 
-                        # Is that the last trick of this hand?
-                        if self.ns.tricks + self.ew.tricks == 13:
-
-                            # Yup.  Finish the hand up.
-                            self.finish_hand()
-
-                            # Did someone win the overall game?
-                            winner = self.find_winner()
-                            if winner:
-
-                                # Yup.  Finish.
-                                self.resolve(winner)
-                                self.finish()
-
-                            else:
-
-                                # Nope.  Pass the deal to the next dealer...
-                                self.dealer = self.next_seat(self.dealer)
-
-                                # Deal and set up the first player.
-                                self.new_deal()
-                                self.turn = self.next_seat(self.dealer)
-                                self.layout.change_turn(self.turn.data.who)
+                        # Is that the last trick of this hand, or are the
+                        # rest of them a foregone conclusion?
+                        if self.engine.hand_over() or self.auto_claim():
+                            self.finish_play()
 
                     else:
 
                         # Trick not over.  Rotate.
-                        self.turn = self.next_seat(self.turn)
-                        self.layout.change_turn(self.turn.data.who)
+                        self.update_turn()
                         if self.turn.player:
                             self.show_hand(self.turn.player)
 
         if not handled:
             self.tell_pre(player, "Invalid command.\n")
 
-    def finish_trick(self):
+    def finish_play(self):
 
-        # Okay, we have a trick with four cards.  Which card won?
-        winner = handle_trick(self.trick, self.trump_suit)
+        # All of the tricks have been taken.  Finish the hand up.
+        self.finish_hand()
 
-        # This /should/ just return one seat...
-        winning_seat_list = [x for x in self.seats if x.data.card == winner]
+        # Did someone win the overall game?
+        winner = self.find_winner()
+        if winner:
 
-        if len(winning_seat_list) != 1:
-            self.server.log.log(self.log_prefix + "Something went horribly awry; trick ended without a finish.")
-            self.bc_pre("Something went horribly wrong; no one won the trick!  Tell the admin.\n")
-            return
+            # Yup.  Finish.
+            self.resolve(winner)
+            self.finish()
 
-        winning_seat = winning_seat_list[0]
+        else:
 
-        # Print information about the winning card.
-        self.bc_pre("%s wins the trick with ^C%s^~.\n" % (self.get_sp_str(winning_seat), card_to_str(winner, LONG)))
+            # Nope.  Pass the deal to the next dealer...
+            self.engine.pass_deal()
+            self.dealer = self.seats[self.engine.dealer]
 
-        # Give the trick to the correct partnership.
-        if winning_seat == self.seats[0] or winning_seat == self.seats[2]:
-            self.ns.tricks += 1
-        else:
-            self.ew.tricks += 1
+            # Deal and set up the first player.
+            self.new_deal()
+            self.update_turn()
 
-        # Clear the trick.
-        self.clear_trick()
+    def finish_trick(self):
 
-        # Set the next leader to the player who won.
-        self.turn = winning_seat
-        self.layout.change_turn(self.turn.data.who)
+        # Okay, we have a trick with four cards.  The engine works out which
+        # card won, gives the trick to that partnership, and sets the
+        # winner to lead next.
+        position, winner = self.engine.finish_trick()
+        winning_seat = self.seats[position]
+
+        # Print information about the winning card.
+        self.bc_pre("%s wins the trick with ^C%s^~.\n" % (self.get_sp_str(winning_seat), card_to_str(winner, LONG)))
+
+        # Clear the trick, and show the next leader their hand.
+        self.layout.clear()
+        self.update_turn()
         if self.turn.player:
             self.show_hand(self.turn.player)
 
     def finish_hand(self):
 
         # Which side won more than 6 tricks?
-        if self.ns.tricks > 6:
-            winning_side = "^RNorth/South^~"
-            addend = self.ns.tricks - 6
-            self.ns.score += addend
-        else:
-            winning_side = "^MEast/West^~"
-            addend = self.ew.tricks - 6
-            self.ew.score += addend
+        winning_side, addend = self.engine.finish_hand()
 
         # Let everyone know.
-        self.bc_pre("%s wins the hand and gains ^C%s^~.\n" % (winning_side, get_plural_str(addend, "point")))
+        self.bc_pre("%s wins the hand and gains ^C%s^~.\n" % (self.get_partnership_str(winning_side), get_plural_str(addend, "point")))
         self.bc_pre(self.get_score_str())
 
     def find_winner(self):
 
         # Easy: has one of the sides reached a winning score?
-        if self.ns.score >= self.goal:
-            return self.ns
-        elif self.ew.score >= self.goal:
-            return self.ew
-
-        return None
+        return self.engine.winner()
 
     def resolve(self, winning_partnership):
 
-        if self.ns == winning_partnership:
+        if winning_partnership == NORTH_SOUTH:
             name_one = self.seats[0].player_name
             name_two = self.seats[2].player_name
         else:
@@ -0,0 +1,200 @@
+# Giles: whist_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.double_dummy import claim_holds, DEFAULT_BUDGET
+from giles.games.engine import Engine
+from giles.games.hand import Hand, CardHand
+from giles.games.playing_card import new_deck
+from giles.games.trick import handle_trick, hand_has_suit, sorted_hand
+
+# Positions are 0 to 3: North, East, South, and West.
+NORTH_SOUTH = "north_south"
+EAST_WEST = "east_west"
+
+class WhistEngine(Engine):
+    """The rules of Whist.  The side to play is a position, 0 to 3, and
+    moves are cards from that position's hand.  A hand ends once all of
+    its tricks are taken; the partnership that took more than six scores
+    a point for each extra trick, and the first to the goal wins.
+
+    apply() plays a whole game through, dealing each new hand as the last
+    one ends; tables call the individual steps so they can talk about
+    each one as it happens.
+    """
+
+    def __init__(self, goal=5, dealer=0):
+
+        super(WhistEngine, self).__init__()
+
+        self.goal = goal
+        self.dealer = dealer
+        self.hands = [CardHand() for i in range(4)]
+        self.trick = Hand()
+        self.played = [None] * 4
+        self.led_suit = None
+        self.trump_suit = None
+        self.tricks = {NORTH_SOUTH: 0, EAST_WEST: 0}
+        self.scores = {NORTH_SOUTH: 0, EAST_WEST: 0}
+        self.turn = None
+
+    def next_position(self, position):
+        return (position + 1) % 4
+
+    def partnership_of(self, position):
+
+        if position % 2:
+            return EAST_WEST
+        return NORTH_SOUTH
+
+    def new_deal(self):
+
+        # Shuffles and deals out every card.  The dealer's last card is
+        # flipped to set the trump suit; we return it.
+        deck = new_deck()
+        deck.shuffle()
+        self.hands = [CardHand() for i in range(4)]
+        for i in range(13):
+            for hand in self.hands:
+                hand.add(deck.discard())
+
+        last_card = self.hands[self.dealer][-1]
+        self.trump_suit = last_card.suit
+
+        # Sort everyone's hands.
+        self.hands = [sorted_hand(hand, self.trump_suit) for hand in self.hands]
+
+        # Eldest leads to the first trick.
+        self.tricks = {NORTH_SOUTH: 0, EAST_WEST: 0}
+        self.clear_trick()
+        self.turn = self.next_position(self.dealer)
+        return last_card
+
+    def clear_trick(self):
+
+        self.trick = Hand()
+        self.played = [None] * 4
+        self.led_suit = None
+
+    def can_play(self, card):
+
+        # You can't play off-suit if you can match the led suit.
+        hand = self.hands[self.turn]
+        if card not in hand:
+            return False
+        return (not self.led_suit or card.suit == self.led_suit or
+                not hand_has_suit(hand, self.led_suit))
+
+    def play(self, card):
+
+        # Plays a card for the side to play, and passes the turn if the
+        # trick isn't over.
+        if not self.led_suit:
+            self.led_suit = card.suit
+        self.played[self.turn] = card
+        self.trick.add(self.hands[self.turn].discard_specific(card))
+        if not self.trick_complete():
+            self.turn = self.next_position(self.turn)
+
+    def trick_complete(self):
+        return len(self.trick) == 4
+
+    def finish_trick(self):
+
+        # Gives the trick to the partnership of whoever played the winning
+        # card, who leads next.  Returns the winner's position and card.
+        winning_card = handle_trick(self.trick, self.trump_suit)
+        winner = self.played.index(winning_card)
+        self.tricks[self.partnership_of(winner)] += 1
+        self.clear_trick()
+        self.turn = winner
+        return (winner, winning_card)
+
+    def hand_over(self):
+        return self.tricks[NORTH_SOUTH] + self.tricks[EAST_WEST] == 13
+
+    def holds_rest(self, partnership, budget=DEFAULT_BUDGET):
+
+        # Can this partnership take every remaining trick, whatever the
+        # other side does?  None if the solver gave up.
+        side = [i for i in range(4) if self.partnership_of(i) == partnership]
+        return claim_holds(self.hands, self.turn, self.trump_suit, side, budget)
+
+    def give_rest(self, partnership):
+
+        # The partnership takes every trick left in the hand.  Returns how
+        # many that was.
+        remaining = len(self.hands[self.turn])
+        self.tricks[partnership] += remaining
+        for hand in self.hands:
+            hand.muck()
+        return remaining
+
+    def finish_hand(self):
+
+        # Which side won more than 6 tricks?  Returns it and the points it
+        # gained.
+        if self.tricks[NORTH_SOUTH] > 6:
+            winning_side = NORTH_SOUTH
+        else:
+            winning_side = EAST_WEST
+        addend = self.tricks[winning_side] - 6
+        self.scores[winning_side] += addend
+        return (winning_side, addend)
+
+    def pass_deal(self):
+        self.dealer = self.next_position(self.dealer)
+
+    def legal_moves(self):
+
+        if self.winner() or self.turn is None:
+            return []
+        return [card for card in self.hands[self.turn] if self.can_play(card)]
+
+    def is_legal(self, move):
+        return self.turn is not None and self.can_play(move)
+
+    def apply(self, move):
+
+        self.play(move)
+        if self.trick_complete():
+            self.finish_trick()
+            if self.hand_over():
+                self.finish_hand()
+                if not self.winner():
+                    self.pass_deal()
+                    self.new_deal()
+
+    def winner(self):
+
+        # Easy: has one of the sides reached a winning score?
+        if self.scores[NORTH_SOUTH] >= self.goal:
+            return NORTH_SOUTH
+        elif self.scores[EAST_WEST] >= self.goal:
+            return EAST_WEST
+        return None
+
+    def copy(self):
+
+        new_engine = WhistEngine.__new__(WhistEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.hands = [hand.copy() for hand in self.hands]
+        new_engine.trick = Hand()
+        for card in self.trick:
+            new_engine.trick.add(card)
+        new_engine.played = self.played[:]
+        new_engine.tricks = dict(self.tricks)
+        new_engine.scores = dict(self.scores)
+        return new_engine
@@ -19,27 +19,12 @@ from giles.utils import demangle_move
 from giles.state import State
 from giles.games.seated_game import SeatedGame
 from giles.games.seat import Seat
+from giles.games.y.y_engine import YEngine, SWAP, WHITE, BLACK
 
 # What are the minimum and maximum sizes for the board?
 Y_MIN_SIZE = 2
 Y_MAX_SIZE = 26
 
-#      . 0
-#     . . 1
-#    . . . 2
-#   . . . . 3
-#  0 1 2 3
-#
-# (1, 2) is adjacent to (1, 1), (2, 2), (0, 2), (1, 3), (2, 3), and (0, 1).
-Y_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0), (1, 1), (-1, -1))
-
-# Because we're lazy and use a square board despite the shape of the Y, we
-# fill the rest of the square with invalid characters that match neither
-# side.  Define white and black here too.
-INVALID = "invalid"
-WHITE = "white"
-BLACK = "black"
-
 
 COL_CHARACTERS = "abcdefghijklmnopqrstuvwxyz"
 
@@ -69,18 +54,13 @@ class Y(SeatedGame):
         self.seats[0].data.color_code = "^W"
         self.seats[1].data.color = BLACK
         self.seats[1].data.color_code = "^K"
-        self.board = None
-        self.printable_board = None
+        self.engine = None
         self.size = 19
-        self.empty_space_count = None
         self.master = False
         self.turn = None
         self.turn_number = 0
         self.move_list = []
         self.last_moves = []
-        self.resigner = None
-        self.adjacency = None
-        self.found_winner = False
 
         # Y requires both seats, so may as well mark them active.
         self.seats[0].active = True
@@ -90,24 +70,8 @@ class Y(SeatedGame):
 
     def init_board(self):
 
-        self.board = []
-        self.empty_space_count = 0
-
-        # We're going to be lazy and build a square board, then fill the
-        # half that doesn't make the proper shape with invalid marks.
-        # The number of empty spaces on a Y board is equal to the sizeth
-        # triangular number; we abuse that to get the right empty space
-        # count while we're at it.
-        for x in range(self.size):
-            self.board.append([None] * self.size)
-            self.empty_space_count += x + 1
-
-            # Looking at the grid above, you can see that for a given column,
-            # all row values less than that value are invalid.
-            for y in range(x):
-                self.board[x][y] = INVALID
-
-        # That's it!
+        # The engine holds the board and the rules; we just talk to people.
+        self.engine = YEngine(self.size, self.master)
 
     def set_size(self, player, size_str):
 
@@ -123,7 +87,7 @@ class Y(SeatedGame):
         # Got a valid size.
         self.size = new_size
         self.init_board()
-        self.update_printable_board()
+        self.mark_board_dirty()
         self.channel.broadcast_cc(self.prefix + "^M%s^~ has changed the size of the board to ^C%s^~.\n" % (player, str(new_size)))
         return True
 
@@ -137,6 +101,7 @@ class Y(SeatedGame):
             else:
                 self.master = False
                 display_str = "^coff^~"
+            self.engine.master = self.master
             self.channel.broadcast_cc(self.prefix + "^R%s^~ has turned ^GMaster Y^~ mode %s.\n" % (player, display_str))
         else:
             player.tell_cc(self.prefix + "Not a valid boolean!\n")
@@ -151,14 +116,14 @@ class Y(SeatedGame):
             return None
 
         # If you're in master mode and it's the first turn, only one move.
-        if self.master and self.turn_number == 1 and move_count != 1:
+        if self.master and not self.engine.turn_count and move_count != 1:
             seat.player.tell_cc(self.prefix + "You can only make one move on the first turn.\n")
             return None
 
         # You make two moves per turn in master mode (unless there's only
         # one space left on the board).
-        if self.master and self.turn_number > 1 and move_count != 2:
-            if not (self.empty_space_count == 1 and move_count == 1):
+        if self.master and self.engine.turn_count and move_count != 2:
+            if not (self.engine.empty_count == 1 and move_count == 1):
                 seat.player.tell_cc(self.prefix + "You must make two moves per turn.\n")
                 return None
 
@@ -168,11 +133,11 @@ class Y(SeatedGame):
             move_str = "%s%s" % (COL_CHARACTERS[x], y + 1)
 
             # Check bounds.
-            if (x < 0 or x > y or y >= self.size):
+            if not self.engine.is_valid(x, y):
                 seat.player.tell_cc(self.prefix + "^R%s^~ is out of bounds.\n" % move_str)
                 return None
 
-            if self.board[x][y]:
+            if not self.engine.is_empty(x, y):
                 seat.player.tell_cc(self.prefix + "^R%s^~ is already occupied.\n" % move_str)
                 return None
 
@@ -188,25 +153,25 @@ class Y(SeatedGame):
 
         # All the moves were valid.  Make them.
         self.last_moves = []
-        for x, y in valid_moves:
-            self.board[x][y] = seat.data.color
-            self.last_moves.append((x, y))
+        for move in valid_moves:
+            self.engine.apply(move)
+            self.last_moves.append(move)
         move_str = ", ".join(move_strs)
         self.channel.broadcast_cc(self.prefix + seat.data.color_code + "%s^~ has moved to ^C%s^~.\n" % (seat.player_name, move_str))
-        self.empty_space_count -= move_count
         return (valid_moves)
 
     def swap(self):
 
-        # This is an easy one.  Take the first move and change the piece
-        # on the board from white to black.
-        self.board[self.move_list[0][0][0]][self.move_list[0][0][1]] = BLACK
+        # This is an easy one.  The engine changes White's first piece to
+        # black.
+        self.engine.apply(SWAP)
         self.channel.broadcast_cc(self.prefix + "^Y%s^~ has swapped ^WWhite^~'s first move.\n" % self.seats[1].player_name)
         self.turn_number += 1
 
-    def update_printable_board(self):
+    def render_board(self):
 
-        self.printable_board = []
+        board = self.engine.board
+        lines = []
         slash_line = " "
         char_line = ""
         for x in range(self.size):
@@ -219,7 +184,7 @@ class Y(SeatedGame):
             for spc in range(self.size - x):
                 msg += " "
             for y in range(x + 1):
-                piece = self.board[y][x]
+                piece = board[y][x]
                 if (y, x) in self.last_moves:
                     msg += "^5"
                 if piece == BLACK:
@@ -231,16 +196,14 @@ class Y(SeatedGame):
                 else:
                     msg += "^M.^~ "
             msg += "- " + str(x + 1) + "\n"
-            self.printable_board.append(msg)
-        self.printable_board.append(slash_line + "\n")
-        self.printable_board.append(char_line + "\n")
+            lines.append(msg)
+        lines.append(slash_line + "\n")
+        lines.append(char_line + "\n")
+        return "".join(lines)
 
     def print_board(self, player):
 
-        if not self.printable_board:
-            self.update_printable_board()
-        for line in self.printable_board:
-            player.tell_cc(line)
+        self.tell_board(player)
 
     def get_turn_str(self):
         if self.state.get() == "playing":
@@ -263,7 +226,7 @@ class Y(SeatedGame):
 
         # Okay, this person can resign; it's their turn, after all.
         self.channel.broadcast_cc(self.prefix + "^R%s^~ is resigning from the game.\n" % seat.player_name)
-        self.resigner = seat.data.color
+        self.engine.resign(seat.data.color)
         return True
 
     def show(self, player):
@@ -291,7 +254,7 @@ class Y(SeatedGame):
             self.state.set("playing")
             self.channel.broadcast_cc(self.prefix + "^WWhite^~: ^R%s^~; ^KBlack^~: ^Y%s^~\n" %
                (self.seats[0].player_name, self.seats[1].player_name))
-            self.turn = WHITE
+            self.turn = self.engine.turn
             self.turn_number = 1
             self.send_board()
             self.channel.broadcast_cc(self.prefix + self.get_turn_str())
@@ -367,7 +330,7 @@ class Y(SeatedGame):
 
             elif primary in ('swap',):
 
-                if self.turn_number == 2 and seat.player == player:
+                if self.engine.can_swap() and seat.player == player:
                     self.swap()
                     move = "swap"
                     made_move = True
@@ -387,7 +350,7 @@ class Y(SeatedGame):
 
             if made_move:
 
-                self.update_printable_board()
+                self.mark_board_dirty()
                 self.send_board()
                 self.move_list.append(move)
                 self.turn_number += 1
@@ -397,10 +360,7 @@ class Y(SeatedGame):
                     self.resolve(winner)
                     self.finish()
                 else:
-                    if self.turn == WHITE:
-                        self.turn = BLACK
-                    else:
-                        self.turn = WHITE
+                    self.turn = self.engine.turn
                     self.channel.broadcast_cc(self.prefix + self.get_turn_str())
 
         if not handled:
@@ -408,85 +368,15 @@ class Y(SeatedGame):
 
     def find_winner(self):
 
-
-        # First, check resignations; that's a fast bail.
-        if self.resigner:
-            if self.resigner == WHITE:
-                return self.seats[1].player_name
-            elif self.resigner == BLACK:
-                return self.seats[0].player_name
-            else:
-                self.server.log.log(self.log_prefix + "Weirdness; a resign that's not a player.")
-                return None
-
-        # Well, darn, we have to do actual work.  Time for recursion!
-        # To calculate a winner:
-        #    - Pick a side.
-        #    - For each piece on that side, see if it's connected to
-        #      both other sides.  If so, that player is a winner.
-        #    - If not, there is no winner (as winners must connect all
-        #      three sides).
-
-        self.found_winner = None
-        self.adjacency = []
-
-        # Set up our adjacency checker.
-        for i in range(self.size):
-            self.adjacency.append([None] * self.size)
-
-        # For each piece on the left side of the board...
-        for i in range(self.size):
-            if self.board[0][i]:
-
-                # We're not touching the other two sides yet.
-                self.touch_bottom = False
-                self.touch_right = False
-                self.update_adjacency(0, i, self.board[0][i])
-
-                if self.found_winner == WHITE:
-                    return self.seats[0].player_name
-                elif self.found_winner == BLACK:
-                    return self.seats[1].player_name
+        # The engine handles both resignations and connections.
+        winner = self.engine.winner()
+        if winner == WHITE:
+            return self.seats[0].player_name
+        elif winner == BLACK:
+            return self.seats[1].player_name
 
         # No winner yet.
         return None
 
-    def update_adjacency(self, x, y, color):
-
-        # Skip work if a winner's already found.
-        if self.found_winner:
-            return
-
-        # Skip work if we're off the board.
-        if (x < 0 or x > y or y >= self.size):
-            return
-
-        # Skip work if we've been here already.
-        if self.adjacency[x][y]:
-            return
-
-        # Skip work if it's empty or for the other player.
-        this_cell = self.board[x][y]
-        if this_cell != color:
-            return
-
-        # All right, it's this player's cell.  Mark it visited.
-        self.adjacency[x][y] = color
-
-        # If we're on either the bottom or right edges, mark that.
-        if (y == self.size - 1):
-            self.touch_bottom = True
-
-        if (x == y):
-            self.touch_right = True
-
-        # Bail if we've met both win conditions.
-        if self.touch_bottom and self.touch_right:
-            self.found_winner = color
-
-        # Okay, no winner yet.  Recurse on the six adjacent cells.
-        for x_delta, y_delta in Y_DELTAS:
-            self.update_adjacency(x + x_delta, y + y_delta, color)
-
     def resolve(self, winner):
         self.channel.broadcast_cc(self.prefix + "^C%s^~ wins!\n" % (winner))
@@ -0,0 +1,198 @@
+# Giles: y_engine.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from giles.games.connectivity import ConnectionTracker
+from giles.games.connectivity import EDGE_TOP, EDGE_RIGHT, EDGE_DIAGONAL
+from giles.games.engine import Engine
+from giles.games.geometry import TRIANGULAR
+
+#      . 0
+#     . . 1
+#    . . . 2
+#   . . . . 3
+#  0 1 2 3
+#
+# (1, 2) is adjacent to (1, 1), (2, 2), (0, 2), (1, 3), (2, 3), and (0, 1).
+#
+# The connectivity code treats x as the row, so the left side of the Y is
+# its "top," the bottom side its "right," and the x = y side its diagonal.
+Y_GOAL = EDGE_TOP | EDGE_RIGHT | EDGE_DIAGONAL
+
+# Because we're lazy and use a square board despite the shape of the Y, we
+# fill the rest of the square with invalid characters that match neither
+# side.  Define white and black here too.
+INVALID = "invalid"
+WHITE = "white"
+BLACK = "black"
+
+# The move that swaps White's first stone.
+SWAP = "swap"
+
+class YEngine(Engine):
+    """The rules of Y, and of Master Y, where every turn but the first is
+    two stones.  The board is board[x][y], valid where x <= y.  A move is a
+    single stone, as an (x, y) tuple, so a Master Y turn is two moves by
+    the same side; the turn only passes once the side has placed all of
+    its stones for the turn.  SWAP is Black's alternative first turn.
+    """
+
+    def __init__(self, size, master=False):
+
+        super(YEngine, self).__init__()
+
+        self.size = size
+        self.master = master
+        self.board = []
+        self.empty_count = 0
+
+        # We're going to be lazy and build a square board, then fill the
+        # half that doesn't make the proper shape with invalid marks.
+        # The number of empty spaces on a Y board is equal to the sizeth
+        # triangular number; we abuse that to get the right empty space
+        # count while we're at it.
+        for x in range(size):
+            self.board.append([None] * size)
+            self.empty_count += x + 1
+
+            # Looking at the grid above, you can see that for a given column,
+            # all row values less than that value are invalid.
+            for y in range(x):
+                self.board[x][y] = INVALID
+
+        self.connections = {
+            WHITE: ConnectionTracker(TRIANGULAR, size, size),
+            BLACK: ConnectionTracker(TRIANGULAR, size, size),
+        }
+
+        self.turn = WHITE
+        self.turn_count = 0
+        self.placed = 0
+        self.first_move = None
+        self.resigner = None
+
+    def rebuild_connections(self):
+
+        # Only a swap changes the colour of a piece, and it happens with a
+        # single piece on the board, so just start over.
+        for color in self.connections:
+            self.connections[color].clear()
+        for x in range(self.size):
+            for y in range(x, self.size):
+                color = self.board[x][y]
+                if color:
+                    self.connections[color].add_cell(x, y)
+
+    def is_valid(self, x, y):
+        return 0 <= x <= y < self.size
+
+    def is_empty(self, x, y):
+        return not self.board[x][y]
+
+    def stones_per_turn(self):
+
+        # One stone per turn, except in Master Y, where it's two after the
+        # first turn (unless there's only one space left).
+        if not self.master or not self.turn_count:
+            return 1
+        return min(2, self.empty_count + self.placed)
+
+    def can_swap(self):
+
+        # Black can swap only instead of their first turn.
+        return self.turn_count == 1 and not self.placed
+
+    def other(self, color):
+
+        if color == WHITE:
+            return BLACK
+        return WHITE
+
+    def end_turn(self):
+
+        self.turn_count += 1
+        self.placed = 0
+        self.turn = self.other(self.turn)
+
+    def swap(self):
+
+        # An easy one: White's first piece changes colour.
+        x, y = self.first_move
+        self.board[x][y] = BLACK
+        self.rebuild_connections()
+
+    def legal_moves(self):
+
+        if self.winner():
+            return []
+        moves = []
+        for x in range(self.size):
+            for y in range(x, self.size):
+                if not self.board[x][y]:
+                    moves.append((x, y))
+        if self.can_swap():
+            moves.append(SWAP)
+        return moves
+
+    def is_legal(self, move):
+
+        if move == SWAP:
+            return self.can_swap()
+        x, y = move
+        return self.is_valid(x, y) and self.is_empty(x, y)
+
+    def apply(self, move):
+
+        if move == SWAP:
+            self.swap()
+            self.end_turn()
+            return
+
+        x, y = move
+        self.board[x][y] = self.turn
+        self.connections[self.turn].add_cell(x, y)
+        if not self.first_move:
+            self.first_move = move
+        self.empty_count -= 1
+        self.placed += 1
+        if self.placed >= self.stones_per_turn():
+            self.end_turn()
+
+    def resign(self, color):
+        self.resigner = color
+
+    def winner(self):
+
+        if self.resigner:
+            return self.other(self.resigner)
+
+        # Pieces are added to their colour's connection tracker as they're
+        # placed; a winner is anyone with a group touching all three sides.
+        if self.connections[WHITE].connects(Y_GOAL):
+            return WHITE
+        elif self.connections[BLACK].connects(Y_GOAL):
+            return BLACK
+        return None
+
+    def copy(self):
+
+        new_engine = YEngine.__new__(YEngine)
+        new_engine.__dict__.update(self.__dict__)
+        new_engine.board = [column[:] for column in self.board]
+        new_engine.connections = {
+            WHITE: self.connections[WHITE].copy(),
+            BLACK: self.connections[BLACK].copy(),
+        }
+        return new_engine
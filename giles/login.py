@@ -57,6 +57,15 @@ class Login(object):
                     player.tell("\nWelcome, %s!\n" % player)
                     player.state = State("chat")
 
+                    # Timestamps are on by default once they're in, but
+                    # they may have saved settings of their own.
+                    player.config["timestamps"] = True
+                    if self.server.profile_store.load(player):
+                        player.tell("Your saved settings have been restored.\n")
+
+                    # They may have been playing before a restart.
+                    self.server.game_master.reattach(player)
+
                     self.server.log.log("%s logged in from %s." % (player, player.client.addrport()))
 
                 else:
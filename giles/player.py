@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from giles.utils import name_is_valid, MAX_NAME_LENGTH
+from miniboa.xterm import colorize
 
 class Player(object):
     """A player on Giles.  Tracks their name, current location, and other
@@ -38,6 +39,7 @@ class Player(object):
 
             "color": True,
             "timestamps": False,
+            "board_mode": "full",
         }
         self.state = state
 
@@ -101,6 +103,14 @@ class Player(object):
             msg = "(^C%s^~) %s" % (self.server.timestamp, msg)
         self.client.send_cc(msg)
 
+    def tell_colorized(self, msg):
+
+        # For text that's already been colorized to suit this player's
+        # color setting, such as a game board shared by everyone watching.
+        if self.config["timestamps"]:
+            msg = colorize("(^C%s^~) " % self.server.timestamp, self.config["color"]) + msg
+        self.client.send(msg)
+
     def prompt(self):
         if self.server.admin_manager.is_admin(self):
             loc_color_code = "^R"
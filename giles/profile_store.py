@@ -0,0 +1,128 @@
+# Giles: profile_store.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import sqlite3
+
+# The parts of a player's config worth keeping between sessions.  The rest
+# (their last channel, focused table, and so on) only means anything while
+# they're connected.
+PROFILE_KEYS = (
+    "channel_aliases",
+    "player_aliases",
+    "table_aliases",
+    "color",
+    "timestamps",
+    "board_mode",
+)
+
+# Aliases are numbered, but JSON keys can only be strings.
+ALIAS_KEYS = ("channel_aliases", "player_aliases", "table_aliases")
+
+class ProfileStore(object):
+    """Keeps players' settings between sessions, in an SQLite database.
+
+    Profiles are cached once they've been looked up, so a player logging
+    in costs at most one query by name, and a player reconnecting costs
+    none.  Saving a profile only changes the cache; flush() writes every
+    changed profile out in a single transaction, and the server calls it
+    every so often rather than on every command.
+    """
+
+    def __init__(self, filename):
+
+        self.db = sqlite3.connect(filename)
+        self.db.execute("CREATE TABLE IF NOT EXISTS profiles "
+                        "(name TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        self.db.commit()
+
+        # Name -> profile dictionary, or None if they don't have one.
+        self.cache = {}
+        self.dirty = set()
+
+    def encode(self, profile):
+        return json.dumps(profile, sort_keys=True)
+
+    def decode(self, data):
+
+        profile = {}
+        for key, value in json.loads(data).items():
+            key = str(key)
+            if key in ALIAS_KEYS:
+                value = dict([(int(num), str(name)) for num, name in value.items()])
+            elif isinstance(value, unicode):
+                value = str(value)
+            profile[key] = value
+        return profile
+
+    def get(self, name):
+
+        if name in self.cache:
+            return self.cache[name]
+
+        row = self.db.execute("SELECT data FROM profiles WHERE name = ?",
+                              (name,)).fetchone()
+        profile = None
+        if row:
+            profile = self.decode(row[0])
+        self.cache[name] = profile
+        return profile
+
+    def load(self, player):
+
+        # Puts the player's saved settings into their config.  Returns
+        # whether they had any.
+        profile = self.get(player.name)
+        if not profile:
+            return False
+
+        for key in PROFILE_KEYS:
+            if key in profile:
+                value = profile[key]
+                if key in ALIAS_KEYS:
+                    value = dict(value)
+                player.config[key] = value
+        player.client.use_ansi = player.config["color"]
+        return True
+
+    def save(self, player):
+
+        # Notes the player's current settings, to be written out at the
+        # next flush.  Cheap if nothing has changed, so call it freely.
+        profile = {}
+        for key in PROFILE_KEYS:
+            value = player.config[key]
+            if key in ALIAS_KEYS:
+                value = dict(value)
+            profile[key] = value
+
+        if profile != self.cache.get(player.name):
+            self.cache[player.name] = profile
+            self.dirty.add(player.name)
+
+    def flush(self):
+
+        # Writes out every profile that's changed since the last flush.
+        # Returns how many there were.
+        if not self.dirty:
+            return 0
+
+        rows = [(name, self.encode(self.cache[name])) for name in self.dirty]
+        self.db.executemany("INSERT OR REPLACE INTO profiles (name, data) "
+                            "VALUES (?, ?)", rows)
+        self.db.commit()
+        self.dirty = set()
+        return len(rows)
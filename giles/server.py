@@ -30,7 +30,9 @@ from giles.location import Location
 from giles.log import Log
 from giles.login import Login
 from giles.player import Player
+from giles.profile_store import ProfileStore
 from giles.state import State
+from giles.table_store import TableStore
 
 # How many seconds and, if time is wonky, ticks should pass between cleanup
 # sweeps?  Ticks (on my system) are roughly 20/s.  Tweak as appropriate.
@@ -45,13 +47,22 @@ KEEPALIVE_INTERVAL_TICKS = 1500
 GAMEINTERVAL_TICKS_SECONDS = 0.5
 GAMETICK_INTERVAL_TICKS = 20
 
+# And writing out changed player profiles?
+PROFILE_FLUSH_INTERVAL_SECONDS = 30
+PROFILE_FLUSH_INTERVAL_TICKS = 750
+
+# And snapshotting tables?
+SNAPSHOT_INTERVAL_SECONDS = 10
+SNAPSHOT_INTERVAL_TICKS = 250
+
 class Server(object):
     """The Giles server itself.  Tracks all players, games in progress,
     and so on.
     """
 
     def __init__(self, name="Giles", source_url=None, admin_password=None,
-                 config_filename=None):
+                 config_filename=None, profile_filename=":memory:",
+                 snapshot_filename=":memory:"):
 
         if not source_url:
             print("Nice try setting source_url to nothing.  Bailing.")
@@ -76,6 +87,8 @@ class Server(object):
         self.game_master = GameMaster(self)
         self.chat = Chat(self)
         self.login = Login(self)
+        self.profile_store = ProfileStore(profile_filename)
+        self.table_store = TableStore(snapshot_filename)
 
         # The admin manager needs the channel manager.
         self.admin_manager = AdminManager(self, admin_password)
@@ -85,15 +98,19 @@ class Server(object):
 
         # Set up the global channel for easy access.
         self.wall = self.channel_manager.channels[0]
+
+        # Pick up any tables that were in play when we last shut down.
+        self.game_master.restore_tables()
         self.log.log("Server started up.")
 
-    def instantiate(self, port=9435, timeout=.05):
+    def instantiate(self, port=9435, timeout=.05, compress_level=6):
         self.telnet = TelnetServer(
            port=port,
            address='',
            on_connect=self.connect_client,
            on_disconnect=self.disconnect_client,
-           timeout=timeout)
+           timeout=timeout,
+           compress_level=compress_level)
         self.update_timestamp()
 
     def update_timestamp(self):
@@ -109,7 +126,9 @@ class Server(object):
     def loop(self):
 
         cleanup_time = keepalive_time = gametick_time = time.time()
+        profile_time = snapshot_time = cleanup_time
         cleanup_ticker = keepalive_ticker = gametick_ticker = 0
+        profile_ticker = snapshot_ticker = 0
         while self.should_run:
             self.telnet.poll()
             self.handle_players()
@@ -148,7 +167,25 @@ class Server(object):
                         self.announce_midnight()
                     self.update_prompts()
 
+            profile_ticker += 1
+            if ((profile_time + PROFILE_FLUSH_INTERVAL_SECONDS <= curr_time) or
+             ((profile_ticker % PROFILE_FLUSH_INTERVAL_TICKS) == 0)):
+                self.flush_profiles()
+                profile_time = curr_time
+                profile_ticker = 0
+
+            snapshot_ticker += 1
+            if ((snapshot_time + SNAPSHOT_INTERVAL_SECONDS <= curr_time) or
+             ((snapshot_ticker % SNAPSHOT_INTERVAL_TICKS) == 0)):
+                self.snapshot_tables()
+                snapshot_time = curr_time
+                snapshot_ticker = 0
+
         self.log.log("Server shutting down.")
+        for player in self.players:
+            self.save_profile(player)
+        self.flush_profiles()
+        self.snapshot_tables()
 
     def connect_client(self, client):
 
@@ -164,11 +201,16 @@ class Server(object):
         client.request_will_echo()
         client.request_will_sga()
 
+        # Offer to compress their output, if we're configured to.
+        if client.compress_level:
+            client.request_will_compress()
+
     def disconnect_client(self, client):
         self.log.log("Client disconnect on port %s." % client.addrport())
 
         for player in self.players:
             if client == player.client:
+                self.save_profile(player)
                 self.admin_manager.remove_player(player)
                 self.channel_manager.remove_player(player)
                 self.game_master.remove_player(player)
@@ -193,6 +235,30 @@ class Server(object):
                     self.log.log("The chat module bombed with player %s: %s\n%s" % (player.name, e, traceback.format_exc()))
                     player.prompt()
 
+    def save_profile(self, player):
+
+        # Players who haven't finished logging in don't have a name yet.
+        if player.state.get() == "chat":
+            self.profile_store.save(player)
+
+    def flush_profiles(self):
+
+        try:
+            count = self.profile_store.flush()
+            if count:
+                self.log.log("Saved %d player profile(s)." % count)
+        except Exception as e:
+            self.log.log("Saving player profiles failed: %s\n%s" % (e, traceback.format_exc()))
+
+    def snapshot_tables(self):
+
+        try:
+            written, dropped = self.game_master.snapshot_tables()
+            if written or dropped:
+                self.log.log("Snapshotted %d table(s); dropped %d." % (written, dropped))
+        except Exception as e:
+            self.log.log("Snapshotting tables failed: %s\n%s" % (e, traceback.format_exc()))
+
     def announce_midnight(self):
         for player in self.players:
             player.tell_cc("It is now ^C%s^~.\n" % self.current_day)
@@ -0,0 +1,97 @@
+# Giles: table_store.py
+# Copyright 2012 Phil Bordelon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import cPickle
+import sqlite3
+import zlib
+
+# Bump this whenever the way snapshots are stored changes.  Games have a
+# snapshot_version of their own for changes to what's in them.
+FORMAT_VERSION = 1
+
+def class_path(table):
+    return ".".join((table.__class__.__module__, table.__class__.__name__))
+
+class TableStore(object):
+    """Keeps snapshots of running tables in an SQLite database, so they
+    can be picked up again after a restart.
+
+    A snapshot is the table pickled and compressed.  write() takes one of
+    every table, but only writes out the ones that have changed since it
+    last did, and drops the ones for tables that have gone away, all in a
+    single transaction.
+    """
+
+    def __init__(self, filename):
+
+        self.db = sqlite3.connect(filename)
+        self.db.execute("CREATE TABLE IF NOT EXISTS tables "
+                        "(name TEXT PRIMARY KEY, class TEXT NOT NULL, "
+                        "format INTEGER NOT NULL, version INTEGER NOT NULL, "
+                        "data BLOB NOT NULL)")
+        self.db.commit()
+
+        # Table name -> the snapshot we last wrote for it.
+        self.written = {}
+
+    def snapshot(self, table):
+        return zlib.compress(cPickle.dumps(table, cPickle.HIGHEST_PROTOCOL))
+
+    def read(self):
+        """Returns (name, class path, game snapshot version, data) for
+        every snapshot stored in the current format.
+        """
+
+        rows = self.db.execute("SELECT name, class, format, version, data "
+                               "FROM tables").fetchall()
+        snapshots = []
+        for name, path, format, version, data in rows:
+            data = str(data)
+            self.written[name] = data
+            if format == FORMAT_VERSION:
+                snapshots.append((str(name), str(path), version, data))
+        return snapshots
+
+    def load(self, data):
+        return cPickle.loads(zlib.decompress(data))
+
+    def write(self, snapshots):
+        """Writes out snapshots, a dictionary of table names to (table,
+        data) pairs, and forgets every table that isn't in it.  Returns
+        how many snapshots were written and how many dropped.
+        """
+
+        rows = []
+        for name, (table, data) in snapshots.items():
+            if self.written.get(name) != data:
+                rows.append((name, class_path(table), FORMAT_VERSION,
+                             table.snapshot_version, buffer(data)))
+        gone = [(name,) for name in self.written if name not in snapshots]
+
+        if not rows and not gone:
+            return (0, 0)
+
+        self.db.executemany("INSERT OR REPLACE INTO tables "
+                            "(name, class, format, version, data) "
+                            "VALUES (?, ?, ?, ?, ?)", rows)
+        self.db.executemany("DELETE FROM tables WHERE name = ?", gone)
+        self.db.commit()
+
+        for name, (table, data) in snapshots.items():
+            self.written[name] = data
+        for name, in gone:
+            del self.written[name]
+        return (len(rows), len(gone))
@@ -55,7 +55,7 @@ class TelnetServer(object):
     Poll sockets for new connections and sending/receiving data from clients.
     """
     def __init__(self, port=7777, address='', on_connect=_on_connect,
-            on_disconnect=_on_disconnect, timeout=0.005):
+            on_disconnect=_on_disconnect, timeout=0.005, compress_level=0):
         """
         Create a new Telnet Server.
 
@@ -75,6 +75,10 @@ class TelnetServer(object):
 
         timeout -- amount of time that Poll() will wait from user inport
             before returning.  Also frees a slice of CPU time.
+
+        compress_level -- zlib compression level, 1 to 9, for clients that
+            agree to MCCP.  0 means don't offer it.  Offering it is up to
+            on_connect; see TelnetClient.request_will_compress().
         """
 
         self.port = port
@@ -82,6 +86,7 @@ class TelnetServer(object):
         self.on_connect = on_connect
         self.on_disconnect = on_disconnect
         self.timeout = timeout
+        self.compress_level = compress_level
 
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -173,6 +178,7 @@ class TelnetServer(object):
                     continue
 
                 new_client = TelnetClient(sock, addr_tup)
+                new_client.compress_level = self.compress_level
                 #print "++ Opened connection to %s" % new_client.addrport()
                 ## Add the connection to our dictionary and call handler
                 self.clients[new_client.fileno] = new_client
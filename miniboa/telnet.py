@@ -18,11 +18,15 @@ Manage one Telnet client connected via a TCP/IP socket.
 
 import socket
 import time
+import zlib
 
 from miniboa.error import BogConnectionLost
 from miniboa.xterm import colorize
+from miniboa.xterm import visible_length
 from miniboa.xterm import word_wrap
 
+## Not every platform can cork a TCP socket.
+TCP_CORK = getattr(socket, 'TCP_CORK', None)
 
 #---[ Telnet Notes ]-----------------------------------------------------------
 # (See RFC 854 for more information)
@@ -94,6 +98,7 @@ SGA     = chr(  3)      # Suppress Go-Ahead
 TTYPE   = chr( 24)      # Terminal Type
 NAWS    = chr( 31)      # Negotiate About Window Size
 LINEMO  = chr( 34)      # Line Mode
+COMPRESS2 = chr( 86)    # MUD Client Compression Protocol, version 2
 
 
 #-----------------------------------------------------------------Telnet Option
@@ -131,10 +136,16 @@ class TelnetClient(object):
         self.columns = 80
         self.rows = 24
         self.send_pending = False
-        self.send_buffer = ''
+        self.send_buffer = ''       # Text waiting to go out
+        self.wire_buffer = ''       # Bytes, maybe compressed, for the socket
+        self.compress_level = 0     # zlib level for MCCP; 0 turns it off
+        self.compressor = None      # Set once MCCP has been agreed on
+        self.prompt_mark = None     # Where an unsent prompt redraw begins
+        self.corked = False         # Is the socket corked?
         self.recv_buffer = ''
         self.bytes_sent = 0
         self.bytes_received = 0
+        self.lines_sent = 0         # How far the DE's cursor has moved down
         self.cmd_ready = False
         self.command_list = []
         self.connect_time = time.time()
@@ -153,6 +164,14 @@ class TelnetClient(object):
         self.ansi_got_esc = False   # Did ESC begin an ANSI/VT100+ code?
         self.ansi_buffer = ''       # Buffer for keyboard escape codes
 
+        ## Everything for a client is gathered up and written at once, so
+        ## Nagle's algorithm has nothing to save us, and would only hold
+        ## back the last partial segment of a response.
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except socket.error:
+            pass
+
     def get_command(self):
         """
         Get a line of text that was received from the DE. The class's
@@ -167,26 +186,53 @@ class TelnetClient(object):
             self.cmd_ready = False
         return cmd
 
-    def _send(self, text):
+    def _send(self, text, lines=None):
         """
-        Send raw text to the distant end.
+        Send raw text to the distant end.  If the caller knows how many
+        lines it moves the cursor down by, such as for text full of cursor
+        movement, it can say so in lines rather than have us count.
         """
         if text:
+            if lines is None:
+                lines = self._count_lines(text)
+            self.lines_sent += lines
             self.send_buffer += text.replace('\n', '\r\n')
             self.send_pending = True
+            self.prompt_mark = None
+
+    def _count_lines(self, text):
+        """
+        Count the lines text moves the cursor down by on the DE, both
+        newlines and long lines wrapping at the edge of the screen.
+        """
+        count = text.count('\n')
+        if len(text) > self.columns:
+            for line in text.split('\n'):
+                length = visible_length(line)
+                if length > self.columns:
+                    count += (length - 1) // self.columns
+        return count
 
-    def send(self, text):
+    def send(self, text, lines=None):
         """
         Send raw text to the distant end. Redraw prompt if in char mode.
+        lines is as for _send().
         """
-        ## Erase current line with prompt and input if in char mode
+        ## Erase current line with prompt and input if in char mode.  If
+        ## the last thing we queued was a prompt that hasn't gone out yet,
+        ## just take it back instead, so a run of sends only draws the
+        ## prompt once.
         if self.prompt and self.telnet_echo:
-            self.send_buffer += colorize('^l\r')
+            if self.prompt_mark is not None:
+                self.send_buffer = self.send_buffer[:self.prompt_mark]
+            if not self.send_buffer.endswith('\n'):
+                self.send_buffer += colorize('^l\r')
 
-        self._send(text)
+        self._send(text, lines)
 
         ## Draw a new prompt and redraw pending input in char mode
         if self.prompt and self.telnet_echo:
+            self.prompt_mark = len(self.send_buffer)
             self.send_buffer += self.prompt + self.recv_buffer
 
     def send_cc(self, text):
@@ -288,6 +334,49 @@ class TelnetClient(object):
         self._iac_do(NAWS)
         self._note_reply_pending(NAWS, True)
 
+    def request_will_compress(self):
+        """
+        Offer to compress everything we send the DE, using the MUD Client
+        Compression Protocol, version 2.
+        """
+        self._iac_will(COMPRESS2)
+        self._note_reply_pending(COMPRESS2, True)
+
+    def _start_compression(self):
+        """
+        Begin the compressed stream.  Everything before the subnegotiation
+        goes out as it was; everything after it is compressed.
+        """
+        self._flush_send_buffer()
+        self.wire_buffer += '%c%c%c%c%c' % (IAC, SB, COMPRESS2, IAC, SE)
+        self.compressor = zlib.compressobj(self.compress_level)
+        self.send_pending = True
+
+    def _end_compression(self):
+        """
+        Finish the compressed stream; the DE carries on uncompressed.
+        """
+        self._flush_send_buffer()
+        self.wire_buffer += self.compressor.flush(zlib.Z_FINISH)
+        self.compressor = None
+        self.send_pending = True
+
+    def _flush_send_buffer(self):
+        """
+        Move pending text to the wire, compressing it if we're using MCCP.
+        A sync flush after each lot means the DE can show everything we've
+        sent so far; since the server sends once per poll, after handling
+        a command and redrawing the prompt, that's once per response.
+        """
+        if self.send_buffer:
+            if self.compressor:
+                self.wire_buffer += (self.compressor.compress(self.send_buffer)
+                    + self.compressor.flush(zlib.Z_SYNC_FLUSH))
+            else:
+                self.wire_buffer += self.send_buffer
+            self.send_buffer = ''
+            self.prompt_mark = None
+
     def request_terminal_type(self):
         """
         Begins the Telnet negotiations to request the terminal type from
@@ -300,19 +389,38 @@ class TelnetClient(object):
         """
         Called by TelnetServer when send data is ready.
         """
-        if len(self.send_buffer):
+        self._flush_send_buffer()
+        if len(self.wire_buffer):
             try:
-                sent = self.sock.send(self.send_buffer)
+                sent = self.sock.send(self.wire_buffer)
             except socket.error, err:
                 print("!! SEND error '%d:%s' from %s" % (err[0], err[1],
                     self.addrport()))
                 self.active = False
                 return
             self.bytes_sent += sent
-            self.send_buffer = self.send_buffer[sent:]
+            self.wire_buffer = self.wire_buffer[sent:]
+
+            ## If it didn't all fit, cork the socket until the rest has
+            ## gone, so it goes out in full segments rather than dribbles.
+            if self.wire_buffer:
+                self._set_cork(True)
+            elif self.corked:
+                self._set_cork(False)
         else:
             self.send_pending = False
 
+    def _set_cork(self, state):
+        """
+        Cork or uncork the socket, where the platform allows it.
+        """
+        if TCP_CORK is not None and state != self.corked:
+            try:
+                self.sock.setsockopt(socket.IPPROTO_TCP, TCP_CORK, int(state))
+                self.corked = state
+            except socket.error:
+                pass
+
     def socket_recv(self):
         """
         Called by TelnetServer when recv data is ready.
@@ -422,7 +530,11 @@ class TelnetClient(object):
         Echo a character back to the client; convert CR to CR/LF.
         """
 
+        self.prompt_mark = None
         if byte == '\r':
+            ## The prompt and the input on it may have wrapped, too.
+            line = self.prompt + self.recv_buffer
+            self.lines_sent += 1 + self._count_lines(line)
             self.send_buffer += '\r\n'
         elif self.telnet_echo_password:
             self.send_buffer += '*'
@@ -603,6 +715,18 @@ class TelnetClient(object):
                     self._iac_will(SGA)
                     ## Just nod
 
+            elif option == COMPRESS2:
+
+                if self._check_reply_pending(COMPRESS2):
+                    self._note_reply_pending(COMPRESS2, False)
+                    self._note_local_option(COMPRESS2, True)
+                    self._start_compression()
+
+                elif self._check_local_option(COMPRESS2) is UNKNOWN:
+                    ## We never offered, so refuse once.
+                    self._note_local_option(COMPRESS2, False)
+                    self._iac_wont(COMPRESS2)
+
             else:
 
                 ## ALL OTHER OTHERS = Default to refusing once
@@ -652,6 +776,16 @@ class TelnetClient(object):
                     self._iac_will(SGA)
                     ## Just nod
 
+            elif option == COMPRESS2:
+
+                if self._check_reply_pending(COMPRESS2):
+                    self._note_reply_pending(COMPRESS2, False)
+                    self._note_local_option(COMPRESS2, False)
+
+                elif self.compressor:
+                    self._note_local_option(COMPRESS2, False)
+                    self._end_compression()
+
             else:
 
                 ## ALL OTHER OPTIONS = Default to ignoring
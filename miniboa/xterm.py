@@ -59,6 +59,12 @@ _ANSI_CODES = (
     ( '^l', '\x1b[2K'),         # clear to end of line
     )
 
+## Every caret code colorize() knows, apart from the '^^' escape.
+CARET_CODES = frozenset([token for token, code in _ANSI_CODES])
+
+## Matches the ANSI sequences that take up no room on the screen.
+_ANSI_SEQUENCE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
 
 def strip_caret_codes(text):
     """
@@ -71,6 +77,15 @@ def strip_caret_codes(text):
     return text.replace('\x00', '^')
 
 
+def visible_length(text):
+    """
+    Return how many columns already-colorized text takes up on screen.
+    """
+    if '\x1b' in text:
+        text = _ANSI_SEQUENCE.sub('', text)
+    return len(text)
+
+
 def colorize(text, ansi=True):
     """
     If the client wants ansi, replace the tokens with ansi sequences --